@@ -1600,8 +1600,9 @@ class CPdbData(CPdbDataStub):
             selection_string: Selection string (e.g., "A/27.A", "{A/ or B/} and {(ALA)}")
 
         Returns:
-            Tuple of (num_atoms, selected_atoms_list)
-            where selected_atoms_list is list of (model, chain, residue, atom) tuples
+            Tuple of (num_atoms, selected_atoms)
+            where selected_atoms is an AtomSelection: a sequence of
+            (model, chain, residue, atom) tuples, created when iterated
 
         Raises:
             ValueError: If selection string is invalid or structure not loaded
@@ -1619,10 +1620,17 @@ class CPdbData(CPdbDataStub):
 
         try:
             # Parse and evaluate selection using our coordinate_selection module
-            from core.coordinate_selection import parse_selection, evaluate_selection
+            from core.coordinate_selection import (
+                AtomTable, SelectionEvaluator, compile_selection
+            )
 
-            ast = parse_selection(selection_string)
-            selected_atoms = evaluate_selection(ast, gemmi_structure)
+            ast = compile_selection(selection_string)
+            # The atom table is built once per loaded structure
+            atom_table = getattr(self, '_atom_table', None)
+            if atom_table is None or atom_table.structure is not gemmi_structure:
+                atom_table = AtomTable(gemmi_structure)
+                object.__setattr__(self, '_atom_table', atom_table)
+            selected_atoms = SelectionEvaluator(gemmi_structure, atom_table).select(ast)
 
             return (len(selected_atoms), selected_atoms)
 
@@ -1805,7 +1813,9 @@ class CPdbDataFile(CPdbDataFileStub):
 
     def setContentFlag(self):
         """
-        Introspect the PDB/mmCIF file using gemmi to determine the format type.
+        Set the format type of the PDB/mmCIF file from its extension or first line.
+
+        The structure itself is not read (see _introspect_content_flag).
 
         Sets self.contentFlag to:
         - 1 (CONTENT_FLAG_PDB): PDB format
@@ -1815,49 +1825,9 @@ class CPdbDataFile(CPdbDataFileStub):
         Returns:
             int: The detected content flag value
         """
-        import gemmi
-        from pathlib import Path
-
-        input_path = self.getFullPath()
-        if not input_path or not Path(input_path).exists():
-            self.contentFlag.set(0)
-            return 0
-
-        try:
-            # Use gemmi to read the structure - it auto-detects format
-            structure = gemmi.read_structure(input_path)
-
-            # Check the file extension to determine format
-            path = Path(input_path)
-            suffix = path.suffix.lower()
-
-            # mmCIF files
-            if suffix in ['.cif', '.mmcif']:
-                self.contentFlag.set(self.CONTENT_FLAG_MMCIF)
-                return self.CONTENT_FLAG_MMCIF
-            # PDB files
-            elif suffix in ['.pdb', '.ent']:
-                self.contentFlag.set(self.CONTENT_FLAG_PDB)
-                return self.CONTENT_FLAG_PDB
-            else:
-                # Default to PDB if ambiguous
-                self.contentFlag.set(self.CONTENT_FLAG_PDB)
-                return self.CONTENT_FLAG_PDB
-
-        except Exception as e:
-            # If gemmi fails, fall back to simple text introspection
-            try:
-                with open(input_path, 'r') as f:
-                    first_line = f.readline().strip()
-                    if first_line.startswith('data_') or first_line.startswith('loop_'):
-                        self.contentFlag.set(self.CONTENT_FLAG_MMCIF)
-                        return self.CONTENT_FLAG_MMCIF
-                    else:
-                        self.contentFlag.set(self.CONTENT_FLAG_PDB)
-                        return self.CONTENT_FLAG_PDB
-            except Exception:
-                self.contentFlag.set(0)
-                return 0
+        flag = self._introspect_content_flag() or 0
+        self.contentFlag.set(flag)
+        return flag
 
     def fileExtensions(self):
         """
@@ -132,6 +132,15 @@ class CPluginScript(CData):
         # waitForFinished = -1 also triggers async mode (legacy compatibility)
         self.waitForFinished = 0
 
+        # Live program output. Wrappers may set either handler before startProcess():
+        # - _processOutputHandler(pid, stream, data): called (or awaited, if a
+        #   coroutine function) with each chunk of output after it is logged
+        # - _readyReadStandardOutputHandler(): legacy QProcess slot that reads
+        #   PROCESSMANAGER().getJobData(pid, attribute='qprocess')
+        self._processOutputHandler = None
+        self._readyReadStandardOutputHandler = None
+        self._qprocess = None
+
         # Child job counter for sub-plugins (follows legacy convention)
         self._childJobCounter = 0
 
@@ -1608,17 +1617,48 @@ class CPluginScript(CData):
 
     def _startProcessSync(self) -> CErrorReport:
         """Synchronous process execution using subprocess.run()."""
-        import subprocess
-        import os
-
-        error = CErrorReport()
-
         # Register with PROCESSMANAGER so it can return our exit code
         from core.CCP4Modules import PROCESSMANAGER
         PROCESSMANAGER().register(self)
 
         # Prepare execution environment (common setup)
         prep = self._prepareProcessExecution()
+
+        if self._processOutputHandler or self._readyReadStandardOutputHandler:
+            return self._startProcessStreaming(prep)
+        return self._runProcessSync(prep)
+
+    def _writeLogHeader(self, stdout_file, command):
+        """Write the task name, command line and command script at the top of the LOG."""
+        # Write formatted header to stdout
+        stdout_file.write("="*70 + "\n")
+        stdout_file.write(f"CCP4i2 Task: {self.TASKNAME}\n")
+        stdout_file.write("="*70 + "\n\n")
+
+        # Write command line
+        stdout_file.write("Command Line:\n")
+        stdout_file.write("-" * 70 + "\n")
+        stdout_file.write(f"{' '.join(command)}\n\n")
+
+        # Write command script if present
+        if self.commandScript:
+            stdout_file.write("Command Script (stdin):\n")
+            stdout_file.write("-" * 70 + "\n")
+            for line in self.commandScript:
+                stdout_file.write(line)
+            stdout_file.write("\n")
+
+        stdout_file.write("="*70 + "\n")
+        stdout_file.write("Program Output:\n")
+        stdout_file.write("="*70 + "\n\n")
+        stdout_file.flush()
+
+    def _runProcessSync(self, prep: dict) -> CErrorReport:
+        """Run the prepared command with subprocess.run(), output going to the log files."""
+        import subprocess
+        import os
+
+        error = CErrorReport()
         command = prep['command']
         stdout_path = prep['stdout_path']
         stderr_path = prep['stderr_path']
@@ -1628,28 +1668,7 @@ class CPluginScript(CData):
         try:
 
             with open(stdout_path, 'w') as stdout_file, open(stderr_path, 'w') as stderr_file:
-                # Write formatted header to stdout
-                stdout_file.write("="*70 + "\n")
-                stdout_file.write(f"CCP4i2 Task: {self.TASKNAME}\n")
-                stdout_file.write("="*70 + "\n\n")
-
-                # Write command line
-                stdout_file.write("Command Line:\n")
-                stdout_file.write("-" * 70 + "\n")
-                stdout_file.write(f"{' '.join(command)}\n\n")
-
-                # Write command script if present
-                if self.commandScript:
-                    stdout_file.write("Command Script (stdin):\n")
-                    stdout_file.write("-" * 70 + "\n")
-                    for line in self.commandScript:
-                        stdout_file.write(line)
-                    stdout_file.write("\n")
-
-                stdout_file.write("="*70 + "\n")
-                stdout_file.write("Program Output:\n")
-                stdout_file.write("="*70 + "\n\n")
-                stdout_file.flush()
+                self._writeLogHeader(stdout_file, command)
 
                 # Run the process
                 # Note: When input= is provided, stdin is automatically set to PIPE and closed after writing
@@ -1711,6 +1730,102 @@ class CPluginScript(CData):
 
         return error
 
+    def _streamingProcessOptions(self) -> dict:
+        """
+        startProcess() options that stream program output to this plugin.
+
+        The legacy readyRead slot reads output from self._qprocess, which
+        PROCESSMANAGER().getJobData(id(self), 'qprocess') returns for a
+        registered plugin.
+        """
+        from core.async_process_manager import QProcessOutputBuffer
+        from core.CCP4Modules import PROCESSMANAGER
+
+        options = {'outputHandler': self._processOutputHandler}
+        if self._readyReadStandardOutputHandler:
+            PROCESSMANAGER().register(self)
+            self._qprocess = QProcessOutputBuffer()
+            options['readyReadStandardOutputHandler'] = self._readyReadStandardOutputHandler
+            options['outputBuffer'] = self._qprocess
+        return options
+
+    def _startProcessStreaming(self, prep: dict) -> CErrorReport:
+        """
+        Synchronous process execution with live output.
+
+        Runs the program through AsyncProcessManager, which reads its stdout and
+        stderr as they are produced, tees them to the LOG and STDERR files and
+        passes each chunk to the plugin's output handlers. Blocks until the
+        program has exited. The LOG starts with the same header as that of
+        _runProcessSync; a legacy readyRead handler appends to it.
+        """
+        from core.async_process_manager import ASYNC_PROCESSMANAGER, EventLoopUnavailable
+
+        error = CErrorReport()
+        command = prep['command']
+
+        with open(prep['stdout_path'], 'w') as stdout_file:
+            self._writeLogHeader(stdout_file, command)
+
+        try:
+            pm = ASYNC_PROCESSMANAGER()
+            pid = pm.startProcess(
+                command=command[0],
+                args=command[1:],
+                inputFile=prep['command_script_file'],
+                logFile=prep['stdout_path'],
+                stderrFile=prep['stderr_path'],
+                cwd=str(self.workDirectory),
+                env=prep['env'],
+                timeout=300 * 1000,  # 5 minute timeout, as for _startProcessSync
+                ifAsync=False,
+                appendLog=True,
+                **self._streamingProcessOptions()
+            )
+        except EventLoopUnavailable as e:
+            logger.warning("Running %s without live output: %s", self.TASKCOMMAND, e)
+            return self._runProcessSync(prep)
+        except Exception as e:
+            error.append(
+                klass=self.__class__.__name__,
+                code=104,
+                details=f"Error running {self.TASKCOMMAND}: {str(e)}"
+            )
+            return error
+
+        status = pm.getJobData(pid, 'status')
+        exitCode = pm.getJobData(pid, 'exitCode')
+        self._exitCode = exitCode
+        self._exitStatus = 0 if exitCode == 0 else 1
+
+        if status == 'timeout':
+            error.append(
+                klass=self.__class__.__name__,
+                code=103,
+                details=f"Process {self.TASKCOMMAND} timed out after 300 seconds"
+            )
+        elif exitCode != 0:
+            processError = pm.getJobData(pid, 'error')
+            if processError and 'No such file' in processError:
+                error.append(
+                    klass=self.__class__.__name__,
+                    code=102,
+                    details=f"File not found error: {processError}. "
+                            f"Command: {command[0]}. "
+                            f"Working directory: {self.workDirectory}. "
+                            f"Make sure CCP4 is set up (source ccp4.setup-sh)"
+                )
+            else:
+                error.append(
+                    klass=self.__class__.__name__,
+                    code=101,
+                    details=f"Process {self.TASKCOMMAND} exited with code {exitCode}"
+                )
+        else:
+            print(f"✅ Process completed successfully (exit code 0)")
+
+        return error
+
     def _startProcessAsync(self) -> CErrorReport:
         """
         Asynchronous process execution using AsyncProcessManager.
@@ -1755,7 +1870,8 @@ class CPluginScript(CData):
                 env=env,
                 handler=handler,
                 timeout=-1,  # No timeout
-                ifAsync=True
+                ifAsync=True,
+                **self._streamingProcessOptions()
             )
 
             print(f"✅ Process started asynchronously (PID: {self._runningProcessId})")
@@ -1853,13 +1969,17 @@ class CPluginScript(CData):
         Report job completion and save parameters.
 
         This method:
-        1. Saves parameters to PARAMS file
-        2. Reports completion to database
-        3. Emits finished signal
+        1. Releases file watches
+        2. Saves parameters to PARAMS file
+        3. Reports completion to database
+        4. Emits finished signal
 
         Args:
             status: Final status (SUCCEEDED or FAILED)
         """
+        # The program has finished writing anything the plugin was watching
+        self.releaseWatches()
+
         # Save params
         self.saveParams()
 
@@ -1920,15 +2040,14 @@ class CPluginScript(CData):
         return self._watchedDirectories
 
     def watchFile(self, fileName, handler, minDeltaSize=0, unwatchWhileHandling=False):
-        """Watch a file for changes (legacy API compatibility).
-
-        In the legacy Qt-based implementation, this used QFileSystemWatcher
-        to monitor file changes. In the modern async implementation, file
-        watching is handled differently (via async file monitoring in the
-        database handler or through explicit polling).
+        """Call handler(fileName) whenever a file is written (legacy API).
 
-        This method is provided for backward compatibility with legacy plugins
-        that call watchFile(), but it's a no-op in the new architecture.
+        The file need not exist yet. Changes are picked up by the process-wide
+        FileWatcher (inotify, or stat polling where inotify is unavailable);
+        bursts of writes are coalesced into one call. Handlers run on the loop
+        the plugin called watchFile() from if it has one, otherwise in a worker
+        thread; handlers of one plugin never run concurrently. Watches are
+        released when the plugin reports its status.
 
         Args:
             fileName: Path to file to watch
@@ -1936,34 +2055,56 @@ class CPluginScript(CData):
             minDeltaSize: Minimum file size change to trigger handler
             unwatchWhileHandling: Whether to temporarily unwatch during handling
         """
-        import os
-        parentDirectoryPath, fileRoot = os.path.split(fileName)
+        from core.file_watcher import FILE_WATCHER
 
-        # Store watch metadata for compatibility
+        fileName = str(fileName)
+        previous = self.watchedFiles().pop(fileName, None)
+        if previous is not None:
+            FILE_WATCHER().unwatch(previous["watch"])
+
+        watch = FILE_WATCHER().watch_file(
+            fileName,
+            handler,
+            owner=self,
+            min_delta_size=minDeltaSize,
+            unwatch_while_handling=unwatchWhileHandling,
+        )
         self.watchedFiles()[fileName] = {
-            "parentDirectoryPath": parentDirectoryPath,
+            "parentDirectoryPath": os.path.dirname(fileName),
             "handler": handler,
-            "maxSizeYet": 0,
             "minDeltaSize": minDeltaSize,
-            "unwatchWhileHandling": unwatchWhileHandling
+            "unwatchWhileHandling": unwatchWhileHandling,
+            "watch": watch,
         }
-
-        # Note: In the Qt-free implementation, actual file watching would be
-        # handled by the async framework or database handler, not here.
-        # This is just a compatibility stub.
-        logger.debug(f"watchFile called for {fileName} (compatibility mode - no actual watching)")
+        logger.debug(f"Watching {fileName} ({FILE_WATCHER().backend})")
 
     def watchDirectory(self, directoryName, handler):
-        """Watch a directory for changes (legacy API compatibility).
-
-        This is a no-op stub for backward compatibility.
+        """Call handler(directoryName) when files appear in or vanish from a directory (legacy API).
 
         Args:
             directoryName: Path to directory to watch
             handler: Callback function to call when directory changes
         """
-        self.watchedDirectories()[directoryName] = {"handler": handler}
-        logger.debug(f"watchDirectory called for {directoryName} (compatibility mode - no actual watching)")
+        from core.file_watcher import FILE_WATCHER
+
+        directoryName = str(directoryName)
+        previous = self.watchedDirectories().pop(directoryName, None)
+        if previous is not None:
+            FILE_WATCHER().unwatch(previous["watch"])
+
+        watch = FILE_WATCHER().watch_directory(directoryName, handler, owner=self)
+        self.watchedDirectories()[directoryName] = {"handler": handler, "watch": watch}
+        logger.debug(f"Watching directory {directoryName} ({FILE_WATCHER().backend})")
+
+    def releaseWatches(self):
+        """Stop all watches set up by watchFile() and watchDirectory()."""
+        if not self.watchedFiles() and not self.watchedDirectories():
+            return
+        from core.file_watcher import FILE_WATCHER
+
+        FILE_WATCHER().unwatch_owner(self)
+        self.watchedFiles().clear()
+        self.watchedDirectories().clear()
 
     # =========================================================================
     # Dictionary merging for crystallographic refinement
@@ -2529,8 +2670,10 @@ class CPluginScript(CData):
         """
         from core.CCP4Utils import merge_mtz_files
         from core.base_object.fundamental_types import CInt
+        from core.hklin_cache import HklinCache, file_digest
 
         input_specs = []
+        content_flags = []
         converted_files = []  # Track temporary file objects for cleanup
 
         for file_spec_idx, file_spec in enumerate(file_objects):
@@ -2719,16 +2862,39 @@ class CPluginScript(CData):
                 'path': path,
                 'column_mapping': column_mapping
             })
+            content_flags.append(content_flag)
 
         # Call low-level gemmi utility
-        output_path = self.workDirectory / f"{output_name}.mtz"
-        result = merge_mtz_files(
-            input_specs=input_specs,
-            output_path=output_path,
-            merge_strategy=merge_strategy
-        )
+        output_path = Path(self.workDirectory) / f"{output_name}.mtz"
+
+        def merge():
+            return merge_mtz_files(
+                input_specs=input_specs,
+                output_path=output_path,
+                merge_strategy=merge_strategy
+            )
 
-        return result
+        # Identical inputs, mappings and strategy give an identical HKLIN:
+        # serve reruns and pipeline cycles from the project's cache
+        cache = HklinCache.for_path(self.workDirectory)
+        if cache is None or not input_specs:
+            return merge()
+        try:
+            key = cache.key(
+                kind='merge',
+                merge_strategy=merge_strategy,
+                inputs=[
+                    [file_digest(spec['path']), list(spec['column_mapping'].items()), flag]
+                    for spec, flag in zip(input_specs, content_flags)
+                ],
+            )
+        except OSError:
+            # Missing input: let merge_mtz_files report it
+            return merge()
+        return cache.get_or_build(
+            key, output_path, merge,
+            description={'inputs': [str(spec['path']) for spec in input_specs]},
+        )
 
     def _get_content_flag_name(self, file_obj, content_flag: int) -> str:
         """
@@ -3054,9 +3220,10 @@ class CPluginScript(CData):
         """
         Split an MTZ file into multiple mini-MTZ files with selected columns.
 
-        This is a thin CData wrapper around split_mtz_file() from CCP4Utils.
+        This is a thin CData wrapper around split_mtz_files() from CCP4Utils.
         It handles the legacy outfiles list format and converts it to the
-        simple column_mapping dict format.
+        simple column_mapping dict format. The input is read once for all
+        outputs.
 
         Args:
             infile: Path to input MTZ file
@@ -3076,13 +3243,15 @@ class CPluginScript(CData):
             ...     '/path/to/log'
             ... )
         """
-        from core.CCP4Utils import split_mtz_file, MtzSplitError
+        from core.CCP4Utils import split_mtz_files, MtzSplitError
 
         logger.debug(f'[DEBUG splitMtz] Splitting {infile} using gemmi')
         logger.debug(f'[DEBUG splitMtz] Output specs: {outfiles}')
 
         try:
-            # Process each output file
+            # Parse every output specification first, so that the input is
+            # read (and its ASU and unique reflection set computed) only once
+            outputs = []
             for outfile_spec in outfiles:
                 # Parse output specification
                 if len(outfile_spec) == 2:
@@ -3104,20 +3273,15 @@ class CPluginScript(CData):
 
                 # Build column mapping dict for utility function
                 column_mapping = dict(zip(input_col_names, output_col_names))
-
                 logger.debug(f'[DEBUG splitMtz] Creating {output_path}')
                 logger.debug(f'[DEBUG splitMtz]   Column mapping: {column_mapping}')
+                outputs.append((output_path, column_mapping))
 
-                # Call CData-agnostic utility function
-                result_path = split_mtz_file(
-                    input_path=infile,
-                    output_path=output_path,
-                    column_mapping=column_mapping
-                )
+            # Call CData-agnostic utility function
+            result_paths = split_mtz_files(input_path=infile, outputs=outputs)
 
-                import os
-                file_size = os.path.getsize(result_path)
-                logger.debug(f'[DEBUG splitMtz] Created: {result_path} ({file_size} bytes)')
+            for result_path in result_paths:
+                logger.debug(f'[DEBUG splitMtz] Created: {result_path} ({os.path.getsize(result_path)} bytes)')
 
             return self.SUCCEEDED
 
@@ -1,5 +1,4 @@
 import os
-import json
 from typing import List, Dict, Any, Optional, Type, Tuple
 from pathlib import Path
 
@@ -94,49 +93,18 @@ class CTaskManager:
     insts = None
 
     def __init__(self):
-        dir_path = os.path.dirname(os.path.abspath(__file__))
-        self.task_manager_dir = os.path.join(dir_path, "task_manager")
-        defxml_path = os.path.join(self.task_manager_dir, "defxml_lookup.json")
-        plugin_path = os.path.join(self.task_manager_dir, "plugin_lookup.json")
-        task_module_path = os.path.join(self.task_manager_dir, "task_module_map.json")
-        task_metadata_path = os.path.join(self.task_manager_dir, "task_metadata.json")
-
-        self.defxml_lookup: List[Dict[str, str]] = []
-        self.plugin_lookup: Dict[str, Dict[str, Any]] = {}
-        self.task_module_map: Dict[str, str] = {}
-        self.task_metadata: Dict[str, Dict[str, Any]] = {}
-
-        # Load defxml_lookup.json
-        try:
-            with open(defxml_path, "r") as f:
-                self.defxml_lookup = json.load(f)
-        except Exception as e:
-            print(f"Error loading defxml_lookup.json: {e}")
-
-        # Load plugin_lookup.json (for backward compatibility)
-        try:
-            with open(plugin_path, "r") as f:
-                self.plugin_lookup = json.load(f)
-        except Exception as e:
-            print(f"Error loading plugin_lookup.json: {e}")
-
-        # Load task_module_map.json (task-to-folder mapping for UI)
-        try:
-            with open(task_module_path, "r") as f:
-                data = json.load(f)
-                # Remove _comment key if present
-                self.task_module_map = {k: v for k, v in data.items() if not k.startswith('_')}
-        except Exception as e:
-            print(f"Error loading task_module_map.json: {e}")
-
-        # Load task_metadata.json (UI display metadata: titles, descriptions, etc.)
-        try:
-            with open(task_metadata_path, "r") as f:
-                data = json.load(f)
-                # Remove _comment/_todo keys if present
-                self.task_metadata = {k: v for k, v in data.items() if not k.startswith('_')}
-        except Exception as e:
-            print(f"Error loading task_metadata.json: {e}")
+        # The lookup files are loaded and indexed once per process and shared
+        # by every CTaskManager (see task_manager/task_catalog.py)
+        from .task_manager.task_catalog import get_task_catalog
+        self.catalog = get_task_catalog()
+        self.task_manager_dir = self.catalog.task_manager_dir
+
+        self.defxml_lookup = self.catalog.defxml_lookup
+        self.plugin_lookup = self.catalog.plugin_lookup
+        # Task-to-folder mapping for UI
+        self.task_module_map = self.catalog.task_module_map
+        # UI display metadata: titles, descriptions, etc.
+        self.task_metadata = self.catalog.task_metadata
 
         # Set up CCP4I2_ROOT for plugin imports
         ccp4i2_root = os.environ.get("CCP4I2_ROOT")
@@ -212,36 +180,10 @@ class CTaskManager:
             - No plugins have actual version variants (e.g., 1.0 vs 2.0)
             Therefore, matching by name only is both simpler and sufficient.
         """
-        for entry in self.defxml_lookup:
-            plugin_name = entry.get("pluginName", "")
-
-            # Match by plugin name only (version checking is unnecessary - see docstring)
-            if plugin_name == task_name:
-                # Get relative path from entry
-                rel_path = entry.get("file_path", "")
-
-                if rel_path:
-                    # CRITICAL: Paths in defxml_lookup.json are relative to the task_manager directory
-                    # (where defxml_lookup.py is located), NOT relative to CCP4I2_ROOT or CWD.
-                    #
-                    # The defxml_lookup.py script does:
-                    #   script_dir = os.path.dirname(os.path.abspath(__file__))  # core/task_manager/
-                    #   rel_path = os.path.relpath(file_path, script_dir)
-                    #
-                    # So a path like "../../pipelines/shelx/script/shelx.def.xml" means:
-                    #   - Start from core/task_manager/
-                    #   - Go up two levels to project root
-                    #   - Then pipelines/shelx/script/shelx.def.xml
-                    #
-                    # Therefore, we resolve relative to self.task_manager_dir (which is rooted to
-                    # __file__, making it CWD-independent)
-                    abs_path = Path(self.task_manager_dir) / rel_path
-                    abs_path = abs_path.resolve()  # Resolve any .. in the path
-
-                    if abs_path.exists():
-                        return abs_path
-
-        return None
+        # Paths in defxml_lookup.json are relative to the task_manager directory
+        # (where defxml_lookup.py is located), NOT relative to CCP4I2_ROOT or CWD.
+        # The catalog resolves them once and keeps the first existing file per task.
+        return self.catalog.def_xml_path(task_name)
 
     def getReportClass(self, name: str, version: Optional[str] = None) -> Optional[Type]:
         """
@@ -412,21 +354,8 @@ class CTaskManager:
         - Spaces vs underscores
         - None values
         """
-        if module is None:
-            return 'wrappers'
-
-        # Handle lists (some tasks have multiple modules)
-        if isinstance(module, list):
-            module = module[0] if module else 'wrappers'
-
-        # Normalize spaces to underscores
-        module = str(module).replace(' ', '_').lower()
-
-        # Map some legacy names
-        if module == 'expt_data_util':
-            module = 'expt_data_utility'
-
-        return module
+        from .task_manager.task_catalog import normalize_module_name
+        return normalize_module_name(module)
 
     def _get_task_module(self, task_name: str, metadata: Dict[str, Any]) -> str:
         """
@@ -484,6 +413,13 @@ class CTaskManager:
         Returns:
             List of [module_name, module_title, [task_names...]] tuples
         """
+        # The tree only depends on the lookup files: build it once per process
+        tree = self.catalog.derived(
+            ("task_tree", show_wrappers), lambda: self._build_task_tree(show_wrappers)
+        )
+        return [(module, title, list(task_list)) for module, title, task_list in tree]
+
+    def _build_task_tree(self, show_wrappers: bool) -> Tuple[Tuple[str, str, Tuple[str, ...]], ...]:
         module_lookup = self._build_module_lookup()
         tree = []
 
@@ -507,7 +443,7 @@ class CTaskManager:
                 title = MODULE_TITLES.get(module_name, module_name)
                 tree.append((module_name, title, module_lookup[module_name]))
 
-        return tree
+        return tuple((module, title, tuple(task_list)) for module, title, task_list in tree)
 
     @property
     def task_lookup(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
@@ -528,6 +464,10 @@ class CTaskManager:
         2. plugin_lookup.json (extracted from plugin scripts)
         3. Defaults
         """
+        # Built once per process; callers get their own top-level dict
+        return dict(self.catalog.derived("task_lookup", self._build_task_lookup))
+
+    def _build_task_lookup(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         lookup: Dict[str, Dict[str, Dict[str, Any]]] = {}
 
         for task_name, plugin_meta in self.plugin_lookup.items():
@@ -21,6 +21,203 @@ class MtzSplitError(Exception):
     pass
 
 
+class MtzSplitSource:
+    """
+    An MTZ file prepared once for writing any number of column subsets.
+
+    Reading the file, moving its reflections to the ASU, generating the
+    complete unique reflection set (gemmi.make_miller_array) and matching it
+    to the input reflections are done once here; every output is then a
+    gather from shared arrays. Used by split_mtz_files() and gemmi_split_mtz().
+
+    Example:
+        >>> source = MtzSplitSource('/data/hklout.mtz')
+        >>> source.write('/data/fobs.mtz', {'FMEAN': 'F', 'SIGFMEAN': 'SIGF'})
+        >>> source.write('/data/freer.mtz', {'FreeR_flag': 'FREER'})
+    """
+
+    def __init__(self, input_path: Union[str, Path]):
+        self.input_path = Path(input_path)
+        if not self.input_path.exists():
+            raise FileNotFoundError(f"Input MTZ file not found: {self.input_path}")
+
+        self.mtz = gemmi.read_mtz_file(str(self.input_path))
+        self.mtz.ensure_asu()
+        self.labels = self.mtz.column_labels()
+
+        # Complete unique reflection set for the space group, including
+        # systematic absences
+        self.uniques = gemmi.make_miller_array(
+            self.mtz.cell,
+            self.mtz.spacegroup,
+            self.mtz.resolution_high(),
+            self.mtz.resolution_low()
+        )
+
+        # Row of the input file holding each unique reflection (-1 if absent)
+        self.rows = np.full(len(self.uniques), -1, dtype=np.intp)
+        if self.mtz.nreflections:
+            input_keys = self._hkl_keys(self.mtz.array[:, :3].astype(np.int64))
+            unique_keys = self._hkl_keys(self.uniques.astype(np.int64))
+            order = np.argsort(input_keys, kind='stable')
+            sorted_keys = input_keys[order]
+            position = np.minimum(np.searchsorted(sorted_keys, unique_keys), len(order) - 1)
+            found = sorted_keys[position] == unique_keys
+            self.rows[found] = order[position[found]]
+
+    @staticmethod
+    def _hkl_keys(hkl) -> np.ndarray:
+        # Indices of any real data set fit comfortably in 20 bits each
+        offset = 1 << 19
+        return ((hkl[:, 0] + offset) << 40) | ((hkl[:, 1] + offset) << 20) | (hkl[:, 2] + offset)
+
+    def check_columns(self, labels) -> None:
+        """Raise ValueError if any of labels is not a column of the input."""
+        for label in labels:
+            if label not in self.labels:
+                raise ValueError(
+                    f"Column '{label}' not found in {self.input_path}. "
+                    f"Available columns: {self.labels}"
+                )
+
+    def write(
+        self,
+        output_path: Union[str, Path],
+        column_mapping: dict,
+        history: Optional[List[str]] = None
+    ) -> Path:
+        """
+        Write the columns in column_mapping (input name -> output name).
+
+        Data columns go in a copy of the first non-base dataset they use, if
+        the input has more than one dataset, otherwise in HKL_base.
+        """
+        if not column_mapping:
+            raise ValueError("column_mapping cannot be empty")
+        self.check_columns(column_mapping.keys())
+
+        columns = [(self.mtz.column_with_label(label), output_label)
+                   for label, output_label in column_mapping.items()]
+        dataset = None
+        if len(self.mtz.datasets) > 1:
+            for column, _ in columns:
+                if column.dataset_id > 0:
+                    dataset = self.mtz.dataset(column.dataset_id)
+                    break
+        if history is None:
+            history = [
+                f'MTZ file created from {self.input_path.name} using split_mtz_file (gemmi)',
+                f'Columns: {", ".join(f"{i}->{o}" for i, o in column_mapping.items())}'
+            ]
+        return self.write_columns(output_path, columns, dataset=dataset, history=history)
+
+    def write_columns(
+        self,
+        output_path: Union[str, Path],
+        columns: list,
+        dataset=None,
+        history: Optional[List[str]] = None
+    ) -> Path:
+        """
+        Write [(gemmi.Column of the input, output label), ...] to output_path.
+
+        Args:
+            output_path: Path for output MTZ file
+            columns: Input columns and their labels in the output
+            dataset: Input dataset whose names the data columns are put
+                     under (default: HKL_base)
+            history: MTZ history lines
+        """
+        output_path = Path(output_path)
+        mtzout = gemmi.Mtz()
+        mtzout.spacegroup = self.mtz.spacegroup
+        mtzout.cell = self.mtz.cell
+
+        hkl_base = mtzout.add_dataset('HKL_base')
+        mtzout.add_column('H', 'H')
+        mtzout.add_column('K', 'H')
+        mtzout.add_column('L', 'H')
+        target = hkl_base
+        if dataset is not None:
+            target = mtzout.add_dataset(dataset.project_name)
+            target.crystal_name = dataset.crystal_name
+            target.dataset_name = dataset.dataset_name
+            target.wavelength = dataset.wavelength
+
+        data = np.full((len(self.uniques), 3 + len(columns)), np.nan, dtype=np.float32)
+        data[:, :3] = self.uniques
+        present = self.rows >= 0
+        source_rows = self.rows[present]
+        source = self.mtz.array
+        for i, (column, label) in enumerate(columns):
+            mtzout.add_column(label, column.type, dataset_id=target.id)
+            data[present, 3 + i] = source[source_rows, column.idx]
+        mtzout.set_data(data)
+
+        if history is not None:
+            mtzout.history = history
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        mtzout.write_to_file(str(output_path))
+        if not output_path.exists():
+            raise MtzSplitError(f"Output file not created: {output_path}")
+        return output_path
+
+
+def split_mtz_files(
+    input_path: Union[str, Path],
+    outputs: List[tuple],
+    max_workers: Optional[int] = None
+) -> List[Path]:
+    """
+    Split several column subsets out of one MTZ file, reading it once.
+
+    Args:
+        input_path: Path to input MTZ file
+        outputs: List of (output_path, column_mapping) pairs; see split_mtz_file()
+        max_workers: Write the outputs in this many threads (default: one by one)
+
+    Returns:
+        List[Path]: Created output files, in the order of outputs
+
+    Raises:
+        FileNotFoundError: If input MTZ file doesn't exist
+        ValueError: If a column_mapping is empty or names a missing column;
+                    raised before any output is written
+        MtzSplitError: If gemmi operations fail
+
+    Example:
+        >>> split_mtz_files('/data/hklout.mtz', [
+        ...     ('/data/fobs.mtz', {'FMEAN': 'F', 'SIGFMEAN': 'SIGF'}),
+        ...     ('/data/abcd.mtz', {'HLA': 'HLA', 'HLB': 'HLB', 'HLC': 'HLC', 'HLD': 'HLD'}),
+        ... ])
+        [Path('/data/fobs.mtz'), Path('/data/abcd.mtz')]
+    """
+    if not Path(input_path).exists():
+        raise FileNotFoundError(f"Input MTZ file not found: {input_path}")
+    for _, column_mapping in outputs:
+        if not column_mapping:
+            raise ValueError("column_mapping cannot be empty")
+
+    try:
+        source = MtzSplitSource(input_path)
+        for _, column_mapping in outputs:
+            source.check_columns(column_mapping.keys())
+
+        if max_workers and max_workers > 1 and len(outputs) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(source.write, output_path, column_mapping)
+                           for output_path, column_mapping in outputs]
+                return [future.result() for future in futures]
+        return [source.write(output_path, column_mapping)
+                for output_path, column_mapping in outputs]
+
+    except (ValueError, FileNotFoundError, MtzSplitError):
+        raise
+    except Exception as e:
+        raise MtzSplitError(f"Failed to split MTZ file: {e}")
+
+
 def split_mtz_file(
     input_path: Union[str, Path],
     output_path: Union[str, Path],
@@ -33,6 +230,9 @@ def split_mtz_file(
     containing only the specified columns. Uses gemmi.make_miller_array() to ensure
     all expected reflections (including systematic absences) are present.
 
+    To write several outputs from the same input use split_mtz_files(), which
+    reads the input only once.
+
     Args:
         input_path: Path to input MTZ file
         output_path: Path for output MTZ file
@@ -55,90 +255,7 @@ def split_mtz_file(
         ... )
         Path('/data/mini.mtz')
     """
-    input_path = Path(input_path)
-    output_path = Path(output_path)
-
-    # Validate input
-    if not input_path.exists():
-        raise FileNotFoundError(f"Input MTZ file not found: {input_path}")
-
-    if not column_mapping:
-        raise ValueError("column_mapping cannot be empty")
-
-    try:
-        # Read input MTZ and ensure reflections are in ASU
-        mtzin = gemmi.read_mtz_file(str(input_path))
-        mtzin.ensure_asu()
-
-        # Validate all requested columns exist
-        available_columns = mtzin.column_labels()
-        for input_col in column_mapping.keys():
-            if input_col not in available_columns:
-                raise ValueError(
-                    f"Column '{input_col}' not found in {input_path}. "
-                    f"Available columns: {available_columns}"
-                )
-
-        # Create output MTZ with complete unique reflection set
-        mtzout = gemmi.Mtz()
-        mtzout.spacegroup = mtzin.spacegroup
-        mtzout.cell = mtzin.cell
-
-        # Add HKL_base dataset for H, K, L columns
-        hkl_base = mtzout.add_dataset('HKL_base')
-        mtzout.add_column('H', 'H')
-        mtzout.add_column('K', 'H')
-        mtzout.add_column('L', 'H')
-
-        # Create complete unique reflection set for the space group
-        # This ensures all expected reflections (including absences) are present
-        uniques = gemmi.make_miller_array(
-            mtzout.cell,
-            mtzout.spacegroup,
-            mtzin.resolution_high(),
-            mtzin.resolution_low()
-        )
-        mtzout.set_data(uniques)
-
-        # Determine if we need a data dataset (for non-HKL columns)
-        dataset = hkl_base
-        for input_col_name in column_mapping.keys():
-            col = mtzin.column_with_label(input_col_name)
-            if col.dataset_id > 0 and len(mtzin.datasets) > 1:
-                src_dataset = mtzin.dataset(col.dataset_id)
-                dataset = mtzout.add_dataset(src_dataset.project_name)
-                dataset.crystal_name = src_dataset.crystal_name
-                dataset.dataset_name = src_dataset.dataset_name
-                dataset.wavelength = src_dataset.wavelength
-                break
-
-        # Copy data columns using copy_column for automatic H,K,L matching
-        for input_col_name, output_col_name in column_mapping.items():
-            src_col = mtzin.column_with_label(input_col_name)
-            # Use copy_column(-1, col) to automatically match H,K,L indices
-            new_col = mtzout.copy_column(-1, src_col)
-            new_col.label = output_col_name
-            new_col.dataset_id = dataset.id
-
-        # Set history
-        mtzout.history = [
-            f'MTZ file created from {input_path.name} using split_mtz_file (gemmi)',
-            f'Columns: {", ".join(f"{i}->{o}" for i, o in column_mapping.items())}'
-        ]
-
-        # Write output file
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        mtzout.write_to_file(str(output_path))
-
-        if not output_path.exists():
-            raise MtzSplitError(f"Output file not created: {output_path}")
-
-        return output_path
-
-    except (ValueError, FileNotFoundError):
-        raise
-    except Exception as e:
-        raise MtzSplitError(f"Failed to split MTZ file: {e}")
+    return split_mtz_files(input_path, [(output_path, column_mapping)])[0]
 
 
 def merge_mtz_files_cad(
@@ -12,6 +12,7 @@ from core.CCP4Data import CFloatRange
 from core.base_object.error_reporting import CErrorReport
 from core.cdata_stubs.CCP4XtalData import CAltSpaceGroupStub, CAltSpaceGroupListStub, CAnomalousColumnGroupStub, CAnomalousIntensityColumnGroupStub, CAnomalousScatteringElementStub, CAsuComponentStub, CAsuComponentListStub, CCellStub, CCellAngleStub, CCellLengthStub, CColumnGroupStub, CColumnGroupItemStub, CColumnGroupListStub, CColumnTypeStub, CColumnTypeListStub, CCrystalNameStub, CDatasetStub, CDatasetListStub, CDatasetNameStub, CDialsJsonFileStub, CDialsPickleFileStub, CExperimentalDataTypeStub, CFPairColumnGroupStub, CFSigFColumnGroupStub, CFormFactorStub, CFreeRColumnGroupStub, CFreeRDataFileStub, CGenericReflDataFileStub, CHLColumnGroupStub, CIPairColumnGroupStub, CISigIColumnGroupStub, CImageFileStub, CImageFileListStub, CImosflmXmlDataFileStub, CImportUnmergedStub, CImportUnmergedListStub, CMapCoeffsDataFileStub, CMapColumnGroupStub, CMapDataFileStub, CMergeMiniMtzStub, CMergeMiniMtzListStub, CMiniMtzDataFileStub, CMiniMtzDataFileListStub, CMmcifReflDataStub, CMmcifReflDataFileStub, CMtzColumnStub, CMtzColumnGroupStub, CMtzColumnGroupTypeStub, CMtzDataStub, CMtzDataFileStub, CMtzDatasetStub, CObsDataFileStub, CPhaserRFileDataFileStub, CPhaserSolDataFileStub, CPhiFomColumnGroupStub, CPhsDataFileStub, CProgramColumnGroupStub, CProgramColumnGroup0Stub, CRefmacKeywordFileStub, CReindexOperatorStub, CResolutionRangeStub, CRunBatchRangeStub, CRunBatchRangeListStub, CShelxFADataFileStub, CShelxLabelStub, CSpaceGroupStub, CSpaceGroupCellStub, CUnmergedDataContentStub, CUnmergedDataFileStub, CUnmergedDataFileListStub, CUnmergedMtzDataFileStub, CWavelengthStub, CXia2ImageSelectionStub, CXia2ImageSelectionListStub
 from core.CCP4TaskManager import TASKMANAGER
+from core.hklin_cache import cached_conversion
 
 class CAltSpaceGroup(CAltSpaceGroupStub):
     """
@@ -437,10 +438,10 @@ class CMiniMtzDataFile(CMiniMtzDataFileStub):
         signature_list = self.__class__.CONTENT_SIGNATURE_LIST
 
         try:
-            import gemmi
+            from core.mtz_metadata import read_mtz_header
 
-            # Read MTZ file
-            mtz = gemmi.read_mtz_file(file_path)
+            # Read MTZ header (column labels only need the header)
+            mtz = read_mtz_header(file_path)
 
             # Extract column labels (just the names, not types)
             column_labels = [col.label for col in mtz.columns]
@@ -481,14 +482,14 @@ class CMiniMtzDataFile(CMiniMtzDataFileStub):
             return ''
 
         try:
-            import gemmi
+            from core.mtz_metadata import read_mtz_header
             from pathlib import Path
 
             if not Path(file_path).exists():
                 return ''
 
-            # Read MTZ file
-            mtz = gemmi.read_mtz_file(file_path)
+            # Read MTZ header
+            mtz = read_mtz_header(file_path)
 
             # Get dataset names (excluding HKL_base)
             for dataset in mtz.datasets:
@@ -749,6 +750,7 @@ class CPhsDataFile(CPhsDataFileStub, CMiniMtzDataFile):
     # CONTENT_SIGNATURE_LIST = [['HLA', 'HLB', 'HLC', 'HLD'], ['PHI', 'FOM']]
     # defined in CPhsDataFileStub
 
+    @cached_conversion('HL')
     def as_HL(self, work_directory: Optional[Any] = None) -> str:
         """
         Convert this file to HL format (Hendrickson-Lattman coefficients).
@@ -1152,13 +1154,15 @@ class CMtzData(CMtzDataStub):
 
     def loadFile(self, file_path: str = None):
         """
-        Load MTZ file using gemmi library.
+        Load MTZ file metadata using gemmi library.
 
         This method:
-        1. Reads MTZ file using gemmi.read_mtz_file()
+        1. Reads the MTZ header only (cached by path, size and mtime; see
+           core.mtz_metadata) - reflections are not read
         2. Extracts metadata (cell, spacegroup, resolution, datasets)
         3. Populates CData attributes using proper setters (NO __dict__ manipulation)
-        4. Stores gemmi Mtz object for advanced queries
+        4. Stores the header-only gemmi Mtz object for advanced queries; use
+           loadReflections() for the reflection data
 
         Args:
             file_path: Optional path to MTZ file. If None, gets path from parent CDataFile.
@@ -1215,8 +1219,9 @@ class CMtzData(CMtzDataStub):
             return error
 
         try:
-            # Read MTZ file using gemmi
-            mtz = gemmi.read_mtz_file(str(file_path))
+            # Read the MTZ header (no reflections)
+            from core.mtz_metadata import read_mtz_header
+            mtz = read_mtz_header(file_path)
 
             # Extract cell parameters using smart assignment (NO __dict__)
             if hasattr(self, 'cell') and self.cell is not None:
@@ -1231,9 +1236,8 @@ class CMtzData(CMtzDataStub):
             if hasattr(self, 'spaceGroup') and self.spaceGroup is not None:
                 self.spaceGroup = mtz.spacegroup.hm
 
-            # Extract resolution range using smart assignment
+            # Extract resolution range (from the header) using smart assignment
             if hasattr(self, 'resolutionRange') and self.resolutionRange is not None:
-                mtz.update_reso()
                 self.resolutionRange.low = mtz.resolution_low()
                 self.resolutionRange.high = mtz.resolution_high()
 
@@ -1295,9 +1299,10 @@ class CMtzData(CMtzDataStub):
             if hasattr(self, 'merged') and self.merged is not None:
                 self.merged = True
 
-            # Store gemmi Mtz object for advanced queries
+            # Store header-only gemmi Mtz object for advanced queries
             # Use object.__setattr__ to bypass smart assignment
             object.__setattr__(self, '_gemmi_mtz', mtz)
+            object.__setattr__(self, '_mtz_path', str(file_path))
 
         except Exception as e:
             error.append(
@@ -1309,6 +1314,27 @@ class CMtzData(CMtzDataStub):
 
         return error
 
+    def loadReflections(self):
+        """
+        Read the MTZ file including its reflection data.
+
+        loadFile() only reads the header; call this when the reflections
+        themselves are needed. The result is not kept.
+
+        Returns:
+            gemmi.Mtz with data, or None if no file has been loaded
+        """
+        from core.mtz_metadata import read_mtz_reflections
+
+        file_path = getattr(self, '_mtz_path', None)
+        if file_path is None:
+            parent = self.get_parent()
+            if parent is not None and hasattr(parent, 'getFullPath'):
+                file_path = parent.getFullPath()
+        if not file_path:
+            return None
+        return read_mtz_reflections(file_path)
+
     def getListOfWavelengths(self):
         """
         Get list of wavelengths from MTZ datasets.
@@ -1965,6 +1991,7 @@ class CObsDataFile(CObsDataFileStub, CMiniMtzDataFile):
             setattr(container, name, child)
         return getattr(container, name)
 
+    @cached_conversion('FPAIR')
     def as_FPAIR(self, work_directory: Optional[Any] = None) -> str:
         """
         Convert this file to FPAIR format (Anomalous Structure Factors).
@@ -1991,6 +2018,7 @@ class CObsDataFile(CObsDataFileStub, CMiniMtzDataFile):
         return ObsDataConverter.to_fpair(self, work_directory=work_directory)
 
 
+    @cached_conversion('IMEAN')
     def as_IMEAN(self, work_directory: Optional[Any] = None) -> str:
         """
         Convert this file to IMEAN format (Mean Intensities).
@@ -2016,6 +2044,7 @@ class CObsDataFile(CObsDataFileStub, CMiniMtzDataFile):
         from core.conversions import ObsDataConverter
         return ObsDataConverter.to_imean(self, work_directory=work_directory)
 
+    @cached_conversion('FPAIR')
     def as_FPAIR(self, work_directory: Optional[Any] = None) -> str:
         """
         Convert this file to FPAIR format (Anomalous Structure Factors).
@@ -2175,6 +2204,15 @@ class CProgramColumnGroup(CProgramColumnGroupStub):
         if name.startswith('_'):
             raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
+        # Named children take precedence, as for any CData
+        try:
+            child = self._child_attribute(name)
+        except AttributeError:
+            # Object not fully initialized yet
+            child = None
+        if child is not None:
+            return child
+
         # Check if we have this column mapping
         if '_column_mapping' in self.__dict__ and name in self._column_mapping:
             return self._column_mapping[name]
@@ -2598,8 +2636,9 @@ class CUnmergedDataContent(CUnmergedDataContentStub):
         return error
 
     def _load_mtz_file(self, file_path: str, gemmi, error):
-        """Load MTZ file and extract metadata."""
-        mtz = gemmi.read_mtz_file(str(file_path))
+        """Load MTZ file metadata from its header and extract metadata."""
+        from core.mtz_metadata import read_mtz_header
+        mtz = read_mtz_header(file_path)
 
         # Set format
         self.format = 'mtz'
@@ -2622,7 +2661,6 @@ class CUnmergedDataContent(CUnmergedDataContentStub):
             self.spaceGroup = mtz.spacegroup.hm
 
         # Extract resolution range
-        mtz.update_reso()
         if hasattr(self, 'lowRes') and self.lowRes is not None:
             self.lowRes = mtz.resolution_low()
         if hasattr(self, 'highRes') and self.highRes is not None:
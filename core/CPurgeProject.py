@@ -21,6 +21,9 @@ Usage:
 
     # Purge with custom categories
     cleanup.purgeJob(jobId, purgeCategories=[1, 2, 5])
+
+    # Empty the project's merged HKLIN cache
+    cleanup.purgeHklinCache()
 """
 
 import os
@@ -214,6 +217,39 @@ class CPurgeProject:
 
         return stats
 
+    def purgeHklinCache(self, projectDirectory: Optional[str] = None,
+                        reportMode: str = "report") -> Dict[str, int]:
+        """
+        Empty the project's cache of merged HKLIN and converted MTZ files.
+
+        Job files served from the cache by hardlink are not affected.
+
+        Args:
+            projectDirectory: Project directory (looked up from projectId if None)
+            reportMode: "report", "skip" or "verbose", as for purgeJob()
+
+        Returns:
+            Dictionary with purge statistics, as for purgeJob()
+        """
+        from core.hklin_cache import HklinCache
+
+        if projectDirectory is None:
+            try:
+                projectDirectory = self.db().getProjectInfo(
+                    projectId=self.projectId, mode='projectdirectory')
+            except Exception as e:
+                logger.error(f"Error getting directory of project {self.projectId}: {e}")
+            if not projectDirectory:
+                return {'files_deleted': 0, 'bytes_freed': 0, 'errors': 1}
+
+        stats = HklinCache.for_project(projectDirectory).purge()
+        if reportMode != "skip":
+            logger.info(f"HKLIN cache purged for project {projectDirectory}: "
+                       f"{stats['files_deleted']} files deleted, "
+                       f"{stats['bytes_freed']} bytes freed, "
+                       f"{stats['errors']} errors")
+        return stats
+
     def _getTaskPurgeList(self, jobId: str) -> List[List]:
         """
         Get task-specific PURGESEARCHLIST from the job's plugin class.
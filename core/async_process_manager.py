@@ -8,6 +8,8 @@ Key features:
 - Async subprocess execution with asyncio
 - Signal-based completion notification
 - Process monitoring and timeout handling
+- Live stdout/stderr streaming to per-process callbacks, teed to the log files
+- QProcess-style readAllStandardOutput() shim for legacy readyRead handlers
 - Compatible with existing CPluginScript API
 - No Qt dependencies
 """
@@ -15,6 +17,7 @@ Key features:
 import asyncio
 import logging
 import os
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
@@ -25,6 +28,53 @@ from core.base_object.error_reporting import CErrorReport
 
 logger = logging.getLogger(__name__)
 
+# Bytes requested from a pipe per read when streaming output
+STREAM_READ_SIZE = 65536
+
+# Seconds to wait for the background event loop to start
+LOOP_START_TIMEOUT = 5.0
+
+
+class EventLoopUnavailable(RuntimeError):
+    """The manager's event loop cannot run work for the calling thread."""
+
+
+class QByteArrayCompat(bytes):
+    """bytes with the QByteArray.data() accessor used by legacy handlers."""
+
+    def data(self) -> bytes:
+        return bytes(self)
+
+
+class QProcessOutputBuffer:
+    """
+    Stand-in for the QProcess that legacy readyRead handlers query.
+
+    Wrappers such as refmac_i2 register a zero-argument
+    ``_readyReadStandardOutputHandler`` that fetches the process with
+    ``PROCESSMANAGER().getJobData(pid, attribute='qprocess')`` and calls
+    ``readAllStandardOutput()`` / ``readAllStandardError()``. This buffer
+    collects streamed output between handler calls so those wrappers run
+    unchanged.
+    """
+
+    def __init__(self):
+        self._stdout = bytearray()
+        self._stderr = bytearray()
+
+    def append(self, stream: str, data: bytes):
+        (self._stdout if stream == "stdout" else self._stderr).extend(data)
+
+    def readAllStandardOutput(self) -> QByteArrayCompat:
+        data = QByteArrayCompat(self._stdout)
+        self._stdout.clear()
+        return data
+
+    def readAllStandardError(self) -> QByteArrayCompat:
+        data = QByteArrayCompat(self._stderr)
+        self._stderr.clear()
+        return data
+
 
 @dataclass
 class ProcessInfo:
@@ -39,6 +89,14 @@ class ProcessInfo:
     env: Optional[Dict[str, str]] = None
     handler: Optional[Any] = None
     timeout: Optional[int] = None
+    stderrFile: Optional[str] = None
+    appendLog: bool = False
+
+    # Streaming output: outputHandler(pid, stream, data) receives each chunk;
+    # readyReadStandardOutputHandler() is the legacy QProcess-style slot
+    outputHandler: Optional[Callable] = None
+    readyReadStandardOutputHandler: Optional[Callable] = None
+    qprocess: Optional[QProcessOutputBuffer] = None
 
     # Runtime info
     startTime: float = field(default_factory=time.time)
@@ -83,6 +141,7 @@ class AsyncProcessManager:
     _instance: Optional["AsyncProcessManager"] = None
     _loop: Optional[asyncio.AbstractEventLoop] = None
     _loop_thread: Optional[Any] = None
+    _loop_ready = threading.Event()
 
     def __new__(cls):
         """Ensure singleton instance."""
@@ -123,32 +182,36 @@ class AsyncProcessManager:
         if self._has_running_loop():
             # Already have a loop
             return
+        self._start_loop_thread()
 
-        # Create a new event loop in a background thread
-        import threading
+    def _start_loop_thread(self):
+        """Run the manager's own event loop in a background thread, once."""
+        if AsyncProcessManager._loop_thread is None:
 
-        def run_event_loop():
-            """Run event loop in background thread."""
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            AsyncProcessManager._loop = loop
+            def run_event_loop():
+                """Run event loop in background thread."""
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
 
-            # Create lock and semaphore in this loop
-            async def init_async():
-                self._lock = asyncio.Lock()
-                self._semaphore = asyncio.Semaphore(self._max_concurrent)
+                # Create lock and semaphore in this loop
+                async def init_async():
+                    self._lock = asyncio.Lock()
+                    self._semaphore = asyncio.Semaphore(self._max_concurrent)
 
-            loop.run_until_complete(init_async())
+                loop.run_until_complete(init_async())
 
-            logger.info("Event loop started in background thread")
-            loop.run_forever()
+                AsyncProcessManager._loop = loop
+                loop.call_soon(AsyncProcessManager._loop_ready.set)
+                logger.info("Event loop started in background thread")
+                loop.run_forever()
 
-        thread = threading.Thread(target=run_event_loop, daemon=True, name="AsyncProcessManager")
-        thread.start()
-        AsyncProcessManager._loop_thread = thread
+            thread = threading.Thread(target=run_event_loop, daemon=True, name="AsyncProcessManager")
+            AsyncProcessManager._loop_thread = thread
+            thread.start()
 
-        # Wait a bit for loop to start
-        time.sleep(0.1)
+        # Only return once the loop runs, so that work scheduled on it is run
+        if not AsyncProcessManager._loop_ready.wait(LOOP_START_TIMEOUT):
+            raise EventLoopUnavailable("AsyncProcessManager event loop did not start")
 
     def _get_loop(self) -> asyncio.AbstractEventLoop:
         """Get the event loop."""
@@ -158,10 +221,28 @@ class AsyncProcessManager:
         try:
             return asyncio.get_running_loop()
         except RuntimeError:
-            # Create and return new loop
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Initialised inside an event loop, now called outside one
+            self._start_loop_thread()
+            return AsyncProcessManager._loop
+
+    def _get_loop_for_blocking_call(self) -> asyncio.AbstractEventLoop:
+        """
+        The loop to schedule work on and wait for from the calling thread.
+
+        Waiting on the calling thread's own running loop would block the loop
+        that has to do the work, so the manager's background loop is used
+        instead. Its own thread (e.g. an output or completion handler) cannot
+        wait on it at all.
+        """
+        loop = self._get_loop()
+        if not self._has_running_loop() or asyncio.get_running_loop() is not loop:
             return loop
+        if threading.current_thread() is AsyncProcessManager._loop_thread:
+            raise EventLoopUnavailable(
+                "startProcess cannot wait for a process from the process manager's own event loop"
+            )
+        self._start_loop_thread()
+        return AsyncProcessManager._loop
 
     async def _get_next_pid(self) -> int:
         """Get next available process ID."""
@@ -187,6 +268,8 @@ class AsyncProcessManager:
         handler: Any = None,
         timeout: int = None,
         ifAsync: bool = True,
+        outputHandler: Callable = None,
+        readyReadStandardOutputHandler: Callable = None,
         **kwargs
     ) -> int:
         """
@@ -202,16 +285,34 @@ class AsyncProcessManager:
             env: Environment variables
             handler: Completion handler [callback, kwargs]
             timeout: Timeout in milliseconds (-1 for no timeout)
-            ifAsync: Whether to run asynchronously
+            ifAsync: Whether to run asynchronously. If False, blocks until
+                the process has finished.
+            outputHandler: Streaming callback outputHandler(pid, stream, data)
+                called with each chunk of output ('stdout' or 'stderr', bytes),
+                after it has been written to the log file. May be a coroutine
+                function; the pipe is not read again until it returns.
+            readyReadStandardOutputHandler: Legacy zero-argument slot called
+                whenever output is available; it reads the output from the
+                QProcessOutputBuffer stored as the 'qprocess' job data. The
+                handler owns the log file, so logFile is not written.
+            **kwargs: stderrFile (str) - file for stderr (default: logFile
+                with an _err.txt suffix); outputBuffer (QProcessOutputBuffer) -
+                buffer to use as the 'qprocess' job data; appendLog (bool) -
+                append to logFile (e.g. after a header written by the caller)
+                instead of truncating it
 
         Returns:
             Process ID (int)
 
+        Raises:
+            EventLoopUnavailable: If called from the manager's own event loop
+                thread, or its loop does not start
+
         Note: This is the sync interface compatible with existing code.
               It schedules async work in the event loop.
         """
         # Get event loop
-        loop = self._get_loop()
+        loop = self._get_loop_for_blocking_call()
 
         # Schedule the async start
         future = asyncio.run_coroutine_threadsafe(
@@ -226,13 +327,15 @@ class AsyncProcessManager:
                 handler=handler,
                 timeout=timeout,
                 ifAsync=ifAsync,
+                outputHandler=outputHandler,
+                readyReadStandardOutputHandler=readyReadStandardOutputHandler,
                 **kwargs
             ),
             loop
         )
 
-        # Wait for PID (blocking)
-        pid = future.result(timeout=5.0)
+        # Wait for PID (blocking); synchronous runs wait for the process itself
+        pid = future.result(timeout=5.0 if ifAsync else None)
         return pid
 
     async def _startProcess_async(
@@ -247,6 +350,8 @@ class AsyncProcessManager:
         handler: Any = None,
         timeout: int = None,
         ifAsync: bool = True,
+        outputHandler: Callable = None,
+        readyReadStandardOutputHandler: Callable = None,
         **kwargs
     ) -> int:
         """
@@ -274,8 +379,14 @@ class AsyncProcessManager:
             cwd=cwd,
             env=env or os.environ.copy(),
             handler=handler,
-            timeout=timeout
+            timeout=timeout,
+            stderrFile=kwargs.get('stderrFile'),
+            appendLog=bool(kwargs.get('appendLog')),
+            outputHandler=outputHandler,
+            readyReadStandardOutputHandler=readyReadStandardOutputHandler,
         )
+        if readyReadStandardOutputHandler is not None:
+            proc_info.qprocess = kwargs.get('outputBuffer') or QProcessOutputBuffer()
 
         self.processes[pid] = proc_info
 
@@ -315,18 +426,26 @@ class AsyncProcessManager:
             stderr_dest = None
             stdout_file = None
             stderr_file = None
+            streaming = bool(proc_info.outputHandler or proc_info.readyReadStandardOutputHandler)
 
-            if proc_info.logFile:
+            if proc_info.logFile and proc_info.readyReadStandardOutputHandler is None:
                 # Create parent directory if needed
                 Path(proc_info.logFile).parent.mkdir(parents=True, exist_ok=True)
                 # Open log file for direct writing (real-time, no buffering)
-                stdout_file = open(proc_info.logFile, 'w')
+                stdout_file = open(proc_info.logFile, 'a' if proc_info.appendLog else 'w')
                 stdout_dest = stdout_file
                 # Stderr to separate file
-                err_file_path = str(Path(proc_info.logFile).with_suffix('')) + '_err.txt'
+                err_file_path = proc_info.stderrFile or (
+                    str(Path(proc_info.logFile).with_suffix('')) + '_err.txt'
+                )
                 stderr_file = open(err_file_path, 'w')
                 stderr_dest = stderr_file
-            else:
+
+            if streaming:
+                # Read the pipes ourselves and tee into the log files
+                stdout_dest = asyncio.subprocess.PIPE
+                stderr_dest = asyncio.subprocess.PIPE
+            elif not proc_info.logFile:
                 # No log file - still need to capture output
                 stdout_dest = asyncio.subprocess.PIPE
                 stderr_dest = asyncio.subprocess.PIPE
@@ -365,6 +484,24 @@ class AsyncProcessManager:
                 except Exception as e:
                     logger.error(f"Error reading input file {proc_info.inputFile}: {e}")
 
+            # Stream output to the log files and callbacks while the process runs
+            pumps = []
+            if streaming:
+                delivery_lock = asyncio.Lock()
+                pumps = [
+                    asyncio.create_task(
+                        self._pump_output(pid, "stdout", process.stdout, stdout_file, delivery_lock)
+                    ),
+                    asyncio.create_task(
+                        self._pump_output(pid, "stderr", process.stderr, stderr_file, delivery_lock)
+                    ),
+                ]
+
+            async def wait_for_exit():
+                await process.wait()
+                if pumps:
+                    await asyncio.gather(*pumps)
+
             # Wait for completion (with timeout)
             timeout_seconds = None
             if proc_info.timeout and proc_info.timeout > 0:
@@ -373,13 +510,16 @@ class AsyncProcessManager:
             try:
                 # Wait for process to complete (no buffering - logs written in real-time)
                 await asyncio.wait_for(
-                    process.wait(),
+                    wait_for_exit(),
                     timeout=timeout_seconds
                 )
             except asyncio.TimeoutError:
                 logger.warning(f"Process {pid} timed out, killing...")
-                process.kill()
+                if process.returncode is None:
+                    process.kill()
                 await process.wait()
+                for pump in pumps:
+                    pump.cancel()
                 proc_info.status = "timeout"
                 proc_info.exitCode = -1
                 proc_info.exitStatus = 1
@@ -419,6 +559,63 @@ class AsyncProcessManager:
             if self._semaphore:
                 self._semaphore.release()
 
+    async def _pump_output(
+        self,
+        pid: int,
+        stream: str,
+        reader: asyncio.StreamReader,
+        tee_file: Any,
+        delivery_lock: asyncio.Lock,
+    ):
+        """
+        Copy one output pipe to its log file and the process's callbacks.
+
+        Chunks are cut at the last newline so callbacks see whole lines; a
+        partial line is held back until the rest of it arrives (or EOF). The
+        pipe is not read again until the callbacks have returned, so a slow
+        consumer throttles the program instead of buffering without limit.
+        """
+        pending = b""
+        while True:
+            data = await reader.read(STREAM_READ_SIZE)
+            if data:
+                pending += data
+                cut = pending.rfind(b"\n") + 1
+                if cut == 0 and len(pending) < STREAM_READ_SIZE:
+                    continue
+                chunk, pending = (pending[:cut], pending[cut:]) if cut else (pending, b"")
+            else:
+                chunk, pending = pending, b""
+                if not chunk:
+                    return
+
+            if tee_file is not None:
+                tee_file.write(chunk.decode("utf-8", errors="replace"))
+                tee_file.flush()
+            async with delivery_lock:
+                await self._deliver_output(pid, stream, chunk)
+
+    async def _deliver_output(self, pid: int, stream: str, chunk: bytes):
+        """Hand a chunk to the streaming callback and/or the legacy slot."""
+        proc_info = self.processes.get(pid)
+        if proc_info is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            callback = proc_info.outputHandler
+            if callback is not None:
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(pid, stream, chunk)
+                else:
+                    await loop.run_in_executor(self._executor, callback, pid, stream, chunk)
+
+            slot = proc_info.readyReadStandardOutputHandler
+            if slot is not None:
+                proc_info.qprocess.append(stream, chunk)
+                await loop.run_in_executor(self._executor, slot)
+        except Exception as e:
+            logger.error(f"Error in output handler for process {pid}: {e}", exc_info=True)
+
     async def _handle_finish(self, pid: int, exitCode: int, exitStatus: int):
         """
         Handle process completion.
@@ -484,7 +681,8 @@ class AsyncProcessManager:
             'logFile': 'logFile',
             'startTime': 'startTime',
             'finishTime': 'finishTime',
-            'error': 'error'
+            'error': 'error',
+            'qprocess': 'qprocess',
         }
 
         field_name = attr_map.get(attribute, attribute)
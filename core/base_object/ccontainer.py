@@ -18,7 +18,8 @@ Supports both list-style and dict-style access:
 from typing import List, Optional
 
 from .cdata import CData
-from .hierarchy_system import HierarchicalObject
+from .hierarchy_system import HierarchicalObject, ObjectState
+from .path_index import PathIndex, get_path_index
 
 
 class CContainer(CData):
@@ -478,6 +479,15 @@ class CContainer(CData):
         if name.startswith('_'):
             raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
+        # O(1) lookup of named children (the common case)
+        try:
+            child = self._child_attribute(name)
+        except AttributeError:
+            # Object not fully initialized yet
+            child = None
+        if child is not None:
+            return child
+
         # Helper function to search for a child by name
         def find_child(search_name):
             # Check children from HierarchicalObject hierarchy
@@ -487,7 +497,6 @@ class CContainer(CData):
                 for child in children_list:
                     # Skip destroyed children
                     if hasattr(child, 'state'):
-                        from .hierarchy_system import ObjectState
                         if child.state == ObjectState.DESTROYED:
                             continue
                     # Check if name matches
@@ -604,6 +613,13 @@ class CContainer(CData):
         else:
             path_to_search = path_elements
 
+        # O(1) if this container has been indexed (see path_index())
+        index = self.__dict__.get("_path_index")
+        if index is not None:
+            found = index.get(".".join(path_to_search))
+            if found is not None:
+                return found
+
         # Navigate the path using built-in hierarchy traversal
         current = self
         for segment in path_to_search:
@@ -674,6 +690,8 @@ class CContainer(CData):
         """Find all CDataFile objects in container hierarchy.
 
         Replaces server/ccp4x/lib/cdata_utils.find_all_files() as a core method.
+        Answered from the container's path index, which is built on the first
+        call and reused until the hierarchy changes.
 
         Returns:
             List of all CDataFile objects found in hierarchy (deduplicated by id)
@@ -683,33 +701,21 @@ class CContainer(CData):
             >>> for file_obj in output_files:
             ...     print(f"Found {file_obj.objectName()}: {file_obj.object_path()}")
         """
-        from .cdata_file import CDataFile
-
-        files = []
-        visited = set()  # Track visited object IDs to prevent duplicates/cycles
-
-        def traverse(obj):
-            """Recursively traverse hierarchy using children()"""
-            obj_id = id(obj)
-            if obj_id in visited:
-                return
-            visited.add(obj_id)
+        return self.path_index().files()
 
-            # Check if this object is a file
-            if isinstance(obj, CDataFile):
-                files.append(obj)
+    def path_index(self) -> PathIndex:
+        """Flattened index of the objects below this container.
 
-            # Traverse children using standardized children() method
-            if hasattr(obj, 'children'):
-                try:
-                    for child in obj.children():
-                        if child is not None:
-                            traverse(child)
-                except Exception:
-                    pass
+        Built on first use and kept current through the child_added and
+        child_removed signals. Once it exists, find_by_path() resolves
+        indexed paths with one dictionary lookup.
 
-        traverse(self)
-        return files
+        Example:
+            >>> index = plugin.container.path_index()
+            >>> index.get("inputData.ASU_CONTENT[0].source")
+            >>> index.performance_indicators()
+        """
+        return get_path_index(self)
 
     def set_parameter(self, object_path: str, value, skip_first: bool = True):
         """
@@ -29,13 +29,126 @@ class ValueState(Enum):
 
 
 # Import decorator after ValueState definition
-from .class_metadata import cdata_class
+from .class_metadata import cdata_class, get_class_layout, apply_metadata_to_instance
+
+# Names that are never resolved to children
+_NON_CHILD_NAMES = frozenset(("parent", "children", "signals"))
+
+_MISSING = object()
+
+# Child names already checked against each class's own attributes
+_CHECKED_CHILD_NAMES: Dict[type, set] = {}
+
+
+def _class_lookup(cls: type, name: str):
+    """Find name in the class dicts along cls.__mro__ (like type attribute lookup)."""
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+    return _MISSING
+
+
+def _is_data_descriptor(attr) -> bool:
+    attr_type = type(attr)
+    return hasattr(attr_type, "__set__") or hasattr(attr_type, "__delete__")
+
+
+class _ChildAttribute:
+    """Data descriptor giving a named child precedence over a colliding attribute.
+
+    Children are not stored in __dict__; attribute reads that miss the normal
+    lookup reach CData.__getattr__, which resolves them from _children_by_name.
+    When a child is registered under a name that the class (or the instance
+    __dict__) already uses, e.g. a generated annotation default or a method,
+    this descriptor is installed on the class so the child still wins. For
+    instances without such a child it behaves exactly like the attribute it
+    shadows.
+    """
+
+    __slots__ = ("name", "original")
+
+    def __init__(self, name: str, original):
+        self.name = name
+        self.original = original
+
+    def __get__(self, obj, objtype=None):
+        original = self.original
+        if obj is None:
+            if original is _MISSING:
+                raise AttributeError(f"type object '{objtype.__name__}' has no attribute '{self.name}'")
+            getter = getattr(type(original), "__get__", None)
+            return getter(original, None, objtype) if getter else original
+
+        child = obj._child_attribute(self.name)
+        if child is not None:
+            return child
+
+        if original is not _MISSING and _is_data_descriptor(original):
+            return type(original).__get__(original, obj, type(obj))
+        instance_dict = obj.__dict__
+        if self.name in instance_dict:
+            return instance_dict[self.name]
+        if original is _MISSING:
+            raise AttributeError(f"'{type(obj).__name__}' object has no attribute '{self.name}'")
+        getter = getattr(type(original), "__get__", None)
+        return getter(original, obj, type(obj)) if getter else original
+
+    def __set__(self, obj, value):
+        original = self.original
+        if original is not _MISSING and hasattr(type(original), "__set__"):
+            type(original).__set__(original, obj, value)
+        else:
+            obj.__dict__[self.name] = value
+
+    def __delete__(self, obj):
+        original = self.original
+        if original is not _MISSING and hasattr(type(original), "__delete__"):
+            type(original).__delete__(original, obj)
+        else:
+            try:
+                del obj.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+
+
+def _expose_child_name(obj: "CData", name: str):
+    """Make sure a child registered as name is what obj.name returns.
+
+    Only needed when something on the class or in the instance __dict__ would
+    otherwise be found first; the common case is a single set probe.
+    """
+    if not name or name[0] == "_" or name in _NON_CHILD_NAMES:
+        return
+    cls = type(obj)
+    checked = _CHECKED_CHILD_NAMES.get(cls)
+    if checked is None:
+        checked = _CHECKED_CHILD_NAMES[cls] = set()
+    if name in checked and name not in obj.__dict__:
+        return
+    checked.add(name)
+
+    original = _class_lookup(cls, name)
+    if isinstance(original, _ChildAttribute):
+        return
+    if original is _MISSING and name not in obj.__dict__:
+        return
+    setattr(cls, name, _ChildAttribute(name, original))
 
 
 @cdata_class(gui_label="CData")
 class CData(HierarchicalObject):
     """Base class for all CCP4i2 data objects with hierarchical relationships."""
 
+    # Bookkeeping lives in slots; data attributes still go to __dict__
+    __slots__ = (
+        "_value_states",
+        "_default_values",
+        "_skip_validation",
+        "_hierarchy_initialized",
+        "_qualifiers",
+        "__dict__",
+    )
+
     def __init__(self, parent=None, name=None, **kwargs):
         # Initialize hierarchical object first (it only takes parent and name)
         super().__init__(parent=parent, name=name)
@@ -49,6 +162,10 @@ class CData(HierarchicalObject):
         # Mark that hierarchy is initialized - now we can use custom setattr
         self._hierarchy_initialized = True
 
+        # Merged class-level tables, computed once per class
+        cls = self.__class__
+        layout = get_class_layout(cls)
+
         # Load default values from qualifiers if available
         self._load_default_values()
 
@@ -57,38 +174,29 @@ class CData(HierarchicalObject):
 
         # --- Per-instance metadata copying and override ---
         # Copy class-level metadata to instance for override flexibility
-        cls = self.__class__
         # Qualifiers - store in _qualifiers (private) to leave qualifiers() method free for legacy API
-        if hasattr(cls, '_class_qualifiers'):
-            class_qualifiers = getattr(cls, '_class_qualifiers')
-            logger.debug("%s._class_qualifiers type: %s, value: %s", cls.__name__, type(class_qualifiers), class_qualifiers)
-
-            # Handle case where qualifiers is a dict-like object
-            if isinstance(class_qualifiers, dict):
-                self._qualifiers = dict(class_qualifiers)
-            elif hasattr(class_qualifiers, 'items') and callable(getattr(class_qualifiers, 'items', None)):
-                try:
-                    self._qualifiers = dict(class_qualifiers.items())
-                except (AttributeError, TypeError) as e:
-                    logger.error("Error calling .items() on _class_qualifiers for %s: %s (type: %s)", cls.__name__, e, type(class_qualifiers))
-                    self._qualifiers = {}
-            else:
-                # Not a dict and doesn't have .items() - set to empty dict
-                logger.warning("Class-level _class_qualifiers for %s is not dict-like: %s, setting to empty dict", cls.__name__, type(class_qualifiers))
+        class_qualifiers = layout.qualifiers
+        if class_qualifiers is None:
+            self._qualifiers = {}
+        elif isinstance(class_qualifiers, dict):
+            self._qualifiers = dict(class_qualifiers)
+        elif hasattr(class_qualifiers, 'items') and callable(getattr(class_qualifiers, 'items', None)):
+            try:
+                self._qualifiers = dict(class_qualifiers.items())
+            except (AttributeError, TypeError) as e:
+                logger.error("Error calling .items() on _class_qualifiers for %s: %s (type: %s)", cls.__name__, e, type(class_qualifiers))
                 self._qualifiers = {}
         else:
+            # Not a dict and doesn't have .items() - set to empty dict
+            logger.warning("Class-level _class_qualifiers for %s is not dict-like: %s, setting to empty dict", cls.__name__, type(class_qualifiers))
             self._qualifiers = {}
-        # Qualifiers order
-        if hasattr(cls, 'qualifiers_order'):
-            self.qualifiers_order = list(getattr(cls, 'qualifiers_order'))
-        # Qualifiers definition
-        if hasattr(cls, 'qualifiers_definition'):
-            self.qualifiers_definition = dict(getattr(cls, 'qualifiers_definition'))
+        # qualifiers_order and qualifiers_definition describe the class schema and
+        # are never mutated, so instances read them from the class (set by @cdata_class)
         # CONTENT_ORDER
-        if hasattr(cls, 'CONTENT_ORDER'):
-            self.CONTENT_ORDER = list(getattr(cls, 'CONTENT_ORDER'))
+        if layout.content_order is not None:
+            self.CONTENT_ORDER = list(layout.content_order)
         # For CList: subitem
-        if hasattr(cls, 'subItem'):
+        if layout.has_sub_item:
             self.subItem = getattr(cls, 'subItem')
 
         # Allow overrides via kwargs
@@ -104,63 +212,37 @@ class CData(HierarchicalObject):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
-    def __getattribute__(self, name: str):
-        """Override to check hierarchy first for CData children, then fall back to normal lookup.
+    def _child_attribute(self, name: str):
+        """Return the live child registered under name, or None.
 
-        This enables storing CData children in hierarchy only (not in __dict__),
-        providing O(1) access via _children_by_name cache while keeping a clean
-        separation between hierarchy and instance storage.
+        Children live in the hierarchy (_children_by_name), not in __dict__,
+        so attribute access falls through to __getattr__ for them.
         """
-        # Use object.__getattribute__ for internal/private attributes to avoid recursion
-        # Also skip for common attributes that are definitely in __dict__
-        if name.startswith('_') or name in ('parent', 'children', 'signals'):
-            return object.__getattribute__(self, name)
-
-        # Check if object is initialized enough to have hierarchy
-        try:
-            children_by_name = object.__getattribute__(self, '_children_by_name')
-        except AttributeError:
-            # Object not fully initialized yet
-            return object.__getattribute__(self, name)
-
-        # O(1) lookup in hierarchy cache for CData children
-        if name in children_by_name:
-            child_ref = children_by_name[name]
-            if child_ref is not None:
-                child = child_ref()
-                if child is not None:
-                    return child
-                else:
-                    # Dead reference - clean it up
-                    del children_by_name[name]
-
-        # Fall back to normal attribute lookup (checks __dict__, class, __getattr__)
-        return object.__getattribute__(self, name)
+        child_ref = self._children_by_name.get(name)
+        if child_ref is not None:
+            child = child_ref()
+            if child is not None:
+                return child
+            # Dead reference - clean it up
+            del self._children_by_name[name]
+        return None
+
+    def _add_child(self, child: HierarchicalObject, emit: bool = True):
+        """Add a child and make sure attribute access resolves to it."""
+        super()._add_child(child, emit=emit)
+        _expose_child_name(self, child._name)
 
     def _load_default_values(self):
         """Load default values from qualifiers metadata."""
-        # Try to get default values from metadata system
-        try:
-            from .metadata_system import MetadataRegistry
-            metadata = MetadataRegistry.get_class_metadata(self.__class__.__name__)
-            if metadata:
-                for field_name, field_meta in metadata.fields.items():
-                    if field_meta.default_value is not None:
-                        self._default_values[field_name] = field_meta.default_value
-                        self._value_states[field_name] = ValueState.NOT_SET
-        except Exception:
-            # If metadata not available, that's okay
-            pass
+        default_values = get_class_layout(self.__class__).default_values
+        for field_name, default_value in default_values.items():
+            self._default_values[field_name] = default_value
+            self._value_states[field_name] = ValueState.NOT_SET
 
     def _apply_metadata_attributes(self):
         """Apply metadata-driven attribute creation if metadata is available."""
         try:
-            from .class_metadata import apply_metadata_to_instance
-
             apply_metadata_to_instance(self)
-        except ImportError:
-            # Metadata system not available, skip
-            pass
         except Exception:
             # Any other error, skip silently to avoid breaking existing code
             pass
@@ -1262,6 +1344,7 @@ class CData(HierarchicalObject):
                 child_ref = weakref.ref(value)
                 self._children_by_name[key] = child_ref
                 self._child_storage[key] = value
+                _expose_child_name(self, key)
         elif isinstance(value, list):
             # Handle list of CData objects
             for i, item in enumerate(value):
@@ -1458,15 +1541,18 @@ class CData(HierarchicalObject):
 
         # IMPORTANT: CData children are stored ONLY in hierarchy (via set_parent),
         # NOT in __dict__. This keeps hierarchy as the single source of truth.
-        # The __getattribute__ override provides O(1) access via _children_by_name.
+        # __getattr__ provides O(1) access via _children_by_name.
         # Non-CData values (primitives, lists of primitives) are stored in __dict__.
         if isinstance(value, CData):
             # CData children: already added to hierarchy via _setup_hierarchy_for_value
-            # Don't store in __dict__ - __getattribute__ will find it via _children_by_name
+            # Don't store in __dict__ - __getattr__ will find it via _children_by_name
             pass
         else:
             # Non-CData values: store normally in __dict__
             super().__setattr__(name, value)
+            if name in self._children_by_name:
+                # A child of the same name still takes precedence on reads
+                _expose_child_name(self, name)
 
         # Track that this value has been explicitly set (unless it's internal)
         # IMPORTANT: Don't mark 'value' attribute here for types with @property setters
@@ -1488,14 +1574,29 @@ class CData(HierarchicalObject):
             self._value_states[name] = ValueState.EXPLICITLY_SET
 
     def __getattr__(self, name: str):
-        """Auto-create metadata-defined attributes when accessed.
+        """Resolve children by name and auto-create metadata-defined attributes.
 
-        This is called when normal attribute lookup fails (after __getattribute__).
+        This is called when normal attribute lookup fails. Children are not in
+        __dict__, so this is where obj.childName is answered (O(1) via
+        _children_by_name).
         If the attribute is defined in metadata but hasn't been instantiated yet,
         create it and add to hierarchy via set_parent().
         """
         # Avoid infinite recursion - only process if object is fully initialized
-        if name.startswith("_") or not hasattr(self, "_hierarchy_initialized"):
+        if name.startswith("_"):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        # Children are stored in the hierarchy only - O(1) lookup by name
+        if name not in _NON_CHILD_NAMES:
+            try:
+                child = self._child_attribute(name)
+            except AttributeError:
+                # Object not fully initialized yet
+                child = None
+            if child is not None:
+                return child
+
+        if not hasattr(self, "_hierarchy_initialized"):
             raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
         # Check if this attribute is defined in metadata
@@ -1507,7 +1608,7 @@ class CData(HierarchicalObject):
             attr_obj = MetadataAttributeFactory.create_attribute(name, attr_def, self)
 
             # Add to hierarchy via set_parent (populates _children_by_name for O(1) access)
-            # The __getattribute__ override will find it via _children_by_name
+            # __getattr__ will find it via _children_by_name
             # DON'T store in __dict__ - hierarchy is the single source of truth for CData
             if isinstance(attr_obj, CData):
                 attr_obj._name = name  # Set hierarchical name
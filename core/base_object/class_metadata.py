@@ -53,9 +53,33 @@ class ClassMetadata:
     content_qualifiers: Optional[Dict[str, Dict[str, Any]]] = None  # Per-field qualifiers
 
 
+@dataclass(frozen=True)
+class ClassLayout:
+    """Per-class tables used when constructing instances.
+
+    Merged once per class from its MRO (see get_class_layout) so that
+    CData.__init__ and apply_metadata_to_instance do not repeat the walk
+    for every object. Containers are shared with the class and must be
+    copied before being handed to an instance.
+    """
+
+    attributes: Dict[str, AttributeDefinition]
+    content_qualifiers: Dict[str, Dict[str, Any]]
+    qualifiers: Optional[Any] = None
+    content_order: Optional[List[str]] = None
+    has_sub_item: bool = False
+    default_values: Dict[str, Any] = field(default_factory=dict)
+
+
 # Global registry of class metadata
 _CLASS_METADATA_REGISTRY: Dict[str, ClassMetadata] = {}
 
+# Per-class construction tables, keyed by class object
+_CLASS_LAYOUTS: Dict[Type, ClassLayout] = {}
+
+# Resolved custom_class names for MetadataAttributeFactory
+_CUSTOM_CLASS_CACHE: Dict[str, Any] = {}
+
 
 def attribute(attr_type: AttributeType, custom_class: Optional[str] = None) -> AttributeDefinition:
     """Helper function to create attribute definitions.
@@ -137,6 +161,7 @@ def cdata_class(
 
         # Store in global registry
         _CLASS_METADATA_REGISTRY[cls.__name__] = metadata
+        _CLASS_LAYOUTS.pop(cls, None)
 
         # Store as class attribute for easy access
         cls._metadata = metadata
@@ -183,6 +208,62 @@ def get_class_metadata_by_type(cls: Type) -> Optional[ClassMetadata]:
     return getattr(cls, "_metadata", None)
 
 
+def get_class_layout(cls: Type) -> ClassLayout:
+    """Get the merged construction tables for a class, building them on first use.
+
+    Args:
+        cls: The class type
+
+    Returns:
+        ClassLayout for the class
+    """
+    layout = _CLASS_LAYOUTS.get(cls)
+    if layout is None:
+        layout = _CLASS_LAYOUTS[cls] = _build_class_layout(cls)
+    return layout
+
+
+def clear_class_layouts():
+    """Drop cached class layouts (needed after metadata is changed at runtime)."""
+    _CLASS_LAYOUTS.clear()
+
+
+def _build_class_layout(cls: Type) -> ClassLayout:
+    """Merge the metadata of cls and its ancestors into a ClassLayout."""
+    # Walk MRO in REVERSE order so that child classes override parent classes
+    merged_attributes = {}
+    merged_content_qualifiers = {}
+    for klass in reversed(cls.__mro__):
+        if klass is object:
+            continue
+        metadata = getattr(klass, "_metadata", None)
+        if metadata:
+            merged_attributes.update(metadata.attributes)
+            if metadata.content_qualifiers:
+                merged_content_qualifiers.update(metadata.content_qualifiers)
+
+    default_values = {}
+    try:
+        from .metadata_system import MetadataRegistry
+        metadata = MetadataRegistry.get_class_metadata(cls.__name__)
+        if metadata:
+            for field_name, field_meta in metadata.fields.items():
+                if field_meta.default_value is not None:
+                    default_values[field_name] = field_meta.default_value
+    except Exception:
+        # If metadata not available, that's okay
+        pass
+
+    return ClassLayout(
+        attributes=merged_attributes,
+        content_qualifiers=merged_content_qualifiers,
+        qualifiers=getattr(cls, "_class_qualifiers", None),
+        content_order=getattr(cls, "CONTENT_ORDER", None),
+        has_sub_item=hasattr(cls, "subItem"),
+        default_values=default_values,
+    )
+
+
 class MetadataAttributeFactory:
     """Factory for creating attribute objects from metadata definitions."""
 
@@ -352,7 +433,18 @@ class MetadataAttributeFactory:
 
         If class_name ends with 'Stub', tries to find the implementation class first
         (without the Stub suffix), falling back to the stub if not found.
+        Resolved classes are cached; misses are retried on the next call.
         """
+        custom_class = _CUSTOM_CLASS_CACHE.get(class_name)
+        if custom_class is None:
+            custom_class = cls._resolve_class(class_name)
+            if custom_class is not None:
+                _CUSTOM_CLASS_CACHE[class_name] = custom_class
+        return custom_class
+
+    @classmethod
+    def _resolve_class(cls, class_name: str):
+        """Look up a class by name in the fundamental types and core modules."""
         # Import here to avoid circular dependencies
         from .fundamental_types import CInt, CFloat, CBoolean, CString, CList
         from .base_classes import CContainer
@@ -420,21 +512,10 @@ def apply_metadata_to_instance(instance):
     Args:
         instance: The instance to apply metadata to
     """
-    # Collect attributes and content_qualifiers from all ancestor classes with metadata
-    # Walk MRO in REVERSE order so that child classes override parent classes
-    merged_attributes = {}
-    merged_content_qualifiers = {}
-    for cls in reversed(instance.__class__.__mro__):
-        if cls is object:
-            continue
-        metadata = getattr(cls, "_metadata", None)
-        if metadata:
-            # Parent attributes are added first (because we're in reverse),
-            # then child overrides them
-            merged_attributes.update(metadata.attributes)
-            # Same for content_qualifiers (per-field qualifiers from CONTENTS)
-            if metadata.content_qualifiers:
-                merged_content_qualifiers.update(metadata.content_qualifiers)
+    # Attributes and content_qualifiers merged from all ancestor classes with metadata
+    layout = get_class_layout(instance.__class__)
+    merged_attributes = layout.attributes
+    merged_content_qualifiers = layout.content_qualifiers
 
     # Create attributes from merged metadata
     for attr_name, attr_def in merged_attributes.items():
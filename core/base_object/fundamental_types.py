@@ -1508,6 +1508,15 @@ class CList(CData):
         # Mark as explicitly set
         self._value_states["_items"] = ValueState.EXPLICITLY_SET
 
+    def _item_removed(self, item: Any) -> None:
+        """Notify listeners that item left the list.
+
+        Items stay children of the list in the hierarchy, so removal from
+        _items is announced on child_removed for anything indexing the list.
+        """
+        if isinstance(item, CData):
+            self._emit_core_signal("child_removed", item)
+
     def insert(self, index: int, item: Any) -> None:
         """Insert an item at specified index."""
         if isinstance(item, CData):
@@ -1529,6 +1538,7 @@ class CList(CData):
         """Remove an item from the list."""
         index = self._items.index(item)
         self._items.remove(item)
+        self._item_removed(item)
 
         # Update names of subsequent items
         for i in range(index, len(self._items)):
@@ -1541,6 +1551,7 @@ class CList(CData):
     def pop(self, index: int = -1) -> Any:
         """Remove and return item at index."""
         item = self._items.pop(index)
+        self._item_removed(item)
 
         # Update names of subsequent items if needed
         if index >= 0:
@@ -1554,7 +1565,10 @@ class CList(CData):
 
     def clear(self) -> None:
         """Remove all items from the list."""
+        removed = list(self._items)
         self._items.clear()
+        for item in removed:
+            self._item_removed(item)
         self._value_states["_items"] = ValueState.EXPLICITLY_SET
 
     def set(self, value=None, validate=False):
@@ -1594,7 +1608,10 @@ class CList(CData):
         item_class = sub_item_def.get('class') if isinstance(sub_item_def, dict) else None
 
         # Clear current items
+        removed = list(self._items)
         self._items.clear()
+        for item in removed:
+            self._item_removed(item)
 
         # Add new items using append to ensure proper parent/name setup
         for item in value:
@@ -1635,7 +1652,10 @@ class CList(CData):
             value.set_parent(self)
             value.name = f"{self.name}[{index}]"
 
+        replaced = self._items[index]
         self._items[index] = value
+        if replaced is not value:
+            self._item_removed(replaced)
         self._value_states["_items"] = ValueState.EXPLICITLY_SET
 
     def __iter__(self):
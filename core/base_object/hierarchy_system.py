@@ -16,7 +16,7 @@ import logging
 import threading
 import weakref
 from abc import ABC
-from typing import Any, Dict, List, Optional, Type, TypeVar, Callable, Set
+from typing import Any, Dict, List, Optional, Type, TypeVar, Callable
 from dataclasses import dataclass, field
 from enum import Enum, auto
 
@@ -31,6 +31,19 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T", bound="HierarchicalObject")
 
+# One re-entrant lock serialises hierarchy updates for every object rather than
+# allocating an RLock per node. Only the bookkeeping is done while holding it:
+# signals and event handlers run after it is released, since they may block.
+_HIERARCHY_LOCK = threading.RLock()
+
+# Signals every HierarchicalObject exposes, created lazily on first access
+_CORE_SIGNALS = {
+    "destroyed": type(None),
+    "parent_changed": "HierarchicalObject",
+    "child_added": "HierarchicalObject",
+    "child_removed": "HierarchicalObject",
+}
+
 
 class ObjectState(Enum):
     """Object lifecycle states."""
@@ -64,40 +77,96 @@ class HierarchicalObject(ABC):
     - Event handling and propagation
     - Thread-safe operations
     - Memory leak prevention through weak references
+
+    Instances are slotted and allocation-light: the signal manager, the core
+    signals, the property store and the event handler table are only created
+    the first time they are used, and hierarchy updates share one module-level
+    lock instead of allocating an RLock per object. Containers built from large
+    .def.xml files hold thousands of these objects.
     """
 
+    __slots__ = (
+        "_parent_ref",
+        "_children",
+        "_children_by_name",
+        "_child_storage",
+        "_name",
+        "_state",
+        "_signals",
+        "_properties",
+        "_event_handlers",
+        "__weakref__",
+    )
+
+    # All objects share one re-entrant lock (see _HIERARCHY_LOCK)
+    _lock = _HIERARCHY_LOCK
+
     def __init__(
         self, parent: Optional["HierarchicalObject"] = None, name: str = None
     ):
         self._parent_ref: Optional[weakref.ReferenceType] = None
-        self._children: Set[weakref.ReferenceType] = set()
+        # Insertion-ordered set of child refs (dict keys), so children() is deterministic
+        self._children: Dict[weakref.ReferenceType, None] = {}
         self._children_by_name: Dict[str, weakref.ReferenceType] = {}  # O(1) name lookup cache
         self._child_storage: Dict[str, Any] = {}  # Strong references to prevent GC of children
         self._name = name or f"{self.__class__.__name__}_{id(self)}"
-        self._lock = threading.RLock()
-        self._signal_manager = SignalManager()
         self._state = ObjectState.CREATED
-        self._properties: Dict[str, Any] = {}
-        self._event_handlers: Dict[str, List[Callable]] = {}
-
-        # Core signals that all objects have
-        self.destroyed = self._signal_manager.create_signal("destroyed", type(None))
-        self.parent_changed = self._signal_manager.create_signal(
-            "parent_changed", "HierarchicalObject"
-        )
-        self.child_added = self._signal_manager.create_signal(
-            "child_added", "HierarchicalObject"
-        )
-        self.child_removed = self._signal_manager.create_signal(
-            "child_removed", "HierarchicalObject"
-        )
+        # Created on first use - most objects never connect a signal or set a property
+        self._signals: Optional[SignalManager] = None
+        self._properties: Optional[Dict[str, Any]] = None
+        self._event_handlers: Optional[Dict[str, List[Callable]]] = None
 
         # Set parent relationship
         if parent is not None:
             self.set_parent(parent)
 
         self._state = ObjectState.INITIALIZED
-        logger.debug(f"Created {self._name}")
+        logger.debug("Created %s", self._name)
+
+    @property
+    def _signal_manager(self) -> SignalManager:
+        """Signal manager for this object, created on first access."""
+        manager = self._signals
+        if manager is None:
+            manager = self._signals = SignalManager()
+        return manager
+
+    def _core_signal(self, name: str) -> Signal:
+        """Get one of the core hierarchy signals, creating it on first access."""
+        with self._lock:
+            signal = self._signal_manager.get_signal(name)
+            if signal is None:
+                signal = self._signal_manager.create_signal(name, _CORE_SIGNALS[name])
+            return signal
+
+    def _emit_core_signal(self, name: str, *args):
+        """Emit a core signal only if it has been created (i.e. someone may listen)."""
+        manager = self._signals
+        if manager is not None:
+            signal = manager.get_signal(name)
+            if signal is not None:
+                signal.emit(*args)
+
+    # Core signals that all objects have
+    @property
+    def destroyed(self) -> Signal:
+        """Destruction signal (kept for API compatibility; destroy() does not emit it)."""
+        return self._core_signal("destroyed")
+
+    @property
+    def parent_changed(self) -> Signal:
+        """Emitted with the new parent when the parent changes."""
+        return self._core_signal("parent_changed")
+
+    @property
+    def child_added(self) -> Signal:
+        """Emitted with the child when a child is added."""
+        return self._core_signal("child_added")
+
+    @property
+    def child_removed(self) -> Signal:
+        """Emitted with the child when a child is removed."""
+        return self._core_signal("child_removed")
 
     # NOTE: No 'name' property to avoid collision with CData 'name' attributes
     # Use objectName() to get the hierarchical name, or _name directly in internal code
@@ -109,7 +178,7 @@ class HierarchicalObject(ABC):
             name=self._name,
             object_type=self.__class__.__name__,
             state=self._state,
-            properties=self._properties.copy(),
+            properties=dict(self._properties or {}),
         )
 
     @property
@@ -158,6 +227,7 @@ class HierarchicalObject(ABC):
         Returns:
             True if parent was successfully set
         """
+        removed_from = added_to = None
         with self._lock:
             if self._state == ObjectState.DESTROYED:
                 logger.warning(
@@ -168,8 +238,8 @@ class HierarchicalObject(ABC):
             old_parent = self.parent()
 
             # Remove from old parent
-            if old_parent is not None:
-                old_parent._remove_child(self)
+            if old_parent is not None and old_parent._remove_child(self, emit=False):
+                removed_from = old_parent
 
             # Set new parent
             if parent is not None:
@@ -182,34 +252,39 @@ class HierarchicalObject(ABC):
 
                 # Only add child if parent supports hierarchy
                 if hasattr(parent, '_add_child'):
-                    parent._add_child(self)
+                    parent._add_child(self, emit=False)
+                    added_to = parent
             else:
                 self._parent_ref = None
 
-            # Emit signal (guard against GC ordering issues)
-            if hasattr(self, 'parent_changed') and self.parent_changed is not None:
-                self.parent_changed.emit(parent)
-
             # Log parent change (safely handle non-HierarchicalObject parents)
-            parent_name = None
-            if parent is not None:
-                if hasattr(parent, '_name'):
-                    parent_name = parent._name
-                elif hasattr(parent, '__class__'):
-                    parent_name = parent.__class__.__name__
-                else:
-                    parent_name = str(type(parent))
-            logger.debug(f"Set parent of {self._name} to {parent_name}")
-            return True
+            if logger.isEnabledFor(logging.DEBUG):
+                parent_name = None
+                if parent is not None:
+                    if hasattr(parent, '_name'):
+                        parent_name = parent._name
+                    elif hasattr(parent, '__class__'):
+                        parent_name = parent.__class__.__name__
+                    else:
+                        parent_name = str(type(parent))
+                logger.debug("Set parent of %s to %s", self._name, parent_name)
+
+        if removed_from is not None:
+            removed_from._emit_core_signal("child_removed", self)
+        if added_to is not None:
+            added_to._emit_core_signal("child_added", self)
+        self._emit_core_signal("parent_changed", parent)
+        return True
 
-    def _add_child(self, child: "HierarchicalObject"):
-        """Internal method to add a child (called by set_parent)."""
-        with self._lock:
-            # Clean up any dead references first
-            self._cleanup_dead_children()
+    def _add_child(self, child: "HierarchicalObject", emit: bool = True):
+        """Internal method to add a child (called by set_parent).
 
+        Dead references are pruned lazily by children(), not on every insert.
+        With emit=False the caller emits child_added once it has released the lock.
+        """
+        with self._lock:
             child_ref = weakref.ref(child)
-            self._children.add(child_ref)
+            self._children[child_ref] = None
 
             # Add to name lookup cache for O(1) access
             child_name = child._name
@@ -218,13 +293,16 @@ class HierarchicalObject(ABC):
                 # Store strong reference to prevent GC
                 self._child_storage[child_name] = child
 
-            # Guard against GC ordering issues
-            if hasattr(self, 'child_added') and self.child_added is not None:
-                self.child_added.emit(child)
-            logging.debug(f"Added child {child._name} to {self._name}")
+        if emit:
+            self._emit_core_signal("child_added", child)
+        logger.debug("Added child %s to %s", child._name, self._name)
+
+    def _remove_child(self, child: "HierarchicalObject", emit: bool = True) -> bool:
+        """Internal method to remove a child (called by set_parent).
 
-    def _remove_child(self, child: "HierarchicalObject"):
-        """Internal method to remove a child (called by set_parent)."""
+        Returns True if child was removed. With emit=False the caller emits
+        child_removed once it has released the lock.
+        """
         with self._lock:
             # Find and remove the child reference
             # Use 'is' for identity comparison to avoid calling __eq__ during GC
@@ -234,30 +312,31 @@ class HierarchicalObject(ABC):
                     to_remove = child_ref
                     break
 
-            if to_remove:
-                self._children.remove(to_remove)
-
-                # Remove from name lookup cache and strong storage
-                child_name = child._name
-                if child_name and child_name in self._children_by_name:
-                    # Only remove if it's the same child (names can be reused)
-                    cached_ref = self._children_by_name.get(child_name)
-                    if cached_ref is not None and cached_ref() is child:
-                        del self._children_by_name[child_name]
-                        # Also remove from strong storage
-                        self._child_storage.pop(child_name, None)
-
-                # Guard against GC ordering issues - signal might be cleaned up already
-                if hasattr(self, 'child_removed') and self.child_removed is not None:
-                    self.child_removed.emit(child)
-                logger.debug(
-                    f"Removed child {child._name} from {self._name}"
-                )
+            if not to_remove:
+                return False
+
+            del self._children[to_remove]
+
+            # Remove from name lookup cache and strong storage
+            child_name = child._name
+            if child_name and child_name in self._children_by_name:
+                # Only remove if it's the same child (names can be reused)
+                cached_ref = self._children_by_name.get(child_name)
+                if cached_ref is not None and cached_ref() is child:
+                    del self._children_by_name[child_name]
+                    # Also remove from strong storage
+                    self._child_storage.pop(child_name, None)
+
+        if emit:
+            self._emit_core_signal("child_removed", child)
+        logger.debug("Removed child %s from %s", child._name, self._name)
+        return True
 
     def _cleanup_dead_children(self):
         """Remove weak references to destroyed children."""
-        dead_refs = {ref for ref in self._children if ref() is None}
-        self._children -= dead_refs
+        dead_refs = [ref for ref in self._children if ref() is None]
+        for ref in dead_refs:
+            del self._children[ref]
 
         # Also clean up dead entries in name cache and strong storage
         dead_names = [name for name, ref in self._children_by_name.items() if ref() is None]
@@ -269,14 +348,7 @@ class HierarchicalObject(ABC):
         """Get list of all child objects."""
         with self._lock:
             self._cleanup_dead_children()
-            result = [ref() for ref in self._children if ref() is not None]
-            # DEBUG: Check if SMILESIN is missing
-            if hasattr(self, '_name') and self._name == 'inputData':
-                logging.debug(f"[children DEBUG] inputData._children has {len(self._children)} refs")
-                logging.debug(f"[children DEBUG] Returning {len(result)} children")
-                result_names = [c._name if hasattr(c, '_name') else str(c) for c in result]
-                logging.debug(f"[children DEBUG] Children names: {result_names}")
-            return result
+            return [ref() for ref in self._children if ref() is not None]
 
     def find_child(
         self, name: str, recursive: bool = False
@@ -581,24 +653,30 @@ class HierarchicalObject(ABC):
     def set_property(self, name: str, value: Any):
         """Set a custom property on this object."""
         with self._lock:
+            if self._properties is None:
+                self._properties = {}
             self._properties[name] = value
 
     def get_property(self, name: str, default: Any = None) -> Any:
         """Get a custom property value."""
+        if self._properties is None:
+            return default
         return self._properties.get(name, default)
 
     def has_property(self, name: str) -> bool:
         """Check if a property exists."""
-        return name in self._properties
+        return self._properties is not None and name in self._properties
 
     def property_names(self) -> List[str]:
         """Get list of all property names."""
-        return list(self._properties.keys())
+        return list(self._properties or ())
 
     # Event system
     def install_event_handler(self, event_type: str, handler: Callable):
         """Install an event handler for a specific event type."""
         with self._lock:
+            if self._event_handlers is None:
+                self._event_handlers = {}
             if event_type not in self._event_handlers:
                 self._event_handlers[event_type] = []
             self._event_handlers[event_type].append(handler)
@@ -606,7 +684,7 @@ class HierarchicalObject(ABC):
     def remove_event_handler(self, event_type: str, handler: Callable):
         """Remove an event handler."""
         with self._lock:
-            if event_type in self._event_handlers:
+            if self._event_handlers and event_type in self._event_handlers:
                 try:
                     self._event_handlers[event_type].remove(handler)
                     if not self._event_handlers[event_type]:
@@ -616,14 +694,15 @@ class HierarchicalObject(ABC):
 
     def emit_event(self, event_type: str, data: Any = None, propagate: bool = True):
         """Emit an event, optionally propagating to parent."""
-        # Handle locally first
+        # Handle locally first, with a copy taken under the lock so that
+        # handlers run without it
         with self._lock:
-            handlers = self._event_handlers.get(event_type, [])
-            for handler in handlers:
-                try:
-                    handler(self, event_type, data)
-                except Exception as e:
-                    logger.error(f"Event handler error: {e}")
+            handlers = list(self._event_handlers.get(event_type, ())) if self._event_handlers else []
+        for handler in handlers:
+            try:
+                handler(self, event_type, data)
+            except Exception as e:
+                logger.error(f"Event handler error: {e}")
 
         # Propagate to parent if requested
         if propagate:
@@ -638,7 +717,11 @@ class HierarchicalObject(ABC):
 
     def get_signal(self, name: str) -> Optional[Signal]:
         """Get a signal by name."""
-        return self._signal_manager.get_signal(name)
+        if name in _CORE_SIGNALS:
+            return self._core_signal(name)
+        if self._signals is None:
+            return None
+        return self._signals.get_signal(name)
 
     # Lifecycle management
     def destroy(self):
@@ -646,7 +729,7 @@ class HierarchicalObject(ABC):
         if self._state == ObjectState.DESTROYED:
             return
 
-        logger.debug(f"Destroying {self._name}")
+        logger.debug("Destroying %s", self._name)
         self._state = ObjectState.DESTROYING
 
         # Destroy all children first
@@ -670,15 +753,16 @@ class HierarchicalObject(ABC):
         #         pass
 
         # Cleanup
-        self._signal_manager.cleanup()
+        if self._signals is not None:
+            self._signals.cleanup()
         self._children.clear()
         self._children_by_name.clear()
         self._child_storage.clear()  # Clear strong references to children
-        self._properties.clear()
-        self._event_handlers.clear()
+        self._properties = None
+        self._event_handlers = None
 
         self._state = ObjectState.DESTROYED
-        logger.debug(f"Destroyed {self._name}")
+        logger.debug("Destroyed %s", self._name)
 
     def connectSignal(self, origin, signal_name: str, handler):
         """
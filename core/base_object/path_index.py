@@ -0,0 +1,187 @@
+"""Flattened path index for CData hierarchies.
+
+Resolving "inputData.ASU_CONTENT[0].source" segment by segment, or walking a
+whole container to collect its files, costs a Python attribute lookup per
+node. A PathIndex walks the hierarchy below a root once and keeps
+
+- every descendant under its path relative to the root, in the form taken by
+  CContainer.find_by_path(..., skip_first=False) (list items as "name[i]")
+- buckets of the CDataFile and CPerformanceIndicator descendants
+
+so that lookups are dictionary hits and type queries are O(k).
+
+The index is built lazily, on the first lookup after it was created or after
+the hierarchy changed. It listens to the child_added/child_removed signals of
+every node with children, and a change anywhere below the root only marks it
+stale: list items are renamed after they are parented, so entries are rebuilt
+on the next lookup rather than patched in place.
+
+Example:
+    index = get_path_index(plugin.container)
+    ncycles = index.get("controlParameters.NCYCLES")
+    for file_obj in index.files():
+        ...
+"""
+
+import logging
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PathIndex:
+    """Paths and type buckets of the descendants of one root object."""
+
+    def __init__(self, root):
+        self._root = root
+        self._lock = threading.RLock()
+        self._stale = True
+        self._paths: Dict[str, object] = {}
+        self._objects: List[object] = []
+        self._files: List[object] = []
+        self._performance_indicators: List[object] = []
+        # id(node) -> (weak ref to node, [(signal, connection id), ...])
+        self._listening: Dict[int, Tuple[weakref.ref, List[Tuple[object, str]]]] = {}
+
+    def _changed(self, *args):
+        self._stale = True
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup."""
+        self._stale = True
+
+    def close(self):
+        """Stop listening to the hierarchy and drop all entries."""
+        with self._lock:
+            self._disconnect(self._listening)
+            self._listening = {}
+            self._paths, self._objects = {}, []
+            self._files, self._performance_indicators = [], []
+            self._stale = True
+
+    @staticmethod
+    def _disconnect(listening):
+        for _, connections in listening.values():
+            for signal, connection_id in connections:
+                signal.disconnect(connection_id)
+
+    def _listen(self, node, listening):
+        """Listen to node, reusing the connections of the previous build."""
+        previous = self._listening.pop(id(node), None)
+        if previous is not None and previous[0]() is node:
+            listening[id(node)] = previous
+            return
+        if previous is not None:
+            self._disconnect({id(node): previous})
+        connections = [
+            (signal, signal.connect(self._changed))
+            for signal in (node.child_added, node.child_removed)
+        ]
+        listening[id(node)] = (weakref.ref(node), connections)
+
+    def _build(self):
+        from .ccontainer import CContainer
+        from .cdata_file import CDataFile
+        from .fundamental_types import CList
+        from ..cdata_stubs.CCP4PerformanceData import CPerformanceIndicatorStub
+
+        # Cleared first: a change while walking leaves the index stale again
+        self._stale = False
+        listening = {}
+        paths: Dict[str, object] = {}
+        ambiguous = set()
+        objects, files, indicators = [], [], []
+        visited = set()
+
+        stack = [("", self._root)]
+        while stack:
+            path, node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            objects.append(node)
+            if isinstance(node, CDataFile):
+                files.append(node)
+            elif isinstance(node, CPerformanceIndicatorStub):
+                indicators.append(node)
+            if path:
+                if path in paths:
+                    # Two children of one node share a name; leave it to the walk
+                    ambiguous.add(path)
+                paths[path] = node
+
+            if isinstance(node, CList):
+                children = [
+                    (f"{path}[{i}]", item) for i, item in enumerate(node._items)
+                    if hasattr(item, "child_added")
+                ]
+            else:
+                children = []
+                for child in node.children():
+                    name = child.objectName() if hasattr(child, "objectName") else child._name
+                    if not name:
+                        continue
+                    if name.startswith("[") or not path:
+                        children.append((f"{path}{name}", child))
+                    else:
+                        children.append((f"{path}.{name}", child))
+            if children or isinstance(node, (CList, CContainer)):
+                self._listen(node, listening)
+            stack.extend(reversed(children))
+
+        # Nodes no longer below the root
+        self._disconnect(self._listening)
+        self._listening = listening
+        for path in ambiguous:
+            del paths[path]
+        self._paths, self._objects = paths, objects
+        self._files, self._performance_indicators = files, indicators
+        logger.debug("Indexed %d paths below %s", len(paths), self._root)
+
+    def _current(self):
+        with self._lock:
+            if self._stale:
+                self._build()
+            return self
+
+    def get(self, path: str) -> Optional[object]:
+        """Descendant at path (relative to the root), or None if not indexed."""
+        return self._current()._paths.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._current()._paths
+
+    def __len__(self) -> int:
+        return len(self._current()._paths)
+
+    def paths(self) -> List[str]:
+        """Paths of all indexed descendants, depth-first."""
+        return list(self._current()._paths)
+
+    def objects(self) -> List[object]:
+        """The root and all its descendants, depth-first."""
+        return list(self._current()._objects)
+
+    def of_type(self, object_type) -> List[object]:
+        """The root and descendants that are instances of object_type."""
+        return [obj for obj in self._current()._objects if isinstance(obj, object_type)]
+
+    def files(self) -> List[object]:
+        """All CDataFile objects (including the root), depth-first."""
+        return list(self._current()._files)
+
+    def performance_indicators(self) -> List[object]:
+        """All CPerformanceIndicator objects (including the root), depth-first."""
+        return list(self._current()._performance_indicators)
+
+
+def get_path_index(root) -> PathIndex:
+    """The path index of root, created on first use and kept with root."""
+    index = root.__dict__.get("_path_index") if hasattr(root, "__dict__") else None
+    if index is None:
+        index = PathIndex(root)
+        if hasattr(root, "__dict__"):
+            object.__setattr__(root, "_path_index", index)
+    return index
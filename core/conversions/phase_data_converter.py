@@ -16,27 +16,24 @@ Conversion Matrix (CPhsDataFile):
 FROM HL    ✓      ✓
      PHIFOM ✓      ✓
 
-Production Implementation:
-- Uses CCP4 chltofom plugin for accurate, validated HL ↔ PHIFOM conversions
-- Integrated with CCP4i2 plugin framework for consistent error handling
-- Ensures compatibility with CCP4 ecosystem
-- Provides reliable, well-tested transformations
+Implementations (selected with the engine argument of to_hl()/to_phifom()):
+- 'numpy' (default): vectorized gemmi/numpy engine. Converts all reflections
+  at once in memory-capped chunks, handles centric reflections, and
+  reproduces chltofom's PHI/FOM to float32 precision
+- 'chltofom': runs the CCP4 chltofom plugin
 - Automatic direction detection based on input contentFlag
 
-The module also includes experimental gemmi-based implementations for future
-development, but these are not used in production due to FOM calculation
-differences compared to the CCP4 reference.
-
 Dependencies:
-- CCP4 chltofom (required for production conversions)
-- gemmi (used for MTZ I/O and experimental implementations)
-- numpy (used for experimental numerical calculations)
+- gemmi (MTZ I/O, centric flags)
+- numpy (numerical calculations)
+- CCP4 chltofom (only for engine='chltofom')
 
 References:
 - Read, R.J. (1986). Acta Cryst. A42, 140-149. (Phase probability distributions)
 - Hendrickson & Lattman (1970). Acta Cryst. B26, 136-143. (HL coefficients)
 """
 
+import functools
 from typing import Optional, Any
 from core.CCP4ErrorHandling import CException, CErrorReport, SEVERITY_ERROR
 
@@ -61,6 +58,7 @@ class PhaseDataConverter:
         8: {'description': 'PHI column not found in input MTZ file', 'severity': SEVERITY_ERROR},
         9: {'description': 'FOM column not found in input MTZ file', 'severity': SEVERITY_ERROR},
         10: {'description': 'Invalid number of HL coefficient columns', 'severity': SEVERITY_ERROR},
+        11: {'description': 'Unknown phase conversion engine', 'severity': SEVERITY_ERROR},
     }
 
     @staticmethod
@@ -87,21 +85,22 @@ class PhaseDataConverter:
         if content_flag == 0:
             raise CException(PhaseDataConverter, 2, details=f"File: {input_path}")
 
+    ENGINES = ('numpy', 'chltofom')
+
     @staticmethod
-    def to_hl(phase_file, work_directory: Optional[Any] = None) -> str:
+    def to_hl(phase_file, work_directory: Optional[Any] = None, engine: str = 'numpy') -> str:
         """
         Convert phase data to HL format (Hendrickson-Lattman coefficients).
 
         HL format: HLA, HLB, HLC, HLD
 
         Possible conversions:
-        - PHIFOM → HL: Convert phase+FOM to HL coefficients using CCP4 chltofom
-
-        Uses the CCP4 chltofom tool for accurate, validated conversion.
+        - PHIFOM → HL: Convert phase+FOM to HL coefficients
 
         Args:
             phase_file: CPhsDataFile or CMapCoeffsDataFile instance
             work_directory: Directory for output files
+            engine: 'numpy' (vectorized) or 'chltofom' (CCP4 plugin)
 
         Returns:
             Full path to converted HL file
@@ -109,6 +108,9 @@ class PhaseDataConverter:
         Raises:
             CException: If validation fails, conversion not supported, or chltofom fails
         """
+        if engine not in PhaseDataConverter.ENGINES:
+            raise CException(PhaseDataConverter, 11, details=f"engine={engine}")
+
         # Validate input file
         PhaseDataConverter._validate_input_file(phase_file)
 
@@ -122,6 +124,8 @@ class PhaseDataConverter:
             # Already in HL format, just return current path
             return input_path
         elif content_flag == 2:  # PHIFOM format
+            if engine == 'numpy':
+                return PhaseDataConverter._phifom_to_hl_gemmi(input_path, output_path)
             return PhaseDataConverter._phifom_to_hl_chltofom(
                 input_path, output_path)
         else:
@@ -131,20 +135,19 @@ class PhaseDataConverter:
             )
 
     @staticmethod
-    def to_phifom(phase_file, work_directory: Optional[Any] = None) -> str:
+    def to_phifom(phase_file, work_directory: Optional[Any] = None, engine: str = 'numpy') -> str:
         """
         Convert phase data to PHIFOM format (Phase + Figure of Merit).
 
         PHIFOM format: PHI, FOM
 
         Possible conversions:
-        - HL → PHIFOM: Convert HL coefficients to best phase estimate + FOM using CCP4 chltofom
-
-        Uses the CCP4 chltofom tool for accurate, validated conversion.
+        - HL → PHIFOM: Convert HL coefficients to best phase estimate + FOM
 
         Args:
             phase_file: CPhsDataFile or CMapCoeffsDataFile instance
             work_directory: Directory for output files
+            engine: 'numpy' (vectorized) or 'chltofom' (CCP4 plugin)
 
         Returns:
             Full path to converted PHIFOM file
@@ -152,6 +155,9 @@ class PhaseDataConverter:
         Raises:
             CException: If validation fails, conversion not supported, or chltofom fails
         """
+        if engine not in PhaseDataConverter.ENGINES:
+            raise CException(PhaseDataConverter, 11, details=f"engine={engine}")
+
         # Validate input file
         PhaseDataConverter._validate_input_file(phase_file)
 
@@ -162,6 +168,8 @@ class PhaseDataConverter:
         content_flag = int(phase_file.contentFlag)
 
         if content_flag == 1:  # HL format
+            if engine == 'numpy':
+                return PhaseDataConverter._hl_to_phifom_gemmi(input_path, output_path)
             return PhaseDataConverter._hl_to_phifom_chltofom(
                 input_path, output_path)
         elif content_flag == 2:  # PHIFOM format
@@ -194,7 +202,7 @@ class PhaseDataConverter:
         return map_coeffs_file.getFullPath()
 
     # ========================================================================
-    # Production implementation using CCP4 chltofom plugin
+    # Implementation using the CCP4 chltofom plugin
     # ========================================================================
 
     @staticmethod
@@ -329,13 +337,8 @@ class PhaseDataConverter:
             mtz_mini.add_column(col_label, col.type)
             columns_to_copy.append(col)
 
-        # Copy data row by row
-        import numpy as np
-        n_reflections = mtz_full.nreflections
-        data = np.zeros((n_reflections, len(columns_to_copy)), dtype=np.float32)
-
-        for i, col in enumerate(columns_to_copy):
-            data[:, i] = np.array(list(col), dtype=np.float32)
+        # Copy the columns out of gemmi's reflection array
+        data = mtz_full.array[:, [col.idx for col in columns_to_copy]]
 
         mtz_mini.set_data(data)
 
@@ -349,8 +352,7 @@ class PhaseDataConverter:
         """
         Convert HL coefficients to PHIFOM format using CCP4 chltofom plugin.
 
-        This is the production implementation that uses the validated
-        CCP4 plugin framework for accurate conversion.
+        Uses the validated CCP4 plugin framework.
 
         Args:
             input_path: Path to input MTZ with HL coefficients
@@ -369,8 +371,7 @@ class PhaseDataConverter:
         """
         Convert PHIFOM format to HL coefficients using CCP4 chltofom plugin.
 
-        This is the production implementation that uses the validated
-        CCP4 plugin framework for accurate conversion.
+        Uses the validated CCP4 plugin framework.
 
         Args:
             input_path: Path to input MTZ with PHI/FOM
@@ -385,55 +386,82 @@ class PhaseDataConverter:
         return PhaseDataConverter._run_chltofom_plugin(input_path, output_path)
 
     # ========================================================================
-    # Experimental gemmi-based implementation (for future development)
+    # Vectorized gemmi/numpy implementation
     # ========================================================================
     #
-    # NOTE: These methods implement HL ↔ PHIFOM conversions using pure Python
-    # with gemmi and numpy. However, benchmark testing against CCP4 chltofom
-    # shows FOM correlation of only 0.08 (expected >0.99), indicating our
-    # numerical method for calculating FOM from the phase probability
-    # distribution differs significantly from the CCP4 reference.
+    # The phase probability distribution of a reflection is
     #
-    # The gemmi-based approach is preserved here for future investigation and
-    # refinement. Possible issues to investigate:
-    # - Phase probability distribution calculation
-    # - Numerical integration method for FOM
-    # - Handling of HLC/HLD terms in the calculation
+    #   P(phi) ∝ exp(A*cos(phi) + B*sin(phi) + C*cos(2*phi) + D*sin(2*phi))
     #
-    # For production use, the chltofom-based methods above should be used.
+    # and m*exp(i*phi_best) = <exp(i*phi)> over P gives the centroid phase
+    # and FOM (Read, 1986), which is what chltofom writes. Acentric
+    # reflections with C = D = 0 have the closed form m = I1(k)/I0(k),
+    # k = |(A, B)|, read from a lookup table; other acentric reflections are
+    # integrated on a (reflections × HL_PHASE_SAMPLES) grid in chunks of at
+    # most HL_CHUNK_BYTES. Centric reflections only take their two allowed
+    # phases, giving m = tanh(|x|) with x = A*cos(phi0) + B*sin(phi0).
     # ========================================================================
 
     @staticmethod
-    def _phifom_to_hl_gemmi_experimental(input_path: str, output_path: str, mtz) -> str:
+    def _hl_to_phifom_gemmi(input_path: str, output_path: str) -> str:
         """
-        Convert PHIFOM format to HL coefficients using gemmi.
+        Convert HL coefficients to PHIFOM format with the vectorized engine.
+
+        Args:
+            input_path: Path to input MTZ with HL coefficients
+            output_path: Path for output MTZ with PHI/FOM
 
-        Uses centrosymmetric approximation:
-        - HLA = FOM * cos(PHI)
-        - HLB = FOM * sin(PHI)
-        - HLC = 0
-        - HLD = 0
+        Returns:
+            Path to output MTZ file
+        """
+        import gemmi
+
+        mtz = gemmi.read_mtz_file(input_path)
+        hl_cols = {}
+        for col in mtz.columns:
+            if col.type == 'A':
+                for name in ('HLA', 'HLB', 'HLC', 'HLD'):
+                    if name in col.label:
+                        hl_cols[name] = col.idx
+        if len(hl_cols) != 4:
+            raise CException(
+                PhaseDataConverter, 10,
+                details=f"Found {len(hl_cols)} columns: {', '.join(hl_cols.keys())}"
+            )
+
+        # Column views into gemmi's reflection array (no copies)
+        data = mtz.array
+        centric, centric_phase = PhaseDataConverter._centric_phases(mtz)
+        phi, fom = PhaseDataConverter._hl_to_phifom_calculation(
+            data[:, hl_cols['HLA']], data[:, hl_cols['HLB']],
+            data[:, hl_cols['HLC']], data[:, hl_cols['HLD']],
+            centric=centric, centric_phase=centric_phase)
+
+        return PhaseDataConverter._write_phase_mtz(
+            mtz, output_path, 'phase_data', [('PHI', 'P', phi), ('FOM', 'W', fom)])
+
+    @staticmethod
+    def _phifom_to_hl_gemmi(input_path: str, output_path: str) -> str:
+        """
+        Convert PHIFOM format to HL coefficients with the vectorized engine.
 
         Args:
             input_path: Path to input MTZ with PHI/FOM
             output_path: Path for output MTZ with HL coefficients
-            mtz: gemmi.Mtz object (already loaded)
 
         Returns:
             Path to output MTZ file
         """
         import gemmi
-        import numpy as np
 
-        # Find PHI and FOM columns
+        mtz = gemmi.read_mtz_file(input_path)
         phi_col = None
         fom_col = None
-
         for col in mtz.columns:
             label = col.label.upper()
-            if col.type == 'P' or 'PHI' in label:  # Phase column
+            if col.type == 'P' or 'PHI' in label:
                 phi_col = col
-            elif col.type == 'W' or 'FOM' in label:  # Weight/FOM column
+            elif col.type == 'W' or 'FOM' in label:
                 fom_col = col
 
         if phi_col is None:
@@ -441,155 +469,89 @@ class PhaseDataConverter:
         if fom_col is None:
             raise CException(PhaseDataConverter, 9, details=f"Input file: {input_path}")
 
-        # Extract PHI and FOM as numpy arrays
-        phi = np.array(phi_col)  # Degrees
-        fom = np.array(fom_col)
+        data = mtz.array
+        centric, centric_phase = PhaseDataConverter._centric_phases(mtz)
+        hla, hlb, hlc, hld = PhaseDataConverter._phifom_to_hl_calculation(
+            data[:, phi_col.idx], data[:, fom_col.idx], centric=centric)
 
-        # Convert PHI to radians for calculation
-        phi_rad = np.radians(phi)
+        return PhaseDataConverter._write_phase_mtz(
+            mtz, output_path, 'hl_data',
+            [('HLA', 'A', hla), ('HLB', 'A', hlb), ('HLC', 'A', hlc), ('HLD', 'A', hld)])
 
-        # Calculate HL coefficients using centrosymmetric approximation
-        hla = fom * np.cos(phi_rad)
-        hlb = fom * np.sin(phi_rad)
-        hlc = np.zeros_like(fom)
-        hld = np.zeros_like(fom)
+    @staticmethod
+    def _write_phase_mtz(mtz, output_path: str, dataset_name: str, columns) -> str:
+        """Write H, K, L of mtz plus columns [(label, type, values), ...]."""
+        import gemmi
+        import numpy as np
 
-        # Create output MTZ with same structure
         out_mtz = gemmi.Mtz(with_base=False)
         out_mtz.spacegroup = mtz.spacegroup
         out_mtz.set_cell_for_all(mtz.cell)
-
-        # Add a single dataset for all columns
-        out_mtz.add_dataset('hl_data')
-
-        # Add H, K, L columns
-        out_mtz.add_column('H', 'H')
-        out_mtz.add_column('K', 'H')
-        out_mtz.add_column('L', 'H')
-
-        # Add HL coefficient columns
-        out_mtz.add_column('HLA', 'A')  # HL coefficient type
-        out_mtz.add_column('HLB', 'A')
-        out_mtz.add_column('HLC', 'A')
-        out_mtz.add_column('HLD', 'A')
-
-        # Set data
-        out_mtz.set_data(np.column_stack([
-            np.array(mtz.column_with_label('H')),
-            np.array(mtz.column_with_label('K')),
-            np.array(mtz.column_with_label('L')),
-            hla,
-            hlb,
-            hlc,
-            hld
-        ]))
-
-        # Write output
+        out_mtz.add_dataset(dataset_name)
+        for label in ('H', 'K', 'L'):
+            out_mtz.add_column(label, 'H')
+        for label, col_type, _ in columns:
+            out_mtz.add_column(label, col_type)
+
+        data = np.empty((mtz.nreflections, 3 + len(columns)), dtype=np.float32)
+        for i, label in enumerate(('H', 'K', 'L')):
+            data[:, i] = mtz.array[:, mtz.column_with_label(label).idx]
+        for i, (_, _, values) in enumerate(columns):
+            data[:, 3 + i] = values
+        out_mtz.set_data(data)
         out_mtz.write_to_file(output_path)
         return output_path
 
     @staticmethod
-    def _hl_to_phifom_gemmi_experimental(input_path: str, output_path: str, mtz) -> str:
+    def _centric_phases(mtz):
         """
-        EXPERIMENTAL: Convert HL coefficients to PHIFOM format using gemmi.
-
-        Reads HLA, HLB, HLC, HLD columns and calculates best phase (PHI) and
-        figure of merit (FOM) using numerical optimization of the phase
-        probability distribution.
+        Find the centric reflections of an MTZ and their allowed phases.
 
-        Args:
-            input_path: Path to input MTZ with HL coefficients
-            output_path: Path for output MTZ with PHI/FOM
-            mtz: gemmi.Mtz object (already loaded)
+        A centric h has an operation (R, t) with h*R = -h, which restricts its
+        phase to phi0 = pi*h.t (mod pi).
 
         Returns:
-            Path to output MTZ file
-
-        References:
-            - Read, R.J. (1986). Acta Cryst. A42, 140-149.
-            - Hendrickson & Lattman (1970). Acta Cryst. B26, 136-143.
+            tuple: (centric, phi0) - boolean array and allowed phases in radians
         """
-        import gemmi
         import numpy as np
 
-        # Find HL coefficient columns (column type 'A')
-        hl_cols = {}
-        for col in mtz.columns:
-            if col.type == 'A':  # HL coefficient type
-                label = col.label
-                if 'HLA' in label:
-                    hl_cols['HLA'] = col
-                elif 'HLB' in label:
-                    hl_cols['HLB'] = col
-                elif 'HLC' in label:
-                    hl_cols['HLC'] = col
-                elif 'HLD' in label:
-                    hl_cols['HLD'] = col
-
-        if len(hl_cols) != 4:
-            raise CException(
-                PhaseDataConverter, 10,
-                details=f"Found {len(hl_cols)} columns: {', '.join(hl_cols.keys())}"
-            )
-
-        # Extract HL coefficients as numpy arrays
-        hla = np.array(hl_cols['HLA'])
-        hlb = np.array(hl_cols['HLB'])
-        hlc = np.array(hl_cols['HLC'])
-        hld = np.array(hl_cols['HLD'])
-
-        # Calculate PHI and FOM from HL coefficients
-        phi, fom = PhaseDataConverter._hl_to_phifom_calculation(hla, hlb, hlc, hld)
-
-        # Create output MTZ with same structure
-        out_mtz = gemmi.Mtz(with_base=False)
-        out_mtz.spacegroup = mtz.spacegroup
-        out_mtz.set_cell_for_all(mtz.cell)
-
-        # Add a single dataset for all columns
-        out_mtz.add_dataset('phase_data')
-
-        # Add H, K, L columns
-        out_mtz.add_column('H', 'H')
-        out_mtz.add_column('K', 'H')
-        out_mtz.add_column('L', 'H')
-
-        # Add PHI and FOM columns
-        out_mtz.add_column('PHI', 'P')  # Phase column type
-        out_mtz.add_column('FOM', 'W')  # Weight/FOM column type
-
-        # Set data
-        out_mtz.set_data(np.column_stack([
-            np.array(mtz.column_with_label('H')),
-            np.array(mtz.column_with_label('K')),
-            np.array(mtz.column_with_label('L')),
-            phi,
-            fom
-        ]))
-
-        # Write output
-        out_mtz.write_to_file(output_path)
-        return output_path
+        hkl = mtz.make_miller_array()
+        ops = mtz.spacegroup.operations()
+        centric = np.asarray(ops.centric_flag_array(hkl), dtype=bool)
+        phi0 = np.zeros(len(hkl))
+        found = ~centric
+        for op in ops:
+            if found.all():
+                break
+            rot = np.array(op.rot) // op.DEN
+            tran = np.array(op.tran) / op.DEN
+            match = ~found & (hkl @ rot == -hkl).all(axis=1)
+            phi0[match] = np.pi * (hkl[match] @ tran)
+            found |= match
+        return centric, phi0
 
     @staticmethod
-    def _hl_to_phifom_calculation(hla, hlb, hlc, hld):
+    def _hl_to_phifom_calculation(hla, hlb, hlc, hld, centric=None, centric_phase=None,
+                                  samples: int = None, chunk_bytes: int = None,
+                                  analytic: bool = True):
         """
-        Calculate best phase and FOM from Hendrickson-Lattman coefficients.
-
-        The phase probability distribution P(phi) is proportional to:
-        exp(A*cos(phi) + B*sin(phi) + C*cos(2*phi) + D*sin(2*phi))
+        Calculate centroid phase and FOM from Hendrickson-Lattman coefficients.
 
-        where A=HLA, B=HLB, C=HLC, D=HLD
-
-        Best phase (phi_best) is found by maximizing P(phi) numerically.
-        FOM = <cos(phi - phi_best)> is calculated by numerical integration.
+        FOM * exp(i*phi_best) = <exp(i*phi)> over the phase probability
+        distribution, evaluated for all reflections at once (see the section
+        comment above).
 
         Args:
             hla, hlb, hlc, hld: Hendrickson-Lattman coefficient arrays (numpy)
+            centric: Optional boolean array marking centric reflections
+            centric_phase: Allowed phases (radians) of the centric reflections
+            samples: Phase samples per reflection for the numerical integral
+            chunk_bytes: Memory cap for the (reflections × samples) work arrays
+            analytic: Use the I1/I0 lookup table for acentrics with C = D = 0
 
         Returns:
-            tuple: (phi_best, fom) - Best phase estimate and figure of merit
-                   Both in degrees for phi_best, FOM in [0, 1]
+            tuple: (phi_best, fom) - Best phase estimate in degrees [0, 360)
+                   and figure of merit in [0, 1]
 
         References:
             - Read, R.J. (1986). Acta Cryst. A42, 140-149.
@@ -597,42 +559,171 @@ class PhaseDataConverter:
         """
         import numpy as np
 
+        samples = samples or HL_PHASE_SAMPLES
+        chunk_bytes = chunk_bytes or HL_CHUNK_BYTES
+        hla, hlb, hlc, hld = (np.asarray(x) for x in (hla, hlb, hlc, hld))
         n_reflections = len(hla)
         phi_best = np.zeros(n_reflections)
         fom = np.zeros(n_reflections)
 
-        # Sample phases from 0 to 360 degrees
-        # Use fine grid for accurate maximum finding
-        phi_samples = np.linspace(0, 2 * np.pi, 360)
+        if centric is None:
+            centric = np.zeros(n_reflections, dtype=bool)
+        acentric = ~centric
+        if analytic:
+            simple = acentric & (hlc == 0) & (hld == 0)
+        else:
+            simple = np.zeros(n_reflections, dtype=bool)
+        general = np.flatnonzero(acentric & ~simple)
+
+        if simple.any():
+            a = hla[simple].astype(np.float64)
+            b = hlb[simple].astype(np.float64)
+            fom[simple] = PhaseDataConverter._sim(np.hypot(a, b))
+            phi_best[simple] = np.arctan2(b, a)
+
+        if centric.any():
+            phi0 = centric_phase[centric]
+            x = hla[centric] * np.cos(phi0) + hlb[centric] * np.sin(phi0)
+            fom[centric] = np.tanh(np.abs(x))
+            phi_best[centric] = phi0 + np.where(x < 0, np.pi, 0.0)
+
+        if len(general):
+            angles = np.arange(samples) * (2 * np.pi / samples)
+            basis = np.stack([np.cos(angles), np.sin(angles),
+                              np.cos(2 * angles), np.sin(2 * angles)])
+            # Two (chunk × samples) float64 arrays are alive at a time
+            chunk = max(1, chunk_bytes // (2 * 8 * samples))
+            for start in range(0, len(general), chunk):
+                rows = general[start:start + chunk]
+                coefficients = np.stack(
+                    [hla[rows], hlb[rows], hlc[rows], hld[rows]], axis=1).astype(np.float64)
+                exponent = coefficients @ basis
+                # Prevent overflow by subtracting each reflection's maximum
+                exponent -= exponent.max(axis=1, keepdims=True)
+                prob = np.exp(exponent, out=exponent)
+                # The integrand is periodic, so the rectangle rule on a uniform
+                # grid converges exponentially
+                moments = prob @ basis[:2].T
+                total = prob.sum(axis=1)
+                fom[rows] = np.hypot(moments[:, 0], moments[:, 1]) / total
+                phi_best[rows] = np.arctan2(moments[:, 1], moments[:, 0])
+
+        np.clip(fom, 0.0, 1.0, out=fom)
+        phi_best_deg = np.mod(np.degrees(phi_best), 360.0)
+        # -0.0 and values within rounding of 360 wrap to 0
+        phi_best_deg[phi_best_deg >= 360.0] = 0.0
+        return phi_best_deg, fom
 
-        for i in range(n_reflections):
-            # Calculate phase probability distribution
-            # P(phi) ∝ exp(A*cos(phi) + B*sin(phi) + C*cos(2*phi) + D*sin(2*phi))
-            exponent = (hla[i] * np.cos(phi_samples) +
-                        hlb[i] * np.sin(phi_samples) +
-                        hlc[i] * np.cos(2 * phi_samples) +
-                        hld[i] * np.sin(2 * phi_samples))
+    @staticmethod
+    def _phifom_to_hl_calculation(phi, fom, centric=None):
+        """
+        Calculate Hendrickson-Lattman coefficients from phase and FOM.
 
-            # Prevent overflow by subtracting maximum
-            exponent_max = np.max(exponent)
-            prob = np.exp(exponent - exponent_max)
+        The inverse of the unimodal (C = D = 0) case: HLA = k*cos(phi),
+        HLB = k*sin(phi) with k such that I1(k)/I0(k) = FOM for acentric and
+        tanh(k) = FOM for centric reflections.
 
-            # Find best phase (maximum probability)
-            max_idx = np.argmax(prob)
-            phi_best[i] = phi_samples[max_idx]
+        Args:
+            phi: Phases in degrees
+            fom: Figures of merit
+            centric: Optional boolean array marking centric reflections
 
-            # Calculate FOM = <cos(phi - phi_best)> by numerical integration
-            # FOM = ∫ cos(phi - phi_best) * P(phi) dphi / ∫ P(phi) dphi
-            cos_term = np.cos(phi_samples - phi_best[i])
-            numerator = np.trapezoid(cos_term * prob, phi_samples)
-            denominator = np.trapezoid(prob, phi_samples)
+        Returns:
+            tuple: (hla, hlb, hlc, hld) arrays
+        """
+        import numpy as np
 
-            fom[i] = numerator / denominator if denominator > 0 else 0.0
+        phi = np.radians(np.asarray(phi, dtype=np.float64))
+        fom = np.clip(np.asarray(fom, dtype=np.float64), 0.0, None)
+        if centric is None:
+            centric = np.zeros(len(fom), dtype=bool)
+
+        k = np.empty(len(fom))
+        k[~centric] = PhaseDataConverter._invsim(fom[~centric])
+        # FOM = 1 (the float32 rounding of any tanh(k) with k > 9) maps to the
+        # largest k still distinguishable in float32
+        k[centric] = np.arctanh(np.minimum(fom[centric], 1.0 - 2.0**-24))
+        # Missing phases (NaN) give zero coefficients, i.e. no information
+        k[~np.isfinite(phi)] = 0.0
+        phi = np.nan_to_num(phi)
+        zeros = np.zeros(len(fom))
+        return k * np.cos(phi), k * np.sin(phi), zeros, zeros.copy()
 
-            # Ensure FOM is in valid range [0, 1]
-            fom[i] = np.clip(fom[i], 0.0, 1.0)
+    @staticmethod
+    def _sim(k):
+        """I1(k)/I0(k): the FOM of a unimodal phase distribution."""
+        import numpy as np
 
-        # Convert phi_best from radians to degrees
-        phi_best_deg = np.degrees(phi_best)
+        k = np.abs(np.asarray(k, dtype=np.float64))
+        grid, table, slope = _sim_table()
+        # Cubic Hermite interpolation between the tabulated points
+        step = grid[1] - grid[0]
+        index = np.minimum((k / step).astype(np.intp), len(grid) - 2)
+        t = np.minimum(k / step - index, 1.0)
+        result = ((2 * t**3 - 3 * t**2 + 1) * table[index]
+                  + (t**3 - 2 * t**2 + t) * step * slope[index]
+                  + (-2 * t**3 + 3 * t**2) * table[index + 1]
+                  + (t**3 - t**2) * step * slope[index + 1])
+        large = k > grid[-1]
+        if large.any():
+            # Asymptotic expansion; its error is below 1e-9 past the table
+            x = 1.0 / k[large]
+            result[large] = 1.0 - x / 2 - x**2 / 8 - x**3 / 8 - 25 * x**4 / 128
+        return result
 
-        return phi_best_deg, fom
+    @staticmethod
+    def _invsim(fom):
+        """Inverse of _sim(), capped at HL_MAX_CONCENTRATION."""
+        import numpy as np
+
+        fom = np.minimum(np.asarray(fom, dtype=np.float64),
+                         PhaseDataConverter._sim(np.array([HL_MAX_CONCENTRATION]))[0])
+        grid, table, _ = _sim_table()
+        k = np.interp(fom, table, grid)
+        # Polish the interpolated inverse with Newton steps
+        for _ in range(2):
+            value = PhaseDataConverter._sim(k)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.where(k > 0, 1.0 - value / k - value**2, 0.5)
+            k = np.maximum(k - (value - fom) / slope, 0.0)
+        large = fom > table[-1]
+        if large.any():
+            # Newton iterations on the asymptotic expansion
+            target = fom[large]
+            x = 2.0 * (1.0 - target)
+            for _ in range(4):
+                value = 1.0 - x / 2 - x**2 / 8 - x**3 / 8 - 25 * x**4 / 128
+                slope = -0.5 - x / 4 - 3 * x**2 / 8 - 25 * x**3 / 32
+                x -= (value - target) / slope
+            k[large] = 1.0 / x
+        return k
+
+
+# Phase samples for the numerical HL → PHIFOM integral
+HL_PHASE_SAMPLES = 144
+
+# Memory cap for the HL → PHIFOM work arrays
+HL_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Largest HL concentration produced from a FOM (FOM 0.999)
+HL_MAX_CONCENTRATION = 500.0
+
+
+@functools.lru_cache(maxsize=1)
+def _sim_table():
+    """
+    I1(k)/I0(k) and its derivative on k = 0 .. 64 in steps of 1/64.
+
+    The values come from numerical integration, the derivative from
+    d/dk (I1/I0) = 1 - (I1/I0)/k - (I1/I0)**2.
+    """
+    import numpy as np
+
+    grid = np.linspace(0.0, 64.0, 64 * 64 + 1)
+    angles = np.arange(128) * (2 * np.pi / 128)
+    weights = np.exp(np.multiply.outer(grid, np.cos(angles) - 1.0))
+    table = (weights @ np.cos(angles)) / weights.sum(axis=1)
+    slope = np.empty_like(table)
+    slope[0] = 0.5
+    slope[1:] = 1.0 - table[1:] / grid[1:] - table[1:] ** 2
+    return grid, table, slope
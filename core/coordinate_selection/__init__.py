@@ -7,10 +7,20 @@ pure Python + gemmi.
 
 Public API:
     parse_selection(selection_string) -> SelectionAST
+    compile_selection(selection_string) -> SelectionAST (cached per string)
     evaluate_selection(ast, gemmi_structure) -> list[gemmi.Atom]
+    AtomTable(gemmi_structure), SelectionEvaluator(structure, table).select(ast)
+        -> AtomSelection (NumPy mask, mapped to gemmi atoms on iteration)
 """
 
-from .parser import parse_selection
-from .evaluator import evaluate_selection
+from .parser import compile_selection, parse_selection
+from .evaluator import AtomSelection, AtomTable, SelectionEvaluator, evaluate_selection
 
-__all__ = ['parse_selection', 'evaluate_selection']
+__all__ = [
+    'parse_selection',
+    'compile_selection',
+    'evaluate_selection',
+    'AtomTable',
+    'AtomSelection',
+    'SelectionEvaluator',
+]
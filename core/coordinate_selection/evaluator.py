@@ -2,197 +2,334 @@
 Evaluator for coordinate selection AST using gemmi.
 
 Applies selection criteria to gemmi.Structure objects.
+
+The structure is flattened once into an AtomTable: one row per atom, with
+each selectable property (model number, chain id, sequence number, insertion
+code, residue name, atom name, element, altloc) stored as integer codes into
+a small table of the distinct values. A CID selector is matched against the
+distinct values of each column only, and the AST is evaluated as NumPy
+boolean masks over all atoms, so `and`/`or`/`not` cost one vectorised
+operation each whatever the size of the model. Selected atoms are mapped back
+to gemmi objects only when they are iterated (e.g. when writing output).
 """
 
-from typing import List, Set, Tuple
-import re
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
 from .ast_nodes import (
     CIDSelector, LogicalAnd, LogicalOr, LogicalNot, SelectionNode
 )
 
+# Atom properties are read for the candidates of the other fields of a
+# selector, instead of for every atom, when fewer than 1/16 of atoms remain
+SPARSE_CANDIDATE_FRACTION = 16
+
+# CIDSelector fields and the AtomTable columns they are matched against
+_SELECTOR_COLUMNS = (
+    ("model", "model"),
+    ("chain", "chain"),
+    ("seq_no", "seq_num"),
+    ("res_name", "res_name"),
+    ("ins_code", "ins_code"),
+    ("atom_name", "atom_name"),
+    ("chem_elem", "element"),
+    ("alt_loc", "alt_loc"),
+)
+
+
+def matches_value(actual: str, pattern: str) -> bool:
+    """
+    Check if actual value matches the pattern.
+
+    Pattern can be:
+    - Exact match: "A"
+    - Wildcard: "*"
+    - List: "A,B,C"
+    - Range: "10-20" (for numbers only)
+    """
+    if pattern == '*':
+        return True
+
+    # Check for comma-separated list
+    if ',' in pattern:
+        values = [v.strip() for v in pattern.split(',')]
+        return actual in values
+
+    # Check for range (only for numeric values)
+    if '-' in pattern and pattern[0].isdigit():
+        parts = pattern.split('-')
+        if len(parts) == 2:
+            try:
+                start = int(parts[0])
+                end = int(parts[1])
+                actual_num = int(actual)
+                return start <= actual_num <= end
+            except ValueError:
+                pass
+
+    # Exact match
+    return actual == pattern
+
+
+class _Column:
+    """Per-atom codes into the distinct values of one property."""
+
+    __slots__ = ("values", "codes", "_matches")
+
+    def __init__(self, per_atom: List[str], repeats: Optional[np.ndarray] = None):
+        # Values of per-residue properties are given once per residue
+        index = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) for value in per_atom),
+            dtype=np.int32, count=len(per_atom),
+        )
+        self.values: List[str] = list(index)
+        self.codes = np.repeat(codes, repeats) if repeats is not None else codes
+        self._matches = {}
+
+    def mask(self, pattern: str) -> np.ndarray:
+        """Boolean mask of the atoms whose value matches pattern."""
+        matching = self._matches.get(pattern)
+        if matching is None:
+            matching = np.fromiter(
+                (matches_value(value, pattern) for value in self.values),
+                dtype=bool, count=len(self.values),
+            )
+            self._matches[pattern] = matching
+        return matching[self.codes]
+
+
+class AtomTable:
+    """
+    Columnar view of the atoms of a gemmi Structure.
+
+    Built in one pass over the residues. Atoms are numbered in structure
+    order; for each atom the table records the model, chain, residue and
+    atom indices needed to fetch the gemmi objects again. Columns of atom
+    properties (name, element, altloc) need a pass over every atom and are
+    only built the first time a selector uses them.
+    """
+
+    # Atom-level columns and how to read them from a gemmi Atom
+    _ATOM_COLUMNS = {
+        "atom_name": lambda atom: atom.name,
+        "element": lambda atom: atom.element.name,
+        "alt_loc": lambda atom: atom.altloc if atom.altloc else '',
+    }
+
+    def __init__(self, structure):
+        self.structure = structure
+        models, chains, residues, atom_counts = [], [], [], []
+        chain_ids, seq_nums, ins_codes, res_names = [], [], [], []
+        self._residues = []
+
+        for model_index, model in enumerate(structure):
+            for chain_index, chain in enumerate(model):
+                chain_id = chain.name
+                for residue_index, residue in enumerate(chain):
+                    count = len(residue)
+                    if not count:
+                        continue
+                    self._residues.append(residue)
+                    models.append(model_index)
+                    chains.append(chain_index)
+                    residues.append(residue_index)
+                    atom_counts.append(count)
+                    chain_ids.append(chain_id)
+                    seqid = residue.seqid
+                    seq_nums.append(str(seqid.num))
+                    ins_codes.append(seqid.icode if seqid.icode else '')
+                    res_names.append(residue.name)
+
+        counts = np.array(atom_counts, dtype=np.int64)
+        self.size = int(counts.sum())
+        # Position in self._residues of the residue of each atom
+        self._residue_row = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+        self.model_index = np.repeat(np.array(models, dtype=np.int32), counts)
+        self.chain_index = np.repeat(np.array(chains, dtype=np.int32), counts)
+        self.residue_index = np.repeat(np.array(residues, dtype=np.int32), counts)
+        # Position of each atom within its residue
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        self.atom_index = (np.arange(self.size, dtype=np.int64) - starts).astype(np.int32)
+
+        # Model numbers are positions in the structure, counted from 1
+        self._columns = {
+            "model": _Column([str(i + 1) for i in models], counts),
+            "chain": _Column(chain_ids, counts),
+            "seq_num": _Column(seq_nums, counts),
+            "ins_code": _Column(ins_codes, counts),
+            "res_name": _Column(res_names, counts),
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def has_column(self, name: str) -> bool:
+        """Whether the column exists without a pass over the atoms."""
+        return name in self._columns
+
+    def values(self, name: str, rows: np.ndarray) -> List[str]:
+        """One property of the atoms at rows, read without building its column."""
+        if name in self._columns:
+            column = self._columns[name]
+            return [column.values[code] for code in column.codes[rows].tolist()]
+        read = self._ATOM_COLUMNS[name]
+        residues = self._residues
+        return [
+            read(residues[residue_row][atom_index])
+            for residue_row, atom_index in zip(
+                self._residue_row[rows].tolist(), self.atom_index[rows].tolist()
+            )
+        ]
+
+    def column(self, name: str) -> _Column:
+        """One property of every atom (see _SELECTOR_COLUMNS for the names)."""
+        column = self._columns.get(name)
+        if column is None:
+            # One comprehension per column: this is the per-atom hot loop
+            values = []
+            if name == "atom_name":
+                for residue in self._residues:
+                    values.extend([atom.name for atom in residue])
+            elif name == "element":
+                for residue in self._residues:
+                    values.extend([atom.element.name for atom in residue])
+            elif name == "alt_loc":
+                for residue in self._residues:
+                    values.extend([atom.altloc if atom.altloc else '' for atom in residue])
+            else:
+                raise KeyError(name)
+            column = self._columns[name] = _Column(values)
+        return column
+
+    def atom(self, row: int) -> Tuple:
+        """(model, chain, residue, atom) of one row."""
+        model = self.structure[int(self.model_index[row])]
+        chain = model[int(self.chain_index[row])]
+        residue = chain[int(self.residue_index[row])]
+        return (model, chain, residue, residue[int(self.atom_index[row])])
+
+
+class AtomSelection:
+    """
+    Atoms of an AtomTable selected by a boolean mask.
+
+    Behaves as a sequence of (model, chain, residue, atom) tuples, which are
+    only created when it is iterated or indexed.
+    """
+
+    def __init__(self, table: AtomTable, mask: np.ndarray):
+        self.table = table
+        self.mask = mask
+        self.rows = np.flatnonzero(mask)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Tuple]:
+        table, rows = self.table, self.rows
+        structure = table.structure
+        current_key, residue_objects = None, None
+        for key, atom_index in zip(
+            zip(table.model_index[rows].tolist(), table.chain_index[rows].tolist(),
+                table.residue_index[rows].tolist()),
+            table.atom_index[rows].tolist(),
+        ):
+            if key != current_key:
+                # Consecutive rows mostly share a residue; fetch it once
+                model = structure[key[0]]
+                chain = model[key[1]]
+                residue_objects = (model, chain, chain[key[2]])
+                current_key = key
+            model, chain, residue = residue_objects
+            yield (model, chain, residue, residue[atom_index])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.atom(row) for row in self.rows[index].tolist()]
+        return self.table.atom(int(self.rows[index]))
+
+    def __bool__(self) -> bool:
+        return len(self.rows) > 0
+
 
 class SelectionEvaluator:
     """Evaluates selection AST against gemmi Structure."""
 
-    def __init__(self, structure):
+    def __init__(self, structure, table: Optional[AtomTable] = None):
         """
         Initialize evaluator with a gemmi Structure.
 
         Args:
             structure: gemmi.Structure object
+            table: AtomTable of structure, if already built
         """
         self.structure = structure
+        self.table = table if table is not None else AtomTable(structure)
 
-    def evaluate(self, node: SelectionNode) -> List:
-        """
-        Evaluate selection AST and return list of selected atoms.
-
-        Args:
-            node: Root node of selection AST
-
-        Returns:
-            List of (model, chain, residue, atom) tuples for selected atoms
-
-        """
+    def mask(self, node: SelectionNode) -> np.ndarray:
+        """Boolean mask over the atoms of the table selected by node."""
         if isinstance(node, CIDSelector):
             return self._evaluate_cid(node)
         elif isinstance(node, LogicalAnd):
-            left_atoms = set(self.evaluate(node.left))
-            right_atoms = set(self.evaluate(node.right))
-            return list(left_atoms & right_atoms)
+            return self.mask(node.left) & self.mask(node.right)
         elif isinstance(node, LogicalOr):
-            left_atoms = set(self.evaluate(node.left))
-            right_atoms = set(self.evaluate(node.right))
-            return list(left_atoms | right_atoms)
+            return self.mask(node.left) | self.mask(node.right)
         elif isinstance(node, LogicalNot):
-            # Get all atoms
-            all_atoms = set(self._get_all_atoms())
-            # Subtract selected atoms
-            selected_atoms = set(self.evaluate(node.operand))
-            return list(all_atoms - selected_atoms)
+            return ~self.mask(node.operand)
         else:
             raise ValueError(f"Unknown node type: {type(node)}")
 
-    def _get_all_atoms(self) -> List[Tuple]:
-        """Get all atoms in the structure."""
-        atoms = []
-        for model in self.structure:
-            for chain in model:
-                for residue in chain:
-                    for atom in residue:
-                        atoms.append((model, chain, residue, atom))
-        return atoms
-
-    def _evaluate_cid(self, cid: CIDSelector) -> List[Tuple]:
-        """
-        Evaluate a CID selector.
+    def select(self, node: SelectionNode) -> AtomSelection:
+        """Atoms selected by node, in structure order."""
+        return AtomSelection(self.table, self.mask(node))
 
-        Returns list of (model, chain, residue, atom) tuples.
+    def evaluate(self, node: SelectionNode) -> List:
         """
-        selected_atoms = []
-
-        for model in self.structure:
-            if not self._matches_model(model, cid):
-                continue
-
-            for chain in model:
-                if not self._matches_chain(chain, cid):
-                    continue
-
-                for residue in chain:
-                    if not self._matches_residue(residue, cid):
-                        continue
-
-                    for atom in residue:
-                        if self._matches_atom(atom, cid):
-                            selected_atoms.append((model, chain, residue, atom))
-
-        return selected_atoms
-
-    def _matches_model(self, model, cid: CIDSelector) -> bool:
-        """Check if model matches CID criteria."""
-        if cid.model is None:
-            return True
-
-        model_name = str(model.name) if hasattr(model, 'name') and model.name else str(model.get_subchain(0).subchain_id()[0]) if model else "1"
-
-        # Try to get model number - gemmi models don't have a direct number attribute
-        # but we can use the model's position in the structure
-        model_num = None
-        for idx, m in enumerate(self.structure, start=1):
-            if m == model:
-                model_num = str(idx)
-                break
-
-        if model_num is None:
-            model_num = "1"
-
-        return self._matches_value(model_num, cid.model)
-
-    def _matches_chain(self, chain, cid: CIDSelector) -> bool:
-        """Check if chain matches CID criteria."""
-        if cid.chain is None:
-            return True
-
-        chain_id = chain.name
-        return self._matches_value(chain_id, cid.chain)
-
-    def _matches_residue(self, residue, cid: CIDSelector) -> bool:
-        """Check if residue matches CID criteria."""
-        # Check sequence number
-        if cid.seq_no is not None:
-            seq_num = str(residue.seqid.num)
-            if not self._matches_value(seq_num, cid.seq_no):
-                return False
-
-        # Check residue name
-        if cid.res_name is not None:
-            res_name = residue.name
-            if not self._matches_value(res_name, cid.res_name):
-                return False
-
-        # Check insertion code
-        if cid.ins_code is not None:
-            ins_code = residue.seqid.icode if residue.seqid.icode else ''
-            if not self._matches_value(ins_code, cid.ins_code):
-                return False
-
-        return True
-
-    def _matches_atom(self, atom, cid: CIDSelector) -> bool:
-        """Check if atom matches CID criteria."""
-        # Check atom name
-        if cid.atom_name is not None:
-            atom_name = atom.name
-            if not self._matches_value(atom_name, cid.atom_name):
-                return False
-
-        # Check chemical element
-        if cid.chem_elem is not None:
-            elem = atom.element.name
-            if not self._matches_value(elem, cid.chem_elem):
-                return False
-
-        # Check alternate location
-        if cid.alt_loc is not None:
-            alt_loc = atom.altloc if atom.altloc else ''
-            if not self._matches_value(alt_loc, cid.alt_loc):
-                return False
+        Evaluate selection AST and return list of selected atoms.
 
-        return True
+        Args:
+            node: Root node of selection AST
 
-    def _matches_value(self, actual: str, pattern: str) -> bool:
-        """
-        Check if actual value matches the pattern.
+        Returns:
+            List of (model, chain, residue, atom) tuples for selected atoms
 
-        Pattern can be:
-        - Exact match: "A"
-        - Wildcard: "*"
-        - List: "A,B,C"
-        - Range: "10-20" (for numbers only)
         """
-        if pattern == '*':
-            return True
-
-        # Check for comma-separated list
-        if ',' in pattern:
-            values = [v.strip() for v in pattern.split(',')]
-            return actual in values
-
-        # Check for range (only for numeric values)
-        if '-' in pattern and pattern[0].isdigit():
-            parts = pattern.split('-')
-            if len(parts) == 2:
-                try:
-                    start = int(parts[0])
-                    end = int(parts[1])
-                    actual_num = int(actual)
-                    return start <= actual_num <= end
-                except ValueError:
-                    pass
-
-        # Exact match
-        return actual == pattern
+        return list(self.select(node))
+
+    def _evaluate_cid(self, cid: CIDSelector) -> np.ndarray:
+        """Mask of the atoms matching every field set on a CID selector."""
+        table = self.table
+        mask = np.ones(len(table), dtype=bool)
+        unbuilt = []
+        for field, column in _SELECTOR_COLUMNS:
+            pattern = getattr(cid, field)
+            if pattern is None or pattern == '*':
+                continue
+            if table.has_column(column):
+                mask &= table.column(column).mask(pattern)
+            else:
+                unbuilt.append((column, pattern))
+        if not unbuilt:
+            return mask
+
+        rows = np.flatnonzero(mask)
+        if len(rows) * SPARSE_CANDIDATE_FRACTION >= len(table):
+            for column, pattern in unbuilt:
+                mask &= table.column(column).mask(pattern)
+            return mask
+        # Few candidates (e.g. "A/27/CA"): test their atoms directly rather
+        # than reading the property of every atom in the structure
+        for column, pattern in unbuilt:
+            keep = np.fromiter(
+                (matches_value(value, pattern) for value in table.values(column, rows)),
+                dtype=bool, count=len(rows),
+            )
+            rows = rows[keep]
+        mask[:] = False
+        mask[rows] = True
+        return mask
 
 
 def evaluate_selection(ast: SelectionNode, structure) -> List:
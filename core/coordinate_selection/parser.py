@@ -12,6 +12,7 @@ Grammar (simplified):
     cid_selector := ['/' model] ['/' chain] ['/' residue] ['/' atom]
 """
 
+import functools
 from typing import List, Optional
 from .tokenizer import Token, TokenType, tokenize
 from .ast_nodes import (
@@ -167,7 +168,7 @@ class Parser:
                 # These indicate it's an expression, not a simple residue name
                 return False
             elif token.type in (TokenType.IDENTIFIER, TokenType.NUMBER,
-                              TokenType.COMMA, TokenType.DASH, TokenType.WILDCARD):
+                              TokenType.COMMA, TokenType.DASH, TokenType.STAR):
                 # These are OK in a residue name list
                 pos += 1
             else:
@@ -347,3 +348,16 @@ def parse_selection(selection_string: str) -> SelectionNode:
     tokens = tokenize(selection_string)
     parser = Parser(tokens)
     return parser.parse()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_selection(selection_string: str) -> SelectionNode:
+    """
+    Parse a selection string, reusing the AST of earlier calls.
+
+    The returned AST is shared between callers and must not be modified.
+
+    Raises:
+        ParseError: If parsing fails
+    """
+    return parse_selection(selection_string)
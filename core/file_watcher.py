@@ -0,0 +1,479 @@
+"""
+File and directory watching for running plugins.
+
+Replaces the QFileSystemWatcher behind the legacy CPluginScript.watchFile() and
+watchDirectory() API. Wrappers and pipelines use it to react while a program
+runs, typically re-reading a growing log or program XML to update the report.
+
+On Linux the watcher holds one inotify watch per directory and reads its events
+through a selector registered on the asyncio loop that AsyncProcessManager
+already runs, so watching costs no thread and no timer. Where inotify is not
+available (other platforms, exhausted watch limits, a directory that does not
+exist yet) the directory is stat-polled on the same loop instead.
+
+A file is watched through its parent directory, so a file that does not exist
+yet, or that a program replaces by renaming a new copy over it, is still picked
+up. Events for a watch are coalesced: a burst of writes produces one handler
+call after a short delay, and a watch never has two handler calls running at
+once. Handlers of the same owner (plugin) run one at a time, as they did on the
+Qt event loop.
+
+Example:
+    watcher = FILE_WATCHER()
+    watch = watcher.watch_file(log_path, handler, owner=plugin, min_delta_size=34)
+    ...
+    watcher.unwatch_owner(plugin)
+
+Environment Variables:
+    CCP4I2_FILE_WATCHER: Set to "polling" to disable inotify
+"""
+
+import asyncio
+import ctypes
+import errno
+import logging
+import os
+import struct
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (<sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+# Events that change the content of a watched file
+FILE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_MOVED_TO
+# Events that change the entries of a watched directory
+DIRECTORY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_DIRECTORY_MASK = FILE_EVENTS | DIRECTORY_EVENTS | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 65536
+
+# Seconds to wait after an event for more events before calling the handler
+COALESCE_DELAY = 0.1
+# Seconds between stat polls of directories that cannot use inotify
+POLL_INTERVAL = 0.5
+
+
+@dataclass(eq=False)
+class Watch:
+    """
+    One registered watch, as returned by FileWatcher.watch_file() and watch_directory().
+
+    Attributes:
+        path: The watched file or directory, as given
+        handler: Called with path after the watched file or directory changed
+        directory: Directory whose events reach this watch (symbolic links resolved)
+        name: File name within directory ('' for directory watches)
+        owner: Object whose watches are released together (usually a plugin)
+        is_directory: True for watch_directory() watches
+        min_delta_size: Minimum growth in bytes of a file before the handler is called
+        unwatch_while_handling: Discard changes made while the handler runs
+        max_size_yet: File size when the handler was last called
+    """
+
+    path: str
+    handler: Callable
+    directory: str
+    name: str = ""
+    owner: Any = None
+    is_directory: bool = False
+    min_delta_size: int = 0
+    unwatch_while_handling: bool = False
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    max_size_yet: int = 0
+    calls: int = 0
+
+    active: bool = True
+    dirty: bool = False
+    scheduled: bool = False
+    handling: bool = False
+    signature: Optional[Tuple[int, int, int]] = field(default=None, repr=False)
+
+
+@dataclass(eq=False)
+class _WatchedDirectory:
+    path: str  # Symbolic links resolved, so one directory has one inotify watch
+    wd: Optional[int] = None  # None when polled
+    watches: Set[Watch] = field(default_factory=set)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """What stat polling compares to notice a change."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class _Inotify:
+    """Minimal ctypes binding of the Linux inotify API."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd: int):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Return the pending (wd, mask, name) events without blocking."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            if not data:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """
+    Watch files and directories and call handlers when they change.
+
+    Args:
+        loop: Loop that receives events and schedules handlers (default: the
+            AsyncProcessManager loop)
+        use_inotify: Use inotify where available; False always stat-polls
+        coalesce_delay: Seconds to gather events before calling a handler
+        poll_interval: Seconds between stat polls of polled directories
+    """
+
+    def __init__(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        use_inotify: bool = True,
+        coalesce_delay: float = COALESCE_DELAY,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        if loop is None:
+            from core.async_process_manager import ASYNC_PROCESSMANAGER
+
+            loop = ASYNC_PROCESSMANAGER()._get_loop()
+        self.loop = loop
+        self.coalesce_delay = coalesce_delay
+        self.poll_interval = poll_interval
+
+        self._lock = threading.RLock()
+        self._directories: Dict[str, _WatchedDirectory] = {}
+        self._by_wd: Dict[int, _WatchedDirectory] = {}
+        self._owner_locks: Dict[int, asyncio.Lock] = {}
+        self._poll_handle = None
+
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as error:
+                logger.info("inotify unavailable, polling for file changes: %s", error)
+            else:
+                self.loop.call_soon_threadsafe(self.loop.add_reader, self._inotify.fd, self._read_inotify)
+
+    @property
+    def backend(self) -> str:
+        """'inotify' or 'polling'."""
+        return "inotify" if self._inotify is not None else "polling"
+
+    # ------------------------------------------------------------------
+    # Registration (any thread)
+    # ------------------------------------------------------------------
+
+    def watch_file(
+        self,
+        path,
+        handler: Callable,
+        owner: Any = None,
+        min_delta_size: int = 0,
+        unwatch_while_handling: bool = False,
+    ) -> Watch:
+        """
+        Call handler(path) when a file is created, written or replaced.
+
+        Args:
+            path: File to watch; it need not exist yet
+            handler: Plain or coroutine function taking the path
+            owner: Key for unwatch_owner()
+            min_delta_size: Only call the handler once the file has grown by
+                at least this many bytes since the last call (a file that shrank
+                was rewritten and counts from zero)
+            unwatch_while_handling: Discard changes made while the handler runs,
+                e.g. when the handler itself writes to the file
+        """
+        path = os.fspath(path)
+        directory, name = os.path.split(os.path.abspath(path))
+        watch = Watch(
+            path=path,
+            handler=handler,
+            directory=os.path.realpath(directory),
+            name=name,
+            owner=owner,
+            min_delta_size=min_delta_size or 0,
+            unwatch_while_handling=unwatch_while_handling,
+            loop=self._caller_loop(),
+        )
+        self._add(watch)
+        return watch
+
+    def watch_directory(self, path, handler: Callable, owner: Any = None) -> Watch:
+        """Call handler(path) when entries are added to, removed from or renamed in a directory."""
+        path = os.fspath(path)
+        watch = Watch(
+            path=path,
+            handler=handler,
+            directory=os.path.realpath(path),
+            owner=owner,
+            is_directory=True,
+            loop=self._caller_loop(),
+        )
+        self._add(watch)
+        return watch
+
+    def unwatch(self, watch: Watch):
+        """Stop a watch. A handler call already running is not interrupted."""
+        with self._lock:
+            if not watch.active:
+                return
+            watch.active = False
+            directory = self._directories.get(watch.directory)
+            if directory is None:
+                return
+            directory.watches.discard(watch)
+            if not directory.watches:
+                del self._directories[directory.path]
+                if directory.wd is not None:
+                    self._by_wd.pop(directory.wd, None)
+                    self._inotify.rm_watch(directory.wd)
+
+    def unwatch_owner(self, owner: Any):
+        """Stop every watch registered with owner."""
+        for watch in self.watches(owner):
+            self.unwatch(watch)
+        self._owner_locks.pop(id(owner), None)
+
+    def watches(self, owner: Any = None) -> List[Watch]:
+        """Active watches, optionally only those of owner."""
+        with self._lock:
+            return [
+                watch
+                for directory in self._directories.values()
+                for watch in directory.watches
+                if owner is None or watch.owner is owner
+            ]
+
+    def close(self):
+        """Stop all watches and release the inotify descriptor."""
+        for watch in self.watches():
+            self.unwatch(watch)
+        if self._inotify is not None:
+            inotify, self._inotify = self._inotify, None
+
+            def remove_reader():
+                self.loop.remove_reader(inotify.fd)
+                inotify.close()
+
+            self.loop.call_soon_threadsafe(remove_reader)
+
+    def _caller_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """The loop handlers should run on: the caller's, if it runs one."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return None if loop is self.loop else loop
+
+    def _add(self, watch: Watch):
+        watch.signature = _signature(watch.path)
+        with self._lock:
+            directory = self._directories.get(watch.directory)
+            if directory is None:
+                directory = _WatchedDirectory(watch.directory)
+                if self._inotify is not None:
+                    try:
+                        directory.wd = self._inotify.add_watch(directory.path, _DIRECTORY_MASK)
+                    except OSError as error:
+                        if error.errno not in (errno.ENOENT, errno.ENOTDIR):
+                            logger.warning("Polling %s: %s", directory.path, error)
+                    else:
+                        self._by_wd[directory.wd] = directory
+                self._directories[watch.directory] = directory
+            directory.watches.add(watch)
+            if directory.wd is None:
+                self.loop.call_soon_threadsafe(self._schedule_poll)
+
+    # ------------------------------------------------------------------
+    # Event sources (watcher loop)
+    # ------------------------------------------------------------------
+
+    def _read_inotify(self):
+        if self._inotify is None:
+            return
+        events = self._inotify.read_events()
+        with self._lock:
+            for wd, mask, name in events:
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("inotify queue overflowed; notifying every watch")
+                    for directory in list(self._directories.values()):
+                        for watch in list(directory.watches):
+                            self._notify(watch)
+                    continue
+                directory = self._by_wd.get(wd)
+                if directory is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                    # The directory itself went away; poll for it to come back
+                    self._by_wd.pop(wd, None)
+                    directory.wd = None
+                    self._schedule_poll()
+                    for watch in list(directory.watches):
+                        if watch.is_directory:
+                            self._notify(watch)
+                    continue
+                for watch in list(directory.watches):
+                    if watch.is_directory:
+                        if mask & DIRECTORY_EVENTS:
+                            self._notify(watch)
+                    elif name == watch.name and mask & FILE_EVENTS:
+                        self._notify(watch)
+
+    def _schedule_poll(self):
+        if self._poll_handle is None:
+            self._poll_handle = self.loop.call_later(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._poll_handle = None
+        polling = False
+        with self._lock:
+            for directory in list(self._directories.values()):
+                if directory.wd is not None:
+                    continue
+                polling = True
+                for watch in list(directory.watches):
+                    signature = _signature(watch.path)
+                    if signature != watch.signature:
+                        watch.signature = signature
+                        if signature is not None or watch.is_directory:
+                            self._notify(watch)
+        if polling:
+            self._schedule_poll()
+
+    # ------------------------------------------------------------------
+    # Coalescing and dispatch (watcher loop)
+    # ------------------------------------------------------------------
+
+    def _notify(self, watch: Watch):
+        """Record a change; the handler runs once the burst of events is over."""
+        if not watch.active or (watch.handling and watch.unwatch_while_handling):
+            return
+        watch.dirty = True
+        if not watch.scheduled and not watch.handling:
+            watch.scheduled = True
+            self.loop.call_later(self.coalesce_delay, self._start_dispatch, watch)
+
+    def _start_dispatch(self, watch: Watch):
+        watch.scheduled = False
+        self.loop.create_task(self._dispatch(watch))
+
+    def _should_call(self, watch: Watch) -> bool:
+        if watch.is_directory:
+            return True
+        try:
+            size = os.stat(watch.path).st_size
+        except OSError:
+            return False
+        if size < watch.max_size_yet:
+            watch.max_size_yet = 0
+        if watch.min_delta_size and size - watch.max_size_yet < watch.min_delta_size:
+            return False
+        watch.max_size_yet = size
+        return True
+
+    async def _dispatch(self, watch: Watch):
+        owner_lock = self._owner_locks.setdefault(id(watch.owner), asyncio.Lock())
+        watch.handling = True
+        try:
+            while watch.dirty and watch.active:
+                watch.dirty = False
+                if not self._should_call(watch):
+                    continue
+                async with owner_lock:
+                    if watch.active:
+                        await self._call_handler(watch)
+                if watch.unwatch_while_handling:
+                    watch.dirty = False
+        finally:
+            watch.handling = False
+
+    async def _call_handler(self, watch: Watch):
+        watch.calls += 1
+        try:
+            if watch.loop is not None and watch.loop.is_running():
+                # Run on the loop the plugin registered the watch from
+                future = asyncio.run_coroutine_threadsafe(_invoke(watch.handler, watch.path), watch.loop)
+                await asyncio.wrap_future(future)
+            elif asyncio.iscoroutinefunction(watch.handler):
+                await watch.handler(watch.path)
+            else:
+                await self.loop.run_in_executor(None, watch.handler, watch.path)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Error in watch handler for %s", watch.path)
+
+
+async def _invoke(handler: Callable, path: str):
+    result = handler(path)
+    if asyncio.iscoroutine(result):
+        await result
+
+
+_file_watcher: Optional[FileWatcher] = None
+_file_watcher_lock = threading.Lock()
+
+
+def FILE_WATCHER() -> FileWatcher:
+    """Get the process-wide FileWatcher running on the AsyncProcessManager loop."""
+    global _file_watcher
+    with _file_watcher_lock:
+        if _file_watcher is None:
+            use_inotify = os.environ.get("CCP4I2_FILE_WATCHER", "").lower() != "polling"
+            _file_watcher = FileWatcher(use_inotify=use_inotify)
+        return _file_watcher
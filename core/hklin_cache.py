@@ -0,0 +1,392 @@
+"""
+Project-level content-addressed cache of merged HKLIN and converted MTZ files.
+
+makeHklinGemmi() merges the same mini-MTZs again whenever a task is rerun with
+unchanged reflection data (only keywords changed), and pipelines merge the same
+files in every cycle. Conversions such as as_FPAIR(), as_IMEAN() and as_HL()
+are repeated in the same way. The cache keeps one copy of each result under
+the project directory, keyed by a SHA-256 of:
+
+- the content checksums of the input files,
+- the column mappings / content flags / conversion target,
+- the merge strategy and CACHE_FORMAT_VERSION.
+
+A hit is served into the job directory by hardlink, reflink (FICLONE) or, when
+neither is possible, a copy. Entries are evicted least recently used first once
+the cache is larger than HKLIN_CACHE_MAX_BYTES. Because hardlinked entries share
+their blocks with job files, evicting them frees less space than they appear to
+use until the jobs are purged; CPurgeProject.purgeHklinCache() empties the cache.
+
+Each entry <key>.mtz has a sidecar <key>.json recording its size and mtime. An
+entry whose file no longer matches (e.g. a hardlinked job file that a program
+rewrote in place) is discarded instead of being served.
+
+Files outside a project (no CCP4_JOBS / CCP4_IMPORTED_FILES ancestor) are not
+cached.
+
+Example:
+    cache = HklinCache.for_path(work_directory)
+    if cache is not None:
+        key = cache.key(kind='merge', inputs=[file_digest(p) for p in paths])
+        cache.get_or_build(key, work_directory / 'hklin.mtz', build)
+"""
+
+import collections
+import errno
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Cache location relative to the project directory
+HKLIN_CACHE_SUBDIRECTORY = os.path.join("CCP4_TMP", "hklin_cache")
+
+# LRU eviction threshold for one project's cache
+HKLIN_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Bump when the merge or conversion output changes for the same inputs
+CACHE_FORMAT_VERSION = 1
+
+# Subdirectories that mark their parent as a project directory
+PROJECT_SUBDIRECTORIES = ("CCP4_JOBS", "CCP4_IMPORTED_FILES")
+
+# Number of file checksums kept in memory
+FILE_DIGEST_CACHE_SIZE = 1024
+
+# Linux FICLONE ioctl (_IOW(0x94, 9, int))
+_FICLONE = 0x40049409
+
+_digests: "collections.OrderedDict[str, tuple]" = collections.OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def file_digest(path) -> str:
+    """
+    SHA-256 of a file's contents.
+
+    Checksums are remembered per (path, size, mtime), so repeat calls for an
+    unchanged file cost a stat().
+    """
+    real_path = os.path.realpath(os.fspath(path))
+    stat = os.stat(real_path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _digests_lock:
+        cached = _digests.get(real_path)
+        if cached is not None and cached[0] == signature:
+            _digests.move_to_end(real_path)
+            return cached[1]
+
+    sha = hashlib.sha256()
+    with open(real_path, "rb") as stream:
+        for block in iter(functools.partial(stream.read, 1024 * 1024), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    with _digests_lock:
+        _digests[real_path] = (signature, digest)
+        _digests.move_to_end(real_path)
+        while len(_digests) > FILE_DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def project_directory_for(path) -> Optional[Path]:
+    """Project directory containing path, or None if path is not in a project."""
+    if not path:
+        return None
+    path = Path(os.path.abspath(os.fspath(path)))
+    for parent in path.parents:
+        if parent.name in PROJECT_SUBDIRECTORIES:
+            return parent.parent
+    return None
+
+
+def place_file(source, dest) -> str:
+    """
+    Make dest a copy of source as cheaply as the filesystem allows.
+
+    Tries a hardlink, then a reflink, then a plain copy. dest must not exist.
+
+    Returns:
+        'link', 'reflink' or 'copy'
+    """
+    source, dest = os.fspath(source), os.fspath(dest)
+    try:
+        os.link(source, dest)
+        return "link"
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+
+        with open(source, "rb") as src, open(dest, "xb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                return "reflink"
+            except OSError:
+                pass
+        os.remove(dest)
+    except ImportError:
+        pass
+
+    shutil.copyfile(source, dest)
+    return "copy"
+
+
+def _remove(path) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class HklinCache:
+    """
+    Content-addressed store of MTZ files in one project.
+
+    Safe to share between processes working on the same project: entries are
+    written under temporary names and renamed into place.
+    """
+
+    def __init__(self, directory, max_bytes: int = HKLIN_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def for_project(cls, project_directory, **kwargs) -> "HklinCache":
+        return cls(Path(project_directory) / HKLIN_CACHE_SUBDIRECTORY, **kwargs)
+
+    @classmethod
+    def for_path(cls, *paths, **kwargs) -> Optional["HklinCache"]:
+        """Cache of the project containing the first of paths that is in a project."""
+        for path in paths:
+            project_directory = project_directory_for(path)
+            if project_directory is not None:
+                return cls.for_project(project_directory, **kwargs)
+        return None
+
+    @staticmethod
+    def key(**parts) -> str:
+        """Cache key of the JSON-serialisable description parts."""
+        parts["version"] = CACHE_FORMAT_VERSION
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}.mtz"
+
+    def _sidecar(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _valid_entry(self, key: str) -> Optional[Path]:
+        entry, sidecar = self._entry(key), self._sidecar(key)
+        try:
+            with open(sidecar, encoding="utf-8") as stream:
+                recorded = json.load(stream)
+            stat = os.stat(entry)
+        except (OSError, ValueError):
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (recorded.get("size"), recorded.get("mtime_ns")):
+            logger.warning("Discarding modified HKLIN cache entry %s", entry)
+            self._discard(key)
+            return None
+        return entry
+
+    def _discard(self, key: str) -> None:
+        _remove(self._sidecar(key))
+        _remove(self._entry(key))
+
+    def fetch(self, key: str, dest) -> bool:
+        """
+        Place the entry for key at dest (replacing dest).
+
+        Returns:
+            True on a hit, False if there is no valid entry
+        """
+        entry = self._valid_entry(key)
+        if entry is None:
+            return False
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _remove(dest)
+        try:
+            method = place_file(entry, dest)
+        except FileNotFoundError:
+            # Evicted by another process since it was validated
+            return False
+        # The sidecar's mtime orders entries for LRU eviction
+        try:
+            os.utime(self._sidecar(key))
+        except OSError:
+            pass
+        logger.debug("HKLIN cache hit %s -> %s (%s)", key, dest, method)
+        return True
+
+    def store(self, key: str, source, description: Optional[Dict] = None) -> None:
+        """Add source to the cache as the entry for key and evict old entries."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = f".{key}.{os.getpid()}.{uuid.uuid4().hex}"
+        data_tmp = self.directory / f"{temporary}.mtz"
+        sidecar_tmp = self.directory / f"{temporary}.json"
+        try:
+            place_file(source, data_tmp)
+            stat = os.stat(data_tmp)
+            with open(sidecar_tmp, "w", encoding="utf-8") as stream:
+                json.dump({
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "created": time.time(),
+                    "description": description or {},
+                }, stream)
+            os.replace(data_tmp, self._entry(key))
+            os.replace(sidecar_tmp, self._sidecar(key))
+        finally:
+            _remove(data_tmp)
+            _remove(sidecar_tmp)
+        self.evict()
+
+    def get_or_build(self, key: str, dest, build: Callable[[], object],
+                     description: Optional[Dict] = None):
+        """
+        Serve dest from the cache, or build it and add it to the cache.
+
+        Args:
+            key: Cache key (from key())
+            dest: Path the result is wanted at
+            build: Callable writing dest; its return value is returned on a miss
+            description: Optional JSON-serialisable notes stored with the entry
+
+        Returns:
+            dest on a hit, otherwise the return value of build()
+        """
+        if self.fetch(key, dest):
+            return dest
+        # dest may be a hardlink to an entry from an earlier hit: never write
+        # through it
+        _remove(dest)
+        result = build()
+        try:
+            self.store(key, dest, description=description)
+        except OSError as err:
+            logger.warning("Could not add %s to the HKLIN cache: %s", dest, err)
+        return result
+
+    def _entries(self):
+        """(last use, total bytes, key) of every entry, oldest first."""
+        entries = []
+        try:
+            sidecars = list(self.directory.glob("*.json"))
+        except OSError:
+            return entries
+        for sidecar in sidecars:
+            if sidecar.name.startswith("."):
+                continue
+            key = sidecar.stem
+            try:
+                last_use = sidecar.stat().st_mtime
+                size = self._entry(key).stat().st_size
+            except OSError:
+                continue
+            entries.append((last_use, size, key))
+        entries.sort()
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of bytes removed
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, key in entries:
+            if total <= max_bytes:
+                break
+            self._discard(key)
+            total -= size
+            removed += size
+        return removed
+
+    def purge(self) -> Dict[str, int]:
+        """
+        Remove every entry (and leftovers of interrupted writes).
+
+        Returns:
+            Dictionary with 'files_deleted', 'bytes_freed' and 'errors', as
+            returned by CPurgeProject.purgeJob()
+        """
+        stats = {'files_deleted': 0, 'bytes_freed': 0, 'errors': 0}
+        if not self.directory.is_dir():
+            return stats
+        for path in self.directory.iterdir():
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError as err:
+                if err.errno != errno.ENOENT:
+                    logger.warning("Failed to delete %s: %s", path, err)
+                    stats['errors'] += 1
+                continue
+            if path.suffix == ".mtz":
+                stats['files_deleted'] += 1
+            stats['bytes_freed'] += size
+        return stats
+
+
+def cached_conversion(target_name: str):
+    """
+    Memoize an as_<TARGET>(work_directory) conversion method in the HKLIN cache.
+
+    The result for identical input contents is linked to the path the
+    conversion would have written. Conversions of files outside a project,
+    and results that are the input itself (already in the target format),
+    are not cached.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, work_directory=None, *args, **kwargs):
+            if args or kwargs:
+                return method(self, work_directory, *args, **kwargs)
+            source = self.getFullPath()
+            cache = HklinCache.for_path(source, work_directory)
+            if cache is None or not source or not os.path.isfile(source):
+                return method(self, work_directory)
+
+            key = cache.key(
+                kind="conversion",
+                file_class=type(self).__name__,
+                target=target_name,
+                inputs=[file_digest(source)],
+            )
+            dest = self._get_conversion_output_path(target_name, work_directory=work_directory)
+            if cache.fetch(key, dest):
+                return str(dest)
+
+            result = method(self, work_directory)
+            if result and os.path.abspath(str(result)) != os.path.abspath(str(source)):
+                try:
+                    cache.store(key, result, description={
+                        "target": target_name, "source": str(source),
+                    })
+                except OSError as err:
+                    logger.warning("Could not add %s to the HKLIN cache: %s", result, err)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,397 @@
+"""
+Incremental program.xml writing and reading.
+
+Log scrapers (refmac_i2, servalcat, ...) build an XML tree while a program runs
+and republish it as program.xml so that running-job reports stay current.
+Re-serialising the whole tree on every scraped chunk costs time proportional to
+the tree, so over a run the cost grows quadratically.
+
+IncrementalXmlWriter keeps program.xml open and appends to it. Top-level
+children that already have a later sibling are treated as committed: each one is
+serialised once and written after the previously committed children. Only the
+last child, which the scraper is probably still filling in, is rewritten on each
+flush. A committed child that is modified or removed later is detected, and the
+file is rewritten from that child onwards.
+
+Every flush leaves a well-formed document followed by a checkpoint comment:
+
+    <?xml version='1.0' encoding='utf-8'?>
+    <REFMAC>
+    <Cycle>...</Cycle>                      committed (appended once)
+    <Cycle>...</Cycle>                      provisional tail
+    </REFMAC>
+    <!--program-xml-checkpoint generation="..." body="..." committed="..."-->
+
+read_program_xml_changes() uses the checkpoint to read only what was committed
+since a previous cursor, which makes polling a running job cheap.
+
+Example:
+    writer = IncrementalXmlWriter(self.makeFileName('PROGRAMXML'), self.xmlroot)
+    ...
+    writer.checkpoint()     # after each scraped chunk; flushes on a time/size budget
+    ...
+    writer.close()
+
+    changes = read_program_xml_changes(path)
+    ...
+    changes = read_program_xml_changes(path, since=changes.cursor)
+"""
+
+import logging
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
+
+_CHECKPOINT_RE = re.compile(
+    rb'<!--program-xml-checkpoint generation="(\d+)" body="(\d+)" committed="(\d+)"-->\s*$'
+)
+
+# Bytes read from the end of the file to find the checkpoint comment
+_TRAILER_READ_SIZE = 512
+
+
+def _is_lxml(element) -> bool:
+    return hasattr(element, "getroottree")
+
+
+def _serialize(element) -> bytes:
+    """Serialise one element (without its tail) as UTF-8 bytes ending in a newline."""
+    if _is_lxml(element):
+        from lxml import etree
+
+        data = etree.tostring(element, encoding="utf-8", pretty_print=True, with_tail=False)
+    else:
+        tail, element.tail = element.tail, None
+        try:
+            data = ET.tostring(element, encoding="utf-8")
+        finally:
+            element.tail = tail
+    return data if data.endswith(b"\n") else data + b"\n"
+
+
+def _root_tags(root) -> Tuple[bytes, bytes]:
+    """Return the start and end tag of root (attributes and namespaces included)."""
+    if _is_lxml(root):
+        from lxml import etree
+
+        shallow = etree.Element(root.tag, dict(root.attrib), nsmap=root.nsmap)
+        shallow.text = ""
+        data = etree.tostring(shallow, encoding="utf-8")
+    else:
+        shallow = ET.Element(root.tag, dict(root.attrib))
+        data = ET.tostring(shallow, encoding="utf-8", short_empty_elements=False)
+    split = data.rindex(b"</")
+    return data[:split], data[split:]
+
+
+def _size(element) -> int:
+    """Number of descendant nodes, used to notice changes to committed children."""
+    if _is_lxml(element):
+        return int(element.xpath("count(descendant::node())"))
+    return sum(1 for _ in element.iter()) - 1
+
+
+class IncrementalXmlWriter:
+    """
+    Publish a growing XML tree to a file by appending.
+
+    Args:
+        path: File to write (typically the plugin's PROGRAMXML)
+        root: Root element of the tree being built (lxml or ElementTree)
+        interval: Minimum seconds between flushes made by checkpoint()
+        max_pending_bytes: checkpoint() flushes early once this many bytes of
+            newly committed elements are waiting to be written
+        open_elements: Number of trailing top-level children treated as still
+            being filled in; they are rewritten on every flush
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        root: Any,
+        interval: float = 0.5,
+        max_pending_bytes: int = 256 * 1024,
+        open_elements: int = 1,
+    ):
+        self.path = Path(path)
+        self.root = root
+        self.interval = interval
+        self.max_pending_bytes = max_pending_bytes
+        self.open_elements = open_elements
+
+        self._file = None
+        self._generation = time.time_ns()
+        self._start_tag = None
+        self._end_tag = None
+        # Committed children: (element, size), the byte offset where each one
+        # starts (plus the end of the last), and their not yet written bytes
+        self._committed: List[Tuple[Any, int]] = []
+        self._committed_nodes = 0
+        self._offsets: List[int] = []
+        self._written = 0  # Number of committed children already on disk
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._last_flush = 0.0
+        self.flushes = 0
+        self.bytes_written = 0
+
+    @property
+    def generation(self) -> int:
+        """Changes whenever previously committed bytes are rewritten."""
+        return self._generation
+
+    def checkpoint(self, force: bool = False) -> bool:
+        """
+        Note that the tree has changed; flush if the time or size budget allows.
+
+        Returns:
+            True if the file was written
+        """
+        self._commit_new_children()
+        due = (
+            force
+            or self._pending_bytes >= self.max_pending_bytes
+            or time.monotonic() - self._last_flush >= self.interval
+        )
+        if due:
+            self.flush()
+        return due
+
+    def flush(self):
+        """Write all changes to the file now."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "wb")
+
+        start_tag, end_tag = _root_tags(self.root)
+        if start_tag != self._start_tag:
+            self._start_tag, self._end_tag = start_tag, end_tag
+            self._rewind(0)
+        else:
+            self._rewind(self._first_changed_child())
+        self._commit_new_children()
+
+        # Write everything after the last committed child already on disk
+        if self._written == 0:
+            head = XML_DECLARATION + self._start_tag + b"\n"
+            write_at = 0
+            self._offsets[:1] = [len(head)]
+            self._refresh_offsets()
+            parts = [head]
+        else:
+            write_at = self._offsets[self._written]
+            parts = []
+        parts.extend(self._pending)
+
+        committed_end = self._offsets[-1]
+        children = list(self.root)
+        for element in children[len(self._committed):]:
+            parts.append(_serialize(element))
+        parts.append(self._end_tag + b"\n")
+        parts.append(
+            b'<!--program-xml-checkpoint generation="%d" body="%d" committed="%d"-->\n'
+            % (self._generation, self._offsets[0], committed_end)
+        )
+
+        data = b"".join(parts)
+        self._file.seek(write_at)
+        self._file.write(data)
+        self._file.truncate()
+        self._file.flush()
+
+        self._written = len(self._committed)
+        self._pending = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self.flushes += 1
+        self.bytes_written += len(data)
+
+    def close(self, rewrite: bool = True):
+        """
+        Flush and close the file.
+
+        Args:
+            rewrite: Re-serialise every child before closing, so that changes the
+                size check cannot see (edited text or attributes of committed
+                children) reach the final file
+        """
+        if rewrite:
+            self._rewind(0)
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _commit_new_children(self):
+        """Serialise top-level children that have gained later siblings."""
+        children = list(self.root)
+        committable = len(children) - self.open_elements
+        if not self._offsets:
+            self._offsets = [0]
+        for element in children[len(self._committed):committable]:
+            data = _serialize(element)
+            size = _size(element)
+            self._committed.append((element, size))
+            self._committed_nodes += 1 + size
+            self._offsets.append(self._offsets[-1] + len(data))
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+
+    def _first_changed_child(self) -> int:
+        """Index of the first committed child that was changed or removed."""
+        children = list(self.root)
+        for index, (element, _) in enumerate(self._committed):
+            if index >= len(children) or children[index] is not element:
+                return index
+
+        # One count over the whole tree tells whether any committed child grew
+        # or shrank; only then look for which one
+        committed = len(self._committed)
+        expected = self._committed_nodes + sum(1 + _size(element) for element in children[committed:])
+        if _size(self.root) == expected:
+            return committed
+        for index, (element, size) in enumerate(self._committed):
+            if _size(element) != size:
+                return index
+        return committed
+
+    def _rewind(self, index: int):
+        """Forget committed children from index onwards so they are rewritten."""
+        if index >= len(self._committed):
+            return
+        if index < self._written:
+            # Bytes a reader may already have consumed are about to change
+            self._generation += 1
+            self._written = index
+        self._committed_nodes -= sum(1 + size for _, size in self._committed[index:])
+        del self._committed[index:]
+        del self._offsets[index + 1:]
+        self._pending = [_serialize(element) for element, _ in self._committed[self._written:]]
+        self._pending_bytes = sum(len(data) for data in self._pending)
+
+    def _refresh_offsets(self):
+        """Recompute committed offsets after the header length changed."""
+        offset = self._offsets[0]
+        offsets = [offset]
+        for data in self._pending:
+            offset += len(data)
+            offsets.append(offset)
+        self._offsets = offsets
+
+
+@dataclass(frozen=True)
+class ProgramXmlChanges:
+    """
+    Result of read_program_xml_changes().
+
+    Attributes:
+        cursor: Pass as since= to the next call
+        reset: True if appended holds every committed element (the file was new
+            to this reader or was rewritten); earlier results must be discarded
+        root: Empty copy of the root element (tag and attributes)
+        appended: Top-level elements committed since the cursor
+        tail: Provisional trailing elements; they replace the previous tail
+    """
+
+    cursor: Tuple[int, int]
+    reset: bool
+    root: ET.Element
+    appended: List[ET.Element] = field(default_factory=list)
+    tail: List[ET.Element] = field(default_factory=list)
+
+
+def _parse_fragment(data: bytes) -> List[ET.Element]:
+    if not data.strip():
+        return []
+    return list(ET.fromstring(b"<fragment>" + data + b"</fragment>"))
+
+
+def _read_changes_once(path: Path, since: Optional[Tuple[int, int]]) -> Optional[ProgramXmlChanges]:
+    with open(path, "rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        handle.seek(max(0, size - _TRAILER_READ_SIZE))
+        trailer = handle.read()
+        match = _CHECKPOINT_RE.search(trailer)
+        if match is None:
+            return None
+        generation, body, committed = (int(value) for value in match.groups())
+
+        reset = since is None or since[0] != generation or not body <= since[1] <= committed
+        start = body if reset else since[1]
+        handle.seek(0)
+        head = handle.read(body)
+        handle.seek(start)
+        data = handle.read(size - start)
+
+    end = data.rindex(b"</", 0, len(data) - (len(trailer) - match.start()))
+    split = committed - start
+    root = ET.fromstring(head[head.index(b"?>") + 2:].strip() + data[end:].split(b">", 1)[0] + b">")
+    return ProgramXmlChanges(
+        cursor=(generation, committed),
+        reset=reset,
+        root=root,
+        appended=_parse_fragment(data[:split]),
+        tail=_parse_fragment(data[split:end]),
+    )
+
+
+def read_program_xml_changes(
+    path: Union[str, Path],
+    since: Optional[Tuple[int, int]] = None,
+    retries: int = 3,
+    delay: float = 0.05,
+) -> Optional[ProgramXmlChanges]:
+    """
+    Read what an IncrementalXmlWriter has committed since a previous call.
+
+    Only the bytes after the cursor are read and parsed. A read that overlaps a
+    write is retried.
+
+    Args:
+        path: File written by IncrementalXmlWriter
+        since: cursor from the previous result, or None for everything
+
+    Returns:
+        ProgramXmlChanges, or None if the file has no checkpoint (it was not
+        written by IncrementalXmlWriter; parse it in full instead)
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the file stays unreadable
+    """
+    path = Path(path)
+    for attempt in range(retries + 1):
+        try:
+            return _read_changes_once(path, since)
+        except (ET.ParseError, ValueError):
+            if attempt == retries:
+                raise ET.ParseError(f"Could not read checkpoint of {path}")
+            time.sleep(delay)
+
+
+def parse_program_xml(path: Union[str, Path], retries: int = 3, delay: float = 0.05) -> ET.Element:
+    """
+    Parse a whole program XML file, retrying a read that overlaps a write.
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the file stays unparseable
+    """
+    for attempt in range(retries + 1):
+        try:
+            return ET.parse(path).getroot()
+        except ET.ParseError:
+            if attempt == retries:
+                raise
+            time.sleep(delay)
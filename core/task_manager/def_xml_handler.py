@@ -6,14 +6,32 @@ that represent task control parameters, input data, and output data structures.
 
 The parser creates a complete in-memory representation using our modern CData
 classes with hierarchical relationships, smart assignment, and set state tracking.
+
+Parsing is split into two phases:
+
+1. **Compile** - the .def.xml (with its ``<file>`` inheritance expanded by
+   load_nested_xml) is reduced once to a compact, immutable ``DefXmlTemplate``.
+   Templates are held in a process-wide LRU keyed by the file path and
+   validated against the mtimes of the file and every parent it inherits from.
+   An optional on-disk pickle cache (``CCP4I2_DEFXML_CACHE_DIR``) lets new
+   processes skip the XML work entirely.
+2. **Build** - each call instantiates a fresh CContainer tree from the template,
+   replaying exactly the operations the XML walk used to perform.
 """
 
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional, Union, List, Type
+from typing import Dict, Any, Optional, Union, List, Type, NamedTuple, Tuple
+from collections import OrderedDict
 from pathlib import Path
+import hashlib
 import json
+import logging
+import os
+import pickle
 import re
 import sys
+import tempfile
+import threading
 
 from ..base_object.base_classes import CData, CContainer, ValueState
 from ..base_object.fundamental_types import (
@@ -31,15 +49,201 @@ if str(server_path) not in sys.path:
 
 from ccp4x.lib.utils.parameters.load_xml import load_nested_xml
 
+logger = logging.getLogger(__name__)
+
+# Root used to resolve <file><CI2XmlDataFile><project>CCP4I2_TOP</project> references
+# (same location load_nested_xml resolves them against)
+CCP4I2_TOP = Path(__file__).parent.parent.parent
+
+# Bump when the layout of the template tuples changes so stale pickles are ignored
+TEMPLATE_FORMAT_VERSION = 1
+
+
+def _mtime_ns(path: Union[str, Path]) -> int:
+    """Return st_mtime_ns for path, or -1 if it does not exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+class DefXmlContent(NamedTuple):
+    """Compiled <content> element: one CData leaf (or CList) of a container."""
+    id: str
+    class_name: str
+    qualifiers: Dict[str, Any]
+    # (subItem className or None, subItem qualifiers) when a <subItem> is present
+    sub_item: Optional[Tuple[Optional[str], Dict[str, Any]]] = None
+
+
+class DefXmlContainer(NamedTuple):
+    """Compiled <container> element, children in build order."""
+    id: str
+    contents: Tuple[DefXmlContent, ...]
+    containers: Tuple["DefXmlContainer", ...]
+
+
+class DefXmlTemplate(NamedTuple):
+    """
+    Compiled, immutable form of a .def.xml file.
+
+    ``containers`` is the sequence of top-level containers in the order the
+    builder adds them to the root container (containers may legitimately
+    appear more than once - see DefXmlParser._compile_root).
+
+    ``dependencies`` records (path, st_mtime_ns) for the file itself and every
+    .def.xml pulled in through <file> inheritance; the template is stale as
+    soon as any of them changes.
+    """
+    task_name: str
+    containers: Tuple[DefXmlContainer, ...]
+    dependencies: Tuple[Tuple[str, int], ...]
+
+    def is_current(self) -> bool:
+        """Return True if none of the source files changed since compilation."""
+        return all(
+            _mtime_ns(dep_path) == mtime_ns for dep_path, mtime_ns in self.dependencies
+        )
+
+
+class DefXmlTemplateCache:
+    """
+    Process-wide cache of compiled DefXmlTemplates.
+
+    An in-memory LRU (``maxsize`` entries) sits in front of an optional
+    on-disk pickle cache. Entries are validated with DefXmlTemplate.is_current()
+    on every lookup, so editing a .def.xml (or any parent it inherits from)
+    is picked up without restarting the process.
+    """
+
+    def __init__(self, maxsize: int = 256, cache_dir: Optional[Union[str, Path]] = None):
+        self.maxsize = maxsize
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, DefXmlTemplate]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, xml_path: Path) -> Optional[DefXmlTemplate]:
+        """Return a current template for xml_path, or None."""
+        key = str(xml_path)
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                if template.is_current():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return template
+                del self._entries[key]
+
+        template = self._load_from_disk(key)
+        with self._lock:
+            if template is not None:
+                self.hits += 1
+                self._store(key, template)
+            else:
+                self.misses += 1
+        return template
+
+    def put(self, xml_path: Path, template: DefXmlTemplate) -> None:
+        """Add a freshly compiled template to the memory and disk caches."""
+        key = str(xml_path)
+        with self._lock:
+            self._store(key, template)
+        self._save_to_disk(key, template)
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the disk cache is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _store(self, key: str, template: DefXmlTemplate) -> None:
+        self._entries[key] = template
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{Path(key).name}.{digest[:16]}.pickle"
+
+    def _load_from_disk(self, key: str) -> Optional[DefXmlTemplate]:
+        disk_path = self._disk_path(key)
+        if disk_path is None or not disk_path.exists():
+            return None
+        try:
+            with open(disk_path, "rb") as f:
+                version, template = pickle.load(f)
+        except Exception as e:
+            logger.debug("Ignoring unreadable def.xml cache file %s: %s", disk_path, e)
+            return None
+        if version != TEMPLATE_FORMAT_VERSION or not isinstance(template, DefXmlTemplate):
+            return None
+        if not template.is_current():
+            return None
+        return template
+
+    def _save_to_disk(self, key: str, template: DefXmlTemplate) -> None:
+        disk_path = self._disk_path(key)
+        if disk_path is None:
+            return
+        try:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so concurrent readers never see a partial pickle
+            fd, tmp_name = tempfile.mkstemp(dir=disk_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((TEMPLATE_FORMAT_VERSION, template), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, disk_path)
+        except Exception as e:
+            logger.debug("Could not write def.xml cache file %s: %s", disk_path, e)
+
+
+# Shared by every DefXmlParser in the process
+TEMPLATE_CACHE = DefXmlTemplateCache(
+    maxsize=int(os.environ.get("CCP4I2_DEFXML_CACHE_SIZE", "256")),
+    cache_dir=os.environ.get("CCP4I2_DEFXML_CACHE_DIR") or None,
+)
+
+_CLASS_REGISTRY: Optional[Dict[str, Type[CData]]] = None
+_CLASS_REGISTRY_LOCK = threading.Lock()
+
+
+def clear_def_xml_cache() -> None:
+    """Clear the in-process template cache (e.g. after regenerating def.xml files)."""
+    TEMPLATE_CACHE.clear()
+
+
+def _copy_qualifier_value(value: Any) -> Any:
+    """Copy list/dict qualifier values so built objects never share template state."""
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
 
 class DefXmlParser:
     """Parser for CCP4i2 .def.xml task definition files."""
 
-    def __init__(self):
+    def __init__(self, template_cache: Optional[DefXmlTemplateCache] = None):
         self.class_registry = self._build_class_registry()
         self.metadata_registry = MetadataRegistry()
+        self.template_cache = template_cache if template_cache is not None else TEMPLATE_CACHE
 
     def _build_class_registry(self) -> Dict[str, Type[CData]]:
+        """Return a copy of the process-wide registry of available CData classes."""
+        global _CLASS_REGISTRY
+        if _CLASS_REGISTRY is None:
+            with _CLASS_REGISTRY_LOCK:
+                if _CLASS_REGISTRY is None:
+                    _CLASS_REGISTRY = self._scan_class_registry()
+        return dict(_CLASS_REGISTRY)
+
+    def _scan_class_registry(self) -> Dict[str, Type[CData]]:
         """Build registry of available CData classes."""
         registry = {}
 
@@ -110,15 +314,47 @@ class DefXmlParser:
         This method handles .def.xml inheritance by expanding <file> tags that reference
         parent .def.xml files (e.g., prosmart_refmac inheriting from refmac).
 
+        The XML is only read the first time a given file is requested (or after
+        it, or one of its parents, changes on disk); later calls build the
+        hierarchy straight from the cached DefXmlTemplate.
+
         Args:
             xml_path: Path to the .def.xml file
 
         Returns:
             Root CData object representing the task definition
         """
+        template = self.compile_def_xml(xml_path)
+        return self.build_from_template(template)
+
+    def compile_def_xml(self, xml_path: Union[str, Path]) -> DefXmlTemplate:
+        """
+        Return the compiled template for a .def.xml file, using the template cache.
+
+        Args:
+            xml_path: Path to the .def.xml file
+
+        Returns:
+            DefXmlTemplate describing the task definition
+
+        Raises:
+            FileNotFoundError: If the .def.xml file does not exist
+        """
         xml_path = Path(xml_path)
         if not xml_path.exists():
             raise FileNotFoundError(f"DEF XML file not found: {xml_path}")
+        xml_path = xml_path.absolute()
+
+        template = self.template_cache.get(xml_path)
+        if template is None:
+            template = self._compile_def_xml(xml_path)
+            self.template_cache.put(xml_path, template)
+        return template
+
+    def _compile_def_xml(self, xml_path: Path) -> DefXmlTemplate:
+        """Parse a .def.xml file (expanding inheritance) into a DefXmlTemplate."""
+        # Record mtimes before parsing so an edit racing with us invalidates the template
+        dependencies = self._collect_dependencies(xml_path)
 
         # Parse XML
         tree = ET.parse(xml_path)
@@ -131,14 +367,62 @@ class DefXmlParser:
         # Extract task name from ccp4i2_body id or filename
         task_name = self._extract_task_name(root, xml_path)
 
-        # Create root container
-        root_container = CContainer()
-        root_container._name = task_name
+        return DefXmlTemplate(
+            task_name=task_name,
+            containers=self._compile_root(root),
+            dependencies=dependencies,
+        )
+
+    def _collect_dependencies(self, xml_path: Path) -> Tuple[Tuple[str, int], ...]:
+        """
+        Find the .def.xml file and all parents it inherits from via <file> tags.
+
+        Returns:
+            Tuple of (path, st_mtime_ns) pairs, the file itself first
+        """
+        dependencies: List[Tuple[str, int]] = []
+        seen = set()
+        pending = [xml_path]
+        while pending:
+            path = pending.pop(0)
+            key = str(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            dependencies.append((key, _mtime_ns(path)))
+            try:
+                root = ET.parse(path).getroot()
+            except (OSError, ET.ParseError):
+                # load_nested_xml skips missing/broken parents too; the recorded
+                # mtime (-1 if missing) makes the template recompile once it changes
+                continue
+            for file_node in root.iter("file"):
+                ci2_xml_data_file = file_node.find("CI2XmlDataFile")
+                if ci2_xml_data_file is None:
+                    continue
+                project = (ci2_xml_data_file.findtext("project") or "").strip()
+                rel_path = (ci2_xml_data_file.findtext("relPath") or "").strip()
+                base_name = (ci2_xml_data_file.findtext("baseName") or "").strip()
+                if project == "CCP4I2_TOP" and base_name:
+                    pending.append(CCP4I2_TOP / rel_path / base_name)
+        return tuple(dependencies)
+
+    def _compile_root(self, root: ET.Element) -> Tuple[DefXmlContainer, ...]:
+        """
+        Compile the top-level containers in the order they are added to the root.
+
+        Containers inside the main ccp4i2_body come first; every container with
+        an id anywhere in the document that was not inside a nested ccp4i2_body
+        is then added again at root level. The builder replays this sequence
+        verbatim so built hierarchies are identical to a direct XML walk.
+        """
+        containers: List[DefXmlContainer] = []
+        compiled: Dict[int, DefXmlContainer] = {}
 
         # Parse the main ccp4i2_body structure
         body = root.find(".//ccp4i2_body[@id]")
         if body is not None:
-            self._parse_body(body, root_container)
+            containers.extend(self._compile_body(body, compiled))
 
         # Parse any additional containers at root level (skip those already processed)
         all_containers = root.findall(".//container[@id]")
@@ -152,7 +436,98 @@ class DefXmlParser:
         for container in all_containers:
             container_id = container.get("id")
             if container_id not in processed:
-                self._parse_container(container, root_container)
+                containers.append(self._compile_container(container, compiled))
+
+        return tuple(containers)
+
+    def _compile_body(
+        self, body: ET.Element, compiled: Dict[int, DefXmlContainer]
+    ) -> List[DefXmlContainer]:
+        """Compile a ccp4i2_body element into its list of containers."""
+        # Handle nested ccp4i2_body (some have nested structure)
+        nested_body = body.find("./ccp4i2_body")
+        if nested_body is not None:
+            return self._compile_body(nested_body, compiled)
+
+        return [
+            self._compile_container(container, compiled)
+            for container in body.findall("./container[@id]")
+        ]
+
+    def _compile_container(
+        self, container: ET.Element, compiled: Dict[int, DefXmlContainer]
+    ) -> DefXmlContainer:
+        """Compile a container element; identical elements share one node."""
+        node = compiled.get(id(container))
+        if node is not None:
+            return node
+
+        contents = []
+        for content in container.findall("./content[@id]"):
+            compiled_content = self._compile_content(content)
+            if compiled_content is not None:
+                contents.append(compiled_content)
+
+        # Nested containers first, then containers of nested ccp4i2_body elements
+        containers = [
+            self._compile_container(nested_container, compiled)
+            for nested_container in container.findall("./container[@id]")
+        ]
+        for nested_body in container.findall("./ccp4i2_body"):
+            containers.extend(self._compile_body(nested_body, compiled))
+
+        node = DefXmlContainer(
+            id=container.get("id"),
+            contents=tuple(contents),
+            containers=tuple(containers),
+        )
+        compiled[id(container)] = node
+        return node
+
+    def _compile_content(self, content: ET.Element) -> Optional[DefXmlContent]:
+        """Compile a content element, or return None if it cannot be built."""
+        content_id = content.get("id")
+        class_name = content.find("./className")
+
+        if not content_id or class_name is None:
+            return None
+
+        class_name_str = class_name.text
+        if not class_name_str:
+            return None
+
+        sub_item = None
+        sub_item_elem = content.find("./subItem")
+        if sub_item_elem is not None:
+            sub_class_name_elem = sub_item_elem.find("./className")
+            sub_item = (
+                sub_class_name_elem.text if sub_class_name_elem is not None else None,
+                self._parse_qualifiers(sub_item_elem.find("./qualifiers")),
+            )
+
+        return DefXmlContent(
+            id=content_id,
+            class_name=class_name_str,
+            qualifiers=self._parse_qualifiers(content.find("./qualifiers")),
+            sub_item=sub_item,
+        )
+
+    def build_from_template(self, template: DefXmlTemplate) -> CContainer:
+        """
+        Build a fresh CData hierarchy from a compiled template.
+
+        Args:
+            template: DefXmlTemplate returned by compile_def_xml()
+
+        Returns:
+            Root CContainer representing the task definition
+        """
+        # Create root container
+        root_container = CContainer()
+        root_container._name = template.task_name
+
+        for container in template.containers:
+            self._build_container(container, root_container)
 
         # Re-enable validation after parsing is complete
         # This allows runtime validation when users set values
@@ -189,96 +564,53 @@ class DefXmlParser:
         # Fall back to filename
         return xml_path.stem.replace(".def", "")
 
-    def _parse_body(self, body: ET.Element, parent: CData) -> None:
-        """Parse a ccp4i2_body element."""
-        # Handle nested ccp4i2_body (some have nested structure)
-        nested_body = body.find("./ccp4i2_body")
-        if nested_body is not None:
-            self._parse_body(nested_body, parent)
-            return
-
-        # Parse all containers in this body
-        for container in body.findall("./container[@id]"):
-            self._parse_container(container, parent)
-
-    def _parse_container(self, container: ET.Element, parent: CData) -> None:
-        """Parse a container element and add it to parent."""
-        container_id = container.get("id")
-        if not container_id:
-            return
-
+    def _build_container(self, container: DefXmlContainer, parent: CData) -> None:
+        """Build a compiled container and add it to parent."""
         # Create container object
         container_obj = CContainer()
-        container_obj._name = container_id
-
-        # Parse all content elements
-        for content in container.findall("./content[@id]"):
-            self._parse_content(content, container_obj)
+        container_obj._name = container.id
 
-        # Parse nested containers
-        for nested_container in container.findall("./container[@id]"):
-            self._parse_container(nested_container, container_obj)
+        for content in container.contents:
+            self._build_content(content, container_obj)
 
-        # Parse nested ccp4i2_body
-        for nested_body in container.findall("./ccp4i2_body"):
-            self._parse_body(nested_body, container_obj)
+        for nested_container in container.containers:
+            self._build_container(nested_container, container_obj)
 
         # Add to parent - setattr will trigger hierarchy setup via __setattr__
-        setattr(parent, container_id, container_obj)
-
-    def _parse_content(self, content: ET.Element, parent: CData) -> None:
-        """Parse a content element and add it to parent."""
-        content_id = content.get("id")
-        class_name = content.find("./className")
+        setattr(parent, container.id, container_obj)
 
-        if not content_id or class_name is None:
-            return
+    def _build_content(self, content: DefXmlContent, parent: CData) -> None:
+        """Build a compiled content element and add it to parent."""
+        qualifiers = {
+            key: _copy_qualifier_value(value) for key, value in content.qualifiers.items()
+        }
 
-        class_name_str = class_name.text
-        if not class_name_str:
+        # Create the appropriate object
+        obj = self._create_object(content.class_name, qualifiers, None)
+        if obj is None:
             return
 
-        # Get qualifiers
-        qualifiers = self._parse_qualifiers(content.find("./qualifiers"))
+        obj._name = content.id
+
+        # Handle subItem for lists
+        if content.sub_item is not None and isinstance(obj, CList):
+            sub_class_name, sub_qualifiers = content.sub_item
+            if sub_class_name:
+                # Get the actual class object from registry
+                sub_class = self.class_registry.get(sub_class_name)
+
+                # Set the subItem qualifier that makeItem() expects
+                if sub_class:
+                    obj.set_qualifier('subItem', {
+                        'class': sub_class,
+                        'qualifiers': {
+                            key: _copy_qualifier_value(value)
+                            for key, value in sub_qualifiers.items()
+                        }
+                    })
 
-        # Create the appropriate object
-        obj = self._create_object(class_name_str, qualifiers, content)
-
-        if obj is not None:
-            obj._name = content_id
-
-            # Handle subItem for lists
-            sub_item = content.find("./subItem")
-            if sub_item is not None and isinstance(obj, CList):
-                sub_class_name_elem = sub_item.find("./className")
-                sub_qualifiers = self._parse_qualifiers(sub_item.find("./qualifiers"))
-                if sub_class_name_elem is not None and sub_class_name_elem.text:
-                    # Get the actual class object from registry
-                    sub_class_name = sub_class_name_elem.text
-                    sub_class = self.class_registry.get(sub_class_name)
-
-                    # Set the subItem qualifier that makeItem() expects
-                    if sub_class:
-                        obj.set_qualifier('subItem', {
-                            'class': sub_class,
-                            'qualifiers': sub_qualifiers
-                        })
-
-            # Add to parent - setattr will trigger hierarchy setup via __setattr__
-            if content_id == 'SMILESIN':
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"[SMILESIN DEBUG] About to setattr SMILESIN to {parent.objectName() if hasattr(parent, 'objectName') else parent}")
-                logger.info(f"[SMILESIN DEBUG] obj={obj}, type={type(obj)}")
-            setattr(parent, content_id, obj)
-            if content_id == 'SMILESIN':
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"[SMILESIN DEBUG] After setattr, checking if SMILESIN is in parent's children...")
-                if hasattr(parent, 'children'):
-                    children_names = [c.objectName() for c in parent.children()]
-                    logger.info(f"[SMILESIN DEBUG] children: {children_names}")
-                    logger.info(f"[SMILESIN DEBUG] SMILESIN in children: {'SMILESIN' in children_names}")
+        # Add to parent - setattr will trigger hierarchy setup via __setattr__
+        setattr(parent, content.id, obj)
 
     def _parse_qualifiers(self, qualifiers: Optional[ET.Element]) -> Dict[str, Any]:
         """Parse qualifiers element into a dictionary."""
@@ -337,7 +669,7 @@ class DefXmlParser:
             return text
 
     def _create_object(
-        self, class_name: str, qualifiers: Dict[str, Any], content: ET.Element
+        self, class_name: str, qualifiers: Dict[str, Any], content: Optional[ET.Element] = None
     ) -> Optional[CData]:
         """Create an object of the specified class with given qualifiers."""
         # Handle special cases
@@ -384,7 +716,7 @@ class DefXmlParser:
             return obj
 
     def _create_list_object(
-        self, qualifiers: Dict[str, Any], content: ET.Element  # noqa: ARG002
+        self, qualifiers: Dict[str, Any], content: Optional[ET.Element] = None  # noqa: ARG002
     ) -> CList:
         """Create a CList object with proper item type."""
         # CList is already imported, just create an instance
@@ -0,0 +1,166 @@
+"""
+Process-wide catalog of the task lookup files.
+
+The lookup files in this directory (defxml_lookup.json, plugin_lookup.json,
+task_module_map.json, task_metadata.json) only change when they are
+regenerated with ``CCP4TaskManager.py --rebuild``, so they are read once per
+process into a TaskCatalog shared by every CTaskManager. The catalog indexes
+them by task name:
+
+- def_xml_paths: task name -> resolved path of its .def.xml (first existing
+  entry of defxml_lookup.json, as CTaskManager.locate_def_xml always returned)
+- plugin_lookup / plugin_metadata: task attributes from the plugin scripts
+- report_metadata: report attributes from the report registry
+- task_modules: task name -> GUI module folder
+
+Values derived from the catalog (the task tree, the task lookup for the
+frontend, their JSON encoding) are built once through derived().
+
+The mappings are read-only views. Their values are the shared dicts and lists
+of the lookup files and must not be modified either.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TASK_MANAGER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def normalize_module_name(module: Any) -> str:
+    """
+    Normalize a TASKMODULE value to a module folder name.
+
+    Handles lists (first element), spaces vs underscores, None and legacy names.
+    """
+    if module is None:
+        return 'wrappers'
+
+    # Handle lists (some tasks have multiple modules)
+    if isinstance(module, list):
+        module = module[0] if module else 'wrappers'
+
+    # Normalize spaces to underscores
+    module = str(module).replace(' ', '_').lower()
+
+    # Map some legacy names
+    if module == 'expt_data_util':
+        module = 'expt_data_utility'
+
+    return module
+
+
+def _load_json(path: str, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {os.path.basename(path)}: {e}")
+        return default
+
+
+class TaskCatalog:
+    """Read-only lookup tables of the tasks, indexed by task name."""
+
+    def __init__(self, task_manager_dir: str = TASK_MANAGER_DIR):
+        self.task_manager_dir = task_manager_dir
+        join = os.path.join
+
+        defxml_lookup = _load_json(join(task_manager_dir, "defxml_lookup.json"), [])
+        plugin_lookup = _load_json(join(task_manager_dir, "plugin_lookup.json"), {})
+        # Drop _comment/_todo keys
+        task_module_map = {
+            k: v for k, v in _load_json(join(task_manager_dir, "task_module_map.json"), {}).items()
+            if not k.startswith('_')
+        }
+        task_metadata = {
+            k: v for k, v in _load_json(join(task_manager_dir, "task_metadata.json"), {}).items()
+            if not k.startswith('_')
+        }
+
+        self.defxml_lookup: Tuple[Dict[str, str], ...] = tuple(defxml_lookup)
+        self.plugin_lookup: Mapping[str, Dict[str, Any]] = MappingProxyType(plugin_lookup)
+        self.task_module_map: Mapping[str, str] = MappingProxyType(task_module_map)
+        self.task_metadata: Mapping[str, Dict[str, Any]] = MappingProxyType(task_metadata)
+        self.def_xml_paths: Mapping[str, Path] = MappingProxyType(self._index_def_xml())
+        self.task_modules: Mapping[str, str] = MappingProxyType({
+            task_name: task_module_map[task_name] if task_name in task_module_map
+            else normalize_module_name(metadata.get('TASKMODULE'))
+            for task_name, metadata in plugin_lookup.items()
+        })
+
+        self._derived: Dict[Hashable, Any] = {}
+        # Re-entrant: a derived value may be built from other derived values
+        self._lock = threading.RLock()
+
+    def _index_def_xml(self) -> Dict[str, Path]:
+        # Paths in defxml_lookup.json are relative to this directory (see
+        # defxml_lookup.py); the first entry of a task that exists wins
+        paths: Dict[str, Path] = {}
+        for entry in self.defxml_lookup:
+            task_name = entry.get("pluginName", "")
+            rel_path = entry.get("file_path", "")
+            if not rel_path or task_name in paths:
+                continue
+            abs_path = (Path(self.task_manager_dir) / rel_path).resolve()
+            if abs_path.exists():
+                paths[task_name] = abs_path
+        return paths
+
+    @property
+    def plugin_metadata(self) -> Mapping[str, Dict[str, Any]]:
+        """Plugin metadata of the generated plugin registry (with import info)."""
+        from .plugin_registry import PLUGIN_METADATA
+        return PLUGIN_METADATA
+
+    @property
+    def report_metadata(self) -> Mapping[str, Dict[str, Any]]:
+        """Report metadata of the generated report registry."""
+        from .report_registry import REPORT_METADATA
+        return REPORT_METADATA
+
+    def def_xml_path(self, task_name: str) -> Optional[Path]:
+        return self.def_xml_paths.get(task_name)
+
+    def derived(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Value computed from the catalog, built by build() on first use.
+
+        The value is shared by all callers for the life of the catalog.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+
+_catalog: Optional[TaskCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_task_catalog() -> TaskCatalog:
+    """Get the process-wide task catalog, loading it on first use."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = TaskCatalog()
+                logger.debug("Loaded task catalog with %d tasks", len(_catalog.plugin_lookup))
+    return _catalog
+
+
+def reset_task_catalog():
+    """Drop the catalog so that the lookup files are read again (after a rebuild)."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
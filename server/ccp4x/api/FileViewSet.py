@@ -1,5 +1,5 @@
 import logging
-from django.http import FileResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, JSONParser
@@ -10,6 +10,7 @@ from ..lib.utils.containers.json_encoder import CCP4i2JsonEncoder
 
 # Modern utilities
 from ..lib.utils.files.preview import preview_file
+from ..lib.utils.formats import mtz as mtz_format
 from xml.etree import ElementTree as ET
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.viewsets import ModelViewSet
@@ -153,3 +154,60 @@ class FileViewSet(ModelViewSet):
         except models.File.DoesNotExist as err:
             logging.exception("Failed to retrieve file with id %s", pk, exc_info=err)
             return api_error(str(err), status=404)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[],
+        serializer_class=serializers.FileSerializer,
+    )
+    def reflections(self, request, pk=None):
+        """
+        Reflection columns of an MTZ file, for plotting in the browser.
+
+        Query parameters:
+            columns: Comma-separated column labels (default: all)
+            d_min, d_max: Resolution range in Angstrom
+            stride: Keep every stride-th reflection (default 1)
+            format: "binary" (default) or "json"
+
+        The binary format (see lib/utils/formats/mtz.py) carries each column
+        as a little-endian float32 buffer. JSON is limited to
+        JSON_REFLECTION_LIMIT reflections.
+        """
+        try:
+            the_file = models.File.objects.get(id=pk)
+        except models.File.DoesNotExist:
+            logger.exception("File %s not found", pk)
+            return api_error("File not found", status=404)
+
+        params = request.query_params
+        output_format = params.get("format", "binary")
+        if output_format not in ("binary", "json"):
+            return api_error("format must be 'binary' or 'json'", status=400)
+        try:
+            columns = [label for label in params.get("columns", "").split(",") if label]
+            d_min = float(params["d_min"]) if params.get("d_min") else None
+            d_max = float(params["d_max"]) if params.get("d_max") else None
+            stride = int(params.get("stride", 1))
+            info, data = mtz_format.select_reflections(
+                str(the_file.path), columns=columns, d_min=d_min, d_max=d_max, stride=stride
+            )
+        except ValueError as err:
+            return api_error(str(err), status=400)
+        except Exception as err:
+            logger.exception("Failed to read reflections of file %s", pk, exc_info=err)
+            return api_error(str(err), status=500)
+
+        if output_format == "json":
+            if info["nreflections"] > mtz_format.JSON_REFLECTION_LIMIT:
+                return api_error(
+                    f"{info['nreflections']} reflections selected; use format=binary "
+                    f"or a stride to select at most {mtz_format.JSON_REFLECTION_LIMIT}",
+                    status=400,
+                )
+            return api_success(mtz_format.reflection_columns_as_dict(info, data))
+        return HttpResponse(
+            mtz_format.encode_reflection_columns(info, data),
+            content_type=mtz_format.COLUMNAR_CONTENT_TYPE,
+        )
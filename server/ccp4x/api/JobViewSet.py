@@ -97,7 +97,7 @@ class JobViewSet(ModelViewSet):
 
 
     Attributes:
-        queryset (QuerySet): All Job model instances
+        queryset (QuerySet): All Job model instances, in job number order
         serializer_class (JobSerializer): Serializer for Job model
         parser_classes (list): Supported content parsers for requests
         filterset_fields (list): Fields available for filtering
@@ -159,7 +159,7 @@ class JobViewSet(ModelViewSet):
         ```
     """
 
-    queryset = models.Job.objects.all()
+    queryset = models.Job.objects.order_by("project", "sort_key")
     serializer_class = serializers.JobSerializer
     parser_classes = [FormParser, MultiPartParser, JSONParser]
     filterset_fields = ["project"]
@@ -770,7 +770,7 @@ class JobViewSet(ModelViewSet):
             the_job = models.Job.objects.get(id=pk)
 
             # Modern approach: Use CPluginScript architecture
-            plugin = get_job_plugin(the_job)
+            plugin = get_job_plugin(the_job, read_only=True)
 
             # Serialize container to JSON using modern encoder
             container_json = json.dumps(
@@ -4,10 +4,11 @@ import json
 import pathlib
 import os
 import subprocess
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from pytz import timezone
 from django.http import Http404
-from django.http import FileResponse
+from django.http import FileResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.core.management import call_command
 from rest_framework.response import Response
 from rest_framework import status
@@ -27,7 +28,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from . import serializers
 from ..db import models
+from ..db.export_project import iter_project_zip
 from ..lib.utils.navigation.dependencies import delete_job_and_dependents
+from ..lib.utils.navigation.project_changes import (
+    project_changes_response,
+    touch_project,
+)
 from django.http import JsonResponse
 from django.conf import settings
 from django.utils.text import slugify
@@ -260,6 +266,9 @@ class ProjectViewSet(ModelViewSet):
     def jobs(self, request, pk=None):
         """
         Retrieve a list of jobs associated with a specific project.
+
+        Supports ETag/If-None-Match, ``?since=<version>`` deltas and
+        ``?page_size=`` cursor pagination (see project_changes).
         Args:
             request (Request): The HTTP request object.
             pk (int, optional): The primary key of the project.
@@ -268,12 +277,14 @@ class ProjectViewSet(ModelViewSet):
         """
 
         project = models.Project.objects.get(pk=pk)
-        serializer = serializers.JobSerializer(
-            models.Job.objects.filter(project=project), many=True
+        touch_project(project)
+        return project_changes_response(
+            request,
+            self,
+            project,
+            models.Job.objects.filter(project=project),
+            serializers.JobSerializer,
         )
-        project.last_access = datetime.datetime.now(tz=timezone("UTC"))
-        project.save()
-        return Response(serializer.data)
 
     @action(
         detail=True,
@@ -284,6 +295,8 @@ class ProjectViewSet(ModelViewSet):
     def job_float_values(self, request, pk=None):
         """
         Retrieve all JobFloatValue instances associated with a specific project.
+
+        Supports the same ETag, ``since`` and pagination parameters as jobs.
         Args:
             request (Request): The HTTP request object.
             pk (int, optional): The primary key of the project.
@@ -292,12 +305,14 @@ class ProjectViewSet(ModelViewSet):
         """
 
         project = models.Project.objects.get(pk=pk)
-        serializer = serializers.JobFloatValueSerializer(
-            models.JobFloatValue.objects.filter(job__project=project), many=True
+        touch_project(project)
+        return project_changes_response(
+            request,
+            self,
+            project,
+            models.JobFloatValue.objects.filter(job__project=project),
+            serializers.JobFloatValueSerializer,
         )
-        project.last_access = datetime.datetime.now(tz=timezone("UTC"))
-        project.save()
-        return Response(serializer.data)
 
     @action(
         detail=True,
@@ -308,6 +323,8 @@ class ProjectViewSet(ModelViewSet):
     def job_char_values(self, request, pk=None):
         """
         Retrieve job characteristic values for a specific project.
+
+        Supports the same ETag, ``since`` and pagination parameters as jobs.
         Args:
             request (Request): The HTTP request object.
             pk (int, optional): The primary key of the project.
@@ -316,12 +333,14 @@ class ProjectViewSet(ModelViewSet):
         """
 
         project = models.Project.objects.get(pk=pk)
-        serializer = serializers.JobCharValueSerializer(
-            models.JobCharValue.objects.filter(job__project=project), many=True
+        touch_project(project)
+        return project_changes_response(
+            request,
+            self,
+            project,
+            models.JobCharValue.objects.filter(job__project=project),
+            serializers.JobCharValueSerializer,
         )
-        project.last_access = datetime.datetime.now(tz=timezone("UTC"))
-        project.save()
-        return Response(serializer.data)
 
     @action(
         detail=True,
@@ -569,12 +588,26 @@ class ProjectViewSet(ModelViewSet):
         serializer_class=serializers.ProjectSerializer,
     )
     def export(self, request, pk=None):
+        """
+        Export the project to CCP4_PROJECT_FILES in a background process.
+
+        Optional request data: "jobs" (comma-separated top-level job numbers)
+        and "since" (id of an earlier ProjectExport of this project, to export
+        only the jobs changed since then).
+        """
         the_project = models.Project.objects.get(pk=pk)
+        try:
+            since = _export_since(the_project, request.data.get("since"))
+        except ValueError as err:
+            return api_error(str(err), status=400)
+        jobs = request.data.get("jobs")
 
         # Generate unique filepath based on project name, rooted in project.directory
         project_name = slugify(the_project.name or f"project_{the_project.id}")
         project_export = models.ProjectExport.objects.create(
-            project=the_project, time=datetime.datetime.now(tz=timezone("UTC"))
+            project=the_project,
+            time=datetime.datetime.now(tz=timezone("UTC")),
+            change_version=the_project.change_counter,
         )
         project_export.save()
         timestamp = project_export.time.strftime("%Y%m%d_%H%M%S")
@@ -600,19 +633,25 @@ class ProjectViewSet(ModelViewSet):
             the_project.directory, "CCP4_PROJECT_FILES", log_file_name
         )
 
+        command = [
+            "ccp4-python",
+            "manage.py",
+            "export_project",
+            "-pi",
+            str(the_project.id),
+            "-o",
+            export_file_path,
+        ]
+        if jobs:
+            command.extend(["-j", str(jobs)])
+        if since is not None:
+            command.extend(["--since", str(since.id)])
+
         # Start subprocess to run export_project management command in background
         try:
             with open(log_file_path, "w") as log_file:
                 process = subprocess.Popen(
-                    [
-                        "ccp4-python",
-                        "manage.py",
-                        "export_project",
-                        "-pi",
-                        str(the_project.id),
-                        "-o",
-                        export_file_path,
-                    ],
+                    command,
                     stdout=log_file,
                     stderr=subprocess.STDOUT,
                     start_new_session=True,
@@ -634,6 +673,61 @@ class ProjectViewSet(ModelViewSet):
             )
             return api_error(str(e), status=500)
 
+    @action(
+        detail=True,
+        methods=["get"],
+        permission_classes=[],
+        serializer_class=serializers.ProjectSerializer,
+    )
+    def export_zip(self, request, pk=None):
+        """
+        Stream an export archive of the project as the response.
+
+        The archive is written while it is sent, so nothing is stored on the
+        server. The new ProjectExport's id is returned in the X-Export-Id header,
+        to be passed as "since" for a later incremental export.
+
+        Query parameters:
+            jobs: Comma-separated top-level job numbers (default: all jobs)
+            since: Id of an earlier ProjectExport of this project; only jobs
+                changed since then are exported
+
+        Example:
+            GET /api/projects/5/export_zip/?since=12
+        """
+        try:
+            the_project = models.Project.objects.get(pk=pk)
+        except models.Project.DoesNotExist:
+            return api_error("Project not found", status=404)
+        try:
+            since = _export_since(the_project, request.query_params.get("since"))
+        except ValueError as err:
+            return api_error(str(err), status=400)
+        jobs = request.query_params.get("jobs")
+        job_selection = None
+        if jobs:
+            job_selection = {number.strip() for number in jobs.split(",") if number.strip()}
+
+        project_export = models.ProjectExport.objects.create(
+            project=the_project,
+            time=datetime.datetime.now(tz=timezone("UTC")),
+            change_version=the_project.change_counter,
+        )
+        chunks = iter_project_zip(the_project, job_selection=job_selection, since=since)
+        if isinstance(request._request, ASGIRequest):
+            # Pull chunks from a worker thread instead of buffering them all
+            chunks = _async_chunks(chunks)
+
+        project_name = slugify(the_project.name or f"project_{the_project.id}")
+        timestamp = project_export.time.strftime("%Y%m%d_%H%M%S")
+        suffix = "_incremental" if since is not None else ""
+        response = StreamingHttpResponse(chunks, content_type="application/zip")
+        response["Content-Disposition"] = (
+            f'attachment; filename="{project_name}_export_{timestamp}{suffix}.ccp4_project.zip"'
+        )
+        response["X-Export-Id"] = str(project_export.id)
+        return response
+
     @action(
         detail=True,
         methods=["get"],
@@ -724,3 +818,29 @@ class ProjectViewSet(ModelViewSet):
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+def _export_since(project, since):
+    """The ProjectExport of project with id since (None if since is empty)."""
+    if since in (None, ""):
+        return None
+    try:
+        return models.ProjectExport.objects.get(pk=int(since), project=project)
+    except (TypeError, ValueError, models.ProjectExport.DoesNotExist):
+        raise ValueError(f"No export {since} of this project")
+
+
+async def _async_chunks(chunks):
+    """Async iterator over chunks, advancing the (blocking) iterator in a worker thread."""
+    chunks = iter(chunks)
+    done = object()
+    try:
+        while True:
+            chunk = await sync_to_async(next, thread_sensitive=False)(chunks, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=False)()
@@ -0,0 +1,69 @@
+"""
+Server-Sent Events stream of a project's job events.
+
+GET projects/<pk>/events/ keeps the connection open and sends each
+job event (see lib/job_events.py) as
+
+    id: <event id>
+    event: <event type>
+    data: <JSON event data>
+
+A reconnecting EventSource sends the Last-Event-ID header and receives the
+events it missed first; ?last_event_id= does the same for other clients.
+An event arriving after one with a higher id (committed late) is sent
+without the id line, so that the client's last event id never goes back.
+Served by the ASGI application (asgi.py) so that an open stream does not hold
+a worker thread.
+"""
+
+import json
+import logging
+
+from django.http import JsonResponse, StreamingHttpResponse
+
+from ..db import models
+from ..lib import job_events
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+
+def _format_event(event, with_id: bool = True) -> str:
+    if event is None:
+        return ": keepalive\n\n"
+    return (
+        (f"id: {event['id']}\n" if with_id else "")
+        + f"event: {event['type']}\n"
+        f"data: {json.dumps(event['data'], default=str)}\n\n"
+    )
+
+
+async def _event_stream(project_id, last_event_id):
+    async for event in job_events.stream(project_id, last_event_id):
+        newer = event is not None and event["id"] > last_event_id
+        if newer:
+            last_event_id = event["id"]
+        yield _format_event(event, with_id=newer)
+
+
+async def project_events(request, pk):
+    """Stream the job events of project pk as text/event-stream."""
+    try:
+        project = await models.Project.objects.aget(pk=pk)
+    except models.Project.DoesNotExist:
+        return JsonResponse({"success": False, "error": "Project not found"}, status=404)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id") or 0
+    try:
+        last_event_id = int(last_event_id)
+    except ValueError:
+        return JsonResponse(
+            {"success": False, "error": f"Invalid last event id: {last_event_id}"}, status=400
+        )
+
+    response = StreamingHttpResponse(
+        _event_stream(project.pk, last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop reverse proxies (nginx) from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
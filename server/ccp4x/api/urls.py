@@ -11,6 +11,7 @@ from .JobViewSet import JobViewSet
 from .FileTypeViewSet import FileTypeViewSet
 from .FileImportViewSet import FileImportViewSet
 from .FileUseViewSet import FileUseViewSet
+from . import events
 from . import views
 
 router = routers.DefaultRouter()
@@ -24,8 +25,10 @@ router.register("fileuses", FileUseViewSet)
 router.register("projectexports", ProjectExportViewSet)
 
 urlpatterns = [
+    path("projects/<int:pk>/events/", events.project_events, name="project_events"),
     path("", include(router.urls)),
     path("health/", views.health_check, name="health_check"),
     path("task_tree/", views.task_tree, name="task_tree"),
     path("active_jobs/", views.active_jobs, name="active_jobs"),
+    path("plugin_cache/", views.plugin_cache, name="plugin_cache"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,9 +1,10 @@
 from rest_framework.decorators import api_view
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
 from django.db import connection
 from django.core.exceptions import ImproperlyConfigured
 from ..db import models
-from ..lib.utils.navigation.task_tree import get_task_tree
+from ..lib.utils.navigation.task_tree import get_task_tree_response
+from ..lib.utils.plugins.plugin_cache import get_plugin_cache
 import psutil
 
 
@@ -23,9 +24,30 @@ def task_tree(request):
             }
         }
     }
+
+    The body is built once per process; clients revalidate with If-None-Match.
+    """
+    body, etag = get_task_tree_response()
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@api_view(["GET"])
+def plugin_cache(request):
+    """
+    Returns the hit rate and build latency of the job plugin cache per task.
     """
-    task_tree_data = get_task_tree()
-    return JsonResponse({"success": True, "data": {"task_tree": task_tree_data}})
+    cache = get_plugin_cache()
+    return JsonResponse({
+        "success": True,
+        "data": {"size": len(cache), "max_size": cache.max_size, "tasks": cache.stats()},
+    })
 
 
 @api_view(["GET"])
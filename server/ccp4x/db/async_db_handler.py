@@ -22,6 +22,8 @@ from core.CCP4PluginScript import CPluginScript
 
 # Import using Django's registered app name to avoid app registry errors
 from ccp4x.db import models
+from ccp4x.db.job_status import InvalidStatusTransition, transition_job_status
+from ccp4x.lib import job_events
 
 logger = logging.getLogger(__name__)
 
@@ -149,39 +151,9 @@ class AsyncDatabaseHandler:
                 # Auto-generate job number if not provided
                 if job_number is None:
                     if parent_job:
-                        # Get highest child number for this parent
-                        siblings = models.Job.objects.filter(parent=parent_job)
-                        if siblings.exists():
-                            max_num = max(
-                                int(s.number.split('.')[-1])
-                                for s in siblings
-                            )
-                            child_num = max_num + 1
-                        else:
-                            child_num = 1
-                        computed_number = f"{parent_job.number}.{child_num}"
+                        computed_number = parent_job.next_child_number()
                     else:
-                        # Top-level job - compute next job number from existing jobs
-                        # Don't rely on project.last_job_number which can get out of sync
-                        existing_jobs = models.Job.objects.filter(
-                            project=project,
-                            parent__isnull=True  # Only top-level jobs
-                        )
-                        if existing_jobs.exists():
-                            # Find the maximum job number among top-level jobs
-                            max_num = max(
-                                int(j.number.split('.')[0])  # Handle "1", "2", etc.
-                                for j in existing_jobs
-                            )
-                            next_num = max_num + 1
-                        else:
-                            next_num = 1
-
-                        computed_number = str(next_num)
-
-                        # Update last_job_number to keep it in sync (for legacy compat)
-                        project.last_job_number = next_num
-                        project.save()
+                        computed_number = str(models.Project.next_job_number(project.pk))
                 else:
                     computed_number = job_number
 
@@ -258,6 +230,9 @@ class AsyncDatabaseHandler:
         """
         Update job status in the database.
 
+        Transitions not allowed from the job's current status (see
+        job_status.ALLOWED_TRANSITIONS) are logged and not applied.
+
         Args:
             job_uuid: UUID of job to update
             status: New status (models.Job.Status enum value)
@@ -265,15 +240,11 @@ class AsyncDatabaseHandler:
         """
         @sync_to_async
         def _update():
-            with transaction.atomic():
-                # job_uuid is already a UUID object (see parameter type hint)
-                job = models.Job.objects.get(uuid=job_uuid)
-                job.status = status
-
-                if status == models.Job.Status.FINISHED:
-                    job.finish_time = finish_time or timezone.now()
-
-                job.save()
+            # One conditional UPDATE (see job_status.py); no read of the job first
+            try:
+                transition_job_status(job_uuid, status, finish_time=finish_time)
+            except InvalidStatusTransition as err:
+                logger.warning("Status of job %s not updated: %s", job_uuid, err)
 
         await _update()
 
@@ -427,6 +398,32 @@ class AsyncDatabaseHandler:
 
         return await _find()
 
+    async def find_imported_file_by_source(
+        self,
+        source_path: Path,
+        file_type: str,
+    ) -> Optional[models.File]:
+        """
+        Find the file most recently imported from source_path with this type.
+
+        Args:
+            source_path: Path the file was imported from
+            file_type: File type name (e.g., "application/CCP4-mtz")
+
+        Returns:
+            File instance if one was imported from that path, None otherwise
+        """
+        @sync_to_async
+        def _find():
+            file_import = models.FileImport.objects.filter(
+                name=str(source_path),
+                file__type__name=file_type,
+                file__directory=models.File.Directory.IMPORT_DIR,
+            ).select_related('file', 'file__job__project').order_by('-time').first()
+            return file_import.file if file_import else None
+
+        return await _find()
+
     async def register_imported_file(
         self,
         job_uuid: uuid.UUID,
@@ -565,27 +562,21 @@ class AsyncDatabaseHandler:
 
         await _register()
 
-    async def glean_job_files(
-        self,
-        job_uuid: uuid.UUID,
-        container,
-        plugin=None,
-    ) -> List[models.File]:
+    def _collect_output_files(self, container, plugin=None) -> List[tuple]:
         """
-        Extract file information from a job's output container using modern CData utilities.
+        Find the output files of a job's output container that should be registered.
 
-        This method inspects the job's output container and registers all
-        output files in the database.
+        Files that are unset or missing on disk are skipped. mmCIF coordinates
+        written with a .pdb extension are renamed to .cif on the way.
 
         Args:
-            job_uuid: UUID of the job
             container: CDataContainer with output data
             plugin: Optional CPluginScript instance to provide dbHandler context
 
         Returns:
-            List of created File instances
+            List of (file object, register_output_file() keyword arguments)
         """
-        files_created = []
+        gleaned = []
 
         # Use modern hierarchical traversal to find all files
         output_files = container.find_all_files()
@@ -693,44 +684,31 @@ class AsyncDatabaseHandler:
                         logger.warning(traceback.format_exc())
                         # Continue with original path if rename fails
 
-                # Register the file in database
-                file_record = await self.register_output_file(
-                    job_uuid=job_uuid,
-                    file_path=file_path,
-                    file_type=metadata['file_type'],
-                    param_name=metadata['name'],
-                    content_flag=metadata.get('content_flag'),
-                    sub_type=metadata.get('sub_type'),
-                    annotation=metadata.get('annotation', metadata.get('gui_label', '')),
-                )
-
-                pass  # DEBUG: print(f"  -> Registered as: {file_record.type.name if file_record.type else 'NO TYPE'}")
-
-                # Link back to container
-                if hasattr(file_obj, 'dbFileId'):
-                    file_obj.dbFileId.set(str(file_record.uuid))
-
-                files_created.append(file_record)
+                # Collect the record; all files are registered together
+                gleaned.append((file_obj, {
+                    'file_path': file_path,
+                    'file_type': metadata['file_type'],
+                    'param_name': metadata['name'],
+                    'content_flag': metadata.get('content_flag'),
+                    'sub_type': metadata.get('sub_type'),
+                    'annotation': metadata.get('annotation', metadata.get('gui_label', '')),
+                }))
 
             except Exception as e:
                 logger.exception(f"Error gleaning file {file_obj.objectName()}: {e}")
 
-        return files_created
+        return gleaned
 
-    async def glean_performance_indicators(
-        self,
-        job_uuid: uuid.UUID,
-        container,
-    ) -> int:
+    def _collect_performance_indicators(self, container) -> tuple:
         """
-        Extract performance indicators (KPIs) from output container.
+        Extract performance indicator (KPI) values from an output container.
 
         Args:
-            job_uuid: UUID of the job
             container: CDataContainer with output data
 
         Returns:
-            Number of KPIs extracted
+            (float values, string values, number of values found); a key found
+            in more than one indicator takes its last value
         """
         # Import here to avoid circular dependency
         from ..lib.cdata_utils import extract_kpi_values
@@ -738,12 +716,11 @@ class AsyncDatabaseHandler:
         try:
             from core.CCP4PerformanceData import CPerformanceIndicator
         except ImportError:
-            try:
-                from core.CCP4PerformanceData import CPerformanceIndicator
-            except ImportError:
-                logger.warning("Could not import CPerformanceIndicator")
-                return 0
+            logger.warning("Could not import CPerformanceIndicator")
+            return {}, {}, 0
 
+        float_values = {}
+        char_values = {}
         count = 0
 
         # Find all performance indicator objects
@@ -754,26 +731,141 @@ class AsyncDatabaseHandler:
                 # Extract all KPI values
                 values = extract_kpi_values(kpi)
 
-                # Register each value in database
                 for key, value in values.items():
                     if isinstance(value, float):
-                        await self.register_job_float_value(
-                            job_uuid=job_uuid,
-                            key=key,
-                            value=value,
-                        )
+                        float_values[key] = value
                         count += 1
                     elif isinstance(value, str) and len(value) > 0:
-                        await self.register_job_char_value(
-                            job_uuid=job_uuid,
-                            key=key,
-                            value=value,
-                        )
+                        char_values[key] = value
                         count += 1
 
             except Exception as e:
                 logger.exception(f"Error gleaning KPIs from {kpi.object_path()}: {e}")
 
+        return float_values, char_values, count
+
+    async def register_gleaned_outputs(
+        self,
+        job_uuid: uuid.UUID,
+        files: Optional[List[Dict[str, Any]]] = None,
+        float_values: Optional[Dict[str, float]] = None,
+        char_values: Optional[Dict[str, str]] = None,
+    ) -> List[Optional[models.File]]:
+        """
+        Register a job's output files and KPI values in one transaction.
+
+        Bulk counterpart of register_output_file(), register_job_float_value()
+        and register_job_char_value(): one sync_to_async call and a fixed
+        number of queries (bulk INSERTs and upserts) however many records
+        there are. If the bulk write fails, the records are written one at a
+        time so that one bad record does not lose the others.
+
+        Args:
+            job_uuid: UUID of the job
+            files: register_output_file() keyword arguments (file_path,
+                file_type, param_name, content_flag, sub_type, annotation)
+                for each file
+            float_values: KPI key -> float value
+            char_values: KPI key -> string value
+
+        Returns:
+            Created File instances in the order of files (None for a file
+            that could not be registered)
+        """
+        files = files or []
+        float_values = float_values or {}
+        char_values = char_values or {}
+
+        @sync_to_async
+        def _register():
+            job = models.Job.objects.get(uuid=job_uuid)
+            try:
+                with transaction.atomic():
+                    records = _bulk_register_outputs(job, files, float_values, char_values)
+            except Exception as e:
+                logger.exception(f"Bulk registration of outputs of job {job_uuid} failed, "
+                                 f"registering them one at a time: {e}")
+                records = _register_outputs_individually(job, files, float_values, char_values)
+            _publish_gleaned_outputs(job, records, float_values, char_values)
+            return records
+
+        return await _register()
+
+    async def glean_job_outputs(
+        self,
+        job_uuid: uuid.UUID,
+        container,
+        plugin=None,
+    ) -> tuple:
+        """
+        Register a job's output files and KPIs in a single transaction.
+
+        Args:
+            job_uuid: UUID of the job
+            container: CDataContainer with output data
+            plugin: Optional CPluginScript instance to provide dbHandler context
+
+        Returns:
+            (list of created File instances, number of KPIs)
+        """
+        gleaned = self._collect_output_files(container, plugin=plugin)
+        logger.debug(f"[DEBUG glean_job_outputs] Collected {len(gleaned)} files")
+        float_values, char_values, kpi_count = self._collect_performance_indicators(container)
+
+        records = await self.register_gleaned_outputs(
+            job_uuid,
+            files=[spec for _, spec in gleaned],
+            float_values=float_values,
+            char_values=char_values,
+        )
+        return _link_gleaned_files(gleaned, records), kpi_count
+
+    async def glean_job_files(
+        self,
+        job_uuid: uuid.UUID,
+        container,
+        plugin=None,
+    ) -> List[models.File]:
+        """
+        Extract file information from a job's output container using modern CData utilities.
+
+        This method inspects the job's output container and registers all
+        output files in the database (in one transaction).
+
+        Args:
+            job_uuid: UUID of the job
+            container: CDataContainer with output data
+            plugin: Optional CPluginScript instance to provide dbHandler context
+
+        Returns:
+            List of created File instances
+        """
+        gleaned = self._collect_output_files(container, plugin=plugin)
+        records = await self.register_gleaned_outputs(
+            job_uuid, files=[spec for _, spec in gleaned]
+        )
+        return _link_gleaned_files(gleaned, records)
+
+    async def glean_performance_indicators(
+        self,
+        job_uuid: uuid.UUID,
+        container,
+    ) -> int:
+        """
+        Extract performance indicators (KPIs) from output container.
+
+        Args:
+            job_uuid: UUID of the job
+            container: CDataContainer with output data
+
+        Returns:
+            Number of KPIs extracted
+        """
+        float_values, char_values, count = self._collect_performance_indicators(container)
+        if float_values or char_values:
+            await self.register_gleaned_outputs(
+                job_uuid, float_values=float_values, char_values=char_values
+            )
         return count
 
     @asynccontextmanager
@@ -857,11 +949,11 @@ class AsyncDatabaseHandler:
                 logger.debug(f"[DEBUG track_job] output_container is not None = {output_container is not None}")
                 if output_container is not None:
                     # Pass plugin so file objects can access dbHandler during gleaning
-                    files_gleaned = await self.glean_job_files(job_uuid, output_container, plugin=plugin)
+                    files_gleaned, kpis_gleaned = await self.glean_job_outputs(
+                        job_uuid, output_container, plugin=plugin
+                    )
                     logger.info(f"Gleaned {len(files_gleaned)} output files")
                     logger.debug(f"[DEBUG track_job] Gleaned {len(files_gleaned)} output files")
-
-                    kpis_gleaned = await self.glean_performance_indicators(job_uuid, output_container)
                     logger.info(f"Gleaned {kpis_gleaned} performance indicators")
                     logger.debug(f"[DEBUG track_job] Gleaned {kpis_gleaned} performance indicators")
 
@@ -953,10 +1045,10 @@ class AsyncDatabaseHandler:
                 if status == CPluginScript.SUCCEEDED:
                     output_container = plugin.container.outputData if hasattr(plugin.container, 'outputData') else None
                     if output_container is not None:
-                        files_gleaned = await self.glean_job_files(job.uuid, output_container, plugin=plugin)
+                        files_gleaned, kpis_gleaned = await self.glean_job_outputs(
+                            job.uuid, output_container, plugin=plugin
+                        )
                         logger.info(f"Subjob {job.number}: Gleaned {len(files_gleaned)} output files")
-
-                        kpis_gleaned = await self.glean_performance_indicators(job.uuid, output_container)
                         logger.info(f"Subjob {job.number}: Gleaned {kpis_gleaned} performance indicators")
 
                         # Save params.xml with updated dbFileId values
@@ -1199,6 +1291,150 @@ class AsyncDatabaseHandler:
             return None
 
 
+def _bulk_register_outputs(job, files, float_values, char_values) -> List[models.File]:
+    """Write gleaned files, their FileUses and KPI values with bulk queries."""
+    file_records = []
+
+    if files:
+        # FileType is keyed by name: one INSERT makes sure every type exists
+        models.FileType.objects.bulk_create(
+            [
+                models.FileType(name=name, description=f"File type: {name}")
+                for name in {spec["file_type"] for spec in files}
+            ],
+            ignore_conflicts=True,
+        )
+        file_records = models.File.objects.bulk_create([
+            models.File(
+                name=Path(spec["file_path"]).name,
+                directory=models.File.Directory.JOB_DIR,
+                type_id=spec["file_type"],
+                sub_type=spec.get("sub_type"),
+                content=spec.get("content_flag"),
+                annotation=spec.get("annotation", ""),
+                job=job,
+                job_param_name=spec["param_name"],
+            )
+            for spec in files
+        ])
+        models.FileUse.objects.bulk_create([
+            models.FileUse(
+                file=file_record,
+                job=job,
+                role=models.FileUse.Role.OUT,
+                job_param_name=file_record.job_param_name,
+            )
+            for file_record in file_records
+        ])
+
+    if float_values or char_values:
+        models.JobValueKey.objects.bulk_create(
+            [
+                models.JobValueKey(name=key, description=key)
+                for key in set(float_values) | set(char_values)
+            ],
+            ignore_conflicts=True,
+        )
+        # Bulk writes send no post_save signals: stamp the rows with the
+        # project's change counter here (see db/signals.py)
+        version = models.Project.next_change_version(job.project_id)
+        for model, values in ((models.JobFloatValue, float_values), (models.JobCharValue, char_values)):
+            if values:
+                model.objects.bulk_create(
+                    [
+                        model(job=job, key_id=key, value=value, change_version=version)
+                        for key, value in values.items()
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["job", "key"],
+                    update_fields=["value", "change_version"],
+                )
+
+    return file_records
+
+
+def _register_outputs_individually(job, files, float_values, char_values) -> List[Optional[models.File]]:
+    """Write gleaned records one per transaction, skipping those that fail."""
+    file_records = []
+    for spec in files:
+        try:
+            with transaction.atomic():
+                file_type_obj, _ = models.FileType.objects.get_or_create(
+                    name=spec["file_type"],
+                    defaults={"description": f"File type: {spec['file_type']}"},
+                )
+                file_obj = models.File.objects.create(
+                    name=Path(spec["file_path"]).name,
+                    directory=models.File.Directory.JOB_DIR,
+                    type=file_type_obj,
+                    sub_type=spec.get("sub_type"),
+                    content=spec.get("content_flag"),
+                    annotation=spec.get("annotation", ""),
+                    job=job,
+                    job_param_name=spec["param_name"],
+                )
+                models.FileUse.objects.create(
+                    file=file_obj,
+                    job=job,
+                    role=models.FileUse.Role.OUT,
+                    job_param_name=spec["param_name"],
+                )
+            file_records.append(file_obj)
+        except Exception as e:
+            logger.exception(f"Error registering file {spec['file_path']}: {e}")
+            file_records.append(None)
+
+    for model, values in ((models.JobFloatValue, float_values), (models.JobCharValue, char_values)):
+        for key, value in values.items():
+            try:
+                with transaction.atomic():
+                    job_value_key, _ = models.JobValueKey.objects.get_or_create(
+                        name=key, defaults={"description": key}
+                    )
+                    model.objects.update_or_create(
+                        job=job, key=job_value_key, defaults={"value": value}
+                    )
+            except Exception as e:
+                logger.exception(f"Error registering KPI {key}: {e}")
+
+    return file_records
+
+
+def _publish_gleaned_outputs(job, records, float_values, char_values) -> None:
+    """Publish the registered files and KPI values to the project's event stream."""
+    files = [
+        {
+            "uuid": str(file_record.uuid),
+            "name": file_record.name,
+            "type": file_record.type_id,
+            "param_name": file_record.job_param_name,
+        }
+        for file_record in records
+        if file_record is not None
+    ]
+    if files:
+        job_events.publish(job.project_id, "files", {"job": str(job.uuid), "files": files}, job_id=job.pk)
+    if float_values or char_values:
+        job_events.publish(
+            job.project_id, "kpis",
+            {"job": str(job.uuid), "values": {**float_values, **char_values}},
+            job_id=job.pk,
+        )
+
+
+def _link_gleaned_files(gleaned, records) -> List[models.File]:
+    """Set dbFileId of gleaned file objects; return the registered File instances."""
+    files_created = []
+    for (file_obj, _), file_record in zip(gleaned, records):
+        if file_record is None:
+            continue
+        # Link back to container
+        if hasattr(file_obj, 'dbFileId'):
+            file_obj.dbFileId.set(str(file_record.uuid))
+        files_created.append(file_record)
+    return files_created
+
+
 def plugin_status_to_job_status(finish_status: int) -> int:
     """
     Convert CPluginScript finish status to Job.Status enum value.
@@ -3,11 +3,11 @@ import logging
 import sys
 import uuid
 
-from django.utils import timezone
 
 from core.CCP4PluginScript import CPluginScript
 
 from . import models
+from .job_status import InvalidStatusTransition, transition_job_status
 from .ccp4i2_django_dbapi import CCP4i2DjangoDbApi
 from .ccp4i2_static_data import (
     JOB_STATUS_FAILED,
@@ -206,30 +206,23 @@ class CCP4i2DjangoDbHandler:
         try:
             if status is None and finishStatus is not None:
                 status = plugin_status_to_job_status(finishStatus)
+            if status is None:
+                # Called to synchronise the container only
+                return CPluginScript.SUCCEEDED
             try:
-                the_job = models.Job.objects.get(uuid=job_uuid)
-                the_job.status = status
-                the_job.save()
-                if models.Job.Status(status).label == "Finished":
-                    the_job.finish_time = timezone.now()
-                    the_job.save()
+                # One conditional UPDATE, which also sets finish_time
+                transition_job_status(job_uuid, status)
+                if status == models.Job.Status.FINISHED:
                     self.db.gleanJobFiles(container=container, jobId=jobId)
-                if the_job.parent() is None and models.Job.Status(
-                    the_job.status
-                ).label in [
-                    "Finished",
-                    "Interrupted",
-                    "Failed",
-                    "Unsatisfactory",
-                ]:
-                    pass  # backupProjectDb(the_job.projectid)
+            except InvalidStatusTransition as err:
+                logger.warning("Status of job %s not updated: %s", jobId, err)
             except Exception as err:
                 logger.exception(
-                    "Failed in updateJobStatus %s" % (the_job,),
+                    "Failed in updateJobStatus %s" % (jobId,),
                     exc_info=err,
                 )
         except Exception as err:
-            logger.error("Issue in reportStatus %s %s", err, the_job, exc_info=err)
+            logger.error("Issue in reportStatus %s %s", err, jobId, exc_info=err)
         return CPluginScript.SUCCEEDED
 
     def getProjectDirectory(self, projectId):
@@ -9,6 +9,7 @@ from ..lib.utils.files.get_by_context import get_file_by_job_context
 from . import models
 from .ccp4i2_static_data import FILETYPELIST
 from ..lib.utils.jobs.directory import job_directory
+from ..lib.utils.navigation.dependencies import get_descendent_jobs
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
@@ -402,15 +403,7 @@ class CCP4i2DjangoDbApi(object):
             for descendentJob in jobInfo["descendentjobs"]:
                 child_job_id = descendentJob[0]
         """
-        result = []
-        children = list(job.children.all())
-        for child in children:
-            grandchildren = list(child.children.all())
-            grandchild_ids = [str(gc.uuid) for gc in grandchildren]
-            result.append((str(child.uuid), grandchild_ids))
-            # Recursively add grandchildren
-            result.extend(self._get_descendent_jobs(child))
-        return result
+        return get_descendent_jobs(job)
 
     def jobDirectory(self, jobId=None, projectName=None, jobNumber=None, create=False, projectId=None, projectDirectory=None):
         logger.debug("in CCP4i2DjangoDbApi %s, %s, %s", jobId, projectName, jobNumber)
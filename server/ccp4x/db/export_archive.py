@@ -0,0 +1,346 @@
+"""
+Streaming ZIP writer for project exports.
+
+zipfile.ZipFile compresses members one at a time in the calling thread and
+deflates everything, including MTZ, map and gzip payloads that do not shrink.
+iter_zip() instead
+
+- picks the method per member: STORED for incompressible suffixes
+  (STORED_SUFFIXES), DEFLATED otherwise (falling back to STORED for members
+  that do not shrink),
+- deflates members of up to PARALLEL_MEMBER_MAX_BYTES in a thread pool (zlib
+  releases the GIL) while earlier members are being written,
+- yields the archive as chunks of bytes, so it can be written to a file or
+  sent as an HTTP response without being assembled anywhere. Memory is
+  bounded by IN_FLIGHT_MAX_BYTES of members being compressed ahead; larger
+  members are read and written in CHUNK_SIZE pieces.
+
+Archives use data descriptors for streamed members and ZIP64 records where
+sizes or offsets need them, and are read back by zipfile as usual.
+
+Example:
+    members = [ArchiveMember("DATABASE.db.xml", data=xml_bytes),
+               ArchiveMember("CCP4_JOBS/"),
+               ArchiveMember("CCP4_JOBS/job_1/hklout.mtz", path=mtz_path)]
+    write_zip(members, output_path)
+"""
+
+import collections
+import logging
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Members with these suffixes are already compressed (or compress poorly)
+STORED_SUFFIXES = frozenset({
+    ".mtz", ".map", ".ccp4", ".mrc", ".gz", ".tgz", ".bz2", ".xz", ".zst",
+    ".zip", ".png", ".jpg", ".jpeg", ".gif", ".h5", ".hdf5", ".npz",
+})
+
+# zlib compression level for DEFLATED members
+COMPRESSION_LEVEL = 6
+
+# Size of the pieces large members are read and written in
+CHUNK_SIZE = 1024 * 1024
+
+# Members up to this size are compressed whole in the thread pool
+PARALLEL_MEMBER_MAX_BYTES = 32 * 1024 * 1024
+
+# Total size of the members being compressed ahead of the writer
+IN_FLIGHT_MAX_BYTES = 256 * 1024 * 1024
+
+# Default number of compression threads
+EXPORT_WORKERS = min(8, os.cpu_count() or 1)
+
+_ZIP64_LIMIT = (1 << 31) - 1
+_MAX_UINT32 = 0xFFFFFFFF
+_MAX_UINT16 = 0xFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+_ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_LOCATOR = struct.Struct("<IIQI")
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_VERSION_MADE_BY = (3 << 8) | 45  # Unix, ZIP 4.5
+
+
+class ArchiveMember(NamedTuple):
+    """A ZIP member: a file on disk (path), bytes (data), or a directory (name ending in /)."""
+
+    arcname: str
+    path: Optional[Path] = None
+    data: Optional[bytes] = None
+
+    @property
+    def is_dir(self) -> bool:
+        return self.arcname.endswith("/")
+
+
+class _Entry(NamedTuple):
+    name: bytes
+    flags: int
+    method: int
+    dos_time: int
+    dos_date: int
+    crc: int
+    compressed_size: int
+    size: int
+    offset: int
+    external_attr: int
+
+
+def compression_for(name) -> int:
+    """ZIP compression method for a member name."""
+    if Path(str(name)).suffix.lower() in STORED_SUFFIXES:
+        return 0
+    return 8
+
+
+def _dos_time(timestamp: float):
+    t = time.localtime(timestamp)
+    if t.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (
+        (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+        ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday,
+    )
+
+
+def _compress(data: bytes, method: int):
+    """(method, crc, payload) of data, STORED if deflating does not help."""
+    crc = zlib.crc32(data)
+    if method == 8:
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        if len(payload) < len(data):
+            return 8, crc, payload
+    return 0, crc, data
+
+
+def _compress_file(path, method: int):
+    with open(path, "rb") as stream:
+        data = stream.read()
+    return (*_compress(data, method), len(data))
+
+
+class _ZipStream:
+    """Serialises ZIP records and tracks the offset and central directory."""
+
+    def __init__(self):
+        self.offset = 0
+        self.entries = []
+
+    def _local_header(self, name, flags, method, dos_time, dos_date, crc,
+                      compressed_size, size, zip64):
+        extra = b""
+        if zip64:
+            extra = struct.pack("<HHQQ", 1, 16, size, compressed_size)
+            size = compressed_size = _MAX_UINT32
+        header = _LOCAL_HEADER.pack(
+            0x04034B50, 45 if zip64 else 20, flags, method, dos_time, dos_date,
+            crc, compressed_size, size, len(name), len(extra),
+        )
+        return header + name + extra
+
+    def member(self, member: ArchiveMember, method: int, crc: int, payload: bytes,
+               size: int, mtime: float) -> Iterator[bytes]:
+        """Records of a member whose payload is known."""
+        name, flags = self._name(member.arcname)
+        dos_time, dos_date = _dos_time(mtime)
+        zip64 = size > _ZIP64_LIMIT or len(payload) > _ZIP64_LIMIT
+        header = self._local_header(name, flags, method, dos_time, dos_date, crc,
+                                    len(payload), size, zip64)
+        self._add_entry(name, flags, method, dos_time, dos_date, crc, len(payload), size,
+                        self._external_attr(member))
+        self.offset += len(header) + len(payload)
+        yield header
+        if payload:
+            yield payload
+
+    def streamed_member(self, member: ArchiveMember, method: int) -> Iterator[bytes]:
+        """Records of a file member read and (if method is DEFLATED) compressed in chunks."""
+        # Open before writing anything, so that a missing file leaves no trace
+        stream = open(member.path, "rb")
+        with stream:
+            name, flags = self._name(member.arcname)
+            flags |= _FLAG_DATA_DESCRIPTOR
+            stat = os.fstat(stream.fileno())
+            dos_time, dos_date = _dos_time(stat.st_mtime)
+            zip64 = stat.st_size > _ZIP64_LIMIT
+            header = self._local_header(name, flags, method, dos_time, dos_date, 0, 0, 0, zip64)
+            start = self.offset
+            self.offset += len(header)
+            yield header
+
+            crc = size = compressed_size = 0
+            compressor = None
+            if method == 8:
+                compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    compressed_size += len(chunk)
+                    yield chunk
+            if compressor is not None:
+                chunk = compressor.flush()
+                compressed_size += len(chunk)
+                yield chunk
+
+        if zip64:
+            descriptor = struct.pack("<IIQQ", 0x08074B50, crc, compressed_size, size)
+        else:
+            descriptor = struct.pack("<IIII", 0x08074B50, crc, compressed_size, size)
+        self.offset += compressed_size + len(descriptor)
+        yield descriptor
+        self.entries.append(_Entry(name, flags, method, dos_time, dos_date, crc,
+                                   compressed_size, size, start, self._external_attr(member)))
+
+    def central_directory(self) -> Iterator[bytes]:
+        start = self.offset
+        for entry in self.entries:
+            extra_fields = []
+            size, compressed_size, offset = entry.size, entry.compressed_size, entry.offset
+            if size >= _MAX_UINT32:
+                extra_fields.append(size)
+                size = _MAX_UINT32
+            if compressed_size >= _MAX_UINT32:
+                extra_fields.append(compressed_size)
+                compressed_size = _MAX_UINT32
+            if offset >= _MAX_UINT32:
+                extra_fields.append(offset)
+                offset = _MAX_UINT32
+            extra = b""
+            if extra_fields:
+                extra = struct.pack(f"<HH{len(extra_fields)}Q", 1, 8 * len(extra_fields),
+                                    *extra_fields)
+            record = _CENTRAL_HEADER.pack(
+                0x02014B50, _VERSION_MADE_BY, 45 if extra else 20, entry.flags, entry.method,
+                entry.dos_time, entry.dos_date, entry.crc, compressed_size, size,
+                len(entry.name), len(extra), 0, 0, 0, entry.external_attr, offset,
+            ) + entry.name + extra
+            self.offset += len(record)
+            yield record
+
+        count, size = len(self.entries), self.offset - start
+        if count >= _MAX_UINT16 or size >= _MAX_UINT32 or start >= _MAX_UINT32:
+            zip64_end = self.offset
+            yield _ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                0x06064B50, 44, _VERSION_MADE_BY, 45, 0, 0, count, count, size, start
+            )
+            yield _ZIP64_LOCATOR.pack(0x07064B50, 0, zip64_end, 1)
+            count, size, start = (min(count, _MAX_UINT16), min(size, _MAX_UINT32),
+                                  min(start, _MAX_UINT32))
+        yield _END_OF_CENTRAL_DIRECTORY.pack(0x06054B50, 0, 0, count, count, size, start, 0)
+
+    def _add_entry(self, name, flags, method, dos_time, dos_date, crc, compressed_size, size,
+                   external_attr):
+        self.entries.append(_Entry(name, flags, method, dos_time, dos_date, crc,
+                                   compressed_size, size, self.offset, external_attr))
+
+    @staticmethod
+    def _name(arcname: str):
+        arcname = arcname.replace(os.sep, "/").lstrip("/")
+        try:
+            return arcname.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return arcname.encode("utf-8"), _FLAG_UTF8
+
+    @staticmethod
+    def _external_attr(member: ArchiveMember) -> int:
+        if member.is_dir:
+            return (0o40775 << 16) | 0x10
+        return 0o100664 << 16
+
+
+def iter_zip(members: Iterable[ArchiveMember], workers: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Chunks of a ZIP archive of members, in order.
+
+    Args:
+        members: Members to write; file members that have disappeared are skipped
+        workers: Compression threads (default EXPORT_WORKERS; 1 compresses inline)
+    """
+    workers = workers or EXPORT_WORKERS
+    archive = _ZipStream()
+    executor = ThreadPoolExecutor(workers, thread_name_prefix="export") if workers > 1 else None
+    # (member, method, future or None, bytes in flight) in archive order
+    pending = collections.deque()
+    in_flight = 0
+    members = iter(members)
+
+    def fill():
+        nonlocal in_flight
+        while len(pending) < 4 * workers and in_flight < IN_FLIGHT_MAX_BYTES:
+            member = next(members, None)
+            if member is None:
+                return
+            method = compression_for(member.arcname)
+            future, size = None, 0
+            if executor is not None and member.path is not None and method == 8:
+                try:
+                    size = os.path.getsize(member.path)
+                except OSError:
+                    size = PARALLEL_MEMBER_MAX_BYTES + 1
+                if size <= PARALLEL_MEMBER_MAX_BYTES:
+                    future = executor.submit(_compress_file, member.path, method)
+                    in_flight += size
+                else:
+                    size = 0
+            pending.append((member, method, future, size))
+
+    try:
+        fill()
+        while pending:
+            member, method, future, submitted = pending.popleft()
+            in_flight -= submitted
+            try:
+                if member.is_dir:
+                    yield from archive.member(member, 0, 0, b"", 0, time.time())
+                elif member.data is not None:
+                    method, crc, payload = _compress(member.data, method)
+                    yield from archive.member(member, method, crc, payload, len(member.data),
+                                              time.time())
+                elif future is not None:
+                    method, crc, payload, size = future.result()
+                    yield from archive.member(member, method, crc, payload, size,
+                                              os.stat(member.path).st_mtime)
+                else:
+                    yield from archive.streamed_member(member, method)
+            except FileNotFoundError:
+                # Deleted since the member list was made (nothing has been written)
+                logger.warning("Skipping %s: file no longer exists", member.path)
+            fill()
+        yield from archive.central_directory()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def write_zip(members: Iterable[ArchiveMember], output_path, workers: Optional[int] = None) -> Path:
+    """Write a ZIP archive of members to output_path (replacing it once complete)."""
+    output_path = Path(output_path)
+    temporary = output_path.with_name(f".{output_path.name}.{os.getpid()}.part")
+    try:
+        with open(temporary, "wb") as stream:
+            for chunk in iter_zip(members, workers=workers):
+                stream.write(chunk)
+        os.replace(temporary, output_path)
+    finally:
+        if temporary.exists():
+            temporary.unlink()
+    return output_path
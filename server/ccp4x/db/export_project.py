@@ -1,11 +1,11 @@
 import logging
-import zipfile
-import shutil
 from pathlib import Path
 from xml.etree import ElementTree as ET
 from xml.dom import minidom
 from datetime import datetime
-from typing import List, Dict, Optional, Any, TypedDict, Set
+from typing import Iterator, List, Dict, Optional, Any, TypedDict, Set
+
+from django.db.models import Q
 
 from .models import (
     Project,
@@ -18,8 +18,10 @@ from .models import (
     ProjectTag,
     JobValueKey,
     FileType,
+    ProjectExport,
 )
 from .ccp4i2_static_data import FILETYPELIST, KEYTYPELIST
+from .export_archive import ArchiveMember, iter_zip, write_zip
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
@@ -74,6 +76,12 @@ def generate_project_xml_tree(
     return root
 
 
+def _format_xml_tree(root: ET.Element) -> str:
+    """Indented XML text of an ElementTree."""
+    xml_string = ET.tostring(root, encoding="unicode")
+    return minidom.parseString(xml_string).toprettyxml(indent="  ")
+
+
 def write_xml_tree_to_file(root: ET.Element, output_path: Path) -> Path:
     """
     Write an XML ElementTree to a formatted file.
@@ -86,11 +94,8 @@ def write_xml_tree_to_file(root: ET.Element, output_path: Path) -> Path:
         Path: The path to the created XML file
     """
     # Write formatted XML to file
-    xml_string = ET.tostring(root, encoding="unicode")
-    pretty_xml = minidom.parseString(xml_string).toprettyxml(indent="  ")
-
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(pretty_xml)
+        f.write(_format_xml_tree(root))
 
     logger.info(f"XML tree written to {output_path}")
     return output_path
@@ -118,7 +123,11 @@ def export_project_to_xml(project: Project, output_path: Path) -> Path:
 
 
 def export_project_to_zip(
-    project: Project, output_path: Path, job_selection: Set[str] = None
+    project: Project,
+    output_path: Path,
+    job_selection: Set[str] = None,
+    since: Optional[ProjectExport] = None,
+    workers: Optional[int] = None,
 ) -> Path:
     """
     Export a CCP4 project to a ZIP archive containing XML and project files.
@@ -127,35 +136,75 @@ def export_project_to_zip(
         project (Project): The Django Project model instance to export
         output_path (Path): Path where the ZIP file will be saved
         job_selection (Set[str], optional): Set of job numbers to export. If None, exports all jobs.
+        since (ProjectExport, optional): Export only jobs changed since this earlier export
+        workers (int, optional): Compression threads (default export_archive.EXPORT_WORKERS)
 
     Returns:
         Path: The path to the created ZIP file
     """
-    # Create temporary directory for XML
-    temp_dir = Path(output_path).parent / f"temp_{project.uuid}"
-    temp_dir.mkdir(exist_ok=True)
+    write_zip(
+        project_archive_members(project, job_selection=job_selection, since=since),
+        output_path,
+        workers=workers,
+    )
+    logger.info(f"Exported project {project.name} to ZIP: {output_path}")
+    return Path(output_path)
 
-    try:
-        # Generate XML tree and write to temporary file
-        xml_path = temp_dir / "DATABASE.db.xml"
-        root = generate_project_xml_tree(project, job_selection=job_selection)
-        write_xml_tree_to_file(root, xml_path)
 
-        # Create ZIP archive
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zip_archive:
-            # Add XML file
-            zip_archive.write(xml_path, "DATABASE.db.xml")
+def iter_project_zip(
+    project: Project,
+    job_selection: Set[str] = None,
+    since: Optional[ProjectExport] = None,
+    workers: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Export a CCP4 project as a stream of ZIP archive chunks (e.g. for an HTTP response).
+
+    The database is read before the first chunk is returned; producing the
+    remaining chunks only reads project files. Arguments are as for
+    export_project_to_zip().
+    """
+    members = project_archive_members(project, job_selection=job_selection, since=since)
+    return iter_zip(members, workers=workers)
 
-            # Add project directories and files
-            _add_project_files_to_zip(zip_archive, project, job_selection)
 
-        logger.info(f"Exported project {project.name} to ZIP: {output_path}")
-        return output_path
+def project_archive_members(
+    project: Project,
+    job_selection: Set[str] = None,
+    since: Optional[ProjectExport] = None,
+) -> List[ArchiveMember]:
+    """
+    Members of the export archive of a project: DATABASE.db.xml and project files.
 
-    finally:
-        # Clean up temporary directory
-        if temp_dir.exists():
-            shutil.rmtree(temp_dir)
+    Args:
+        project (Project): The Django Project model instance to export
+        job_selection (Set[str], optional): Set of job numbers to export. If None, exports all jobs.
+        since (ProjectExport, optional): Export only jobs changed since this earlier export
+            (intersected with job_selection if both are given)
+    """
+    if since is not None:
+        changed = changed_job_selection(project, since)
+        job_selection = changed if job_selection is None else set(job_selection) & changed
+    root = generate_project_xml_tree(project, job_selection=job_selection)
+    members = [ArchiveMember("DATABASE.db.xml", data=_format_xml_tree(root).encode("utf-8"))]
+    members.extend(_project_file_members(project, job_selection))
+    return members
+
+
+def changed_job_selection(project: Project, since: ProjectExport) -> Set[str]:
+    """
+    Numbers of the top-level jobs with a job (or sub-job) changed since an earlier export.
+
+    Changes are detected from the project change counter recorded with the
+    export (ProjectExport.change_version), or for older exports without one,
+    from job creation and finish times.
+    """
+    jobs = Job.objects.filter(project=project)
+    if since.change_version is not None:
+        jobs = jobs.filter(change_version__gt=since.change_version)
+    else:
+        jobs = jobs.filter(Q(creation_time__gt=since.time) | Q(finish_time__gt=since.time))
+    return {number.split(".")[0] for number in jobs.values_list("number", flat=True)}
 
 
 def _format_uuid_for_xml(uuid_value) -> str:
@@ -257,7 +306,7 @@ def _export_job_table(
         jobs = Job.objects.filter(project=project)
 
     # Sort jobs by number for consistent output
-    sorted_jobs = sorted(jobs, key=lambda j: j.number)
+    sorted_jobs = sorted(jobs, key=lambda j: j.sort_key)
 
     for job in sorted_jobs:
         job_elem = ET.SubElement(job_table, "job")
@@ -301,7 +350,7 @@ def _export_file_table(
 
         file_elem.set("fileid", _format_uuid_for_xml(file_obj.uuid))
         file_elem.set("jobid", _format_uuid_for_xml(file_obj.job.uuid))
-        file_elem.set("filename", file_obj.objectName() or "")
+        file_elem.set("filename", file_obj.name or "")
 
         # Use the path property to get directory information
         if file_obj.path:
@@ -501,46 +550,46 @@ def _get_key_type_id(key_name: str) -> int:
     return 0  # Default if not found
 
 
-def _add_directory_to_zip(
-    zip_archive: zipfile.ZipFile, source_dir: Path, archive_dir: str
-) -> None:
-    """Recursively add directory contents to ZIP archive under the given archive_dir, ensuring all parent directories are present."""
+def _directory_members(
+    source_dir: Path, archive_dir: str, seen: Set[str]
+) -> Iterator[ArchiveMember]:
+    """Members for directory contents under the given archive_dir, ensuring all parent directories are present."""
     # Ensure parent directories are added as empty entries
     parts = Path(archive_dir).parts
     for i in range(1, len(parts) + 1):
-        parent_dir = Path(*parts[:i])
-        zip_info = zipfile.ZipInfo(str(parent_dir) + "/")
-        # Only add if not already present
-        if zip_info.filename not in zip_archive.namelist():
-            zip_archive.writestr(zip_info, "")
+        yield from _new_member(str(Path(*parts[:i])) + "/", None, seen)
 
-    for item in source_dir.rglob("*"):
+    for item in sorted(source_dir.rglob("*")):
+        # Calculate relative path within the archive under archive_dir
+        relative_path = Path(archive_dir) / item.relative_to(source_dir)
         if item.is_file():
-            # Calculate relative path within the archive under archive_dir
-            relative_path = Path(archive_dir) / item.relative_to(source_dir)
-            zip_archive.write(item, str(relative_path))
+            yield from _new_member(str(relative_path), item, seen)
         elif item.is_dir():
             # Add empty directories under archive_dir
-            relative_path = Path(archive_dir) / item.relative_to(source_dir)
-            zip_info = zipfile.ZipInfo(str(relative_path) + "/")
-            if zip_info.filename not in zip_archive.namelist():
-                zip_archive.writestr(zip_info, "")
+            yield from _new_member(str(relative_path) + "/", None, seen)
 
 
-def _add_project_files_to_zip(
-    zip_archive: zipfile.ZipFile, project: Project, job_selection: Set[str] = None
-) -> None:
-    """Add project directories and files to ZIP archive, filtered by job selection."""
+def _new_member(arcname: str, path: Optional[Path], seen: Set[str]) -> Iterator[ArchiveMember]:
+    """A member for arcname unless one has been added already."""
+    if arcname not in seen:
+        seen.add(arcname)
+        yield ArchiveMember(arcname, path=path)
+
+
+def _project_file_members(
+    project: Project, job_selection: Set[str] = None
+) -> List[ArchiveMember]:
+    """Archive members for project directories and files, filtered by job selection."""
     project_dir = Path(project.directory)
     if not project_dir.exists():
-        return
+        return []
 
     # Get the set of files to export
     if job_selection is not None:
         # Get ALL jobs (including file dependency jobs) for file export
         jobs = _get_jobs_from_selection(project, job_selection)
         if not jobs:
-            return  # No valid jobs found
+            return []  # No valid jobs found
         exported_files = _get_files_for_jobs(jobs)
 
         # Only get directories for TOP-LEVEL jobs from the original selection
@@ -560,12 +609,16 @@ def _add_project_files_to_zip(
 
     else:
         # Export all files
-        exported_files = File.objects.filter(job__project=project)
+        exported_files = File.objects.filter(job__project=project).select_related("job__project")
         job_directories = set()
         ccp4_jobs_dir = project_dir / "CCP4_JOBS"
         if ccp4_jobs_dir.exists():
             job_directories = {d for d in ccp4_jobs_dir.iterdir() if d.is_dir()}
 
+    members: List[ArchiveMember] = []
+    # Archive names already added
+    seen: Set[str] = set()
+
     # Standard project directories to include
     standard_dirs = [
         "CCP4_COOT",
@@ -576,46 +629,38 @@ def _add_project_files_to_zip(
     # Special handling for CCP4_IMPORTED_FILES: only add empty placeholder directory
     imported_files_dir = project_dir / "CCP4_IMPORTED_FILES"
     if imported_files_dir.exists():
-        zip_info = zipfile.ZipInfo("CCP4_IMPORTED_FILES/")
-        if zip_info.filename not in zip_archive.namelist():
-            zip_archive.writestr(zip_info, "")
+        members.extend(_new_member("CCP4_IMPORTED_FILES/", None, seen))
         # Do NOT add files from this directory here; files will be added individually below
 
     # Add standard directories
     for subdir_name in standard_dirs:
         subdir_path = project_dir / subdir_name
         if subdir_path.exists():
-            _add_directory_to_zip(zip_archive, subdir_path, subdir_name)
+            members.extend(_directory_members(subdir_path, subdir_name, seen))
 
     # Add selected job directories and file dependency job directories
-    for job_dir in job_directories:
+    for job_dir in sorted(job_directories):
         relative_path = job_dir.relative_to(project_dir)
-        _add_directory_to_zip(zip_archive, job_dir, str(relative_path))
+        members.extend(_directory_members(job_dir, str(relative_path), seen))
 
     # Add individual files referenced by exported File objects using their path property
-    file_paths_added = set()  # Track to avoid duplicates
-
     for file_obj in exported_files:
         if file_obj.path:
             file_path = Path(file_obj.path)
-            if (
-                file_path.exists()
-                and file_path.is_file()
-                and file_path not in file_paths_added
-            ):
+            if file_path.exists() and file_path.is_file():
                 # Calculate relative path from project directory
                 try:
                     relative_path = file_path.relative_to(project_dir)
                     # Only add the file if it hasn't already been added at this relative path
-                    if str(relative_path) not in zip_archive.namelist():
-                        zip_archive.write(file_path, str(relative_path))
-                    file_paths_added.add(file_path)
+                    members.extend(_new_member(str(relative_path), file_path, seen))
                 except ValueError:
                     # File is outside project directory, skip or handle as needed
                     logger.warning(
                         f"File {file_path} is outside project directory, skipping"
                     )
 
+    return members
+
 
 def _get_top_level_jobs_from_selection(
     project: Project, job_selection: Set[str]
@@ -651,7 +696,7 @@ def _get_top_level_jobs_from_selection(
 def _get_files_for_jobs(jobs: Set[Job]) -> List[File]:
     """Get all File objects associated with the selected jobs."""
     job_uuids = [job.uuid for job in jobs]
-    return list(File.objects.filter(job__uuid__in=job_uuids))
+    return list(File.objects.filter(job__uuid__in=job_uuids).select_related("job__project"))
 
 
 def _get_job_directories_from_job_objects(
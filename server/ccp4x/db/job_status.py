@@ -0,0 +1,197 @@
+"""
+Job status state machine.
+
+A status change is one conditional UPDATE of the job row:
+
+    UPDATE job SET status = <new>, ... WHERE id = <job> AND status IN (<allowed>)
+
+so it needs no read of the row first, two workers cannot overwrite each
+other's status, and an illegal transition (an UPDATE that matched no row) is
+rejected with InvalidStatusTransition. Pass ``expected`` to require one exact
+current status (compare-and-set); it is then also recorded as the previous
+status.
+
+Every applied transition appends a JobStatusHistory row, so queue and run
+times are indexed queries on (job, time) or (to_status, time). Status changes
+made by saving a Job directly are recorded too (see signals.py).
+
+The change is also stamped with the project's change counter and published
+as a job_status event, as saving the job would do.
+"""
+
+import logging
+import uuid
+from typing import Dict, FrozenSet, Optional, Union
+
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from ..lib.job_events import publish_on_commit
+from .models import Job, JobStatusHistory, Project
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+Status = Job.Status
+
+# Statuses from which a job has not been run to completion
+_NOT_STARTED = frozenset({Status.UNKNOWN, Status.PENDING, Status.QUEUED})
+_ACTIVE = _NOT_STARTED | {Status.RUNNING, Status.RUNNING_REMOTELY}
+
+# Status -> statuses a job may move to it from
+ALLOWED_TRANSITIONS: Dict[int, FrozenSet[int]] = {
+    Status.UNKNOWN: frozenset(),
+    Status.PENDING: frozenset({Status.UNKNOWN}),
+    Status.QUEUED: frozenset({Status.UNKNOWN, Status.PENDING}),
+    Status.RUNNING: _NOT_STARTED | {Status.RUNNING_REMOTELY},
+    Status.RUNNING_REMOTELY: _NOT_STARTED,
+    Status.FINISHED: _ACTIVE,
+    # A job already marked FINISHED can still fail while its outputs are gleaned
+    Status.FAILED: _ACTIVE | {Status.FINISHED},
+    Status.INTERRUPTED: _ACTIVE,
+    Status.UNSATISFACTORY: _ACTIVE,
+    Status.FILE_HOLDER: frozenset({Status.UNKNOWN, Status.PENDING}),
+    Status.TO_DELETE: frozenset(Status.values),
+}
+
+
+class InvalidStatusTransition(Exception):
+    """A status transition not allowed from the job's current status."""
+
+    def __init__(self, message, job=None, status=None, current_status=None):
+        super().__init__(message)
+        self.job = job
+        self.status = status
+        self.current_status = current_status
+
+
+def _label(status) -> str:
+    return Status(status).label if status in Status.values else str(status)
+
+
+def check_transition(current: int, status: int, job=None) -> None:
+    """
+    Check that a job with status ``current`` may move to ``status``.
+
+    Raises:
+        InvalidStatusTransition: The transition is not allowed
+    """
+    status = Status(status)
+    if current not in ALLOWED_TRANSITIONS[status]:
+        raise InvalidStatusTransition(
+            f"Job status cannot change from {_label(current)} to {status.label}",
+            job=job, status=status, current_status=current,
+        )
+
+
+def transition_job_status(
+    job: Union[Job, uuid.UUID, str],
+    status: int,
+    expected: Optional[int] = None,
+    finish_time=None,
+    force: bool = False,
+) -> bool:
+    """
+    Move a job to a new status with one conditional UPDATE.
+
+    Args:
+        job: Job instance, or job UUID
+        status: New status (Job.Status value)
+        expected: Exact status the job must have now; by default any status
+            from which the transition is allowed
+        finish_time: Finish time of a FINISHED job (default: now)
+        force: Allow any transition (administrative corrections); with
+            expected, still a compare-and-set
+
+    Returns:
+        True if the status changed, False if the job already had it
+
+    Raises:
+        InvalidStatusTransition: The job does not exist or its current status
+            does not allow the transition
+    """
+    status = Status(status)
+    if expected is not None and expected == status:
+        return False
+    if expected is not None:
+        if not force:
+            check_transition(expected, status, job=job)
+        sources = [expected]
+    else:
+        sources = Status.values if force else sorted(ALLOWED_TRANSITIONS[status])
+
+    is_instance = isinstance(job, Job)
+    if is_instance:
+        job_filter = {"pk": job.pk}
+        project_id = job.project_id
+    else:
+        job_filter = {"uuid": job if isinstance(job, uuid.UUID) else uuid.UUID(str(job))}
+        project_id = Subquery(Job.objects.filter(**job_filter).values("project_id")[:1])
+
+    now = timezone.now()
+    fields = {"status": status}
+    if status == Status.FINISHED:
+        fields["finish_time"] = finish_time or now
+
+    try:
+        with transaction.atomic():
+            # Advanced first so the job row is stamped in the same UPDATE; a
+            # rejected transition rolls the counter back
+            version = Project.next_change_version(project_id)
+            updated = Job.objects.filter(status__in=sources, **job_filter).update(
+                change_version=version, **fields
+            )
+            if not updated:
+                raise _rejected(job, job_filter, status)
+
+            if is_instance:
+                job_id, number, job_uuid = job.pk, job.number, job.uuid
+            else:
+                job_id, number, job_uuid, project_id = (
+                    Job.objects.filter(**job_filter)
+                    .values_list("pk", "number", "uuid", "project_id")
+                    .get()
+                )
+            JobStatusHistory.objects.create(
+                job_id=job_id, from_status=expected, to_status=status, time=now
+            )
+    except InvalidStatusTransition as err:
+        if err.current_status != status:
+            raise
+        # Already there (e.g. marked RUNNING by both the runner and the plugin)
+        if is_instance:
+            job.status = job._loaded_status = status
+        return False
+
+    if is_instance:
+        job.status = status
+        job.change_version = version
+        job._loaded_status = status
+        if "finish_time" in fields:
+            job.finish_time = fields["finish_time"]
+
+    publish_on_commit(
+        project_id,
+        "job_status",
+        {
+            "job": str(job_uuid),
+            "number": number,
+            "status": status,
+            "status_label": status.label,
+            "previous_status": expected,
+        },
+        job_id=job_id,
+    )
+    logger.debug("Job %s status changed from %s to %s", number, expected, status.label)
+    return True
+
+
+def _rejected(job, job_filter, status) -> InvalidStatusTransition:
+    # Only read on failure, to say why
+    current = Job.objects.filter(**job_filter).values_list("status", flat=True).first()
+    if current is None:
+        return InvalidStatusTransition(f"Job {job} does not exist", job=job, status=status)
+    return InvalidStatusTransition(
+        f"Job status cannot change from {_label(current)} to {status.label}",
+        job=job, status=status, current_status=current,
+    )
@@ -5,7 +5,7 @@ import platform
 from pathlib import Path
 from typing import Set
 from django.core.management.base import BaseCommand
-from ccp4x.db.models import Project, Job
+from ccp4x.db.models import Project, Job, ProjectExport
 from ccp4x.db.export_project import export_project_to_zip
 
 
@@ -41,6 +41,14 @@ class Command(BaseCommand):
         parser.add_argument(
             "-d", "--detach", help="Run export in detached process", action="store_true"
         )
+        parser.add_argument(
+            "--since",
+            help="Id of an earlier ProjectExport: export only jobs changed since then",
+            type=int,
+        )
+        parser.add_argument(
+            "-w", "--workers", help="Number of compression threads", type=int
+        )
 
     def handle(self, *args, **options):
         try:
@@ -59,12 +67,27 @@ class Command(BaseCommand):
                 f"Exporting {valid_count} selected top-level jobs and their descendants"
             )
 
+        since = None
+        if options.get("since") is not None:
+            try:
+                since = ProjectExport.objects.get(id=options["since"], project=project)
+            except ProjectExport.DoesNotExist:
+                self.stderr.write(
+                    self.style.ERROR(f"No export {options['since']} of this project")
+                )
+                return
+            self.stdout.write(f"Exporting jobs changed since export of {since.time}")
+
         output_path = self.get_output_path(project, options)
 
         if options["detach"]:
-            self.run_detached_export(project, output_path, options.get("jobs"))
+            self.run_detached_export(
+                project, output_path, options.get("jobs"), options.get("since")
+            )
         else:
-            self.run_export(project, output_path, job_selection)
+            self.run_export(
+                project, output_path, job_selection, since=since, workers=options.get("workers")
+            )
 
     def get_project(self, options):
         """Retrieve project based on provided options."""
@@ -149,7 +172,7 @@ class Command(BaseCommand):
 
         return Path.cwd() / filename
 
-    def run_detached_export(self, project, output_path, job_selection_str):
+    def run_detached_export(self, project, output_path, job_selection_str, since_id=None):
         """Run export in a detached subprocess."""
         # Determine the program name based on the OS
         ccp4_python_program = "ccp4-python"
@@ -170,6 +193,8 @@ class Command(BaseCommand):
         # Add job selection if specified
         if job_selection_str:
             cmd_args.extend(["-j", job_selection_str])
+        if since_id is not None:
+            cmd_args.extend(["--since", str(since_id)])
 
         # Create log file for detached process
         log_path = output_path.parent / f"{output_path.stem}_export.log"
@@ -199,7 +224,9 @@ class Command(BaseCommand):
                 self.style.ERROR(f"Failed to start detached export process: {e}")
             )
 
-    def run_export(self, project, output_path, job_selection: Set[str] = None):
+    def run_export(
+        self, project, output_path, job_selection: Set[str] = None, since=None, workers=None
+    ):
         """Run export in the current process."""
         try:
             if job_selection:
@@ -219,7 +246,7 @@ class Command(BaseCommand):
 
             # Perform the export with job selection (now passing Set[str])
             result_path = export_project_to_zip(
-                project, output_path, job_selection=job_selection
+                project, output_path, job_selection=job_selection, since=since, workers=workers
             )
 
             # Get file size for confirmation
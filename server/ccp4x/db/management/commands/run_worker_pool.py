@@ -0,0 +1,123 @@
+import logging
+import os
+import signal
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from asgiref.sync import async_to_sync
+from ccp4x.db.job_status import InvalidStatusTransition, transition_job_status
+from ccp4x.db.models import Job, JobStatusHistory
+from ccp4x.lib.utils.jobs.worker_pool import (
+    WorkerPool,
+    get_max_workers,
+    get_pool_socket_path,
+    preload_modules,
+)
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+
+def run_pooled_job(job_uuid):
+    """Run one job inside a forked pool worker, as `run_job -ju` would."""
+    from ccp4x.lib.async_run_job import run_job_async
+
+    the_job = Job.objects.get(uuid=uuid.UUID(job_uuid))
+    the_job.process_id = os.getpid()
+    the_job.save(update_fields=["process_id"])
+    with open(
+        the_job.directory / "cplusplus_stdout.txt", "w", encoding="utf-8"
+    ) as stdout_file:
+        # Redirect file descriptors
+        stdout_fd = stdout_file.fileno()
+        os.dup2(stdout_fd, 1)  # Redirect stdout
+        os.dup2(stdout_fd, 2)  # Redirect stderr
+        async_to_sync(run_job_async)(the_job.uuid)
+
+
+def release_queued_jobs(job_uuids):
+    """
+    Return jobs the pool never started to the status they were queued from.
+
+    Otherwise they would stay QUEUED with no pool left to run them. The
+    previous status is taken from the job's status history (PENDING if it is
+    not recorded).
+    """
+    for job_uuid in job_uuids:
+        previous_status = (
+            JobStatusHistory.objects.filter(job__uuid=job_uuid, to_status=Job.Status.QUEUED)
+            .order_by("-time", "-id")
+            .values_list("from_status", flat=True)
+            .first()
+        )
+        if previous_status is None:
+            previous_status = Job.Status.PENDING
+        try:
+            # QUEUED -> PENDING is not a normal transition
+            transition_job_status(job_uuid, previous_status, expected=Job.Status.QUEUED, force=True)
+        except InvalidStatusTransition as error:
+            # Deleted, or already changed by someone else
+            logger.warning("Queued job %s not released: %s", job_uuid, error)
+
+
+class Command(BaseCommand):
+    """
+    A Django management command to run the warm local worker pool.
+
+    The pool imports Django, the plugin registry and the CData modules once and
+    then forks a process for every job submitted by run_job_local, so jobs start
+    without paying interpreter start-up. At most --workers jobs run at once; the
+    rest stay QUEUED until a worker is free, or return to their previous status
+    when the pool stops.
+    """
+
+    help = "Run a pool of preloaded workers for local job execution"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-w",
+            "--workers",
+            help="Maximum number of jobs running at once (default: CCP4I2_MAX_LOCAL_JOBS or CPU count)",
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            "-s",
+            "--socket",
+            help="Unix socket to listen on (default: CCP4I2_WORKER_POOL_SOCKET or ~/.ccp4x/worker_pool.sock)",
+            type=str,
+            default=None,
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(os, "fork"):
+            raise CommandError("The worker pool is not supported on this platform")
+
+        loaded = preload_modules()
+        self.stdout.write(f"Preloaded {len(loaded)} modules")
+
+        # Forked workers must open their own database connections
+        connections.close_all()
+
+        pool = WorkerPool(
+            run_pooled_job,
+            max_workers=options["workers"] or get_max_workers(),
+            socket_path=options["socket"] or get_pool_socket_path(),
+            release_jobs=release_queued_jobs,
+        )
+
+        def stop(signum, frame):
+            pool.shutdown()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Worker pool listening on {pool.socket_path} with {pool.max_workers} workers"
+            )
+        )
+        try:
+            pool.serve_forever()
+        except RuntimeError as error:
+            raise CommandError(str(error)) from error
@@ -1,5 +1,6 @@
 import uuid
 from django.core.management.base import BaseCommand
+from ccp4x.db.job_status import InvalidStatusTransition, transition_job_status
 from ccp4x.db.models import Job, Project
 
 
@@ -67,10 +68,14 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Invalid status: {status_value}"))
             return
 
-        # Set the job status
+        # Set the job status: any transition is allowed here, but only from
+        # the status just read, so a concurrent change is not overwritten
         old_status = the_job.status
-        the_job.status = new_status
-        the_job.save()
+        try:
+            transition_job_status(the_job, new_status, expected=old_status, force=True)
+        except InvalidStatusTransition as e:
+            self.stderr.write(self.style.ERROR(str(e)))
+            return
 
         self.stdout.write(
             self.style.SUCCESS(
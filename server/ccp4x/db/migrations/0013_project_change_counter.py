@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccp4x', '0012_fix_fk_constraints_sqlite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='change_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobcharvalue',
+            name='change_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jobfloatvalue',
+            name='change_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='change_counter',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['project', 'change_version'], name='ccp4x_job_project_987761_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccp4x', '0013_project_change_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(max_length=32)),
+                ('data', models.JSONField(default=dict)),
+                ('time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='ccp4x.job')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='ccp4x.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project', 'id'], name='ccp4x_jobev_project_ff4f74_idx'), models.Index(fields=['time'], name='ccp4x_jobev_time_dc2b98_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccp4x', '0014_jobevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectexport',
+            name='change_version',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
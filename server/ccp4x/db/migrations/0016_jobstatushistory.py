@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccp4x', '0015_projectexport_change_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.IntegerField(blank=True, choices=[(0, 'Unknown'), (1, 'Pending'), (2, 'Queued'), (3, 'Running'), (4, 'Interrupted'), (5, 'Failed'), (6, 'Finished'), (7, 'Running remotely'), (8, 'File holder'), (9, 'To delete'), (10, 'Unsatisfactory')], null=True)),
+                ('to_status', models.IntegerField(choices=[(0, 'Unknown'), (1, 'Pending'), (2, 'Queued'), (3, 'Running'), (4, 'Interrupted'), (5, 'Failed'), (6, 'Finished'), (7, 'Running remotely'), (8, 'File holder'), (9, 'To delete'), (10, 'Unsatisfactory')])),
+                ('time', models.DateTimeField(default=django.utils.timezone.now)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='ccp4x.job')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'time'], name='ccp4x_jobst_job_id_d3a9ff_idx'), models.Index(fields=['to_status', 'time'], name='ccp4x_jobst_to_stat_905cd7_idx')],
+            },
+        ),
+    ]
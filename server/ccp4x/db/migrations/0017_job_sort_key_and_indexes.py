@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:59
+
+from django.db import migrations, models
+
+# Copied from models so that this migration does not change if they do
+JOB_SORT_KEY_WIDTH = 6
+
+
+def job_sort_key(number):
+    return ".".join(element.zfill(JOB_SORT_KEY_WIDTH) for element in number.split("."))
+
+
+def fill_sort_keys(apps, schema_editor):
+    Job = apps.get_model("ccp4x", "Job")
+    Project = apps.get_model("ccp4x", "Project")
+    jobs = list(Job.objects.only("id", "number"))
+    for job in jobs:
+        job.sort_key = job_sort_key(job.number)
+    Job.objects.bulk_update(jobs, ["sort_key"], batch_size=500)
+
+    # Start the top-level job counters at the highest existing job number
+    for project in Project.objects.all():
+        numbers = Job.objects.filter(project=project, parent__isnull=True).values_list(
+            "number", flat=True
+        )
+        highest = max((int(n) for n in numbers if n.isdigit()), default=0)
+        if highest != project.last_job_number:
+            project.last_job_number = highest
+            project.save(update_fields=["last_job_number"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccp4x', '0016_jobstatushistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='sort_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='file',
+            index=models.Index(fields=['job', 'job_param_name'], name='ccp4x_file_job_id_2f51ab_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fileuse',
+            index=models.Index(fields=['job', 'role'], name='ccp4x_fileu_job_id_1ea898_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['project', 'sort_key'], name='ccp4x_job_project_1991e3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['project', 'parent', 'sort_key'], name='ccp4x_job_project_b90d80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['project', 'status'], name='ccp4x_job_project_c47715_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['task_name'], name='ccp4x_job_task_na_eb1c8e_idx'),
+        ),
+    ]
@@ -3,25 +3,58 @@ from socket import gethostname
 from uuid import uuid4
 from pathlib import Path
 
+from django.db import transaction
 from django.db.models import (
     CASCADE,
     CharField,
     DateTimeField,
+    F,
     FloatField,
     ForeignKey,
+    Index,
     IntegerChoices,
     IntegerField,
+    JSONField,
     ManyToManyField,
     Model,
     OneToOneField,
+    OuterRef,
     RESTRICT,
     SET_NULL,
+    Subquery,
     TextField,
     UUIDField,
     TextChoices,
 )
+from django.db.models.functions import Cast, Coalesce, Greatest
 from django.utils import timezone
 
+# Digits per job number element in Job.sort_key
+JOB_SORT_KEY_WIDTH = 6
+
+
+def job_sort_key(number: str) -> str:
+    """Lexicographically sortable form of a job number: "1.12" -> "000001.000012"."""
+    return ".".join(element.zfill(JOB_SORT_KEY_WIDTH) for element in number.split("."))
+
+
+class ChangeVersionedMixin:
+    """
+    Save rows together with their change_version.
+
+    The pre_save signal in signals.py sets change_version from the project's
+    change counter; the counter and the row are written in one transaction,
+    so the project row's lock orders concurrent changes and a poller never
+    sees a counter value whose rows are not committed yet.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"change_version"}
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
 
 class Project(Model):
     uuid = UUIDField(default=uuid4, unique=True)
@@ -38,10 +71,61 @@ class Project(Model):
     )
     i1_project_name = TextField(blank=True)
     i1_project_directory = TextField(blank=True)
+    # Advanced whenever a job or job value of the project changes; rows carry
+    # the value at their last change in change_version (see signals.py)
+    change_counter = IntegerField(default=0)
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def next_change_version(cls, project_id) -> int:
+        """
+        Advance the project's change counter and return its new value.
+
+        As in next_job_number, the counter is advanced and read back in one
+        transaction, so concurrent callers get different versions.
+        """
+        with transaction.atomic(savepoint=False):
+            cls.objects.filter(pk=project_id).update(change_counter=F("change_counter") + 1)
+            return (
+                cls.objects.filter(pk=project_id)
+                .values_list("change_counter", flat=True)
+                .first()
+                or 0
+            )
+
+    @classmethod
+    def next_job_number(cls, project_id) -> int:
+        """
+        Advance the project's top-level job counter and return the new job number.
+
+        The counter is advanced and read back in one transaction, which holds
+        the project row's lock from the UPDATE on, so concurrent callers get
+        different numbers. The counter never falls behind the highest existing
+        top-level job (jobs imported or created with explicit numbers do not
+        advance it).
+        """
+        highest = (
+            Job.objects.filter(project_id=OuterRef("pk"), parent__isnull=True)
+            .order_by("-sort_key")
+            .values("number")[:1]
+        )
+        with transaction.atomic():
+            cls.objects.filter(pk=project_id).update(
+                last_job_number=Greatest(
+                    F("last_job_number"),
+                    Coalesce(Cast(Subquery(highest), IntegerField()), 0),
+                )
+                + 1
+            )
+            return (
+                cls.objects.filter(pk=project_id)
+                .values_list("last_job_number", flat=True)
+                .first()
+                or 0
+            )
+
 
 class ProjectGroup(Model):
     class GroupType(TextChoices):
@@ -96,6 +180,8 @@ class ProjectTag(Model):
 class ProjectExport(Model):
     project = ForeignKey(Project, CASCADE, related_name="exports")
     time = DateTimeField(default=timezone.now)
+    # Project.change_counter when the export started (for incremental exports)
+    change_version = IntegerField(blank=True, null=True)
 
     @property
     def file_exists(self):
@@ -123,7 +209,7 @@ class ProjectImport(Model):
         return f"{self.project} at {self.time}"
 
 
-class Job(Model):
+class Job(ChangeVersionedMixin, Model):
     class Status(IntegerChoices):
         UNKNOWN = 0, "Unknown"
         PENDING = 1, "Pending"
@@ -147,6 +233,9 @@ class Job(Model):
     project = ForeignKey(Project, CASCADE, related_name="jobs")
     parent = ForeignKey("self", CASCADE, blank=True, null=True, related_name="children")
     number = CharField(max_length=50)  # 1 or 1.1 etc
+    # job_sort_key(number), kept in step by save(): ordering by it lists jobs
+    # in number order, each followed by its sub-jobs
+    sort_key = CharField(max_length=255, editable=False, default="")
     title = CharField(max_length=255)
     status = IntegerField(choices=Status.choices, default=Status.UNKNOWN)
     evaluation = IntegerField(choices=Evaluation.choices, default=Evaluation.UNKNOWN)
@@ -155,13 +244,36 @@ class Job(Model):
     finish_time = DateTimeField(blank=True, null=True)
     task_name = CharField(max_length=100)
     process_id = IntegerField(blank=True, null=True)
+    change_version = IntegerField(default=0)
 
     class Meta:
         unique_together = ["project", "number"]
+        indexes = [
+            Index(fields=["project", "change_version"]),
+            Index(fields=["project", "sort_key"]),
+            Index(fields=["project", "parent", "sort_key"]),
+            Index(fields=["project", "status"]),
+            Index(fields=["task_name"]),
+        ]
 
     def __str__(self):
         return f"{self.number} {self.title}"
 
+    def save(self, *args, **kwargs):
+        self.sort_key = job_sort_key(self.number)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "number" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"sort_key"}
+        super().save(*args, **kwargs)
+
+    def next_child_number(self) -> str:
+        """Number for a new sub-job, after the highest-numbered existing one."""
+        last = (
+            self.children.order_by("-sort_key").values_list("number", flat=True).first()
+        )
+        index = int(last.rsplit(".", 1)[-1]) + 1 if last else 1
+        return f"{self.number}.{index}"
+
     @property
     def rel_path(self) -> str:
         path_elements = ["CCP4_JOBS"] + [
@@ -176,6 +288,22 @@ class Job(Model):
         return jobs_dir.joinpath(*path_elements)
 
 
+class JobStatusHistory(Model):
+    # Append-only record of job status changes (see db/job_status.py).
+    # from_status is null when a transition was applied without knowing the
+    # exact previous status
+    job = ForeignKey(Job, CASCADE, related_name="status_history")
+    from_status = IntegerField(choices=Job.Status.choices, blank=True, null=True)
+    to_status = IntegerField(choices=Job.Status.choices)
+    time = DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [Index(fields=["job", "time"]), Index(fields=["to_status", "time"])]
+
+    def __str__(self):
+        return f"{self.job_id} {self.from_status} -> {self.to_status} at {self.time}"
+
+
 class ServerJob(Model):
     job = OneToOneField(Job, CASCADE, primary_key=True)
     server_process_id = IntegerField(blank=True, null=True)
@@ -200,12 +328,13 @@ class JobValueKey(Model):
         return self.name
 
 
-class JobFloatValue(Model):
+class JobFloatValue(ChangeVersionedMixin, Model):
     # If a job is deleted, all its float values should be deleted
     job = ForeignKey(Job, CASCADE, related_name="float_values")
     # Existence of a JobFloatValue should preclude deletion of the corresponding JobValueKey
     key = ForeignKey(JobValueKey, RESTRICT, related_name="+")
     value = FloatField()
+    change_version = IntegerField(default=0)
 
     class Meta:
         unique_together = ["job", "key"]
@@ -214,12 +343,13 @@ class JobFloatValue(Model):
         return f"{self.job} {self.key} = {self.value}"
 
 
-class JobCharValue(Model):
+class JobCharValue(ChangeVersionedMixin, Model):
     # If a job is deleted, all its char values should be deleted
     job = ForeignKey(Job, CASCADE, related_name="char_values")
     # Existence of a JobFloatValue should preclude deletion of the corresponding JobValueKey
     key = ForeignKey(JobValueKey, RESTRICT, related_name="+")
     value = CharField(max_length=255)
+    change_version = IntegerField(default=0)
 
     class Meta:
         unique_together = ["job", "key"]
@@ -251,6 +381,9 @@ class File(Model):
     job = ForeignKey(Job, CASCADE, blank=True, null=True, related_name="files")
     job_param_name = CharField(max_length=32, blank=True)
 
+    class Meta:
+        indexes = [Index(fields=["job", "job_param_name"])]
+
     def __str__(self):
         return self.name
 
@@ -303,6 +436,7 @@ class FileUse(Model):
 
     class Meta:
         unique_together = ["file", "job", "role", "job_param_name"]
+        indexes = [Index(fields=["job", "role"])]
 
     def __str__(self):
         return self.job_param_name
@@ -315,3 +449,19 @@ class XData(Model):
 
     def __str__(self):
         return self.id
+
+
+class JobEvent(Model):
+    # Published job events of a project (see lib/job_events.py); the id is the
+    # event id that stream clients resume from
+    project = ForeignKey(Project, CASCADE, related_name="events")
+    job = ForeignKey(Job, SET_NULL, blank=True, null=True, related_name="+")
+    type = CharField(max_length=32)
+    data = JSONField(default=dict)
+    time = DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [Index(fields=["project", "id"]), Index(fields=["time"])]
+
+    def __str__(self):
+        return f"{self.id} {self.type}"
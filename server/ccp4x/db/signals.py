@@ -1,20 +1,117 @@
-from django.db.models.signals import pre_save
+import logging
+
+from django.db.models.signals import post_init, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Job
+from ..lib.job_events import publish_on_commit
+from .models import Job, JobCharValue, JobFloatValue, JobStatusHistory, Project
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+
+@receiver(post_init, sender=Job)
+def remember_loaded_status(sender, instance, **kwargs):
+    # Compared on save instead of reading the row again (read from __dict__
+    # so that a deferred status field is not loaded)
+    instance._loaded_status = instance.__dict__.get("status")
 
 
 @receiver(pre_save, sender=Job)
-def job_status_change_handler(sender, instance, **kwargs):
-    if not instance.pk:
+def job_status_change_handler(sender, instance, raw=False, **kwargs):
+    if not instance.pk or raw:
         # New Job, not an update
         return
-    try:
-        old_instance = Job.objects.get(pk=instance.pk)
-    except Job.DoesNotExist:
+    previous_status = getattr(instance, "_loaded_status", None)
+    if previous_status is None or previous_status == instance.status:
         return
-    if old_instance.status != instance.status:
-        # Status has changed
-        print(
-            f"Job {instance.pk} status changed from {old_instance.status} to {instance.status}"
+    # Status has changed
+    logger.debug(
+        "Job %s status changed from %s to %s", instance.pk, previous_status, instance.status
+    )
+    instance._status_change = (previous_status, instance.status)
+    publish_on_commit(
+        instance.project_id,
+        "job_status",
+        {
+            "job": str(instance.uuid),
+            "number": instance.number,
+            "status": instance.status,
+            "status_label": dict(Job.Status.choices).get(instance.status, ""),
+            "previous_status": previous_status,
+        },
+        job_id=instance.pk,
+    )
+
+
+@receiver(post_save, sender=Job)
+def record_status_change(sender, instance, created=False, raw=False, **kwargs):
+    """Append saved status changes to the job's status history."""
+    change = instance.__dict__.pop("_status_change", None)
+    instance._loaded_status = instance.__dict__.get("status")
+    if change is not None and not raw:
+        JobStatusHistory.objects.create(job=instance, from_status=change[0], to_status=change[1])
+
+
+@receiver(post_save, sender=Job)
+def job_created_handler(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        publish_on_commit(
+            instance.project_id,
+            "job_created",
+            {
+                "job": str(instance.uuid),
+                "number": instance.number,
+                "task_name": instance.task_name,
+                "status": instance.status,
+            },
+            job_id=instance.pk,
         )
-        # Place your custom logic here
+
+
+def _project_id_of(instance):
+    if isinstance(instance, Job):
+        return instance.project_id
+    job = instance._state.fields_cache.get("job")
+    if job is not None:
+        return job.project_id
+    return Job.objects.filter(pk=instance.job_id).values_list("project_id", flat=True).first()
+
+
+@receiver(pre_save, sender=Job)
+@receiver(pre_save, sender=JobFloatValue)
+@receiver(pre_save, sender=JobCharValue)
+def stamp_change_version(sender, instance, raw=False, **kwargs):
+    """
+    Record a change in the project's change counter.
+
+    change_version is written by the same INSERT or UPDATE as the change
+    (ChangeVersionedMixin adds it to update_fields and makes the counter and
+    the row one transaction).
+    """
+    if raw:
+        return
+    project_id = _project_id_of(instance)
+    if project_id is None:
+        return
+    instance.change_version = Project.next_change_version(project_id)
+
+
+@receiver(pre_delete, sender=Job)
+def count_deletion(sender, instance, origin=None, **kwargs):
+    """
+    Deletions change the project's ETag; pollers drop rows missing from `ids`.
+
+    Counted once per delete() call, not for each sub-job or job value deleted
+    with it (job values have no delete receivers, so they are deleted without
+    being loaded), nor for the jobs of a deleted project.
+    """
+    if isinstance(origin, Project):
+        return
+    if isinstance(origin, Job):
+        if origin.pk == instance.pk:
+            Project.next_change_version(instance.project_id)
+        return
+    # A queryset delete: once per project
+    counted = origin.__dict__.setdefault("_counted_projects", set()) if origin is not None else set()
+    if instance.project_id not in counted:
+        counted.add(instance.project_id)
+        Project.next_change_version(instance.project_id)
@@ -147,7 +147,7 @@ async def clone_job_async(
     logger.debug("Saved cloned parameters to XML file")
 
     # Update project access time
-    await _update_project_access(target_project, new_job.number)
+    await _update_project_access(target_project)
 
     return {
         "job_uuid": new_job.uuid,
@@ -298,7 +298,7 @@ async def _clone_plugin_with_params(
     @sync_to_async
     def _clone():
         # Get plugin class
-        task_manager = CCP4TaskManager.CTaskManager()
+        task_manager = CCP4TaskManager.TASKMANAGER()
         plugin_class = task_manager.get_plugin_class(old_job.task_name)
 
         # Instantiate plugin with new work directory
@@ -366,22 +366,20 @@ async def _save_cloned_parameters(
     await _save()
 
 
-async def _update_project_access(
-    project: models.Project,
-    last_job_number: str,
-):
+async def _update_project_access(project: models.Project):
     """
-    Update project's last access time and last job number.
+    Update project's last access time.
+
+    The last job number was advanced when the job was created (see
+    Project.next_job_number).
 
     Args:
         project: Project model instance
-        last_job_number: Last job number as string
     """
     @sync_to_async
     def _update():
         project.last_access = datetime.datetime.now(tz=timezone("UTC"))
-        project.last_job_number = int(last_job_number.split('.')[0])  # Top-level job number
-        project.save(update_fields=['last_access', 'last_job_number'])
+        project.save(update_fields=['last_access'])
 
     await _update()
 
@@ -104,7 +104,7 @@ async def create_job_async(
     logger.debug(f"Project: {project.name} ({project.uuid})")
 
     # Get task manager for plugin info
-    task_manager = CCP4TaskManager.CTaskManager()
+    task_manager = CCP4TaskManager.TASKMANAGER()
 
     # Determine title if not provided
     if title is None:
@@ -304,7 +304,7 @@ async def _create_plugin_instance(
     @sync_to_async
     def _create():
         # Get plugin class
-        task_manager = CCP4TaskManager.CTaskManager()
+        task_manager = CCP4TaskManager.TASKMANAGER()
         plugin_class = task_manager.get_plugin_class(task_name)
 
         # Instantiate plugin with work directory
@@ -16,6 +16,7 @@ from asgiref.sync import sync_to_async
 
 # Import CData utilities for legacy field name mapping
 from .cdata_utils import get_file_type_from_class
+from .utils.files.import_copy import file_checksum, import_file_copy
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
@@ -111,8 +112,12 @@ async def import_external_file_async(job, file_obj, db_handler):
     Import an external file to CCP4_IMPORTED_FILES using modern CData introspection.
 
     This function implements checksum-based deduplication for imported files:
-    - If a file with the same checksum and type already exists, reuse it
-    - Otherwise, copy the file and create new File/FileImport records
+    - A file imported before from the same path, still of the same size, is
+      checksummed first and reused without copying if its contents match
+    - Otherwise the file is copied once, computing its checksum on the way;
+      if a file with the same checksum and type already exists, the copy is
+      removed and the existing file reused
+    - Otherwise, new File/FileImport records are created for the copy
 
     Args:
         job: Django Job model instance
@@ -138,37 +143,59 @@ async def import_external_file_async(job, file_obj, db_handler):
         logger.warning(f"Source file does not exist: {source_path}")
         return
 
-    # Calculate checksum from SOURCE file (before copying)
-    # This allows us to check for duplicates without copying first
-    checksum = None
+    # Check if source file is already in CCP4_IMPORTED_FILES
+    # This happens when files are pre-processed (e.g., MTZ splitting)
+    # In this case, we can skip the copy step
+    import_dir = Path(job.project.directory) / "CCP4_IMPORTED_FILES"
     try:
-        import hashlib
-        def compute_checksum_sync(path):
-            """Synchronous checksum computation to be wrapped with sync_to_async."""
-            md5_hash = hashlib.md5()
-            with open(path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    md5_hash.update(chunk)
-            return md5_hash.hexdigest()
-        checksum = await sync_to_async(compute_checksum_sync)(source_path)
-        logger.debug(f"Calculated checksum for {source_path.name}: {checksum[:8]}...")
-    except Exception as e:
-        logger.warning(f"Could not calculate checksum for {source_path}: {e}")
+        already_imported = source_path.resolve().parent == import_dir.resolve()
+    except (OSError, ValueError) as e:
+        logger.debug(f"Path resolution failed, proceeding with copy: {e}")
+        already_imported = False
 
-    # Check if file with same checksum and type already exists
     existing_file = None
+    copied_path = None
+    if already_imported:
+        dest_path = source_path.resolve()
+        checksum = await sync_to_async(file_checksum)(dest_path)
+        logger.info(
+            f"Source file {source_path.name} already in CCP4_IMPORTED_FILES, "
+            f"skipping copy"
+        )
+    elif await _may_be_reimport(source_path, metadata['file_type'], db_handler):
+        # Checksummed before copying, so that a re-import is not copied
+        checksum = await sync_to_async(file_checksum)(source_path)
+    else:
+        checksum = None
+
+    # Check if file with same checksum and type already exists
     if checksum and hasattr(db_handler, 'find_imported_file_by_checksum'):
         existing_file = await db_handler.find_imported_file_by_checksum(
             checksum=checksum,
             file_type=metadata['file_type']
         )
 
+    if existing_file is None and not already_imported:
+        looked_up = checksum is not None
+        # One read of the source: the checksum is computed during the copy
+        copied_path, checksum = await sync_to_async(import_file_copy)(source_path, import_dir)
+        dest_path = copied_path
+        logger.info(f"Copied {source_path} to {dest_path}")
+        # The same contents may have been imported from another path
+        if not looked_up and hasattr(db_handler, 'find_imported_file_by_checksum'):
+            existing_file = await db_handler.find_imported_file_by_checksum(
+                checksum=checksum,
+                file_type=metadata['file_type']
+            )
+
     if existing_file:
-        # Reuse existing file - no copy needed!
+        # Reuse existing file (and drop the copy if one was made)
         logger.info(
             f"Deduplicating import: reusing existing file {existing_file.name} "
             f"(checksum {checksum[:8]}...) instead of copying {source_path.name}"
         )
+        if copied_path is not None:
+            await sync_to_async(copied_path.unlink)(missing_ok=True)
         file_record = existing_file
         dest_path = existing_file.path
 
@@ -179,45 +206,6 @@ async def import_external_file_async(job, file_obj, db_handler):
             param_name=metadata['name'],
         )
     else:
-        # No duplicate found - proceed with normal import
-        # Determine destination path in CCP4_IMPORTED_FILES
-        import_dir = Path(job.project.directory) / "CCP4_IMPORTED_FILES"
-
-        # Check if source file is already in CCP4_IMPORTED_FILES
-        # This happens when files are pre-processed (e.g., MTZ splitting)
-        # In this case, we can skip the copy step
-        try:
-            source_resolved = source_path.resolve()
-            import_dir_resolved = import_dir.resolve()
-            if source_resolved.parent == import_dir_resolved:
-                # Source is already in CCP4_IMPORTED_FILES - no copy needed
-                dest_path = source_resolved
-                logger.info(
-                    f"Source file {source_path.name} already in CCP4_IMPORTED_FILES, "
-                    f"skipping copy"
-                )
-            else:
-                # Source is external - need to copy
-                dest_path = import_dir / source_path.name
-
-                # Ensure unique filename
-                dest_path = await ensure_unique_path(dest_path)
-
-                # Ensure import directory exists
-                await sync_to_async(import_dir.mkdir)(parents=True, exist_ok=True)
-
-                # Copy file asynchronously
-                await async_copy_file(source_path, dest_path)
-                logger.info(f"Copied {source_path} to {dest_path}")
-        except (OSError, ValueError) as e:
-            # If path resolution fails, fall back to copying
-            logger.debug(f"Path resolution failed, proceeding with copy: {e}")
-            dest_path = import_dir / source_path.name
-            dest_path = await ensure_unique_path(dest_path)
-            await sync_to_async(import_dir.mkdir)(parents=True, exist_ok=True)
-            await async_copy_file(source_path, dest_path)
-            logger.info(f"Copied {source_path} to {dest_path}")
-
         # Register in database
         file_record = await db_handler.register_imported_file(
             job_uuid=job.uuid,
@@ -242,16 +230,32 @@ async def import_external_file_async(job, file_obj, db_handler):
     if hasattr(file_obj, 'project'):
         file_obj.project.set(str(job.project.uuid))
 
-    # Reload file with new location
-    if hasattr(file_obj, 'loadFile'):
-        await sync_to_async(file_obj.loadFile)()
-
+    # Content flags come from the file header (e.g. MTZ columns); the
+    # contents are not loaded here
     if hasattr(file_obj, 'setContentFlag'):
         await sync_to_async(file_obj.setContentFlag)()
 
     logger.info(f"Successfully imported {file_obj.objectName()}")
 
 
+async def _may_be_reimport(source_path: Path, file_type: str, db_handler) -> bool:
+    """
+    Whether source_path was imported before and that import has its size.
+
+    Only then is the source read for its checksum before copying; a new file
+    is checksummed while it is copied.
+    """
+    if not hasattr(db_handler, 'find_imported_file_by_source'):
+        return False
+    previous = await db_handler.find_imported_file_by_source(source_path, file_type)
+    if previous is None:
+        return False
+    try:
+        return previous.path.stat().st_size == source_path.stat().st_size
+    except OSError:
+        return False
+
+
 async def get_source_file_path(job, file_obj) -> Optional[Path]:
     """
     Get the source file path from a CDataFile object.
@@ -177,7 +177,7 @@ async def create_plugin_for_job(job, db_handler):
     from .utils.plugins.get_plugin import get_job_plugin
 
     # Get plugin class
-    task_manager = CCP4TaskManager.CTaskManager()
+    task_manager = CCP4TaskManager.TASKMANAGER()
     plugin_class = task_manager.get_plugin_class(job.task_name)
 
     # Create plugin instance
@@ -0,0 +1,335 @@
+"""
+Server-push stream of job events per project.
+
+Job status transitions, gleaned output files, KPI values and report-ready
+notifications are published with publish() and delivered to clients of the
+project's event stream (api/events.py, Server-Sent Events), so that open
+projects no longer need to poll the job list and reports every second.
+
+Event types (data fields):
+- job_created: job, number, task_name, status
+- job_status: job, number, status, status_label, previous_status
+- files: job, files (uuid, name, type, param_name)
+- kpis: job, values (key -> value)
+- report_ready: job, number, status
+
+Every event has an increasing integer id; a client that reconnects with
+Last-Event-ID (or ?last_event_id=) receives the events it missed first.
+
+Backends, selected by settings.CCP4I2_EVENT_BACKEND:
+- "database" (default): events are JobEvent rows, so jobs running in other
+  processes reach the server. While anyone is subscribed, one pump thread per
+  server process polls for new rows every EVENT_POLL_INTERVAL seconds and fans
+  them out to all its subscribers. Events older than EVENT_RETENTION are
+  pruned as new ones are published. Ids are allocated before commit, so an
+  event can become visible after one with a higher id: the pump reads the
+  last EVENT_LATE_WINDOW ids again on each poll and skips those it has
+  delivered. An event committed later than that, or after a client has
+  disconnected, is not replayed; clients reload the project's jobs when they
+  (re)connect rather than rely on the history alone.
+- "local": in-memory, for a single process (tests, development).
+- A dotted path to a class with the same interface (e.g. a message broker).
+"""
+
+import asyncio
+import collections
+import datetime
+import importlib
+import itertools
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Seconds between polls for new events by the database backend's pump
+EVENT_POLL_INTERVAL = 0.5
+
+# Seconds of silence after which a stream sends a keep-alive
+EVENT_KEEPALIVE_INTERVAL = 15.0
+
+# Age after which the database backend deletes events
+EVENT_RETENTION = datetime.timedelta(days=1)
+
+# Events kept per project by the local backend
+LOCAL_EVENT_HISTORY = 1000
+
+# Maximum number of events sent from the history on (re)connection
+EVENT_REPLAY_LIMIT = 1000
+
+# Ids below the newest event seen that the database backend's pump reads
+# again, for events committed after events with higher ids
+EVENT_LATE_WINDOW = 200
+
+
+class EventBus:
+    """In-process fan-out of events to the asyncio queues of subscribers."""
+
+    def __init__(self):
+        self._subscribers: Dict[Any, set] = collections.defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id, loop, queue) -> tuple:
+        token = (project_id, loop, queue)
+        with self._lock:
+            self._subscribers[project_id].add(token)
+        return token
+
+    def unsubscribe(self, token) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(token[0])
+            if subscribers is not None:
+                subscribers.discard(token)
+                if not subscribers:
+                    del self._subscribers[token[0]]
+
+    def projects(self) -> List[Any]:
+        with self._lock:
+            return list(self._subscribers)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Queue event for the subscribers of its project (from any thread)."""
+        with self._lock:
+            targets = list(self._subscribers.get(event["project"], ()))
+        for _, loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's event loop has closed
+                pass
+
+
+class LocalEventBackend:
+    """In-memory events of a single process."""
+
+    def __init__(self, history: int = LOCAL_EVENT_HISTORY):
+        self.bus = EventBus()
+        self._events = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, project_id, event_type: str, data: Dict[str, Any],
+                job_id=None) -> Dict[str, Any]:
+        with self._lock:
+            event = {
+                "id": next(self._ids),
+                "project": project_id,
+                "type": event_type,
+                "data": data,
+                "time": timezone.now().isoformat(),
+            }
+            self._events[project_id].append(event)
+        self.bus.deliver(event)
+        return event
+
+    def read(self, project_id, after_id: int, limit: int = EVENT_REPLAY_LIMIT) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [event for event in self._events.get(project_id, ()) if event["id"] > after_id][:limit]
+
+    def start(self) -> None:
+        """Nothing to do: publish() delivers directly."""
+
+
+class DatabaseEventBackend:
+    """Events stored as JobEvent rows, shared by all processes using the database."""
+
+    def __init__(self, poll_interval: float = EVENT_POLL_INTERVAL):
+        self.bus = EventBus()
+        self.poll_interval = poll_interval
+        self._pump = None
+        self._pump_lock = threading.Lock()
+
+    @staticmethod
+    def _as_event(row) -> Dict[str, Any]:
+        return {
+            "id": row.id,
+            "project": row.project_id,
+            "type": row.type,
+            "data": row.data,
+            "time": row.time.isoformat(),
+        }
+
+    def publish(self, project_id, event_type: str, data: Dict[str, Any],
+                job_id=None) -> Dict[str, Any]:
+        from ..db import models
+
+        row = models.JobEvent.objects.create(
+            project_id=project_id, job_id=job_id, type=event_type, data=data
+        )
+        if row.id % 100 == 0:
+            models.JobEvent.objects.filter(time__lt=timezone.now() - EVENT_RETENTION).delete()
+        # Subscribers (in this and other processes) are fed by the pumps
+        return self._as_event(row)
+
+    def read(self, project_id, after_id: int, limit: int = EVENT_REPLAY_LIMIT) -> List[Dict[str, Any]]:
+        from ..db import models
+
+        rows = models.JobEvent.objects.filter(project_id=project_id, id__gt=after_id).order_by("id")
+        return [self._as_event(row) for row in rows[:limit]]
+
+    def start(self) -> None:
+        """
+        Start this process's pump thread if it is not running.
+
+        Returns once the pump has its starting point, so that events read
+        from the history afterwards overlap with (rather than miss) the
+        events it delivers.
+        """
+        with self._pump_lock:
+            if self._pump is None or not self._pump.is_alive():
+                ready = threading.Event()
+                self._pump = threading.Thread(
+                    target=self._run_pump, args=(ready,), name="job-events", daemon=True
+                )
+                self._pump.start()
+                ready.wait(10)
+
+    def _poll(self, projects, last_id: int, seen: set) -> int:
+        """
+        Deliver the events of projects not delivered yet; returns the new last_id.
+
+        seen holds the ids of the trailing window that have been delivered
+        (or were there when the pump started).
+        """
+        from ..db import models
+
+        rows = models.JobEvent.objects.filter(
+            id__gt=last_id - EVENT_LATE_WINDOW, project_id__in=projects
+        ).order_by("id")[:EVENT_LATE_WINDOW + EVENT_REPLAY_LIMIT]
+        for row in rows:
+            if row.id in seen:
+                continue
+            seen.add(row.id)
+            last_id = max(last_id, row.id)
+            self.bus.deliver(self._as_event(row))
+        seen.difference_update([i for i in seen if i <= last_id - EVENT_LATE_WINDOW])
+        return last_id
+
+    def _run_pump(self, ready: threading.Event) -> None:
+        from ..db import models
+
+        try:
+            last_id = models.JobEvent.objects.order_by("-id").values_list("id", flat=True).first() or 0
+            seen = set(
+                models.JobEvent.objects.filter(id__gt=last_id - EVENT_LATE_WINDOW)
+                .values_list("id", flat=True)
+            )
+            ready.set()
+            while True:
+                projects = self.bus.projects()
+                if not projects:
+                    # Stop, unless start() was called for a new subscriber meanwhile
+                    with self._pump_lock:
+                        if not self.bus.projects():
+                            self._pump = None
+                            return
+                    continue
+                last_id = self._poll(projects, last_id, seen)
+                time.sleep(self.poll_interval)
+        except Exception as err:
+            logger.exception("Job event pump stopped: %s", err)
+        finally:
+            ready.set()
+            connection.close()
+            with self._pump_lock:
+                if self._pump is threading.current_thread():
+                    self._pump = None
+
+
+_BACKENDS = {
+    "database": DatabaseEventBackend,
+    "local": LocalEventBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process's event backend (see module docstring)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = getattr(settings, "CCP4I2_EVENT_BACKEND", "database")
+            backend_class = _BACKENDS.get(name)
+            if backend_class is None:
+                module_name, _, class_name = name.rpartition(".")
+                backend_class = getattr(importlib.import_module(module_name), class_name)
+            _backend = backend_class()
+        return _backend
+
+
+def set_backend(backend) -> None:
+    """Replace the process's event backend (None: choose from settings again)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def publish(project_id, event_type: str, data: Optional[Dict[str, Any]] = None,
+            job_id=None) -> Optional[Dict[str, Any]]:
+    """
+    Publish an event to the stream of a project.
+
+    Publishing never raises: a failure is logged and None returned, so event
+    delivery cannot break the operation that is being reported.
+
+    Args:
+        project_id: Primary key of the project
+        event_type: Event type (see module docstring)
+        data: JSON-serialisable event data
+        job_id: Primary key of the job the event is about, if any
+
+    Returns:
+        The published event
+    """
+    try:
+        return get_backend().publish(project_id, event_type, data or {}, job_id=job_id)
+    except Exception as err:
+        logger.exception("Failed to publish %s event for project %s: %s", event_type, project_id, err)
+        return None
+
+
+def publish_on_commit(project_id, event_type: str, data: Optional[Dict[str, Any]] = None,
+                      job_id=None) -> None:
+    """publish() once the current transaction (if any) has committed."""
+    transaction.on_commit(lambda: publish(project_id, event_type, data, job_id=job_id))
+
+
+async def stream(project_id, last_event_id: int = 0,
+                 keepalive: float = EVENT_KEEPALIVE_INTERVAL) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """
+    Events of a project after last_event_id, then new events as they are published.
+
+    Followed events can arrive out of id order (see the database backend);
+    each is yielded once. Yields None after keepalive seconds without an event.
+    """
+    backend = get_backend()
+    queue = asyncio.Queue()
+    # Subscribe before reading the history so that no event falls in between
+    token = backend.bus.subscribe(project_id, asyncio.get_running_loop(), queue)
+    try:
+        await sync_to_async(backend.start)()
+        replayed = set()
+        for event in await sync_to_async(backend.read)(project_id, last_event_id):
+            replayed.add(event["id"])
+            yield event
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if event["id"] in replayed:
+                # Already sent from the history
+                continue
+            yield event
+    finally:
+        backend.bus.unsubscribe(token)
@@ -22,7 +22,7 @@ def get_job_container(the_job: models.Job):
     Returns:
         CCP4Container.CContainer: The loaded job container.
     """
-    defFile = CCP4TaskManager.CTaskManager().locate_def_xml(
+    defFile = CCP4TaskManager.TASKMANAGER().locate_def_xml(
         task_name=the_job.task_name, version=None
     )
     # print 'CProjectDirToDb.globJobs defFile',defFile
@@ -22,6 +22,6 @@ def get_job_container(job):
 
 
 def json_for_job_container(job: models.Job):
-    plugin = get_job_plugin(job)
+    plugin = get_job_plugin(job, read_only=True)
     container = plugin.container
     return json.dumps(container, cls=CCP4i2JsonEncoder)
@@ -10,7 +10,7 @@ def detect_file_type(file_path):
 
     # Try detecting an MTZ file
     try:
-        mtz = gemmi.read_mtz_file(str(path))
+        mtz = gemmi.read_mtz_file(str(path), with_data=False)
         if mtz:  # If it successfully reads, it's an MTZ file
             return "MTZ file"
     except Exception:
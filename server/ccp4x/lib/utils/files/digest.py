@@ -240,7 +240,9 @@ def digest_file(the_file: models.File):
 
 
 def digest_param_file(the_job, object_path):
-    # Use plugin context for consistent container access (same as set_param/get_param)
+    # Use plugin context for consistent container access (same as set_param/get_param).
+    # Not the cached read-only plugin: digesting loads the file into the
+    # container object and sets its content flag
     plugin_result = get_plugin_with_context(the_job)
     if not plugin_result.success:
         return {"status": "Failed", "reason": plugin_result.error, "digest": {}}
@@ -22,15 +22,14 @@ def get_file_by_job_context(
         project_uuid = uuid.UUID(projectId)
 
     context_job_in = models.Job.objects.get(uuid=context_job_uuid)
-    project_jobs = models.Job.objects.filter(
-        parent__isnull=True, project__uuid=context_job_in.project.uuid
+    # Top-level jobs up to the context job, in number order
+    search_jobs_list = list(
+        models.Job.objects.filter(
+            project_id=context_job_in.project_id,
+            parent__isnull=True,
+            sort_key__lte=context_job_in.sort_key,
+        ).order_by("sort_key")
     )
-    search_jobs_list = [
-        project_job
-        for project_job in project_jobs
-        if int(project_job.number) <= int(context_job_in.number)
-    ]
-    search_jobs_list = sorted(search_jobs_list, key=lambda a: int(a.number))
 
     while len(search_jobs_list) > 0:
         context_job = search_jobs_list.pop()
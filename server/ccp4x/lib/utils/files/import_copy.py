@@ -0,0 +1,141 @@
+"""
+Copy a file into a project's CCP4_IMPORTED_FILES in one pass.
+
+The source is read once: the MD5 checksum recorded in FileImport is computed
+from the chunks as they are copied. Where the filesystem can share extents
+(btrfs, XFS, ...) the copy is a reflink and only the checksum reads the data;
+otherwise each chunk read is handed to copy_file_range (server-side copies on
+NFS and SMB), or written out where that is not available.
+
+The destination name is claimed with O_EXCL, so concurrent imports of files
+with the same name get different names (name.mtz, name_1.mtz, ...).
+"""
+
+import errno
+import hashlib
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Bytes read per chunk
+CHUNK_SIZE = 1 << 20
+# Names tried (name, name_1, ...) before giving up
+MAX_NAME_ATTEMPTS = 1000
+
+# Linux ioctl making the destination share the source's extents
+_FICLONE = 0x40049409
+# copy_file_range errors meaning "not between these files", not a failed copy
+_NO_COPY_RANGE = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.EBADF}
+
+
+def create_unique_file(path: Path) -> Tuple[Path, int]:
+    """
+    Create path, or the first free of stem_1.ext, stem_2.ext, ...
+
+    The name is taken atomically (O_CREAT | O_EXCL).
+
+    Returns:
+        Tuple of (created path, file descriptor open for writing)
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    for attempt in range(MAX_NAME_ATTEMPTS):
+        candidate = path if attempt == 0 else path.with_name(f"{path.stem}_{attempt}{path.suffix}")
+        try:
+            return candidate, os.open(candidate, flags, 0o666)
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Could not find unique path for {path}")
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _write_all(dst_fd: int, data: memoryview, offset: int):
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    while data:
+        data = data[os.write(dst_fd, data):]
+
+
+def copy_with_checksum(src_fd: int, dst_fd: int) -> str:
+    """Copy the contents of src_fd to the empty dst_fd; returns the MD5 hex digest."""
+    md5 = hashlib.md5()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    reflinked = _reflink(src_fd, dst_fd)
+    copy_range = not reflinked and hasattr(os, "copy_file_range")
+    offset = 0
+    with os.fdopen(src_fd, "rb", buffering=0, closefd=False) as source:
+        while True:
+            length = source.readinto(buffer)
+            if not length:
+                break
+            md5.update(view[:length])
+            if reflinked:
+                offset += length
+                continue
+            done = 0
+            while copy_range and done < length:
+                try:
+                    copied = os.copy_file_range(
+                        src_fd, dst_fd, length - done, offset + done, offset + done
+                    )
+                except OSError as err:
+                    if err.errno not in _NO_COPY_RANGE:
+                        raise
+                    copied = 0
+                if not copied:
+                    copy_range = False
+                done += copied
+            if done < length:
+                _write_all(dst_fd, view[done:length], offset + done)
+            offset += length
+    return md5.hexdigest()
+
+
+def file_checksum(path: Path) -> str:
+    """MD5 hex digest of a file, as recorded in FileImport.checksum."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as source:
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def import_file_copy(source_path: Path, import_dir: Path) -> Tuple[Path, str]:
+    """
+    Copy source_path into import_dir under a name not used there yet.
+
+    Returns:
+        Tuple of (destination path, MD5 checksum of the contents)
+    """
+    import_dir.mkdir(parents=True, exist_ok=True)
+    dest_path, dst_fd = create_unique_file(import_dir / Path(source_path).name)
+    try:
+        src_fd = os.open(source_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            checksum = copy_with_checksum(src_fd, dst_fd)
+        finally:
+            os.close(src_fd)
+    except BaseException:
+        os.close(dst_fd)
+        dest_path.unlink(missing_ok=True)
+        raise
+    os.close(dst_fd)
+    logger.debug("Copied %s to %s (md5 %s)", source_path, dest_path, checksum)
+    return dest_path, checksum
@@ -1,15 +1,12 @@
 import datetime
 import logging
-import os
 import pathlib
-import shutil
 import uuid
 import re
 
 from django.utils import timezone
 
 from core import CCP4Container
-from core.base_object.cdata_file import CDataFile
 from core import CCP4File
 from core import CCP4PluginScript
 from core.base_object.fundamental_types import CList
@@ -17,7 +14,7 @@ from core.CCP4File import CI2XmlDataFile as CI2XmlDataFile
 
 from ccp4x.db import models
 from ..parameters.save_params import save_params_for_job
-from ..containers.find_objects import find_objects
+from .import_copy import import_file_copy
 
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
@@ -48,19 +45,12 @@ def _process_input(
                     / str(input.relPath)
                     / str(input.baseName)
                 )
-            # Load file
-            input.loadFile()
-            input.setContentFlag()
-            destFilePath = (
-                pathlib.Path(theJob.project.directory)
-                / "CCP4_IMPORTED_FILES"
-                / sourceFilePath.name
+            # One read of the source: copied and checksummed together
+            destFilePath, checksum = import_file_copy(
+                sourceFilePath,
+                pathlib.Path(theJob.project.directory) / "CCP4_IMPORTED_FILES",
             )
-            while destFilePath.exists():
-                fileRoot, fileExt = os.path.splitext(destFilePath.name)
-                destFilePath = destFilePath.parent / "{}_1{}".format(fileRoot, fileExt)
             logger.debug("src %s, UniqueDestFilePath %s", sourceFilePath, destFilePath)
-            shutil.copyfile(sourceFilePath, destFilePath)
             # Now have to change the plugin to reflect the new location
 
             try:
@@ -103,15 +93,15 @@ def _process_input(
                 input.project.set(str(theJob.project.uuid))
                 input.relPath.set("CCP4_IMPORTED_FILES")
                 input.baseName.set(destFilePath.name)
-                input.loadFile()
-                input.setContentFlag(reset=True)
+                # Content flags come from the file header (e.g. MTZ columns)
+                input.setContentFlag()
 
                 createDict = {
                     "file": theFile,
                     "name": str(sourceFilePath),
                     "time": timezone.now(),
                     "last_modified": timezone.now(),
-                    "checksum": input.checksum(),
+                    "checksum": checksum,
                 }
                 # print(createDict)
                 newImportfile = models.FileImport(**createDict)
@@ -149,17 +139,7 @@ def _process_input(
 
 
 def import_files(theJob, plugin):
-    inputs = find_objects(
-        plugin.container.inputData,
-        lambda a: isinstance(
-            a,
-            (
-                CCP4File.CDataFile,
-                CDataFile,
-            ),
-        ),
-        True,
-    )
+    inputs = plugin.container.inputData.find_all_files()
     logger.debug("In import_files %s", len(inputs))
     for the_input in inputs:
         _process_input(theJob, plugin, the_input)
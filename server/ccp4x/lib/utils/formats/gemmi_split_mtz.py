@@ -4,6 +4,7 @@ import gemmi
 from typing import List
 import re
 from core import CCP4XtalData
+from core.CCP4Utils import MtzSplitSource
 from ..files.available_name import available_file_name_based_on
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
@@ -54,8 +55,8 @@ def gemmi_split_mtz(
         )
     logger.warning("Preferred destination provided: %s", preferred_dest)
     
-    mtzin = gemmi.read_mtz_file(str(input_file_path))
-    mtzin.ensure_asu()
+    source = MtzSplitSource(input_file_path)
+    mtzin = source.mtz
 
     provided_column_names = mtzin.column_labels()
     if input_column_path.startswith("/"):
@@ -73,26 +74,9 @@ def gemmi_split_mtz(
     logger.info("Output columns are %s", output_columns)
     final_dest = available_file_name_based_on(preferred_dest)
 
-    mtzout = gemmi.Mtz()
-    mtzout.spacegroup = mtzin.spacegroup
-    mtzout.cell = mtzin.cell
-    # Create a base dataset object with the same spacegroup and cell as the input file and populate with a full set of unique reflections
-    hkl_base = mtzout.add_dataset("HKL_base")
-    mtzout.add_column("H", "H")
-    mtzout.add_column("K", "H")
-    mtzout.add_column("L", "H")
-    uniques = gemmi.make_miller_array(
-        mtzout.cell, mtzout.spacegroup, mtzin.resolution_high(), mtzin.resolution_low()
-    )
-    mtzout.set_data(uniques)
-
-    dataset = hkl_base
+    dataset = None
     if len(mtzin.datasets) > 1:
         dataset = output_columns[-1].dataset
-        ds = mtzout.add_dataset(dataset.project_name)
-        ds.crystal_name = dataset.crystal_name
-        ds.dataset_name = dataset.dataset_name
-        ds.wavelength = dataset.wavelength
 
     output_column_labels = []
     logger.warning("Type signature: %s", type_signature)
@@ -117,13 +101,12 @@ def gemmi_split_mtz(
         ]
     )
     logger.warning("Output column labels: %s", str(output_column_labels))
-    for i, column in enumerate(output_columns):
-        new_column = mtzout.copy_column(-1, column)
-        new_column.label = output_column_labels[i]
-        new_column.dataset_id = dataset.id
-
-    mtzout.history = [f"MTZ file created from {input_file_path.name} using gemmi."]
-    mtzout.write_to_file(str(final_dest))
+    source.write_columns(
+        final_dest,
+        list(zip(output_columns, output_column_labels)),
+        dataset=dataset,
+        history=[f"MTZ file created from {input_file_path.name} using gemmi."],
+    )
 
     return final_dest
 
@@ -1,4 +1,7 @@
+import json
+import math
 import pathlib
+import struct
 import pandas as pd
 import numpy
 import gemmi
@@ -76,3 +79,141 @@ def analyze_mtz(file_path, with_reflections: bool = False):
 
 def mtz_as_dict(file_path, with_reflections: bool = False):
     return analyze_mtz(str(pathlib.Path(file_path)), with_reflections)
+
+
+# Largest selection served as JSON; bigger selections must use the binary format
+JSON_REFLECTION_LIMIT = 20000
+
+# Binary columnar reflection format:
+#   b"MTZC"  uint32 (LE) header length  header (UTF-8 JSON)  zero padding to a
+#   multiple of 4 bytes  then each column as little-endian float32, one after
+#   the other. Column offsets in the header are relative to the end of the
+#   padding, so a browser can map every column with a Float32Array view.
+COLUMNAR_MAGIC = b"MTZC"
+COLUMNAR_CONTENT_TYPE = "application/vnd.ccp4.mtz-columns"
+
+
+def select_reflections(
+    file_path,
+    columns=None,
+    d_min: float = None,
+    d_max: float = None,
+    stride: int = 1,
+):
+    """
+    Select reflection columns of an MTZ file without leaving NumPy.
+
+    Args:
+        file_path: MTZ file
+        columns: Column labels to return (default: all, including H, K, L)
+        d_min: Exclude reflections with d-spacing below this (high resolution limit)
+        d_max: Exclude reflections with d-spacing above this (low resolution limit)
+        stride: Keep every stride-th reflection of the selection
+
+    Returns:
+        (info, data): info is a dict with the selected labels, their MTZ
+        column types, the number of reflections in the file and the
+        selection parameters; data is a float32 array of shape
+        (len(labels), n_selected)
+
+    Raises:
+        ValueError: For an unknown column label or a stride below 1
+    """
+    stride = int(stride)
+    if stride < 1:
+        raise ValueError("stride must be at least 1")
+    mtz = gemmi.read_mtz_file(str(file_path))
+    labels = mtz.column_labels()
+    if columns:
+        unknown = [label for label in columns if label not in labels]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        indices = [labels.index(label) for label in columns]
+    else:
+        indices = list(range(len(labels)))
+
+    # mtz.array is a (reflections, columns) float32 view of gemmi's buffer;
+    # only the selected rows and columns are copied
+    rows = numpy.arange(mtz.nreflections)
+    if d_min is not None or d_max is not None:
+        d_spacing = mtz.make_d_array()
+        keep = numpy.ones(len(d_spacing), dtype=bool)
+        if d_min is not None:
+            keep &= d_spacing >= d_min
+        if d_max is not None:
+            keep &= d_spacing <= d_max
+        rows = numpy.flatnonzero(keep)
+    rows = rows[::stride]
+    data = mtz.array[numpy.ix_(rows, indices)].T
+
+    info = {
+        "labels": [labels[index] for index in indices],
+        "types": [mtz.columns[index].type for index in indices],
+        "total_reflections": mtz.nreflections,
+        "nreflections": data.shape[1],
+        "d_min": d_min,
+        "d_max": d_max,
+        "stride": stride,
+        "resolution_low": mtz.resolution_low(),
+        "resolution_high": mtz.resolution_high(),
+    }
+    return info, numpy.ascontiguousarray(data, dtype="<f4")
+
+
+def encode_reflection_columns(info: dict, data) -> bytes:
+    """Pack select_reflections() output in the binary columnar format."""
+    column_bytes = data.shape[1] * 4
+    header = dict(info)
+    header["columns"] = [
+        {"label": label, "type": col_type, "offset": index * column_bytes, "length": data.shape[1]}
+        for index, (label, col_type) in enumerate(zip(info["labels"], info["types"]))
+    ]
+    header_bytes = json.dumps(header).encode("utf-8")
+    padding = -(len(COLUMNAR_MAGIC) + 4 + len(header_bytes)) % 4
+    return b"".join(
+        [
+            COLUMNAR_MAGIC,
+            struct.pack("<I", len(header_bytes)),
+            header_bytes,
+            b"\0" * padding,
+            data.tobytes(),
+        ]
+    )
+
+
+def decode_reflection_columns(payload: bytes):
+    """
+    Unpack the binary columnar format.
+
+    Returns:
+        (header, columns): columns maps each label to a float32 array
+    """
+    if payload[:4] != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar reflection payload")
+    (header_length,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8 : 8 + header_length])
+    start = 8 + header_length
+    start += -start % 4
+    columns = {
+        column["label"]: numpy.frombuffer(
+            payload, dtype="<f4", count=column["length"], offset=start + column["offset"]
+        )
+        for column in header["columns"]
+    }
+    return header, columns
+
+
+def reflection_columns_as_dict(info: dict, data) -> dict:
+    """
+    JSON-friendly form of select_reflections() output, for small selections.
+
+    Missing values (NaN in the MTZ) become None, as JSON has no NaN.
+    """
+    result = dict(info)
+    columns = data.tolist()
+    if not numpy.isfinite(data).all():
+        columns = [
+            [value if math.isfinite(value) else None for value in values] for values in columns
+        ]
+    result["columns"] = dict(zip(info["labels"], columns))
+    return result
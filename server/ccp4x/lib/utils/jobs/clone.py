@@ -43,26 +43,6 @@ def clone_job(jobId: str = None) -> Result[models.Job]:
         the_project = old_job.project
         task_name = old_job.task_name
 
-        # Calculate next job number
-        try:
-            last_job_number = max(
-                int(job.number)
-                for job in models.Job.objects.filter(project=the_project).filter(
-                    parent__isnull=True
-                )
-            )
-        except ValueError:
-            last_job_number = 0
-
-        next_job_number = str(last_job_number + 1)
-        new_job_dir = Path(the_project.directory) / "CCP4_JOBS" / f"job_{next_job_number}"
-
-        # Create plugin instance
-        task_manager = CCP4TaskManager.CTaskManager()
-        plugin_class = task_manager.get_plugin_class(task_name)
-        new_job_dir.mkdir(exist_ok=True, parents=True)
-        the_job_plugin: CContainer = plugin_class(workDirectory=str(new_job_dir))
-
         # Load cloned parameters using ParamsXmlHandler
         # This properly overlays parameters from input_params.xml onto the .def.xml defaults
         params_file = old_job.directory / "input_params.xml"
@@ -73,6 +53,16 @@ def clone_job(jobId: str = None) -> Result[models.Job]:
                 details={"params_file": str(params_file), "source_job_id": str(jobId)}
             )
 
+        # Numbers are not reused, so only take one once the clone can be made
+        next_job_number = str(models.Project.next_job_number(the_project.pk))
+        new_job_dir = Path(the_project.directory) / "CCP4_JOBS" / f"job_{next_job_number}"
+
+        # Create plugin instance
+        task_manager = CCP4TaskManager.TASKMANAGER()
+        plugin_class = task_manager.get_plugin_class(task_name)
+        new_job_dir.mkdir(exist_ok=True, parents=True)
+        the_job_plugin: CContainer = plugin_class(workDirectory=str(new_job_dir))
+
         # Use the plugin's loadDataFromXml which uses ParamsXmlHandler for proper overlay
         error = the_job_plugin.loadDataFromXml(str(params_file))
         if error and hasattr(error, 'hasError') and error.hasError():
@@ -102,8 +92,7 @@ def clone_job(jobId: str = None) -> Result[models.Job]:
 
         # Update project metadata
         the_project.last_access = datetime.datetime.now(tz=timezone("UTC"))
-        the_project.last_job_number = new_job.number
-        the_project.save()
+        the_project.save(update_fields=["last_access"])
 
         logger.info(
             "Cloned job %s to new job %s in project %s",
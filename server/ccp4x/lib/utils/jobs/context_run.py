@@ -2,7 +2,8 @@
 Context-Dependent Job Execution Module
 
 Provides environment-aware job execution that adapts to deployment context:
-- Local Mode: Executes jobs via subprocess (laptop/development)
+- Local Mode: Hands jobs to the warm worker pool if one is running, otherwise
+  executes them via subprocess (laptop/development)
 - Azure Mode: Queues jobs via Azure Service Bus (container apps)
 
 The execution mode is determined automatically from environment variables,
@@ -13,6 +14,7 @@ Environment Variables:
     SERVICE_BUS_CONNECTION_STRING: Azure connection (implies azure mode)
     SERVICE_BUS_QUEUE_NAME: Azure queue name (default: 'job-queue')
     CCP4: Path to CCP4 installation (required for local mode)
+    CCP4I2_WORKER_POOL_SOCKET: Socket of the local worker pool (see worker_pool.py)
 
 Example Usage:
     from ccp4x.lib.context_dependent_run import run_job_context_aware
@@ -196,12 +198,80 @@ def run_job_azure(job):
         }
 
 
+def run_job_worker_pool(job):
+    """
+    Hand job to the local worker pool, if one is running.
+
+    The pool (``manage.py run_worker_pool``) keeps Django, the plugin registry and
+    the CData modules imported and forks each job from that warm interpreter, capping
+    how many jobs run at once. The job is marked QUEUED before submission; the
+    worker marks it RUNNING once a slot is free.
+
+    Args:
+        job: Job model instance
+
+    Returns:
+        dict: Result dictionary as for run_job_local, or None if no pool is
+        listening (the caller should fall back to a subprocess)
+    """
+    from ccp4x.db import models
+    from ccp4x.db.job_status import InvalidStatusTransition, transition_job_status
+    from .worker_pool import get_pool_socket_path, submit_job
+
+    socket_path = get_pool_socket_path()
+    if not socket_path.exists():
+        return None
+
+    # Mark QUEUED first so the worker's RUNNING update cannot be overwritten
+    previous_status = job.status
+    try:
+        transition_job_status(job, models.Job.Status.QUEUED, expected=previous_status)
+    except InvalidStatusTransition as error:
+        logger.warning("Job %s (%s) not submitted to worker pool: %s", job.id, job.uuid, error)
+        return {
+            "success": False,
+            "error": str(error),
+            "status": 409,
+        }
+
+    try:
+        reply = submit_job(job.uuid, socket_path=socket_path)
+    except (OSError, ValueError) as error:
+        logger.warning("Worker pool at %s unavailable: %s", socket_path, error)
+        reply = None
+
+    if not reply or not reply.get("ok"):
+        # Back to where it was (QUEUED -> PENDING is not a normal transition)
+        try:
+            transition_job_status(
+                job, previous_status, expected=models.Job.Status.QUEUED, force=True
+            )
+        except InvalidStatusTransition as error:
+            logger.warning("Status of job %s not restored: %s", job.uuid, error)
+        return None
+
+    job.refresh_from_db(fields=["status"])
+    logger.info(
+        "Submitted job %s (%s) to worker pool: %s (position %s)",
+        job.id,
+        job.uuid,
+        reply.get("state"),
+        reply.get("position"),
+    )
+    return {
+        "success": True,
+        "data": job,
+        "status": 200,
+    }
+
+
 def run_job_local(job):
     """
-    Execute job via local subprocess.
+    Execute job via the local worker pool or a local subprocess.
 
-    Starts the job in a detached subprocess using the project's virtual environment
-    Python interpreter. This ensures all Django dependencies are available.
+    Jobs go to the warm worker pool when one is running (see run_job_worker_pool).
+    Otherwise the job starts in a detached subprocess using the project's virtual
+    environment Python interpreter. This ensures all Django dependencies are available.
 
     Args:
         job: Job model instance with attributes:
@@ -222,6 +292,25 @@ def run_job_local(job):
     Raises:
         No exceptions - all errors returned in result dict
     """
+    from ccp4x.db import models
+    from ccp4x.db.job_status import InvalidStatusTransition, check_transition
+
+    # Checked once so that both backends accept the same jobs: one that cannot
+    # be queued has already been submitted or run
+    try:
+        check_transition(job.status, models.Job.Status.QUEUED, job=job)
+    except InvalidStatusTransition as error:
+        logger.warning("Job %s (%s) not started: %s", job.id, job.uuid, error)
+        return {
+            "success": False,
+            "error": str(error),
+            "status": 409,
+        }
+
+    pooled = run_job_worker_pool(job)
+    if pooled is not None:
+        return pooled
+
     logger.info("Running job %s in LOCAL mode via subprocess", job.id)
 
     try:
@@ -285,7 +374,7 @@ def run_job_context_aware(job, force_local=False):
 
     Automatically detects execution context and routes to appropriate handler:
     - Azure Mode: Queues job via Azure Service Bus
-    - Local Mode: Executes job via subprocess
+    - Local Mode: Executes job via the worker pool or a subprocess
 
     This is the main entry point for context-aware job execution.
 
@@ -33,7 +33,9 @@ def create_job(
         projectName (str, optional): The name of the project. Defaults to None.
         parentJobId (str, optional): The UUID of the parent job. Defaults to None.
         taskName (str, optional): The name of the task to be executed. Defaults to None.
-        jobNumber (str, optional): The job number. Defaults to None.
+        jobNumber (str, optional): The job number. Defaults to None: the next
+            sub-job number of the parent job (e.g. "4.2"), or without a parent
+            the next top-level number of the project.
         jobId (str, optional): The UUID of the job. Defaults to None.
         saveParams (bool, optional): Whether to save parameters for the job. Defaults to True.
         title (str, optional): The title of the job. Defaults to None.
@@ -56,23 +58,12 @@ def create_job(
         parent_job = None
         the_project = models.Project.objects.get(uuid=projectId)
 
-    if jobNumber is None:
-        project_jobs = models.Job.objects.filter(project__uuid=projectId).filter(
-            parent__isnull=True
-        )
-        if len(project_jobs) == 0:
-            last_job_number = 0
-        else:
-            last_job_number = sorted([int(a.number) for a in project_jobs])[-1]
-        last_job_number = str(last_job_number)
+    if jobNumber is not None:
+        next_job_number = jobNumber
+    elif parent_job is not None:
+        next_job_number = parent_job.next_child_number()
     else:
-        job_number_elements = jobNumber.split(".")
-        job_number_elements[-1] = str(int(job_number_elements[-1]) - 1)
-        last_job_number = ".".join(job_number_elements)
-
-    job_number_elements = last_job_number.split(".")
-    job_number_elements[-1] = str(int(job_number_elements[-1]) + 1)
-    next_job_number = ".".join(job_number_elements)
+        next_job_number = str(models.Project.next_job_number(the_project.pk))
 
     new_job_dir = Path(the_project.directory).joinpath(
         *(["CCP4_JOBS"] + [f"job_{j_no}" for j_no in next_job_number.split(".")])
@@ -85,7 +76,7 @@ def create_job(
     else:
         new_job_id = jobId
 
-    task_manager = CCP4TaskManager.CTaskManager()
+    task_manager = CCP4TaskManager.TASKMANAGER()
     plugin_class = task_manager.get_plugin_class(taskName)
     if saveParams:
         new_job_dir.mkdir(exist_ok=True, parents=True)
@@ -8,7 +8,6 @@ from core import CCP4Container
 
 from ccp4x.db import models
 from ..containers.get_container import get_job_container
-from ..containers.find_objects import find_objects
 
 
 def i2run_for_job(job: models.Job):
@@ -194,14 +193,14 @@ def handle_element(item: CData) -> str:
 
 
 def _is_path_unique(candidate_path, container, full_path):
-    return (
-        candidate_path == full_path
-        or len(
-            find_objects(
-                container,
-                lambda x: x.objectPath().endswith(f".{candidate_path}"),
-                multiple=True,
-            )
-        )
-        == 1
-    )
+    if candidate_path == full_path:
+        return True
+    prefix = container.objectPath()
+    suffix = f".{candidate_path}"
+    matches = 0
+    for path in container.path_index().paths():
+        if (f"{prefix}.{path}" if prefix else path).endswith(suffix):
+            matches += 1
+            if matches > 1:
+                return False
+    return matches == 1
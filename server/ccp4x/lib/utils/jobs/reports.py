@@ -2,17 +2,158 @@
 Job report generation utilities.
 
 Provides access to various job reports: parameters, execution results, diagnostics.
+
+Reports of finished jobs are cached in report_xml.xml in the job directory.
+Reports of running jobs are kept in memory by RunningReportCache, which is
+keyed on the program XML's size and mtime, the job status, the report
+version and the project's change counter. It regenerates a report at most
+every RUNNING_REPORT_MIN_INTERVAL seconds and lets concurrent requests for
+the same job share one rendering.
 """
 
+import collections
 import logging
+import os
+import threading
+import time
 from pathlib import Path
 from xml.etree import ElementTree as ET
 from ccp4x.db import models
 from ccp4x.lib.response import Result
-from ..reporting.i2_report import make_old_report
+from ccp4x.lib import job_events
+from ..reporting.i2_report import XML_FILE_SEARCH_ORDER, make_old_report
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
+# Minimum seconds between regenerations of a running job's report
+RUNNING_REPORT_MIN_INTERVAL = 3.0
+
+# Number of running jobs whose latest report is kept in memory
+RUNNING_REPORT_CACHE_SIZE = 128
+
+
+class RunningReportCache:
+    """
+    In-memory cache of the latest report of each running job.
+
+    A cached report is returned while its signature is unchanged. When the
+    signature changes the report is regenerated, but no sooner than
+    min_interval seconds after the previous rendering, and only by one
+    request at a time: the others are served the previous report meanwhile.
+    Requests for a job with no report yet wait for the rendering in flight.
+
+    The cache is per process; each server worker keeps its own.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = RUNNING_REPORT_MIN_INTERVAL,
+        max_entries: int = RUNNING_REPORT_CACHE_SIZE,
+    ):
+        self.min_interval = min_interval
+        self.max_entries = max_entries
+        # key -> (signature, monotonic time rendered, report bytes)
+        self._entries = collections.OrderedDict()
+        # key -> Event set when the rendering in flight finishes
+        self._rendering = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, signature, render, force: bool = False) -> bytes:
+        """
+        Return the report for key, rendering it with render() if needed.
+
+        Args:
+            key: Cache key (the job UUID)
+            signature: Hashable state the report depends on
+            render: Callable returning the report bytes
+            force: Render even if the cached report is current
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not force:
+                    self._entries.move_to_end(key)
+                    cached_signature, rendered_at, data = entry
+                    if cached_signature == signature:
+                        return data
+                    if key in self._rendering or time.monotonic() - rendered_at < self.min_interval:
+                        # Serve the previous report while another request
+                        # renders the new one, or until the interval has passed
+                        return data
+                in_flight = self._rendering.get(key)
+                if in_flight is None:
+                    in_flight = threading.Event()
+                    self._rendering[key] = in_flight
+                    break
+            # Share the rendering in flight rather than starting another
+            in_flight.wait()
+            force = False
+
+        try:
+            data = render()
+            with self._lock:
+                self._entries[key] = (signature, time.monotonic(), data)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return data
+        finally:
+            with self._lock:
+                del self._rendering[key]
+            in_flight.set()
+
+    def discard(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+running_reports = RunningReportCache()
+
+
+def _running_report_signature(job: models.Job) -> tuple:
+    """State a running job's report depends on, cheap to compute."""
+    from core.CCP4TaskManager import TASKMANAGER
+
+    task_manager = TASKMANAGER()
+    names = list(XML_FILE_SEARCH_ORDER)
+    watch_file = task_manager.getReportAttribute(job.task_name, "WATCHED_FILE")
+    if watch_file:
+        names.append(watch_file)
+
+    files = []
+    for name in names:
+        try:
+            stat = os.stat(job.directory / name)
+        except OSError:
+            continue
+        files.append((name, stat.st_size, stat.st_mtime_ns))
+
+    # Sub-job status changes and gleaned outputs advance the project's counter
+    change_counter = (
+        models.Project.objects.filter(pk=job.project_id)
+        .values_list("change_counter", flat=True)
+        .first()
+    )
+    return (
+        job.status,
+        tuple(files),
+        task_manager.getReportAttribute(job.task_name, "TASKVERSION"),
+        change_counter,
+    )
+
+
+def _publish_report_ready(job: models.Job) -> None:
+    """Tell the project's event stream that a new report of job is available."""
+    job_events.publish(
+        job.project_id, "report_ready",
+        {"job": str(job.uuid), "number": job.number, "status": job.status},
+        job_id=job.pk,
+    )
+
 
 def get_job_params_xml(job: models.Job) -> Result[str]:
     """
@@ -105,6 +246,7 @@ def get_job_report_xml(job: models.Job, regenerate: bool = False) -> Result[byte
             models.Job.Status.INTERRUPTED,
             models.Job.Status.FINISHED,
         ]:
+            running_reports.discard(job.uuid)
             report_xml_path = job.directory / "report_xml.xml"
 
             # Use cached report if exists and not regenerating
@@ -125,6 +267,7 @@ def get_job_report_xml(job: models.Job, regenerate: bool = False) -> Result[byte
             if not is_error_report:
                 with open(report_xml_path, "wb") as f:
                     f.write(xml_bytes)
+                _publish_report_ready(job)
             else:
                 # Delete any stale cached report so we regenerate next time
                 if report_xml_path.exists():
@@ -132,10 +275,17 @@ def get_job_report_xml(job: models.Job, regenerate: bool = False) -> Result[byte
 
             return Result.ok(xml_bytes)
 
-        # For running jobs
-        report_xml = make_old_report(job)
-        ET.indent(report_xml, space="\t", level=0)
-        return Result.ok(ET.tostring(report_xml))
+        # For running jobs: regenerate only when the job's output has changed
+        def render():
+            report_xml = make_old_report(job)
+            ET.indent(report_xml, space="\t", level=0)
+            xml_bytes = ET.tostring(report_xml)
+            _publish_report_ready(job)
+            return xml_bytes
+
+        return Result.ok(running_reports.get(
+            job.uuid, _running_report_signature(job), render, force=regenerate
+        ))
 
     except Exception as err:
         logger.exception("Failed to generate report for job %s", job.uuid, exc_info=err)
@@ -44,7 +44,7 @@ def validate_job(job: models.Job) -> Result[ET.Element]:
         ...         print(f"{severity}: {description}")
     """
     # Get plugin with database context
-    plugin_result = get_plugin_with_context(job)
+    plugin_result = get_plugin_with_context(job, read_only=True)
     if not plugin_result.success:
         return Result.fail(
             f"Failed to load plugin: {plugin_result.error}",
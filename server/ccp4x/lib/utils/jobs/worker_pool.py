@@ -0,0 +1,343 @@
+"""
+Warm Local Worker Pool
+
+Starting ``python manage.py run_job`` for every local job pays for Django setup
+and for importing the plugin registry, gemmi and the CData modules before any
+crystallography starts. The worker pool pays that cost once: a long-lived server
+process imports everything up front, listens on a local Unix socket and forks a
+child for each job. Forked children inherit the warm interpreter, so a job starts
+in milliseconds while still running in its own process (working directory,
+redirected stdout and module globals never leak from one job to the next).
+
+The pool caps the number of jobs running at once; further submissions wait in a
+FIFO queue and are shown as QUEUED until a slot frees up. Jobs still queued when
+the pool stops are handed to a release callback, which the management command
+uses to return them to the status they were queued from.
+
+This module does not import Django. The server is started by the
+``run_worker_pool`` management command, which supplies the job runner; the web
+process talks to it with :func:`submit_job`.
+
+Environment Variables:
+    CCP4I2_WORKER_POOL_SOCKET: Path of the pool's Unix socket
+        (default: ~/.ccp4x/worker_pool.sock)
+    CCP4I2_MAX_LOCAL_JOBS: Maximum number of jobs running at once
+        (default: number of CPUs)
+
+Example Usage:
+    # Terminal 1
+    python manage.py run_worker_pool --workers 4
+
+    # Web process
+    from ccp4x.lib.utils.jobs.worker_pool import submit_job
+
+    reply = submit_job(job.uuid)   # {"ok": True, "state": "queued", ...}
+"""
+
+import collections
+import importlib
+import json
+import logging
+import os
+import pathlib
+import selectors
+import signal
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Modules imported once by the pool server so that forked jobs start warm
+PRELOAD_MODULES = (
+    "gemmi",
+    "core.base_object.base_classes",
+    "core.CCP4XtalData",
+    "core.CCP4PluginScript",
+    "core.CCP4TaskManager",
+    "core.task_manager.plugin_registry",
+    "core.task_manager.def_xml_handler",
+    "ccp4x.db.models",
+    "ccp4x.db.async_db_handler",
+    "ccp4x.lib.async_run_job",
+    "ccp4x.lib.async_import_files",
+    "ccp4x.lib.utils.plugins.get_plugin",
+)
+
+# How long a client waits for the pool to answer before giving up
+CLIENT_TIMEOUT = 2.0
+
+
+def get_pool_socket_path():
+    """Return the Unix socket path used by the local worker pool."""
+    configured = os.getenv("CCP4I2_WORKER_POOL_SOCKET")
+    if configured:
+        return pathlib.Path(configured)
+    return pathlib.Path.home().resolve() / ".ccp4x" / "worker_pool.sock"
+
+
+def get_max_workers():
+    """Return the configured cap on concurrently running local jobs."""
+    configured = os.getenv("CCP4I2_MAX_LOCAL_JOBS")
+    if configured:
+        try:
+            return max(1, int(configured))
+        except ValueError:
+            logger.warning("Ignoring invalid CCP4I2_MAX_LOCAL_JOBS=%r", configured)
+    return os.cpu_count() or 2
+
+
+def preload_modules(module_names=PRELOAD_MODULES):
+    """
+    Import modules so that forked jobs inherit them.
+
+    Modules that fail to import are logged and skipped; the job that needs them
+    will report the error itself.
+
+    Returns:
+        list: Names of the modules that were imported
+    """
+    loaded = []
+    for module_name in module_names:
+        try:
+            importlib.import_module(module_name)
+            loaded.append(module_name)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.warning("Could not preload %s: %s", module_name, error)
+    return loaded
+
+
+def _request(message, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """Send one JSON request to the pool and return its JSON reply."""
+    path = str(socket_path or get_pool_socket_path())
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(message).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError(f"Worker pool at {path} closed the connection")
+    return json.loads(line)
+
+
+def submit_job(job_uuid, socket_path=None, timeout=CLIENT_TIMEOUT):
+    """
+    Hand a job to the running worker pool.
+
+    Args:
+        job_uuid: UUID of the job to run
+        socket_path: Pool socket (default: get_pool_socket_path())
+        timeout: Seconds to wait for the pool to answer
+
+    Returns:
+        dict: Reply with keys ok (bool), state ('queued' or 'running') and
+        position (0-based place in the queue, 0 when running)
+
+    Raises:
+        OSError: If no pool is listening on the socket
+    """
+    return _request(
+        {"action": "submit", "job_uuid": str(job_uuid)}, socket_path, timeout
+    )
+
+
+def pool_status(socket_path=None, timeout=CLIENT_TIMEOUT):
+    """
+    Return the running and queued job UUIDs of the worker pool.
+
+    Raises:
+        OSError: If no pool is listening on the socket
+    """
+    return _request({"action": "status"}, socket_path, timeout)
+
+
+class WorkerPool:
+    """
+    Preloaded server that runs each submitted job in a forked child process.
+
+    Args:
+        run_job: Callable taking a job UUID string; called in the forked child.
+            The child exits 0 if it returns and 1 if it raises.
+        max_workers: Maximum number of children running at once
+        socket_path: Unix socket to listen on
+        release_jobs: Optional callable taking the list of job UUIDs still
+            queued when the pool stops; called in the pool process
+    """
+
+    def __init__(self, run_job, max_workers=None, socket_path=None, release_jobs=None):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("The local worker pool requires os.fork()")
+        self.run_job = run_job
+        self.release_jobs = release_jobs
+        self.max_workers = max_workers or get_max_workers()
+        self.socket_path = pathlib.Path(socket_path or get_pool_socket_path())
+        self._queue = collections.deque()
+        self._running = {}  # pid -> job UUID
+        self._stopping = threading.Event()
+        self._ready = threading.Event()
+        self._listener = None
+
+    # ------------------------------------------------------------------
+    # Job bookkeeping
+    # ------------------------------------------------------------------
+
+    def submit(self, job_uuid):
+        """Queue a job and start it if a worker slot is free."""
+        job_uuid = str(job_uuid)
+        if job_uuid in self._running.values():
+            return {"ok": True, "state": "running", "position": 0}
+        if job_uuid not in self._queue:
+            self._queue.append(job_uuid)
+            logger.info("Queued job %s (%d waiting)", job_uuid, len(self._queue))
+        self._start_queued_jobs()
+        if job_uuid in self._running.values():
+            return {"ok": True, "state": "running", "position": 0}
+        return {"ok": True, "state": "queued", "position": self._queue.index(job_uuid)}
+
+    def status(self):
+        """Return the pool's capacity, running and queued jobs."""
+        return {
+            "ok": True,
+            "max_workers": self.max_workers,
+            "running": sorted(self._running.values()),
+            "queued": list(self._queue),
+        }
+
+    def _start_queued_jobs(self):
+        while self._queue and len(self._running) < self.max_workers:
+            job_uuid = self._queue.popleft()
+            pid = os.fork()
+            if pid == 0:
+                self._run_child(job_uuid)
+            self._running[pid] = job_uuid
+            logger.info("Started job %s in worker pid %d", job_uuid, pid)
+
+    def _run_child(self, job_uuid):
+        """Body of a forked worker; never returns."""
+        exit_code = 1
+        try:
+            if self._listener is not None:
+                self._listener.close()
+            # Detach from the pool's session, as a directly spawned job would be
+            os.setsid()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self.run_job(job_uuid)
+            exit_code = 0
+        except BaseException:  # pylint: disable=broad-except
+            logger.exception("Job %s failed in worker pool", job_uuid)
+        finally:
+            os._exit(exit_code)  # pylint: disable=protected-access
+
+    def _reap_children(self):
+        for pid in list(self._running):
+            try:
+                finished, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                finished, status = pid, 0
+            if finished:
+                job_uuid = self._running.pop(pid)
+                logger.info(
+                    "Job %s finished in worker pid %d (exit status %d)",
+                    job_uuid,
+                    pid,
+                    os.waitstatus_to_exitcode(status),
+                )
+
+    # ------------------------------------------------------------------
+    # Socket server
+    # ------------------------------------------------------------------
+
+    def _bind(self):
+        if self.socket_path.exists():
+            try:
+                _request({"action": "status"}, self.socket_path, timeout=0.5)
+            except OSError:
+                self.socket_path.unlink()  # Stale socket from a dead pool
+            else:
+                raise RuntimeError(f"A worker pool is already listening on {self.socket_path}")
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        listener.listen(64)
+        listener.setblocking(False)
+        return listener
+
+    def _handle_connection(self, connection):
+        with connection:
+            connection.settimeout(CLIENT_TIMEOUT)
+            try:
+                with connection.makefile("rb") as reader:
+                    message = json.loads(reader.readline() or b"{}")
+                action = message.get("action")
+                if action == "submit" and message.get("job_uuid"):
+                    reply = self.submit(message["job_uuid"])
+                elif action == "status":
+                    reply = self.status()
+                else:
+                    reply = {"ok": False, "error": f"Unknown request: {message!r}"}
+                connection.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+            except (OSError, ValueError) as error:
+                logger.warning("Dropped worker pool request: %s", error)
+
+    def serve_forever(self, poll_interval=0.2):
+        """Accept submissions and start jobs until shutdown() is called."""
+        self._listener = self._bind()
+        logger.info(
+            "Worker pool listening on %s with %d workers", self.socket_path, self.max_workers
+        )
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self._listener, selectors.EVENT_READ)
+                self._ready.set()
+                while not self._stopping.is_set():
+                    for _key, _events in selector.select(poll_interval):
+                        try:
+                            connection, _address = self._listener.accept()
+                        except BlockingIOError:
+                            continue
+                        self._handle_connection(connection)
+                    self._reap_children()
+                    self._start_queued_jobs()
+        finally:
+            self._listener.close()
+            self._listener = None
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            if self._queue:
+                self._release_queued_jobs()
+
+    def _release_queued_jobs(self):
+        queued = list(self._queue)
+        self._queue.clear()
+        logger.warning(
+            "Worker pool stopped with %d queued jobs: %s", len(queued), ", ".join(queued)
+        )
+        if self.release_jobs is None:
+            return
+        try:
+            self.release_jobs(queued)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Could not release the queued jobs %s", ", ".join(queued))
+
+    def wait_until_ready(self, timeout=None):
+        """Block until serve_forever() is accepting connections."""
+        return self._ready.wait(timeout)
+
+    def shutdown(self):
+        """Stop accepting work. Running jobs carry on in their own sessions."""
+        self._stopping.set()
+
+    def wait_for_jobs(self, timeout=None):
+        """Wait for running children to exit; returns True if none are left."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._running:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            self._reap_children()
+            time.sleep(0.05)
+        return True
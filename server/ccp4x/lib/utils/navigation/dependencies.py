@@ -1,8 +1,9 @@
-from typing import List
+from typing import List, Tuple
 import logging
 import shutil
 
 from ccp4x.db import models
+from .dependency_graph import get_dependency_graph
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 logger.setLevel(logging.WARNING)
@@ -17,50 +18,47 @@ def version_sort_key(job: models.Job) -> tuple:
 def find_dependent_jobs(
     the_job: models.Job, growing_list: List[models.Job] = None, leaf_action=None
 ) -> List[models.Job]:
+    """
+    Jobs that depend on the_job: its sub-jobs and jobs using its files, recursively.
+
+    Dependencies are read from the project's dependency graph, so the cost
+    does not grow with the depth of the dependency chain.
+
+    Args:
+        the_job: Job whose dependents are wanted
+        growing_list: List the dependents are appended to (if not in it already)
+        leaf_action: Called as leaf_action(job, growing_list) for every
+            dependent, each after the jobs depending on it, and then for
+            the_job itself (used to delete a job and its dependents)
+
+    Returns:
+        growing_list
+    """
     assert isinstance(the_job, models.Job)
     logger.debug("In find dependent jobs for %s" % the_job)
     if growing_list is None:
         growing_list: List[models.Job] = []
-    descendent_files = models.File.objects.filter(job=the_job)
-    # Do I also have to worry about FileImports in this job ? I don't think so...those should have an associated FileUse
-    descendent_file_uses = models.FileUse.objects.filter(file__in=descendent_files)
-    unsorted_descendent_jobs = list(
-        {file_use.job for file_use in descendent_file_uses if file_use.job != the_job}
-    ) + list(models.Job.objects.filter(parent=the_job))
-    # Reduce to uniques
-    unsorted_descendent_jobs = list(set(unsorted_descendent_jobs))
-    # Sort so that "leaves" will be processed first
-    descendent_jobs = sorted(
-        unsorted_descendent_jobs, key=version_sort_key, reverse=True
-    )
-    logger.debug(
-        "descendent_jobs of %s: {%s}",
-        the_job,
-        [dj.number for dj in descendent_jobs],
-    )
-    original_length = len(growing_list)
-    for descendent_job in descendent_jobs:
-        if descendent_job not in growing_list:
-            growing_list.append(descendent_job)
-            find_dependent_jobs(descendent_job, growing_list, leaf_action)
-
-    if original_length == len(growing_list):
-        logger.debug("This node added no new jobs")
-        # Here if (after performing leaf action on any relevant descendents) the list has grown
-        if leaf_action is not None:
-            leaf_action(the_job, growing_list)
-    else:
-        logger.debug("Growing list is now %s", [j.number for j in growing_list])
+    graph = get_dependency_graph(the_job.project_id)
+    descendent_ids = graph.descendants(the_job.id)
+    jobs = models.Job.objects.select_related("project").in_bulk(descendent_ids)
+    for job_id in descendent_ids:
+        if job_id in jobs and jobs[job_id] not in growing_list:
+            growing_list.append(jobs[job_id])
+    logger.debug("descendent_jobs of %s: {%s}", the_job, [j.number for j in growing_list])
+
+    if leaf_action is not None:
+        jobs[the_job.id] = the_job
+        for job_id in graph.deletion_order(the_job.id):
+            if job_id in jobs:
+                leaf_action(jobs[job_id], growing_list)
 
     return growing_list
 
 
 def delete_job_and_dir(the_job: models.Job, growing_list: List[models.Job]):
     logger.warning("Deleting job %s", the_job)
-    for char_value_of_job in the_job.char_values.all():
-        char_value_of_job.delete()
-    for float_value_of_job in the_job.float_values.all():
-        float_value_of_job.delete()
+    the_job.char_values.all().delete()
+    the_job.float_values.all().delete()
     job_file: models.File
     for job_file in the_job.files.all():
         try:
@@ -92,3 +90,21 @@ def delete_job_and_dependents(the_job: models.Job):
     logger.info("Deleted %s files", files_after - files_before)
     logger.info("Deleted %s file_uses", file_uses_after - file_uses_before)
     logger.info("Deleted %s jobs", file_imports_after - file_imports_before)
+
+
+def get_descendent_jobs(the_job: models.Job) -> List[Tuple[str, List[str]]]:
+    """
+    Sub-jobs of a pipeline job, for the descendentjobs entry of job info.
+
+    Returns a list of tuples, one per sub-job at any depth in depth-first
+    order: [(sub_job_uuid, [uuids of its own sub-jobs]), ...]
+    """
+    graph = get_dependency_graph(the_job.project_id)
+    result = []
+    stack = list(reversed(graph.children(the_job.id)))
+    while stack:
+        child_id = stack.pop()
+        grandchildren = graph.children(child_id)
+        result.append((str(graph.uuids[child_id]), [str(graph.uuids[g]) for g in grandchildren]))
+        stack.extend(reversed(grandchildren))
+    return result
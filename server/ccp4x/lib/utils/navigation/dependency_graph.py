@@ -0,0 +1,234 @@
+"""
+In-memory dependency graph of the jobs of a project.
+
+A job depends on another if it is its child (sub-job of a pipeline) or if it
+uses a file the other job produced (a FileUse of a File whose job is the
+other job). Walking these relations one job at a time costs several queries
+per job; the graph loads all jobs and file uses of a project in a constant
+number of queries and answers
+
+- descendants(job_id): jobs that depend on a job, directly or indirectly
+- ancestors(job_id): jobs a job depends on, directly or indirectly
+- deletion_order(job_id): a job's descendants and then the job, each job
+  after everything that depends on it
+- file_consumers(file_id): jobs using a file
+- children(job_id): sub-jobs of a job
+
+in O(V+E). When files are shared with other projects, those projects are
+loaded into the same graph, so dependents in them are not missed.
+
+Graphs are cached per project. Jobs and file uses are only ever added or
+deleted (not re-pointed), so a cached graph is up to date while the row
+count and maximum id of both tables in its projects are unchanged; checking
+this costs two aggregate queries and also sees writes made by job processes.
+Graphs loaded inside a transaction are not cached.
+
+Example:
+    graph = get_dependency_graph(job.project_id)
+    for job_id in graph.deletion_order(job.id):
+        ...
+"""
+
+import collections
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import connection
+from django.db.models import Count, Max, Q
+
+from ccp4x.db import models
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Number of project graphs kept in memory
+DEPENDENCY_GRAPH_CACHE_SIZE = 32
+
+
+def _number_key(number: str) -> tuple:
+    try:
+        return tuple(map(int, number.split(".")))
+    except ValueError:
+        return (number,)
+
+
+class DependencyGraph:
+    """Jobs of one or more projects and the dependencies between them."""
+
+    def __init__(self, jobs: Iterable[Tuple], file_uses: Iterable[Tuple],
+                 projects: Iterable[int] = (), signature=None):
+        """
+        Args:
+            jobs: (id, uuid, number, parent_id, project_id) of every job
+            file_uses: (file_id, producer job_id or None, consumer job_id)
+            projects: Primary keys of the projects the graph covers
+            signature: Database state the graph was loaded from
+        """
+        self.projects = frozenset(projects)
+        self.signature = signature
+        self.uuids: Dict[int, object] = {}
+        self.numbers: Dict[int, str] = {}
+        self.parents: Dict[int, Optional[int]] = {}
+        self.project_of: Dict[int, int] = {}
+        self._children: Dict[int, List[int]] = collections.defaultdict(list)
+        # Dependency edges in both directions (children and file consumers)
+        self._dependents: Dict[int, Set[int]] = collections.defaultdict(set)
+        self._dependencies: Dict[int, Set[int]] = collections.defaultdict(set)
+        self._file_consumers: Dict[int, List[int]] = collections.defaultdict(list)
+
+        for job_id, job_uuid, number, parent_id, project_id in jobs:
+            self.uuids[job_id] = job_uuid
+            self.numbers[job_id] = number
+            self.parents[job_id] = parent_id
+            self.project_of[job_id] = project_id
+        for job_id in sorted(self.parents):
+            parent_id = self.parents[job_id]
+            if parent_id is not None:
+                self._children[parent_id].append(job_id)
+                self._add_edge(parent_id, job_id)
+        for file_id, producer_id, consumer_id in file_uses:
+            if consumer_id not in self._file_consumers[file_id]:
+                self._file_consumers[file_id].append(consumer_id)
+            if producer_id is not None:
+                self._add_edge(producer_id, consumer_id)
+
+    def _add_edge(self, job_id: int, dependent_id: int) -> None:
+        if job_id != dependent_id:
+            self._dependents[job_id].add(dependent_id)
+            self._dependencies[dependent_id].add(job_id)
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self.numbers
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def _sorted(self, job_ids) -> List[int]:
+        # Latest job first, as the recursive walk did
+        return sorted(job_ids, key=lambda job_id: _number_key(self.numbers.get(job_id, "")),
+                      reverse=True)
+
+    def _walk(self, job_id: int, edges) -> Tuple[List[int], List[int]]:
+        """Pre-order and post-order of a depth-first walk from job_id (excluded from pre-order)."""
+        preorder, postorder = [], []
+        visited = {job_id}
+        stack = [(job_id, iter(self._sorted(edges.get(job_id, ()))))]
+        while stack:
+            node, neighbours = stack[-1]
+            for neighbour in neighbours:
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    preorder.append(neighbour)
+                    stack.append((neighbour, iter(self._sorted(edges.get(neighbour, ())))))
+                    break
+            else:
+                stack.pop()
+                postorder.append(node)
+        return preorder, postorder
+
+    def descendants(self, job_id: int) -> List[int]:
+        """Jobs depending on job_id, directly or indirectly, in depth-first order."""
+        return self._walk(job_id, self._dependents)[0]
+
+    def ancestors(self, job_id: int) -> List[int]:
+        """Jobs job_id depends on, directly or indirectly, in depth-first order."""
+        return self._walk(job_id, self._dependencies)[0]
+
+    def deletion_order(self, job_id: int) -> List[int]:
+        """
+        job_id and its descendants, each after every job depending on it.
+
+        The last element is job_id.
+        """
+        return self._walk(job_id, self._dependents)[1]
+
+    def children(self, job_id: int) -> List[int]:
+        """Sub-jobs of job_id in creation order."""
+        return list(self._children.get(job_id, ()))
+
+    def file_consumers(self, file_id: int) -> List[int]:
+        """Jobs using file_id (including the job that produced it, if it records the use)."""
+        return list(self._file_consumers.get(file_id, ()))
+
+
+def _file_uses_of(project_ids):
+    return models.FileUse.objects.filter(
+        Q(job__project_id__in=project_ids) | Q(file__job__project_id__in=project_ids)
+    )
+
+
+def _signature(project_ids) -> tuple:
+    project_ids = sorted(project_ids)
+    jobs = models.Job.objects.filter(project_id__in=project_ids).aggregate(
+        count=Count("id"), last=Max("id")
+    )
+    uses = _file_uses_of(project_ids).aggregate(count=Count("id", distinct=True), last=Max("id"))
+    return (tuple(project_ids), jobs["count"], jobs["last"], uses["count"], uses["last"])
+
+
+def load_dependency_graph(project_id: int) -> DependencyGraph:
+    """
+    Load the dependency graph of a project from the database.
+
+    Two queries per round; further rounds are needed only for projects that
+    share files with the project.
+    """
+    loaded: Set[int] = set()
+    pending = {project_id}
+    jobs, file_uses, seen_uses = [], [], set()
+    signature = _signature(pending)
+    while pending:
+        loaded |= pending
+        jobs.extend(
+            models.Job.objects.filter(project_id__in=pending).values_list(
+                "id", "uuid", "number", "parent_id", "project_id"
+            )
+        )
+        related = set()
+        for use_id, file_id, producer_id, consumer_id, producer_project, consumer_project in (
+            _file_uses_of(pending).values_list(
+                "id", "file_id", "file__job_id", "job_id", "file__job__project_id", "job__project_id"
+            )
+        ):
+            if use_id in seen_uses:
+                continue
+            seen_uses.add(use_id)
+            file_uses.append((file_id, producer_id, consumer_id))
+            related.update((producer_project, consumer_project))
+        related.discard(None)
+        pending = related - loaded
+        if pending:
+            signature = _signature(loaded | pending)
+    return DependencyGraph(jobs, file_uses, projects=loaded, signature=signature)
+
+
+_graphs: "collections.OrderedDict[int, DependencyGraph]" = collections.OrderedDict()
+_graphs_lock = threading.Lock()
+
+
+def get_dependency_graph(project_id: int) -> DependencyGraph:
+    """Cached dependency graph of a project, reloaded if its jobs or file uses changed."""
+    with _graphs_lock:
+        graph = _graphs.get(project_id)
+    if graph is not None and _signature(graph.projects) == graph.signature:
+        with _graphs_lock:
+            if project_id in _graphs:
+                _graphs.move_to_end(project_id)
+        return graph
+
+    graph = load_dependency_graph(project_id)
+    if connection.in_atomic_block:
+        # What the graph was loaded from may yet be rolled back (and its ids reused)
+        return graph
+    with _graphs_lock:
+        _graphs[project_id] = graph
+        _graphs.move_to_end(project_id)
+        while len(_graphs) > DEPENDENCY_GRAPH_CACHE_SIZE:
+            _graphs.popitem(last=False)
+    return graph
+
+
+def clear_dependency_graphs() -> None:
+    """Forget all cached graphs."""
+    with _graphs_lock:
+        _graphs.clear()
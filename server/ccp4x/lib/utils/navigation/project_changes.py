@@ -0,0 +1,129 @@
+"""
+Cheap polling of per-project collections (jobs, job float/char values).
+
+The GUI polls the project's job list every few seconds. Every job and job value
+carries the value of its project's change counter at its last change
+(Project.change_counter / change_version, maintained in db/signals.py), which
+gives three ways to avoid re-sending an unchanged project:
+
+- ETag: the counter is the collection's version, so a poll with a matching
+  If-None-Match header gets 304 Not Modified without touching the job tables.
+- Delta: ``?since=<version>`` returns only rows changed at or after that
+  version, plus the ids of all current rows so that deleted rows can be
+  dropped. Pass the returned ``version`` as the next ``since``; the row(s) of
+  that version are sent again, which makes the cursor safe against a change
+  that was being written while the previous response was built.
+- Cursor pagination: ``?page_size=N`` (and the returned ``next`` links) pages
+  through the rows in id order.
+
+Requests with none of these parameters get the plain list, as before.
+"""
+
+import datetime
+import threading
+import time
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from ccp4x.db import models
+
+# Minimum seconds between writes of Project.last_access from polling endpoints
+LAST_ACCESS_INTERVAL = 60.0
+
+_last_touched = {}
+_last_touched_lock = threading.Lock()
+
+
+class ProjectChangesPagination(CursorPagination):
+    """Cursor pagination in id order for the project polling endpoints."""
+
+    ordering = "id"
+    page_size = 200
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+def touch_project(project, interval: float = LAST_ACCESS_INTERVAL) -> bool:
+    """
+    Record an access to project, writing last_access at most once per interval.
+
+    Returns:
+        True if last_access was written
+    """
+    now = time.monotonic()
+    with _last_touched_lock:
+        last = _last_touched.get(project.pk)
+        if last is not None and now - last < interval:
+            return False
+        _last_touched[project.pk] = now
+
+    # Other processes serve the same project; skip the write if one of them
+    # recorded an access recently
+    access_time = timezone.now()
+    written = models.Project.objects.filter(
+        pk=project.pk,
+        last_access__lt=access_time - datetime.timedelta(seconds=interval),
+    ).update(last_access=access_time)
+    if written:
+        project.last_access = access_time
+    return bool(written)
+
+
+def project_etag(project) -> str:
+    return f'W/"project-{project.uuid}-{project.change_counter}"'
+
+
+def _parse_since(request):
+    since = request.query_params.get("since")
+    if since in (None, ""):
+        return None
+    try:
+        return int(since)
+    except ValueError as error:
+        raise ValidationError({"since": "Expected the integer version of a previous response"}) from error
+
+
+def project_changes_response(request, view, project, queryset, serializer_class):
+    """
+    Build the response of a project polling endpoint.
+
+    Args:
+        request: DRF request
+        view: The viewset (needed by the paginator to build links)
+        project: Project whose change counter versions the collection
+        queryset: Rows of the collection (each with a change_version field)
+        serializer_class: Serializer for one row
+    """
+    etag = project_etag(project)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    since = _parse_since(request)
+    paginate = "page_size" in request.query_params or "cursor" in request.query_params
+    if since is None and not paginate:
+        serializer = serializer_class(queryset, many=True)
+        return Response(serializer.data, headers=headers)
+
+    # The counter was read with the project, before the rows: rows changed
+    # since then are sent again on the next poll rather than missed
+    body = {"version": project.change_counter, "since": since}
+    rows = queryset
+    if since is not None:
+        body["ids"] = list(queryset.order_by("id").values_list("id", flat=True))
+        rows = queryset.filter(change_version__gte=since)
+
+    if paginate:
+        paginator = ProjectChangesPagination()
+        page = paginator.paginate_queryset(rows, request, view=view)
+        body["next"] = paginator.get_next_link()
+        body["previous"] = paginator.get_previous_link()
+        body["results"] = serializer_class(page, many=True).data
+    else:
+        body["results"] = serializer_class(rows.order_by("id"), many=True).data
+    return Response(body, headers=headers)
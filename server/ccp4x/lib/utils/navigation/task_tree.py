@@ -1,4 +1,7 @@
-from core.CCP4TaskManager import CTaskManager
+import hashlib
+import json
+
+from core.CCP4TaskManager import TASKMANAGER
 
 
 def get_task_tree():
@@ -11,10 +14,29 @@ def get_task_tree():
         - lookup: Dict mapping taskName -> {version: {metadata...}}
         - iconLookup: Dict mapping module name to icon path
     """
-    task_manager = CTaskManager()
+    task_manager = TASKMANAGER()
     result = {
         "tree": task_manager.task_tree(),
         "lookup": task_manager.task_lookup,
         "iconLookup": task_manager.task_icon_lookup,
     }
     return result
+
+
+def get_task_tree_response():
+    """
+    JSON body and ETag of the task_tree endpoint.
+
+    The task tree never changes while the process runs, so the response is
+    encoded once per process and the ETag is a digest of the body.
+
+    Returns:
+        Tuple of (body bytes, ETag header value)
+    """
+    def build():
+        body = json.dumps(
+            {"success": True, "data": {"task_tree": get_task_tree()}}
+        ).encode("utf-8")
+        return body, f'"task-tree-{hashlib.sha1(body).hexdigest()}"'
+
+    return TASKMANAGER().catalog.derived("task_tree_response", build)
@@ -5,7 +5,7 @@ from ..plugins.get_plugin import get_job_plugin
 
 
 def get_what_next(job: models.Job):
-    the_job_plugin = get_job_plugin(job)
+    the_job_plugin = get_job_plugin(job, read_only=True)
     if the_job_plugin is None:
         return {"Status": "Failed", "result": []}
 
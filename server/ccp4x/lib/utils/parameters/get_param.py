@@ -81,7 +81,7 @@ def get_parameter(
         ...     print(f"NCYCLES = {result.data['value']}")
     """
     # Get plugin with database context
-    plugin_result = get_plugin_with_context(job)
+    plugin_result = get_plugin_with_context(job, read_only=True)
     if not plugin_result.success:
         return Result.fail(
             f"Failed to load plugin: {plugin_result.error}",
@@ -7,6 +7,7 @@ from core import CCP4Utils
 from core import CCP4PluginScript
 from core import CCP4Container
 from ccp4x.db import models
+from ..plugins.plugin_cache import invalidate_job_plugin
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
@@ -67,3 +68,4 @@ def save_params_for_job(
     ET.indent(body_etree, space="  ")
     #print(f"[DEBUG save_params_for_job] Generated body_etree with excludeUnset={exclude_unset} {ET.tostring(body_etree, encoding='unicode')}")
     f.saveFile(bodyEtree=body_etree)
+    invalidate_job_plugin(the_job)
@@ -14,7 +14,6 @@ from ccp4x.db import models
 from ..plugins.get_plugin import get_job_plugin
 from .save_params import save_params_for_job
 from ..files.get_by_context import get_file_by_job_context
-from ..containers.find_objects import find_objects
 from typing import Optional
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
@@ -39,28 +38,17 @@ def set_input_by_context_job(
     the_container: CContainer = the_job_plugin.container
     input_data: CContainer = the_container.inputData
 
-    def cdata_func(item):
-        if isinstance(item, CCP4File.CDataFile):
-            return item.qualifiers("fromPreviousJob")
-        return False
-
-    dobj_list = find_objects(
-        input_data,
-        cdata_func,
-        multiple=True,
-    )
+    # Files, and lists of files, to be taken from the context job
+    input_index = input_data.path_index()
+    dobj_list = [
+        item for item in input_index.files() if item.qualifiers("fromPreviousJob")
+    ]
 
     # Now find input data that is a list of files, add an item of such lists to the list of dObjs for which we need to set the input
-    def clist_func(item):
-        if isinstance(item, CCP4Data.CList):
-            return item.qualifiers("fromPreviousJob")
-        return False
-
-    list_list = find_objects(
-        input_data,
-        clist_func,
-        multiple=True,
-    )
+    list_list = [
+        item for item in input_index.of_type(CCP4Data.CList)
+        if item.qualifiers("fromPreviousJob")
+    ]
     a_list: CList
     for a_list in list_list:
         try:
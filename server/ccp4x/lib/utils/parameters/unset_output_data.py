@@ -4,7 +4,6 @@ from core import CCP4PluginScript
 # Note that these seem to have to be imported from "core" rather than "ccp4i2.core" for isinstance to work
 # MN
 from core import CCP4File
-from ..containers.find_objects import find_objects
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
@@ -20,8 +19,6 @@ def unset_output_data(the_job_plugin: CCP4PluginScript.CPluginScript):
         None
     """
 
-    outputs = find_objects(
-        the_job_plugin.container.outputData, lambda a: isinstance(a, CCP4File.CDataFile)
-    )
+    outputs = the_job_plugin.container.outputData.find_all_files()
     for output in outputs:
         output.unSet()
@@ -1,5 +1,7 @@
 import logging
 import traceback
+from pathlib import Path
+from typing import Optional
 
 from core import CCP4TaskManager
 
@@ -8,8 +10,30 @@ from ccp4x.db.models import Job
 
 logger = logging.getLogger(f"ccp4x:{__name__}")
 
+# Default of build_job_plugin's params_file: pick the file with job_params_file()
+_AUTO = object()
 
-def get_job_plugin(the_job: Job, parent=None, dbHandler=None):
+
+def job_params_file(the_job: Job) -> Optional[Path]:
+    """
+    The parameter file get_job_plugin loads for a job, or None if there is none.
+
+    For UNKNOWN/PENDING jobs input_params.xml (user control stage) is
+    preferred, for other jobs params.xml (plugin lifecycle output).
+    """
+    params_path = the_job.directory / "params.xml"
+    fallback_params_path = the_job.directory / "input_params.xml"
+    if the_job.status in [Job.Status.UNKNOWN, Job.Status.PENDING]:
+        params_path = the_job.directory / "input_params.xml"
+        fallback_params_path = the_job.directory / "params.xml"
+
+    for params_file in (params_path, fallback_params_path):
+        if params_file.exists():
+            return params_file
+    return None
+
+
+def get_job_plugin(the_job: Job, parent=None, dbHandler=None, read_only=False):
     """
     Retrieves and initializes a job plugin instance based on the provided job.
 
@@ -17,16 +41,25 @@ def get_job_plugin(the_job: Job, parent=None, dbHandler=None):
         the_job (Job): The job object containing details such as task name and directory.
         parent (optional): The parent object, if any. Defaults to None.
         dbHandler (CCP4i2DjangoDbHandler, optional): The database handler for CCP4i2. Defaults to None.
+        read_only (bool, optional): If True, return the plugin shared through the
+            per-process cache (see plugin_cache.py). It must not be modified.
 
     Returns:
         pluginInstance: An instance of the plugin class initialized with the job's parameters.
         None: If an error occurs during plugin initialization.
 
     Raises:
-        Exception: If no parameter definition file (params.xml or input_params.xml) is found in the job directory.
+        Exception: If the parameter file (params.xml or input_params.xml) of the job cannot be loaded.
     """
+    if read_only and parent is None and dbHandler is None:
+        from .plugin_cache import get_plugin_cache
+        return get_plugin_cache().get(the_job)
+    return build_job_plugin(the_job, parent=parent, dbHandler=dbHandler)
+
 
-    taskManager = CCP4TaskManager.CTaskManager()
+def build_job_plugin(the_job: Job, parent=None, dbHandler=None, params_file=_AUTO):
+    """Instantiate the plugin of a job and load its parameter file (see get_job_plugin)."""
+    taskManager = CCP4TaskManager.TASKMANAGER()
 
     pluginClass = taskManager.get_plugin_class(the_job.task_name)
     try:
@@ -37,23 +70,13 @@ def get_job_plugin(the_job: Job, parent=None, dbHandler=None):
         logger.exception("Error in get_job_plugin was", exc_info=err)
         return None
 
-    # Determine which params file to load based on job status
-    # For UNKNOWN/PENDING jobs, prefer input_params.xml (user control stage)
-    # For other jobs, prefer params.xml (plugin lifecycle output)
-    params_path = the_job.directory / "params.xml"
-    fallback_params_path = the_job.directory / "input_params.xml"
-    if the_job.status in [Job.Status.UNKNOWN, Job.Status.PENDING]:
-        params_path = the_job.directory / "input_params.xml"
-        fallback_params_path = the_job.directory / "params.xml"
-
-    params_file = params_path
-    if not params_file.exists():
-        params_file = fallback_params_path
+    if params_file is _AUTO:
+        params_file = job_params_file(the_job)
 
     # Load params if file exists, otherwise return fresh plugin from .def.xml
     # This is critical for new jobs - loading from fresh .def.xml gives proper
     # CData wrappers. If we tried to load from an empty XML, we'd get plain types.
-    if params_file.exists():
+    if params_file is not None:
         # Use CPluginScript.loadDataFromXml() which handles ParamsXmlHandler format
         # (with <ccp4i2> wrapper and header) as well as legacy CContainer format
         error = pluginInstance.loadDataFromXml(str(params_file))
@@ -0,0 +1,149 @@
+"""
+Per-process cache of job plugins loaded for read-only requests.
+
+Loading a job plugin instantiates the plugin class, builds its container from
+the .def.xml and overlays params.xml/input_params.xml. When the GUI shows a
+job it asks several endpoints (container, what_next, parameters, validation,
+report file names) about the same job, and each used to repeat
+that work.
+
+Plugins are cached by (job uuid, parameter file, mtime, size) of the file
+that get_job_plugin would load, so rewriting the parameter file, or a status
+change that selects the other file, misses the cache without any explicit
+invalidation. save_params_for_job also drops the job's entries as soon as it
+has written a new file.
+
+A cached plugin is a snapshot of the parameter file shared by every reader:
+callers of get_job_plugin(job, read_only=True) must not modify it. Code that
+changes parameters gets its own instance from get_job_plugin(job).
+
+Hits, misses and build times are counted per task and available from
+stats() (and the plugin_cache/ endpoint).
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ccp4x.db.models import Job
+from .get_plugin import build_job_plugin, job_params_file
+
+logger = logging.getLogger(f"ccp4x:{__name__}")
+
+# Most recently used plugins kept per process
+PLUGIN_CACHE_SIZE = 32
+
+
+class _TaskStats:
+    __slots__ = ("hits", "misses", "build_seconds", "max_build_seconds")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self.max_build_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_build_ms": 1000.0 * self.build_seconds / self.misses if self.misses else 0.0,
+            "max_build_ms": 1000.0 * self.max_build_seconds,
+        }
+
+
+class JobPluginCache:
+    """Bounded LRU cache of job plugins keyed by the state of their parameter file."""
+
+    def __init__(self, max_size: int = PLUGIN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._stats: Dict[str, _TaskStats] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(the_job: Job) -> Tuple:
+        """(job uuid, parameter file, mtime, size) of the plugin get_job_plugin would load."""
+        params_file = job_params_file(the_job)
+        if params_file is None:
+            return (str(the_job.uuid), None, None, None)
+        try:
+            stat = params_file.stat()
+        except FileNotFoundError:
+            return (str(the_job.uuid), None, None, None)
+        return (str(the_job.uuid), str(params_file), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, the_job: Job):
+        """The cached plugin of the_job, loading it on a miss (None if it cannot be created)."""
+        key = self.key(the_job)
+        with self._lock:
+            stats = self._stats.setdefault(the_job.task_name, _TaskStats())
+            plugin = self._entries.get(key)
+            if plugin is not None:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return plugin
+            stats.misses += 1
+
+        # Built outside the lock: concurrent misses for one job may both build
+        started = time.perf_counter()
+        plugin = build_job_plugin(the_job, params_file=key[1])
+        elapsed = time.perf_counter() - started
+        logger.debug("Built %s plugin of job %s in %.1f ms", the_job.task_name, the_job.uuid, 1000 * elapsed)
+
+        with self._lock:
+            stats.build_seconds += elapsed
+            stats.max_build_seconds = max(stats.max_build_seconds, elapsed)
+            if plugin is not None:
+                # Earlier states of the job's parameter files are not needed again
+                for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                    del self._entries[stale]
+                self._entries[key] = plugin
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return plugin
+
+    def invalidate(self, the_job: Job) -> int:
+        """Drop the cached plugins of the_job; returns the number dropped."""
+        job_uuid = str(the_job.uuid)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == job_uuid]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit rate and build latency per task name."""
+        with self._lock:
+            return {task_name: stats.as_dict() for task_name, stats in sorted(self._stats.items())}
+
+
+_cache: Optional[JobPluginCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_plugin_cache() -> JobPluginCache:
+    """Get the process-wide job plugin cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = JobPluginCache()
+    return _cache
+
+
+def invalidate_job_plugin(the_job: Job) -> int:
+    """Drop the cached plugins of the_job (after its parameters were changed)."""
+    return get_plugin_cache().invalidate(the_job)
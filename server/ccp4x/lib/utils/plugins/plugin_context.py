@@ -20,7 +20,8 @@ logger = logging.getLogger(__name__)
 def get_plugin_with_context(
     job: Job,
     params_file: Optional[Path] = None,
-    create_db_handler: bool = True
+    create_db_handler: bool = True,
+    read_only: bool = False,
 ) -> Result[CPluginScript]:
     """
     Get CPluginScript instance with full database context.
@@ -36,6 +37,10 @@ def get_plugin_with_context(
         job: Django Job model instance
         params_file: Optional specific params file to load (otherwise auto-detects)
         create_db_handler: Whether to attach dbHandler (default True)
+        read_only: Return the plugin shared through the plugin cache, without
+            a dbHandler or database context, for callers that only read the
+            container (not for anything that loads files or sets content
+            flags on it)
 
     Returns:
         Result[CPluginScript] with plugin instance or error
@@ -63,7 +68,7 @@ def get_plugin_with_context(
     try:
         # Create dbHandler for database synchronization
         dbHandler = None
-        if create_db_handler:
+        if create_db_handler and not read_only:
             logger.debug(
                 "Creating dbHandler for job %s (project: %s)",
                 job.uuid, job.project.uuid
@@ -79,7 +84,8 @@ def get_plugin_with_context(
         plugin = get_job_plugin(
             the_job=job,
             parent=None,
-            dbHandler=dbHandler
+            dbHandler=dbHandler,
+            read_only=read_only,
         )
 
         if plugin is None:
@@ -92,6 +98,10 @@ def get_plugin_with_context(
                 }
             )
 
+        if read_only:
+            # The cached plugin is shared by every reader and is not modified
+            return Result.ok(plugin)
+
         # Set database context on plugin
         # This allows file operations to know they're in a DB-aware environment
         plugin.set_db_job_id(str(job.uuid))
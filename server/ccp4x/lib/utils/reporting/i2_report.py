@@ -28,8 +28,10 @@ from core.base_object.fundamental_types import CList
 from core.CCP4TaskManager import CTaskManager
 from report.CCP4ReportParser import ReportClass
 from core import CCP4File
+from core.program_xml import parse_program_xml
 from ccp4x.db.models import Job, FileUse, File
 from ..plugins.get_plugin import get_job_plugin
+from ..navigation.dependencies import get_descendent_jobs
 from ccp4x.db.ccp4i2_static_data import (
     PATH_FLAG_JOB_DIR,
     PATH_FLAG_IMPORT_DIR,
@@ -147,15 +149,7 @@ def _get_descendent_jobs(job: Job) -> List[Tuple[str, List[str]]]:
         for descendentJob in jobInfo["descendentjobs"]:
             child_job_id = descendentJob[0]
     """
-    result = []
-    children = list(job.children.all())
-    for child in children:
-        grandchildren = list(child.children.all())
-        grandchild_ids = [str(gc.uuid) for gc in grandchildren]
-        result.append((str(child.uuid), grandchild_ids))
-        # Recursively add grandchildren
-        result.extend(_get_descendent_jobs(child))
-    return result
+    return get_descendent_jobs(job)
 
 
 def _input_files(job: Job):
@@ -240,7 +234,7 @@ def _output_files(job: Job):
 def _get_filenames(job: Job) -> Dict[str, Any]:
     """Extract filename mappings from job container."""
     try:
-        plugin = get_job_plugin(job)
+        plugin = get_job_plugin(job, read_only=True)
         if plugin is None:
             logger.warning("Failed to get plugin for job %s", job.uuid)
             return {}
@@ -419,7 +413,8 @@ def make_old_report(job: Job) -> ET.Element:
     output_xml = None
     if xml_path is not None:
         try:
-            output_xml = ET.parse(xml_path).getroot()
+            # Running jobs append to program.xml in place; retry a torn read
+            output_xml = parse_program_xml(xml_path)
             logger.debug("Parsed XML file: %s", xml_path)
         except ET.ParseError as err:
             logger.error("Failed to parse XML file %s: %s", xml_path, err)
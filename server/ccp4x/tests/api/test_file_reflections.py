@@ -0,0 +1,92 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import gemmi
+import numpy
+from django.test import TestCase
+
+from core import CCP4Container
+
+from ...db.models import File, FileType, Job, Project
+from ...lib.utils.formats import mtz as mtz_format
+
+GERE_NAT = Path(CCP4Container.__file__).parent.parent / "demo_data" / "gere" / "gere_nat.mtz"
+
+
+class FileReflectionsTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        imported = self.directory / "CCP4_IMPORTED_FILES"
+        imported.mkdir()
+        shutil.copy(GERE_NAT, imported / "gere_nat.mtz")
+
+        project = Project.objects.create(name="Reflections", directory=str(self.directory))
+        job = Job.objects.create(project=project, number="1", title="Import", task_name="import_merged")
+        file_type, _ = FileType.objects.get_or_create(
+            name="application/CCP4-mtz-observed", defaults={"description": "Observed data"}
+        )
+        self.file = File.objects.create(
+            name="gere_nat.mtz", directory=File.Directory.IMPORT_DIR, type=file_type, job=job
+        )
+        self.url = f"/files/{self.file.pk}/reflections/"
+        self.mtz = gemmi.read_mtz_file(str(GERE_NAT))
+
+    def test_binary_columns_match_mtz(self):
+        response = self.client.get(self.url, {"columns": "H,K,L,F_nat"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], mtz_format.COLUMNAR_CONTENT_TYPE)
+
+        header, columns = mtz_format.decode_reflection_columns(response.content)
+        self.assertEqual(list(columns), ["H", "K", "L", "F_nat"])
+        self.assertEqual(header["nreflections"], self.mtz.nreflections)
+        self.assertEqual(header["columns"][3]["type"], "F")
+        numpy.testing.assert_array_equal(columns["F_nat"], self.mtz.column_with_label("F_nat").array)
+        # Every column buffer is aligned for a Float32Array view
+        start = len(response.content) - 4 * 4 * self.mtz.nreflections
+        self.assertEqual(start % 4, 0)
+
+    def test_resolution_range_and_stride(self):
+        d_spacing = self.mtz.make_d_array()
+        in_range = numpy.flatnonzero((d_spacing >= 3.0) & (d_spacing <= 5.0))
+
+        response = self.client.get(
+            self.url, {"columns": "F_nat", "d_min": 3.0, "d_max": 5.0, "stride": 3}
+        )
+        header, columns = mtz_format.decode_reflection_columns(response.content)
+        self.assertEqual(header["total_reflections"], self.mtz.nreflections)
+        self.assertEqual(header["nreflections"], len(in_range[::3]))
+        numpy.testing.assert_array_equal(
+            columns["F_nat"], self.mtz.column_with_label("F_nat").array[in_range[::3]]
+        )
+
+    def test_json_format(self):
+        response = self.client.get(self.url, {"columns": "H,SIGF_nat", "stride": 100, "format": "json"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["labels"], ["H", "SIGF_nat"])
+        self.assertEqual(len(data["columns"]["H"]), len(range(0, self.mtz.nreflections, 100)))
+
+    def test_json_missing_values_are_null(self):
+        # F_nat(-) is missing (NaN) throughout gere_nat.mtz
+        response = self.client.get(self.url, {"columns": "F_nat,F_nat(-)", "stride": 100, "format": "json"})
+        self.assertEqual(response.status_code, 200)
+
+        def reject(constant):
+            raise ValueError(f"{constant} is not valid JSON")
+
+        data = json.loads(response.content, parse_constant=reject)["data"]
+        expected = self.mtz.column_with_label("F_nat").array[::100]
+        self.assertEqual(data["columns"]["F_nat"], expected.tolist())
+        self.assertEqual(data["columns"]["F_nat(-)"], [None] * len(expected))
+
+    def test_json_refuses_large_selections(self):
+        response = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_column(self):
+        response = self.client.get(self.url, {"columns": "F_nat,NOT_A_COLUMN"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("NOT_A_COLUMN", response.json()["error"])
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, TestCase, override_settings
+
+from ...api.events import _event_stream
+from ...db import models
+from ...lib import job_events
+from ...lib.job_events import DatabaseEventBackend, LocalEventBackend
+
+
+async def take(iterator, count, timeout=5):
+    items = []
+    while len(items) < count:
+        item = await asyncio.wait_for(iterator.__anext__(), timeout)
+        if item is not None:
+            items.append(item)
+    return items
+
+
+@override_settings(ROOT_URLCONF="ccp4x.api.urls")
+class JobEventsTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Events", directory=str(self.directory)
+        )
+        self.backend = LocalEventBackend()
+        job_events.set_backend(self.backend)
+        self.addCleanup(job_events.set_backend, None)
+
+    def test_stream_replays_then_follows(self):
+        first = job_events.publish(self.project.pk, "job_status", {"status": 2})
+        job_events.publish(self.project.pk + 1, "job_status", {"status": 3})
+
+        async def scenario():
+            events = job_events.stream(self.project.pk, last_event_id=0, keepalive=0.05)
+            try:
+                replayed = await take(events, 1)
+                job_events.publish(self.project.pk, "report_ready", {"job": "x"})
+                followed = await take(events, 1)
+            finally:
+                await events.aclose()
+            return replayed + followed
+
+        events = async_to_sync(scenario)()
+        self.assertEqual([e["type"] for e in events], ["job_status", "report_ready"])
+        self.assertEqual(events[0]["id"], first["id"])
+        self.assertEqual(self.backend.bus.projects(), [])
+
+    def test_resume_after_last_event_id(self):
+        first = job_events.publish(self.project.pk, "job_status", {"status": 2})
+        job_events.publish(self.project.pk, "job_status", {"status": 3})
+
+        async def scenario():
+            events = job_events.stream(self.project.pk, last_event_id=first["id"], keepalive=0.05)
+            try:
+                return await take(events, 1)
+            finally:
+                await events.aclose()
+
+        self.assertEqual(async_to_sync(scenario)()[0]["data"], {"status": 3})
+
+    def test_status_change_is_published_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = models.Job.objects.create(
+                project=self.project, number="1", title="Refine", task_name="prosmart_refmac"
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            job.status = models.Job.Status.RUNNING
+            job.save()
+
+        events = self.backend.read(self.project.pk, 0)
+        self.assertEqual([e["type"] for e in events], ["job_created", "job_status"])
+        self.assertEqual(events[1]["data"]["job"], str(job.uuid))
+        self.assertEqual(events[1]["data"]["status"], models.Job.Status.RUNNING)
+        self.assertEqual(events[1]["data"]["previous_status"], models.Job.Status.UNKNOWN)
+
+    def test_database_backend(self):
+        job_events.set_backend(DatabaseEventBackend())
+        job = models.Job.objects.create(
+            project=self.project, number="1", title="Refine", task_name="prosmart_refmac"
+        )
+        first = job_events.publish(self.project.pk, "kpis", {"values": {"RFree": 0.25}}, job_id=job.pk)
+        job_events.publish(self.project.pk, "report_ready", {"job": str(job.uuid)}, job_id=job.pk)
+
+        events = job_events.get_backend().read(self.project.pk, first["id"])
+        self.assertEqual([e["type"] for e in events], ["report_ready"])
+        self.assertEqual(models.JobEvent.objects.filter(job=job).count(), 2)
+
+    def test_database_pump_delivers_late_events(self):
+        backend = DatabaseEventBackend()
+        other = models.Project.objects.create(name="Other", directory=str(self.directory / "other"))
+        first = backend.publish(self.project.pk, "job_status", {"status": 2})
+        delivered = []
+
+        def event(offset, project=self.project):
+            return models.JobEvent.objects.create(
+                id=first["id"] + offset, project=project, type="job_status", data={"offset": offset}
+            )
+
+        with mock.patch.object(backend.bus, "deliver", side_effect=delivered.append):
+            # As at the start of the pump
+            last_id, seen = first["id"], {first["id"]}
+            event(5)
+            event(6, project=other)
+            last_id = backend._poll([self.project.pk], last_id, seen)
+            # Allocated before the previous event, committed after it
+            event(2)
+            last_id = backend._poll([self.project.pk], last_id, seen)
+            backend._poll([self.project.pk], last_id, seen)
+
+        self.assertEqual([e["data"]["offset"] for e in delivered], [5, 2])
+        self.assertEqual(last_id, first["id"] + 5)
+
+    def test_late_event_is_sent_without_id(self):
+        published = job_events.publish(self.project.pk, "job_status", {"status": 3})
+
+        async def scenario():
+            chunks = _event_stream(self.project.pk, 0)
+            try:
+                sent = [await asyncio.wait_for(chunks.__anext__(), 5)]
+                # Committed late, with a lower id than the event already sent
+                self.backend.bus.deliver({
+                    "id": published["id"] - 1, "project": self.project.pk,
+                    "type": "kpis", "data": {},
+                })
+                sent.append(await asyncio.wait_for(chunks.__anext__(), 5))
+            finally:
+                await chunks.aclose()
+            return sent
+
+        first, late = async_to_sync(scenario)()
+        self.assertTrue(first.startswith(f"id: {published['id']}\n"))
+        self.assertTrue(late.startswith("event: kpis\n"))
+
+    def test_publish_failure_is_not_raised(self):
+        class Broken(LocalEventBackend):
+            def publish(self, *args, **kwargs):
+                raise RuntimeError("broker down")
+
+        job_events.set_backend(Broken())
+        self.assertIsNone(job_events.publish(self.project.pk, "job_status", {}))
+
+    def test_endpoint_streams_server_sent_events(self):
+        first = job_events.publish(self.project.pk, "job_status", {"status": 3})
+        second = job_events.publish(self.project.pk, "report_ready", {"job": "x"})
+
+        async def scenario():
+            response = await AsyncClient().get(
+                f"/projects/{self.project.pk}/events/", headers={"Last-Event-ID": str(first["id"])}
+            )
+            content = response.streaming_content
+            try:
+                chunk = await asyncio.wait_for(content.__anext__(), 5)
+            finally:
+                await content.aclose()
+            return response, chunk
+
+        response, chunk = async_to_sync(scenario)()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        lines = text.strip().split("\n")
+        self.assertEqual(lines[0], f"id: {second['id']}")
+        self.assertEqual(lines[1], "event: report_ready")
+        self.assertEqual(json.loads(lines[2][len("data: "):]), {"job": "x"})
+
+    def test_endpoint_errors(self):
+        async def get(url):
+            return await AsyncClient().get(url)
+
+        self.assertEqual(async_to_sync(get)("/projects/999999/events/").status_code, 404)
+        self.assertEqual(
+            async_to_sync(get)(f"/projects/{self.project.pk}/events/?last_event_id=x").status_code,
+            400,
+        )
@@ -0,0 +1,195 @@
+import datetime
+import threading
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ...db import models
+from ...db.models import Job, JobFloatValue, JobValueKey, Project
+from ...lib.utils.navigation import project_changes
+
+
+class ProjectJobsPollingTestCase(TestCase):
+    def setUp(self):
+        self.project = Project.objects.create(
+            name="Polling Project",
+            directory="/tmp/polling_project",
+        )
+        self.jobs = [
+            Job.objects.create(
+                project=self.project,
+                number=str(number),
+                title=f"Job {number}",
+                task_name="refmac",
+            )
+            for number in range(1, 6)
+        ]
+        self.url = f"/projects/{self.project.pk}/jobs/"
+        project_changes._last_touched.clear()
+
+    def version(self):
+        self.project.refresh_from_db()
+        return self.project.change_counter
+
+    def test_plain_list_is_unchanged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job["number"] for job in response.json()], ["1", "2", "3", "4", "5"])
+        self.assertIn("ETag", response.headers)
+
+    def test_saves_advance_change_counter(self):
+        before = self.version()
+        job = self.jobs[2]
+        job.status = Job.Status.RUNNING
+        job.save(update_fields=["status"])
+        self.assertEqual(self.version(), before + 1)
+        job.refresh_from_db()
+        self.assertEqual(job.change_version, before + 1)
+
+    def test_change_version_written_with_the_row(self):
+        job = self.jobs[2]
+        job.title = "Renamed"
+        # Counter UPDATE and SELECT, then the job's own UPDATE
+        with self.assertNumQueries(3):
+            job.save(update_fields=["title"])
+        self.assertEqual(
+            Job.objects.values_list("change_version", flat=True).get(pk=job.pk), self.version()
+        )
+
+        key, _ = JobValueKey.objects.get_or_create(name="Rfree", defaults={"description": "R free"})
+        with self.assertNumQueries(3):
+            value = JobFloatValue.objects.create(job=job, key=key, value=0.3)
+        self.assertEqual(value.change_version, self.version())
+
+    def test_etag_not_modified(self):
+        first = self.client.get(self.url)
+        etag = first.headers["ETag"]
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+
+        self.jobs[0].title = "Renamed"
+        self.jobs[0].save()
+        third = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers["ETag"], etag)
+
+    def test_since_returns_changed_jobs_and_ids(self):
+        cursor = self.client.get(self.url, {"since": 0}).json()["version"]
+
+        self.jobs[1].status = Job.Status.FINISHED
+        self.jobs[1].save()
+        self.jobs[4].delete()
+
+        delta = self.client.get(self.url, {"since": cursor}).json()
+        changed = [job["number"] for job in delta["results"]]
+        self.assertIn("2", changed)
+        self.assertNotIn("1", changed)
+        self.assertEqual(delta["ids"], [job.id for job in self.jobs[:4]])
+        self.assertGreater(delta["version"], cursor)
+
+    def test_deletion_is_counted_once(self):
+        parent = self.jobs[0]
+        key, _ = JobValueKey.objects.get_or_create(name="Rfree", defaults={"description": "R free"})
+        children = [
+            Job.objects.create(
+                project=self.project, parent=parent, number=f"1.{n}", title="Sub-job", task_name="refmac"
+            )
+            for n in range(1, 4)
+        ]
+        for job in [parent] + children:
+            JobFloatValue.objects.create(job=job, key=key, value=0.3)
+
+        before = self.version()
+        with CaptureQueriesContext(connection) as queries:
+            parent.delete()
+        self.assertEqual(self.version(), before + 1)
+        # The job values are deleted without being loaded
+        self.assertFalse(any(
+            q["sql"].startswith("SELECT") and "FROM \"ccp4x_jobfloatvalue\"" in q["sql"]
+            for q in queries.captured_queries
+        ))
+
+        Job.objects.filter(project=self.project).delete()
+        self.assertEqual(self.version(), before + 2)
+        self.assertFalse(Job.objects.filter(project=self.project).exists())
+
+    def test_cursor_pagination(self):
+        response = self.client.get(self.url, {"page_size": 2}).json()
+        numbers = [job["number"] for job in response["results"]]
+        while response["next"]:
+            response = self.client.get(response["next"]).json()
+            numbers += [job["number"] for job in response["results"]]
+        self.assertEqual(numbers, ["1", "2", "3", "4", "5"])
+
+    def test_last_access_write_is_rate_limited(self):
+        stale = timezone.now() - datetime.timedelta(hours=1)
+        Project.objects.filter(pk=self.project.pk).update(last_access=stale)
+
+        self.client.get(self.url)
+        self.project.refresh_from_db()
+        touched = self.project.last_access
+        self.assertGreater(touched, stale)
+
+        with self.assertNumQueries(2):
+            # The project and its jobs; no UPDATE of last_access
+            response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            # Not modified: the project only
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=response.headers["ETag"])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.last_access, touched)
+
+    def test_job_float_values_since(self):
+        key, _ = JobValueKey.objects.get_or_create(name="Rfree", defaults={"description": "R free"})
+        url = f"/projects/{self.project.pk}/job_float_values/"
+        JobFloatValue.objects.create(job=self.jobs[0], key=key, value=0.3)
+        cursor = self.client.get(url, {"since": 0}).json()["version"]
+
+        value = JobFloatValue.objects.create(job=self.jobs[1], key=key, value=0.25)
+        delta = self.client.get(url, {"since": cursor + 1}).json()
+        self.assertEqual([row["id"] for row in delta["results"]], [value.id])
+        self.assertEqual(len(delta["ids"]), 2)
+        self.assertEqual(models.JobFloatValue.objects.get(pk=value.pk).change_version, delta["version"])
+
+
+class ConcurrentChangeVersionTestCase(TransactionTestCase):
+    def test_concurrent_saves_get_different_versions(self):
+        project = Project.objects.create(name="Concurrent", directory="/tmp/ccp4x_concurrent")
+        jobs = [
+            Job.objects.create(project=project, number=str(n), title=str(n), task_name="refmac")
+            for n in range(1, 5)
+        ]
+        start = threading.Barrier(len(jobs))
+        versions, errors = [], []
+
+        def save(job):
+            # The in-memory test database reports a lock held by another
+            # connection at once instead of waiting for it
+            while True:
+                try:
+                    job.save(update_fields=["title"])
+                    return job.change_version
+                except OperationalError as err:
+                    if "locked" not in str(err):
+                        raise
+
+        def rename(job):
+            try:
+                start.wait()
+                for n in range(10):
+                    job.title = f"{job.number}.{n}"
+                    versions.append(save(job))
+            except Exception as err:
+                errors.append(err)
+            finally:
+                connection.close()
+
+        first = Project.objects.get(pk=project.pk).change_counter
+        threads = [threading.Thread(target=rename, args=(job,)) for job in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(versions), list(range(first + 1, first + 41)))
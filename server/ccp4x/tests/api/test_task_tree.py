@@ -0,0 +1,31 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from ...lib.utils.navigation.task_tree import get_task_tree, get_task_tree_response
+
+
+@override_settings(ROOT_URLCONF="ccp4x.api.urls")
+class TaskTreeTestCase(TestCase):
+    def test_body_matches_task_tree(self):
+        response = self.client.get("/task_tree/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        task_tree = response.json()["data"]["task_tree"]
+        self.assertEqual(task_tree, json.loads(json.dumps(get_task_tree())))
+        self.assertIn("pointless", task_tree["lookup"])
+
+    def test_response_is_encoded_once(self):
+        self.assertIs(get_task_tree_response(), get_task_tree_response())
+
+    def test_etag_not_modified(self):
+        etag = self.client.get("/task_tree/").headers["ETag"]
+        self.assertEqual(etag, self.client.get("/task_tree/").headers["ETag"])
+
+        response = self.client.get("/task_tree/", HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+        stale = self.client.get("/task_tree/", HTTP_IF_NONE_MATCH='"task-tree-0"')
+        self.assertEqual(stale.status_code, 200)
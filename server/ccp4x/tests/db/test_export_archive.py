@@ -0,0 +1,139 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client, TestCase, override_settings
+
+from ...db import export_archive, models
+from ...db.export_archive import ArchiveMember, iter_zip, write_zip
+from ...db.export_project import export_project_to_zip, iter_project_zip
+
+
+def make_members(directory):
+    (directory / "refine.log").write_text("cycle 1\n" * 5000)
+    (directory / "hklout.mtz").write_bytes(os.urandom(50000))
+    (directory / "big.pdb").write_text("ATOM\n" * 100000)
+    return [
+        ArchiveMember("DATABASE.db.xml", data=b"<database/>"),
+        ArchiveMember("CCP4_JOBS/"),
+        ArchiveMember("CCP4_JOBS/refine.log", path=directory / "refine.log"),
+        ArchiveMember("CCP4_JOBS/hklout.mtz", path=directory / "hklout.mtz"),
+        ArchiveMember("CCP4_JOBS/big.pdb", path=directory / "big.pdb"),
+        ArchiveMember("CCP4_JOBS/deleted.log", path=directory / "deleted.log"),
+    ]
+
+
+def test_archive_readable_with_compression_per_member(tmp_path, monkeypatch):
+    # Stream the large member instead of compressing it in the pool
+    monkeypatch.setattr(export_archive, "PARALLEL_MEMBER_MAX_BYTES", 100000)
+    members = make_members(tmp_path)
+
+    for workers in (1, 4):
+        output = write_zip(members, tmp_path / f"export{workers}.zip", workers=workers)
+        with zipfile.ZipFile(output) as archive:
+            assert archive.testzip() is None
+            info = {i.filename: i for i in archive.infolist()}
+            assert list(info) == ["DATABASE.db.xml", "CCP4_JOBS/", "CCP4_JOBS/refine.log",
+                                  "CCP4_JOBS/hklout.mtz", "CCP4_JOBS/big.pdb"]
+            assert info["CCP4_JOBS/hklout.mtz"].compress_type == zipfile.ZIP_STORED
+            assert info["CCP4_JOBS/refine.log"].compress_type == zipfile.ZIP_DEFLATED
+            assert info["CCP4_JOBS/big.pdb"].compress_size < 10000
+            assert info["CCP4_JOBS/"].is_dir()
+            assert archive.read("CCP4_JOBS/big.pdb") == (tmp_path / "big.pdb").read_bytes()
+
+
+def test_zip64_entry_count(tmp_path):
+    members = [ArchiveMember(f"dir{i}/") for i in range(70000)]
+    members.append(ArchiveMember("last.txt", data=b"last"))
+    stream = io.BytesIO(b"".join(iter_zip(members, workers=1)))
+    with zipfile.ZipFile(stream) as archive:
+        assert len(archive.infolist()) == 70001
+        assert archive.read("last.txt") == b"last"
+
+
+@override_settings(ROOT_URLCONF="ccp4x.api.urls")
+class ProjectExportTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Export", directory=str(self.directory / "project")
+        )
+        for subdir in ["CCP4_JOBS", "CCP4_IMPORTED_FILES", "CCP4_PROJECT_FILES"]:
+            (Path(self.project.directory) / subdir).mkdir(parents=True)
+        self.file_type, _ = models.FileType.objects.get_or_create(
+            name="application/CCP4-mtz-observed", defaults={"description": "Reflections"}
+        )
+        self.first = self.make_job("1")
+        self.second = self.make_job("2")
+
+    def make_job(self, number):
+        job = models.Job.objects.create(
+            project=self.project, number=number, title="Refine", task_name="prosmart_refmac"
+        )
+        job.directory.mkdir(parents=True)
+        (job.directory / "log.txt").write_text(f"job {number}\n" * 100)
+        (job.directory / "HKLOUT.mtz").write_bytes(os.urandom(1000))
+        models.File.objects.create(
+            name="HKLOUT.mtz", type=self.file_type, job=job,
+            directory=models.File.Directory.JOB_DIR, job_param_name="HKLOUT",
+        )
+        return job
+
+    def archive_names(self, source):
+        with zipfile.ZipFile(source) as archive:
+            self.assertIsNone(archive.testzip())
+            return set(archive.namelist())
+
+    def test_export_to_file(self):
+        output = export_project_to_zip(self.project, self.directory / "export.zip", workers=2)
+        names = self.archive_names(output)
+        self.assertTrue({
+            "DATABASE.db.xml", "CCP4_IMPORTED_FILES/", "CCP4_PROJECT_FILES/",
+            "CCP4_JOBS/job_1/log.txt", "CCP4_JOBS/job_1/HKLOUT.mtz", "CCP4_JOBS/job_2/HKLOUT.mtz",
+        } <= names)
+
+    def test_incremental_export(self):
+        self.project.refresh_from_db()
+        earlier = models.ProjectExport.objects.create(
+            project=self.project, change_version=self.project.change_counter
+        )
+        self.second.status = models.Job.Status.FINISHED
+        self.second.save()
+
+        stream = io.BytesIO(b"".join(iter_project_zip(self.project, since=earlier)))
+        names = self.archive_names(stream)
+        self.assertIn("CCP4_JOBS/job_2/log.txt", names)
+        self.assertNotIn("CCP4_JOBS/job_1/log.txt", names)
+        with zipfile.ZipFile(stream) as archive:
+            database = archive.read("DATABASE.db.xml").decode()
+        self.assertIn(str(self.second.uuid).replace("-", ""), database)
+        self.assertNotIn(str(self.first.uuid).replace("-", ""), database)
+
+    def test_streaming_endpoint(self):
+        response = Client().get(f"/projects/{self.project.pk}/export_zip/?jobs=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        export = models.ProjectExport.objects.get(pk=response["X-Export-Id"])
+        self.assertEqual(export.project, self.project)
+
+        names = self.archive_names(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIn("CCP4_JOBS/job_1/log.txt", names)
+        self.assertNotIn("CCP4_JOBS/job_2/log.txt", names)
+
+        bad = Client().get(f"/projects/{self.project.pk}/export_zip/?since=999999")
+        self.assertEqual(bad.status_code, 400)
+
+    def test_streaming_endpoint_under_asgi(self):
+        async def download():
+            response = await AsyncClient().get(f"/projects/{self.project.pk}/export_zip/")
+            chunks = [chunk async for chunk in response.streaming_content]
+            return response, b"".join(chunks)
+
+        response, content = async_to_sync(download)()
+        self.assertTrue(response.is_async)
+        self.assertIn("CCP4_JOBS/job_2/log.txt", self.archive_names(io.BytesIO(content)))
@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.base_object.base_classes import CContainer
+from core.CCP4PerformanceData import CRefinementPerformance
+from core.CCP4XtalData import CObsDataFile
+
+from ...db import models
+from ...db.async_db_handler import AsyncDatabaseHandler
+
+
+class GleanOutputsTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Glean Project", directory=str(self.directory)
+        )
+        self.handler = AsyncDatabaseHandler(self.project.uuid)
+
+    def make_job(self, number):
+        return models.Job.objects.create(
+            project=self.project, number=str(number), title="Refine", task_name="prosmart_refmac"
+        )
+
+    def make_container(self, nfiles, rfactor=0.2):
+        container = CContainer(name="outputData")
+        for index in range(nfiles):
+            path = self.directory / f"HKLOUT{index}.mtz"
+            path.write_bytes(b"MTZ")
+            file_obj = CObsDataFile(name=f"HKLOUT{index}", parent=container)
+            file_obj.setFullPath(str(path))
+            setattr(container, f"HKLOUT{index}", file_obj)
+        performance = CRefinementPerformance(name="PERFORMANCE", parent=container)
+        performance.RFactor.set(rfactor)
+        performance.RFree.set(0.25)
+        container.PERFORMANCE = performance
+        return container
+
+    def glean(self, job, container):
+        return async_to_sync(self.handler.glean_job_outputs)(job.uuid, container)
+
+    def test_files_and_kpis_registered(self):
+        job = self.make_job(1)
+        container = self.make_container(3)
+
+        files, kpi_count = self.glean(job, container)
+
+        self.assertEqual(kpi_count, 2)
+        self.assertEqual([f.name for f in files], ["HKLOUT0.mtz", "HKLOUT1.mtz", "HKLOUT2.mtz"])
+        self.assertEqual(str(container.HKLOUT1.dbFileId), str(files[1].uuid))
+        uses = models.FileUse.objects.filter(job=job, role=models.FileUse.Role.OUT)
+        self.assertEqual(sorted(uses.values_list("job_param_name", flat=True)),
+                         ["HKLOUT0", "HKLOUT1", "HKLOUT2"])
+        self.assertEqual(files[0].type_id, "application/CCP4-mtz-observed")
+
+        values = {v.key_id: v for v in models.JobFloatValue.objects.filter(job=job)}
+        self.assertAlmostEqual(values["RFactor"].value, 0.2)
+        self.assertAlmostEqual(values["RFree"].value, 0.25)
+        self.project.refresh_from_db()
+        self.assertEqual(values["RFactor"].change_version, self.project.change_counter)
+
+    def test_regleaning_updates_values(self):
+        job = self.make_job(1)
+        self.glean(job, self.make_container(0, rfactor=0.3))
+        self.glean(job, self.make_container(0, rfactor=0.18))
+        values = models.JobFloatValue.objects.filter(job=job, key_id="RFactor")
+        self.assertEqual([v.value for v in values], [0.18])
+
+    def test_query_count_independent_of_output_count(self):
+        def count_queries(job, nfiles):
+            container = self.make_container(nfiles)
+            with CaptureQueriesContext(connection) as queries:
+                files, _ = self.glean(job, container)
+            self.assertEqual(len(files), nfiles)
+            return len(queries)
+
+        small = count_queries(self.make_job(1), 2)
+        large = count_queries(self.make_job(2), 40)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 16)
+
+    def test_bad_record_does_not_lose_others(self):
+        job = self.make_job(1)
+        files = [
+            {"file_path": Path("good.mtz"), "file_type": "application/CCP4-mtz-observed",
+             "param_name": "HKLOUT"},
+            {"file_path": Path("bad.mtz"), "file_type": "application/CCP4-mtz-observed",
+             "param_name": "BAD", "annotation": None},
+        ]
+        records = async_to_sync(self.handler.register_gleaned_outputs)(
+            job.uuid, files=files, float_values={"RFree": 0.3}
+        )
+        self.assertEqual(records[0].name, "good.mtz")
+        self.assertIsNone(records[1])
+        self.assertEqual(list(models.File.objects.filter(job=job).values_list("name", flat=True)),
+                         ["good.mtz"])
+        self.assertEqual(models.JobFloatValue.objects.get(job=job).value, 0.3)
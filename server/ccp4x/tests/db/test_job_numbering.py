@@ -0,0 +1,126 @@
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+
+from ...db import models
+from ...db.models import job_sort_key
+from ...lib.utils.jobs.create import create_job
+
+
+class JobNumberingTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Numbering", directory=str(self.directory / "project")
+        )
+
+    def make_job(self, number, parent=None):
+        return models.Job.objects.create(
+            project=self.project, parent=parent, number=number, title=number,
+            task_name="ctruncate",
+        )
+
+    def test_sort_key_orders_by_number(self):
+        self.assertEqual(job_sort_key("1.12"), "000001.000012")
+        one = self.make_job("1")
+        two = self.make_job("2")
+        self.make_job("10")
+        self.make_job("1.10", parent=one)
+        self.make_job("1.2", parent=one)
+        self.make_job("2.1", parent=two)
+        numbers = models.Job.objects.filter(project=self.project).order_by("sort_key")
+        self.assertEqual(
+            list(numbers.values_list("number", flat=True)),
+            ["1", "1.2", "1.10", "2", "2.1", "10"],
+        )
+
+        two.number = "20"
+        two.save(update_fields=["number"])
+        self.assertEqual(
+            models.Job.objects.values_list("sort_key", flat=True).get(pk=two.pk),
+            "000020",
+        )
+
+    def test_next_job_number(self):
+        next_job_number = models.Project.next_job_number
+        self.assertEqual(next_job_number(self.project.pk), 1)
+        self.assertEqual(next_job_number(self.project.pk), 2)
+
+        # Jobs created with explicit numbers move the counter on
+        self.make_job("7")
+        self.assertEqual(next_job_number(self.project.pk), 8)
+
+        # A stale project instance saved over the counter does not reuse numbers
+        self.make_job("8")
+        self.project.last_job_number = 3
+        self.project.save()
+        self.assertEqual(next_job_number(self.project.pk), 9)
+
+    def test_next_child_number(self):
+        parent = self.make_job("4")
+        self.assertEqual(parent.next_child_number(), "4.1")
+        self.make_job("4.9", parent=parent)
+        self.make_job("4.10", parent=parent)
+        self.assertEqual(parent.next_child_number(), "4.11")
+
+    def test_create_job_numbers(self):
+        self.make_job("3")
+        first = create_job(projectId=str(self.project.uuid), taskName="ctruncate", saveParams=False)
+        first_job = models.Job.objects.get(uuid=first)
+        self.assertEqual(first_job.number, "4")
+        child = create_job(parentJobId=str(first_job.uuid), taskName="ctruncate", saveParams=False)
+        child_job = models.Job.objects.get(uuid=child)
+        self.assertEqual((child_job.number, child_job.parent_id), ("4.1", first_job.pk))
+        self.assertEqual(
+            models.Project.objects.get(pk=self.project.pk).last_job_number, 4
+        )
+
+    def test_create_job_numbers_sub_jobs_under_parent(self):
+        parent = self.make_job("4")
+        self.make_job("4.1", parent=parent)
+        child = create_job(parentJobId=str(parent.uuid), taskName="ctruncate", saveParams=False)
+        self.assertEqual(models.Job.objects.get(uuid=child).number, "4.2")
+        grandchild = create_job(parentJobId=child, taskName="ctruncate", saveParams=False)
+        self.assertEqual(models.Job.objects.get(uuid=grandchild).number, "4.2.1")
+        # Sub-jobs do not use up top-level numbers
+        self.assertEqual(models.Project.next_job_number(self.project.pk), 5)
+
+
+class ConcurrentJobNumberTestCase(TransactionTestCase):
+    def test_concurrent_callers_get_different_numbers(self):
+        project = models.Project.objects.create(name="Concurrent", directory="/tmp/ccp4x_concurrent")
+        start = threading.Barrier(4)
+        numbers, errors = [], []
+
+        def next_job_number():
+            # The in-memory test database reports a lock held by another
+            # connection at once instead of waiting for it
+            while True:
+                try:
+                    return models.Project.next_job_number(project.pk)
+                except OperationalError as err:
+                    if "locked" not in str(err):
+                        raise
+
+        def allocate():
+            try:
+                start.wait()
+                for _ in range(10):
+                    numbers.append(next_job_number())
+            except Exception as err:
+                errors.append(err)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(numbers), list(range(1, 41)))
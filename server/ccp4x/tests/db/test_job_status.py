@@ -0,0 +1,217 @@
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.CCP4PluginScript import CPluginScript
+
+from ...db import models
+from ...db.async_db_handler import AsyncDatabaseHandler
+from ...db.management.commands.run_worker_pool import release_queued_jobs
+from ...db.job_status import InvalidStatusTransition, transition_job_status
+from ...lib import job_events
+from ...lib.job_events import LocalEventBackend
+from ...lib.utils.jobs import worker_pool
+from ...lib.utils.jobs import context_run
+from ...lib.utils.jobs.context_run import run_job_local, run_job_worker_pool
+
+Status = models.Job.Status
+
+
+class JobStatusTransitionTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Status", directory=str(self.directory / "project")
+        )
+        self.job = models.Job.objects.create(
+            project=self.project, number="1", title="Refine", task_name="prosmart_refmac",
+            status=Status.PENDING,
+        )
+        self.backend = LocalEventBackend()
+        job_events.set_backend(self.backend)
+        self.addCleanup(job_events.set_backend, None)
+
+    def history(self):
+        return list(
+            models.JobStatusHistory.objects.filter(job=self.job)
+            .order_by("id").values_list("from_status", "to_status")
+        )
+
+    def test_lifecycle(self):
+        before = models.Project.objects.get(pk=self.project.pk).change_counter
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(transition_job_status(self.job, Status.QUEUED, expected=Status.PENDING))
+            self.assertTrue(transition_job_status(self.job.uuid, Status.RUNNING))
+            self.assertTrue(transition_job_status(str(self.job.uuid), Status.FINISHED))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Status.FINISHED)
+        self.assertIsNotNone(self.job.finish_time)
+        self.assertEqual(self.job.change_version, before + 3)
+        self.assertEqual(self.history(), [
+            (Status.PENDING, Status.QUEUED), (None, Status.RUNNING), (None, Status.FINISHED),
+        ])
+        events = self.backend.read(self.project.pk, 0)
+        self.assertEqual([e["data"]["status"] for e in events],
+                         [Status.QUEUED, Status.RUNNING, Status.FINISHED])
+        self.assertEqual(events[0]["data"]["previous_status"], Status.PENDING)
+
+    def test_transition_is_one_conditional_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            transition_job_status(self.job, Status.RUNNING)
+        statements = [q["sql"] for q in queries.captured_queries
+                      if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        # Project counter (UPDATE + SELECT), job UPDATE, history INSERT
+        self.assertEqual([sql.split()[0] for sql in statements], ["UPDATE", "SELECT", "UPDATE", "INSERT"])
+        self.assertIn('"status" IN', statements[2])
+
+    def test_illegal_transition_is_rejected(self):
+        transition_job_status(self.job, Status.FAILED)
+        before = models.Project.objects.get(pk=self.project.pk).change_counter
+        with self.assertRaises(InvalidStatusTransition) as raised:
+            transition_job_status(self.job.uuid, Status.RUNNING)
+        self.assertEqual(raised.exception.current_status, Status.FAILED)
+        with self.assertRaises(InvalidStatusTransition):
+            transition_job_status(self.job, Status.QUEUED, expected=Status.FINISHED)
+        with self.assertRaises(InvalidStatusTransition):
+            transition_job_status(models.Job(pk=999999, project=self.project), Status.FAILED)
+
+        self.assertEqual(models.Project.objects.get(pk=self.project.pk).change_counter, before)
+        self.assertEqual(self.history(), [(None, Status.FAILED)])
+
+    def test_job_failing_while_gleaning_is_marked_failed(self):
+        handler = AsyncDatabaseHandler(self.project.uuid)
+        plugin = SimpleNamespace(
+            get_db_job_id=lambda: self.job.uuid,
+            get_status=lambda: CPluginScript.SUCCEEDED,
+            container=SimpleNamespace(outputData=object()),
+        )
+
+        async def run():
+            # As run_job_async: a job raising after it finished is marked FAILED
+            try:
+                async with handler.track_job(plugin):
+                    pass
+            except RuntimeError:
+                await handler.update_job_status(self.job.uuid, Status.FAILED)
+
+        with mock.patch.object(
+            AsyncDatabaseHandler, "glean_job_outputs", side_effect=RuntimeError("glean failed")
+        ):
+            async_to_sync(run)()
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Status.FAILED)
+        self.assertEqual(self.history(), [
+            (None, Status.RUNNING), (None, Status.FINISHED), (None, Status.FAILED),
+        ])
+
+    def submit_to_pool(self, reply, run=run_job_worker_pool):
+        socket_path = self.directory / "pool.sock"
+        socket_path.touch()
+        with mock.patch.object(worker_pool, "get_pool_socket_path", return_value=socket_path), \
+                mock.patch.object(worker_pool, "submit_job", return_value=reply), \
+                self.captureOnCommitCallbacks(execute=True):
+            return run(self.job)
+
+    def test_worker_pool_submission(self):
+        result = self.submit_to_pool({"ok": True, "state": "queued", "position": 0})
+        self.assertTrue(result["success"])
+        self.assertEqual(self.job.status, Status.QUEUED)
+        self.assertEqual(self.history(), [(Status.PENDING, Status.QUEUED)])
+        events = self.backend.read(self.project.pk, 0)
+        self.assertEqual([e["data"]["status"] for e in events], [Status.QUEUED])
+
+    def test_worker_pool_refusal_restores_status(self):
+        self.assertIsNone(self.submit_to_pool({"ok": False, "error": "shutting down"}))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Status.PENDING)
+        self.assertEqual(self.history(), [
+            (Status.PENDING, Status.QUEUED), (Status.QUEUED, Status.PENDING),
+        ])
+        events = self.backend.read(self.project.pk, 0)
+        self.assertEqual([e["data"]["status"] for e in events], [Status.QUEUED, Status.PENDING])
+
+    def test_worker_pool_refuses_finished_job(self):
+        transition_job_status(self.job, Status.FINISHED)
+        result = self.submit_to_pool({"ok": True, "state": "running", "position": 0})
+        self.assertEqual((result["success"], result["status"]), (False, 409))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Status.FINISHED)
+
+    def test_local_run_refuses_finished_job_with_or_without_pool(self):
+        transition_job_status(self.job, Status.FINISHED)
+        with mock.patch.object(context_run.subprocess, "Popen") as popen:
+            pooled = self.submit_to_pool(
+                {"ok": True, "state": "running", "position": 0}, run=run_job_local
+            )
+            with mock.patch.object(
+                worker_pool, "get_pool_socket_path", return_value=self.directory / "none.sock"
+            ):
+                unpooled = run_job_local(self.job)
+        popen.assert_not_called()
+        for result in (pooled, unpooled):
+            self.assertEqual((result["success"], result["status"]), (False, 409))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Status.FINISHED)
+
+    def test_stopped_worker_pool_releases_queued_jobs(self):
+        self.submit_to_pool({"ok": True, "state": "queued", "position": 0})
+        unknown = models.Job.objects.create(
+            project=self.project, number="2", title="Refine", task_name="prosmart_refmac",
+        )
+        transition_job_status(unknown, Status.QUEUED, expected=Status.UNKNOWN)
+        started = models.Job.objects.create(
+            project=self.project, number="3", title="Refine", task_name="prosmart_refmac",
+            status=Status.QUEUED,
+        )
+        transition_job_status(started, Status.RUNNING)
+
+        release_queued_jobs([str(self.job.uuid), str(unknown.uuid), str(started.uuid)])
+        statuses = dict(
+            models.Job.objects.filter(project=self.project).values_list("number", "status")
+        )
+        self.assertEqual(statuses, {"1": Status.PENDING, "2": Status.UNKNOWN, "3": Status.RUNNING})
+        self.assertEqual(self.history()[-1], (Status.QUEUED, Status.PENDING))
+
+    def test_compare_and_set(self):
+        stale = models.Job.objects.get(pk=self.job.pk)
+        transition_job_status(self.job, Status.QUEUED, expected=Status.PENDING)
+        # Another worker still sees PENDING
+        with self.assertRaises(InvalidStatusTransition):
+            transition_job_status(stale, Status.RUNNING_REMOTELY, expected=stale.status)
+        # Repeating the transition that was made is not an error
+        self.assertFalse(transition_job_status(stale, Status.QUEUED, expected=stale.status))
+        self.assertEqual(stale.status, Status.QUEUED)
+
+    def test_saved_status_changes_are_recorded_without_reading(self):
+        job = models.Job.objects.get(pk=self.job.pk)
+        job.status = Status.RUNNING
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        self.assertFalse(any(
+            q["sql"].startswith("SELECT") and "ccp4x_job" in q["sql"].split("FROM")[-1][:20]
+            for q in queries.captured_queries
+        ))
+        job.title = "Renamed"
+        job.save()
+        self.assertEqual(self.history(), [(Status.PENDING, Status.RUNNING)])
+
+    def test_set_job_status_command(self):
+        out = StringIO()
+        call_command("set_job_status", jobid=self.job.pk, status="FILE_HOLDER", stdout=out)
+        call_command("set_job_status", jobid=self.job.pk, status="PENDING", stdout=out)
+        self.assertEqual(self.history(), [
+            (Status.PENDING, Status.FILE_HOLDER), (Status.FILE_HOLDER, Status.PENDING),
+        ])
@@ -0,0 +1,156 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ...db import models
+from ...lib.utils.navigation import dependency_graph
+from ...lib.utils.navigation.dependencies import (
+    delete_job_and_dependents,
+    find_dependent_jobs,
+    get_descendent_jobs,
+)
+from ...lib.utils.navigation.dependency_graph import DependencyGraph, get_dependency_graph
+
+
+def test_deletion_order_puts_dependents_first():
+    # 1 -> 2 -> 4, 1 -> 3 -> 4, and 2 has sub-job 2.1
+    graph = DependencyGraph(
+        jobs=[(1, "a", "1", None, 1), (2, "b", "2", None, 1), (3, "c", "3", None, 1),
+              (4, "d", "4", None, 1), (5, "e", "2.1", 2, 1)],
+        file_uses=[(10, 1, 2), (10, 1, 3), (20, 2, 4), (30, 3, 4), (20, 2, 2)],
+    )
+    assert sorted(graph.descendants(1)) == [2, 3, 4, 5]
+    assert sorted(graph.ancestors(4)) == [1, 2, 3]
+    order = graph.deletion_order(1)
+    assert order[-1] == 1
+    for job_id in order:
+        assert all(order.index(d) < order.index(job_id) for d in graph.descendants(job_id))
+    assert graph.file_consumers(20) == [4, 2]
+    assert graph.children(2) == [5]
+
+
+def test_cycles_terminate():
+    graph = DependencyGraph(
+        jobs=[(1, "a", "1", None, 1), (2, "b", "2", None, 1)],
+        file_uses=[(10, 1, 2), (20, 2, 1)],
+    )
+    assert graph.descendants(1) == [2]
+    assert graph.deletion_order(1) == [2, 1]
+
+
+class DependencyGraphTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(name="Graph", directory=str(self.directory))
+        self.file_type, _ = models.FileType.objects.get_or_create(
+            name="application/CCP4-mtz-observed", defaults={"description": "Reflections"}
+        )
+
+    def make_job(self, number, parent=None, project=None):
+        job = models.Job.objects.create(
+            project=project or self.project, number=number, title=number,
+            task_name="prosmart_refmac", parent=parent,
+        )
+        job.directory.mkdir(parents=True, exist_ok=True)
+        return job
+
+    def make_file(self, job):
+        return models.File.objects.create(
+            name=f"HKLOUT_{job.number}.mtz", type=self.file_type, job=job,
+            directory=models.File.Directory.JOB_DIR, job_param_name="HKLOUT",
+        )
+
+    def use(self, file, job):
+        models.FileUse.objects.create(
+            file=file, job=job, role=models.FileUse.Role.IN, job_param_name="HKLIN"
+        )
+
+    def make_chain(self, length, first=1):
+        jobs = [self.make_job(str(first))]
+        for number in range(first + 1, first + length):
+            job = self.make_job(str(number))
+            self.use(self.make_file(jobs[-1]), job)
+            jobs.append(job)
+        return jobs
+
+    def test_find_dependent_jobs(self):
+        jobs = self.make_chain(3)
+        pipeline = self.make_job("4")
+        sub_job = self.make_job("4.1", parent=pipeline)
+        self.use(self.make_file(jobs[1]), sub_job)
+
+        dependents = find_dependent_jobs(jobs[0])
+        self.assertCountEqual([j.number for j in dependents], ["2", "3", "4.1"])
+        self.assertEqual(find_dependent_jobs(jobs[2]), [])
+
+    def test_query_count_independent_of_chain_length(self):
+        def count_queries(jobs):
+            with CaptureQueriesContext(connection) as queries:
+                dependents = find_dependent_jobs(jobs[0])
+            self.assertEqual(len(dependents), len(jobs) - 1)
+            return len(queries)
+
+        short = count_queries(self.make_chain(3))
+        long = count_queries(self.make_chain(30, first=10))
+        self.assertEqual(short, long)
+
+    def test_dependents_in_other_projects(self):
+        other = models.Project.objects.create(name="Other", directory=str(self.directory / "other"))
+        job = self.make_job("1")
+        consumer = self.make_job("1", project=other)
+        self.use(self.make_file(job), consumer)
+        follower = self.make_job("2", project=other)
+        self.use(self.make_file(consumer), follower)
+
+        self.assertCountEqual(find_dependent_jobs(job), [consumer, follower])
+
+    def test_delete_job_and_dependents(self):
+        jobs = self.make_chain(3)
+        sub_job = self.make_job("2.1", parent=jobs[1])
+        unrelated = self.make_job("5")
+
+        delete_job_and_dependents(jobs[0])
+
+        self.assertEqual(list(models.Job.objects.filter(project=self.project)), [unrelated])
+        self.assertFalse(sub_job.directory.exists())
+        self.assertFalse(models.File.objects.filter(job__project=self.project).exists())
+
+    def test_descendent_jobs_of_pipeline(self):
+        pipeline = self.make_job("1")
+        first = self.make_job("1.1", parent=pipeline)
+        nested = self.make_job("1.1.1", parent=first)
+        second = self.make_job("1.2", parent=pipeline)
+
+        self.assertEqual(get_descendent_jobs(pipeline), [
+            (str(first.uuid), [str(nested.uuid)]),
+            (str(nested.uuid), []),
+            (str(second.uuid), []),
+        ])
+
+
+class DependencyGraphCacheTestCase(TransactionTestCase):
+    def setUp(self):
+        dependency_graph.clear_dependency_graphs()
+        self.addCleanup(dependency_graph.clear_dependency_graphs)
+        self.project = models.Project.objects.create(name="Cached", directory=tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.project.directory, ignore_errors=True)
+
+    def test_graph_reloaded_after_writes(self):
+        first = models.Job.objects.create(project=self.project, number="1", title="1", task_name="t")
+        graph = get_dependency_graph(self.project.pk)
+        self.assertIs(get_dependency_graph(self.project.pk), graph)
+
+        second = models.Job.objects.create(
+            project=self.project, number="1.1", title="1.1", task_name="t", parent=first
+        )
+        reloaded = get_dependency_graph(self.project.pk)
+        self.assertIsNot(reloaded, graph)
+        self.assertEqual(reloaded.descendants(first.pk), [second.pk])
+
+        second.delete()
+        self.assertEqual(get_dependency_graph(self.project.pk).descendants(first.pk), [])
@@ -0,0 +1,143 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase
+from core import CCP4Container
+
+from ...db import models
+from ...db.async_db_handler import AsyncDatabaseHandler
+from ...lib import async_import_files
+from ...lib.utils.files import import_copy
+from ...lib.utils.files.import_copy import create_unique_file, import_file_copy
+from ...lib.utils.files.import_files import import_files
+from ...lib.utils.plugins.get_plugin import get_job_plugin
+
+MTZ = Path(CCP4Container.__file__).parent.parent / "demo_data" / "gamma" / "merged_intensities_native.mtz"
+
+
+class ImportCopyTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.source = self.directory / "data.mtz"
+        self.source.write_bytes(os.urandom(3 * 1024 + 17))
+        self.md5 = hashlib.md5(self.source.read_bytes()).hexdigest()
+
+    def test_copy_and_checksum(self):
+        import_dir = self.directory / "CCP4_IMPORTED_FILES"
+        names = []
+        for _ in range(3):
+            dest, checksum = import_file_copy(self.source, import_dir)
+            self.assertEqual(checksum, self.md5)
+            self.assertEqual(dest.read_bytes(), self.source.read_bytes())
+            names.append(dest.name)
+        self.assertEqual(names, ["data.mtz", "data_1.mtz", "data_2.mtz"])
+
+    def test_copy_without_reflink_or_copy_file_range(self):
+        unsupported = OSError(errno.EXDEV, "Invalid cross-device link")
+        with mock.patch.object(import_copy, "CHUNK_SIZE", 1000), \
+                mock.patch.object(import_copy, "_reflink", return_value=False), \
+                mock.patch.object(os, "copy_file_range", side_effect=unsupported, create=True):
+            dest, checksum = import_file_copy(self.source, self.directory / "imported")
+        self.assertEqual(checksum, self.md5)
+        self.assertEqual(dest.read_bytes(), self.source.read_bytes())
+
+    def test_failed_copy_releases_name(self):
+        with self.assertRaises(FileNotFoundError):
+            import_file_copy(self.directory / "missing.mtz", self.directory / "imported")
+        self.assertEqual(list((self.directory / "imported").iterdir()), [])
+
+    def test_concurrent_names_are_unique(self):
+        created = []
+
+        def claim():
+            path, fd = create_unique_file(self.directory / "same.mtz")
+            os.close(fd)
+            created.append(path.name)
+
+        threads = [threading.Thread(target=claim) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(created)), 8)
+
+
+class ImportFilesTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Import", directory=str(self.directory / "project")
+        )
+        self.job = models.Job.objects.create(
+            project=self.project, number="1", title="Truncate", task_name="ctruncate"
+        )
+        self.job.directory.mkdir(parents=True)
+        # save_params_for_job also leaves a copy of input_params.xml in the
+        # working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.directory)
+
+    def test_import_reads_source_once(self):
+        plugin = get_job_plugin(self.job)
+        hklin = plugin.container.inputData.HKLIN
+        hklin.setFullPath(str(MTZ))
+
+        opened = []
+        real_open = os.open
+
+        def counting_open(path, *args, **kwargs):
+            if Path(path) == MTZ:
+                opened.append(path)
+            return real_open(path, *args, **kwargs)
+
+        with mock.patch.object(hklin, "loadFile", side_effect=AssertionError("contents loaded")), \
+                mock.patch.object(import_copy.os, "open", side_effect=counting_open):
+            import_files(self.job, plugin)
+
+        self.assertEqual(len(opened), 1)
+        the_file = models.File.objects.get(job=self.job, job_param_name="HKLIN")
+        self.assertEqual(the_file.path.read_bytes(), MTZ.read_bytes())
+        self.assertEqual(
+            the_file.fileimport.checksum, hashlib.md5(MTZ.read_bytes()).hexdigest()
+        )
+        self.assertEqual(str(hklin.baseName), the_file.name)
+        self.assertTrue(models.FileUse.objects.filter(file=the_file, job=self.job).exists())
+
+    def test_reimport_is_not_copied(self):
+        handler = AsyncDatabaseHandler(self.project.uuid)
+        import_file = async_to_sync(async_import_files.import_external_file_async)
+
+        plugin = get_job_plugin(self.job)
+        hklin = plugin.container.inputData.HKLIN
+        hklin.setFullPath(str(MTZ))
+        import_file(self.job, hklin, handler)
+        first = models.File.objects.get(job=self.job, job_param_name="HKLIN")
+
+        second_job = models.Job.objects.create(
+            project=self.project, number="2", title="Truncate", task_name="ctruncate"
+        )
+        second_job.directory.mkdir(parents=True)
+        plugin = get_job_plugin(second_job)
+        hklin = plugin.container.inputData.HKLIN
+        hklin.setFullPath(str(MTZ))
+        with mock.patch.object(
+            async_import_files, "import_file_copy", side_effect=AssertionError("copied")
+        ):
+            import_file(second_job, hklin, handler)
+
+        self.assertEqual(str(hklin.dbFileId), str(first.uuid))
+        self.assertTrue(
+            models.FileUse.objects.filter(file=first, job=second_job).exists()
+        )
+        self.assertEqual(
+            [path.name for path in first.path.parent.iterdir()], [first.name]
+        )
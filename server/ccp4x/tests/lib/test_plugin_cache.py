@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from ...db import models
+from ...lib.utils.files.digest import digest_param_file
+from ...lib.utils.plugins import plugin_cache
+from ...lib.utils.plugins.get_plugin import get_job_plugin
+from ...lib.utils.plugins.plugin_context import get_plugin_with_context
+from ...lib.utils.plugins.plugin_cache import (
+    JobPluginCache, get_plugin_cache, invalidate_job_plugin,
+)
+
+
+@override_settings(ROOT_URLCONF="ccp4x.api.urls")
+class JobPluginCacheTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.project = models.Project.objects.create(
+            name="Plugin cache", directory=str(self.directory / "project")
+        )
+        self.job = self.make_job("1")
+        get_plugin_cache().clear()
+        self.addCleanup(get_plugin_cache().clear)
+
+    def make_job(self, number):
+        job = models.Job.objects.create(
+            project=self.project, number=number, title="Truncate", task_name="ctruncate"
+        )
+        job.directory.mkdir(parents=True)
+        get_job_plugin(job).saveDataToXml(str(job.directory / "input_params.xml"))
+        return job
+
+    def test_read_only_callers_share_plugin(self):
+        first = get_job_plugin(self.job, read_only=True)
+        self.assertIs(get_job_plugin(self.job, read_only=True), first)
+        self.assertIsNot(get_job_plugin(self.job), first)
+        stats = get_plugin_cache().stats()["ctruncate"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertGreater(stats["mean_build_ms"], 0)
+
+    def test_context_not_set_on_cached_plugin(self):
+        cached = get_plugin_with_context(self.job, read_only=True).data
+        self.assertIs(cached, get_job_plugin(self.job, read_only=True))
+        self.assertIsNone(cached.get_db_job_id())
+        self.assertIsNone(cached._dbProjectId)
+
+        plugin = get_plugin_with_context(self.job).data
+        self.assertIsNot(plugin, cached)
+        self.assertEqual(plugin.get_db_job_id(), str(self.job.uuid))
+
+    def test_digest_builds_own_plugin(self):
+        get_job_plugin(self.job, read_only=True)
+        digest_param_file(self.job, "inputData.HKLIN")
+        stats = get_plugin_cache().stats()["ctruncate"]
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 1))
+
+    def test_changed_parameters_are_reloaded(self):
+        cached = get_job_plugin(self.job, read_only=True)
+        plugin = get_job_plugin(self.job)
+        plugin.container.controlParameters.OUTPUTMINIMTZ.set(True)
+        plugin.saveDataToXml(str(self.job.directory / "input_params.xml"))
+
+        reloaded = get_job_plugin(self.job, read_only=True)
+        self.assertIsNot(reloaded, cached)
+        self.assertIs(reloaded.container.controlParameters.OUTPUTMINIMTZ.value, True)
+        self.assertEqual(len(get_plugin_cache()), 1)
+
+        self.assertEqual(invalidate_job_plugin(self.job), 1)
+        self.assertIsNot(get_job_plugin(self.job, read_only=True), reloaded)
+
+    def test_key_follows_parameter_file(self):
+        cache = JobPluginCache()
+        key = cache.key(self.job)
+        self.assertEqual(key[:2], (str(self.job.uuid), str(self.job.directory / "input_params.xml")))
+        cached = cache.get(self.job)
+
+        # Written by another process: a new mtime/size is a new entry
+        params = self.job.directory / "input_params.xml"
+        params.write_text(params.read_text() + "\n")
+        self.assertIsNot(cache.get(self.job), cached)
+        self.assertEqual(len(cache), 1)
+
+        # A finished job reads params.xml, which does not exist yet
+        self.job.status = models.Job.Status.FINISHED
+        self.assertEqual(cache.key(self.job)[1], str(params))
+
+    def test_bounded(self):
+        cache = JobPluginCache(max_size=1)
+        second = self.make_job("2")
+        cache.get(self.job)
+        cache.get(second)
+        self.assertEqual(len(cache), 1)
+        cache.get(second)
+        self.assertEqual(cache.stats()["ctruncate"]["hits"], 1)
+        self.assertEqual(cache.invalidate(second), 1)
+
+    def test_stats_endpoint(self):
+        get_job_plugin(self.job, read_only=True)
+        response = self.client.get("/plugin_cache/")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["size"], 1)
+        self.assertEqual(data["max_size"], plugin_cache.PLUGIN_CACHE_SIZE)
+        self.assertEqual(data["tasks"]["ctruncate"]["misses"], 1)
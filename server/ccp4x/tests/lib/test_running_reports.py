@@ -0,0 +1,145 @@
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+from xml.etree import ElementTree as ET
+
+from django.test import TestCase
+
+from ...db.models import Job, Project
+from ...lib.utils.jobs import reports
+from ...lib.utils.jobs.reports import RunningReportCache
+
+
+def test_cached_until_signature_changes():
+    cache = RunningReportCache(min_interval=0.0)
+    renders = []
+
+    def render():
+        renders.append(1)
+        return f"report {len(renders)}".encode()
+
+    assert cache.get("job", ("a",), render) == b"report 1"
+    assert cache.get("job", ("a",), render) == b"report 1"
+    assert cache.get("job", ("b",), render) == b"report 2"
+    assert cache.get("job", ("b",), render, force=True) == b"report 3"
+
+
+def test_min_interval_serves_previous_report():
+    cache = RunningReportCache(min_interval=60.0)
+    cache.get("job", 1, lambda: b"old")
+    assert cache.get("job", 2, lambda: b"new") == b"old"
+
+    cache.min_interval = 0.0
+    assert cache.get("job", 2, lambda: b"new") == b"new"
+
+
+def test_concurrent_requests_share_one_rendering():
+    cache = RunningReportCache(min_interval=0.0)
+    started = threading.Event()
+    release = threading.Event()
+    renders = []
+
+    def slow_render():
+        renders.append(1)
+        started.set()
+        release.wait(5)
+        return b"first"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("job", 1, slow_render)))
+               for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert renders == [1]
+    assert results == [b"first"] * 5
+
+
+def test_stale_report_served_while_rendering():
+    cache = RunningReportCache(min_interval=0.0)
+    cache.get("job", 1, lambda: b"old")
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_render():
+        started.set()
+        release.wait(5)
+        return b"new"
+
+    renderer = threading.Thread(target=cache.get, args=("job", 2, slow_render))
+    renderer.start()
+    assert started.wait(5)
+    assert cache.get("job", 2, lambda: b"unexpected") == b"old"
+    release.set()
+    renderer.join(5)
+    assert cache.get("job", 2, lambda: b"unexpected") == b"new"
+
+
+def test_failed_rendering_releases_waiters():
+    cache = RunningReportCache(min_interval=0.0)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    try:
+        cache.get("job", 1, fail)
+    except RuntimeError:
+        pass
+    assert cache.get("job", 1, lambda: b"ok") == b"ok"
+
+
+class RunningJobReportTestCase(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        project = Project.objects.create(name="Reports", directory=str(self.directory))
+        self.job = Job.objects.create(
+            project=project, number="1", title="Build", task_name="buccaneer_build_refine_mr",
+            status=Job.Status.RUNNING,
+        )
+        self.job.directory.mkdir(parents=True)
+        reports.running_reports.clear()
+        self.addCleanup(reports.running_reports.clear)
+
+        self.renders = 0
+
+        def make_report(job):
+            self.renders += 1
+            element = ET.Element("report")
+            ET.SubElement(element, "render").text = str(self.renders)
+            return element
+
+        patcher = mock.patch.object(reports, "make_old_report", side_effect=make_report)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def report(self, **kwargs):
+        result = reports.get_job_report_xml(self.job, **kwargs)
+        self.assertTrue(result.success)
+        return ET.fromstring(result.data).find("render").text
+
+    def test_polling_renders_once_until_program_xml_changes(self):
+        program_xml = self.job.directory / "program.xml"
+        program_xml.write_text("<cycle>1</cycle>")
+        self.assertEqual(self.report(), "1")
+        self.assertEqual(self.report(), "1")
+
+        program_xml.write_text("<cycle>1</cycle><cycle>2</cycle>")
+        with mock.patch.object(reports.running_reports, "min_interval", 0.0):
+            self.assertEqual(self.report(), "2")
+        self.assertEqual(self.report(regenerate=True), "3")
+
+    def test_finished_job_uses_report_file(self):
+        self.assertEqual(self.report(), "1")
+        self.job.status = Job.Status.FINISHED
+        self.job.save()
+        self.assertEqual(self.report(), "2")
+        self.assertTrue((self.job.directory / "report_xml.xml").exists())
@@ -0,0 +1,117 @@
+import os
+import pathlib
+import tempfile
+import threading
+import time
+
+import pytest
+
+from ...lib.utils.jobs.worker_pool import WorkerPool, pool_status, submit_job
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def workdir():
+    # Unix socket paths are limited to ~100 characters, so avoid deep tmp_path
+    with tempfile.TemporaryDirectory(prefix="pool") as directory:
+        yield pathlib.Path(directory)
+
+
+def test_worker_pool_caps_concurrency_and_queues(workdir):
+    release = workdir / "release"
+
+    def run_job(job_uuid):
+        (workdir / f"{job_uuid}.started").write_text(str(os.getpid()))
+        while not release.exists():
+            time.sleep(0.01)
+        (workdir / f"{job_uuid}.done").touch()
+
+    socket_path = workdir / "pool.sock"
+    pool = WorkerPool(run_job, max_workers=1, socket_path=socket_path)
+    server = threading.Thread(target=pool.serve_forever, kwargs={"poll_interval": 0.02})
+    server.start()
+    try:
+        assert pool.wait_until_ready(5)
+
+        first = submit_job("job-1", socket_path=socket_path)
+        second = submit_job("job-2", socket_path=socket_path)
+        assert first == {"ok": True, "state": "running", "position": 0}
+        assert second == {"ok": True, "state": "queued", "position": 0}
+
+        # Resubmitting a queued job does not queue it twice
+        assert submit_job("job-2", socket_path=socket_path)["position"] == 0
+
+        status = pool_status(socket_path=socket_path)
+        assert status["running"] == ["job-1"]
+        assert status["queued"] == ["job-2"]
+
+        assert _wait_for((workdir / "job-1.started").exists)
+        assert int((workdir / "job-1.started").read_text()) != os.getpid()
+        assert not (workdir / "job-2.started").exists()
+
+        release.touch()
+        assert _wait_for((workdir / "job-2.done").exists)
+        assert _wait_for(lambda: pool_status(socket_path=socket_path)["running"] == [])
+    finally:
+        pool.shutdown()
+        server.join(5)
+        pool.wait_for_jobs(5)
+
+    assert not socket_path.exists()
+
+
+def test_queued_jobs_are_released_on_stop(workdir):
+    release = workdir / "release"
+    released = []
+
+    def run_job(job_uuid):
+        while not release.exists():
+            time.sleep(0.01)
+
+    socket_path = workdir / "pool.sock"
+    pool = WorkerPool(
+        run_job, max_workers=1, socket_path=socket_path, release_jobs=released.extend
+    )
+    server = threading.Thread(target=pool.serve_forever, kwargs={"poll_interval": 0.02})
+    server.start()
+    try:
+        assert pool.wait_until_ready(5)
+        for job_uuid in ("job-1", "job-2", "job-3"):
+            submit_job(job_uuid, socket_path=socket_path)
+    finally:
+        pool.shutdown()
+        server.join(5)
+        release.touch()
+        pool.wait_for_jobs(5)
+
+    assert released == ["job-2", "job-3"]
+    assert pool.status()["queued"] == []
+
+
+def test_submit_without_pool_raises(workdir):
+    with pytest.raises(OSError):
+        submit_job("job-1", socket_path=workdir / "missing.sock")
+
+
+def test_second_pool_on_same_socket_is_refused(workdir):
+    socket_path = workdir / "pool.sock"
+    pool = WorkerPool(lambda job_uuid: None, max_workers=1, socket_path=socket_path)
+    server = threading.Thread(target=pool.serve_forever, kwargs={"poll_interval": 0.02})
+    server.start()
+    try:
+        assert pool.wait_until_ready(5)
+        with pytest.raises(RuntimeError):
+            WorkerPool(lambda job_uuid: None, socket_path=socket_path).serve_forever()
+    finally:
+        pool.shutdown()
+        server.join(5)
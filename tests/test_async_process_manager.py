@@ -6,6 +6,7 @@ Tests the new asyncio-based process manager that replaces Qt's QProcess.
 
 import pytest
 import asyncio
+import sys
 import time
 from pathlib import Path
 from core.async_process_manager import AsyncProcessManager
@@ -277,5 +278,189 @@ class TestAsyncProcessManager:
         assert pid1 not in running
 
 
+# Prints three lines with pauses so that each arrives as a separate chunk
+STREAMING_SCRIPT = (
+    "import sys, time\n"
+    "for i in range(3):\n"
+    "    print(f'cycle {i}', flush=True)\n"
+    "    print(f'warning {i}', file=sys.stderr, flush=True)\n"
+    "    time.sleep(0.2)\n"
+)
+
+
+class TestOutputStreaming:
+    """Live stdout/stderr streaming to callbacks and legacy readyRead slots."""
+
+    def test_output_handler_receives_chunks_while_running(self, tmp_path):
+        pm = AsyncProcessManager()
+        log_file = tmp_path / 'stream.log'
+        err_file = tmp_path / 'stream_err.txt'
+        seen = []
+
+        def on_output(pid, stream, data):
+            # Chunks are logged before the handler is called
+            log_text = (log_file if stream == 'stdout' else err_file).read_text()
+            seen.append((stream, data.decode(), data.decode() in log_text,
+                         pm.getJobData(pid, 'status')))
+
+        pid = pm.startProcess(
+            command=sys.executable,
+            args=['-c', STREAMING_SCRIPT],
+            logFile=str(log_file),
+            stderrFile=str(err_file),
+            outputHandler=on_output,
+            ifAsync=False,
+        )
+
+        assert pm.getJobData(pid, 'exitCode') == 0
+        stdout_chunks = [text for stream, text, _, _ in seen if stream == 'stdout']
+        assert stdout_chunks == ['cycle 0\n', 'cycle 1\n', 'cycle 2\n']
+        assert all(logged for _, _, logged, _ in seen)
+        assert all(status == 'running' for _, _, _, status in seen)
+        assert log_file.read_text() == 'cycle 0\ncycle 1\ncycle 2\n'
+        assert 'warning 2' in err_file.read_text()
+
+    def test_async_output_handler_applies_backpressure(self):
+        pm = AsyncProcessManager()
+        chunks = []
+
+        async def slow_consumer(pid, stream, data):
+            await asyncio.sleep(0.05)
+            chunks.append(data)
+
+        script = "for i in range(2000): print('x' * 79)"
+        pid = pm.startProcess(
+            command=sys.executable,
+            args=['-c', script],
+            outputHandler=slow_consumer,
+            ifAsync=False,
+        )
+
+        assert pm.getJobData(pid, 'exitCode') == 0
+        data = b''.join(chunks)
+        assert data.count(b'\n') == 2000
+        # Whole lines only, delivered in bounded chunks
+        assert all(chunk.endswith(b'\n') for chunk in chunks)
+        assert max(len(chunk) for chunk in chunks) <= 2 * 65536
+
+    def test_legacy_ready_read_slot(self, tmp_path):
+        from core.async_process_manager import QProcessOutputBuffer
+
+        pm = AsyncProcessManager()
+        log_file = tmp_path / 'legacy.log'
+        buffer = QProcessOutputBuffer()
+        collected = {'stdout': '', 'stderr': '', 'calls': 0}
+
+        def handleReadyReadStandardOutput():
+            collected['stdout'] += buffer.readAllStandardOutput().data().decode('utf-8')
+            collected['stderr'] += buffer.readAllStandardError().data().decode('utf-8')
+            collected['calls'] += 1
+
+        pid = pm.startProcess(
+            command=sys.executable,
+            args=['-c', STREAMING_SCRIPT],
+            logFile=str(log_file),
+            readyReadStandardOutputHandler=handleReadyReadStandardOutput,
+            outputBuffer=buffer,
+            ifAsync=False,
+        )
+
+        assert pm.getJobData(pid, attribute='qprocess') is buffer
+        assert collected['stdout'] == 'cycle 0\ncycle 1\ncycle 2\n'
+        assert collected['stderr'] == 'warning 0\nwarning 1\nwarning 2\n'
+        assert collected['calls'] >= 3
+        # The legacy slot owns the log file, as with QProcess
+        assert not log_file.exists()
+
+    def test_plugin_ready_read_handler_runs_live(self, tmp_path):
+        """A refmac_i2-style wrapper gets its output through the qprocess shim."""
+        from core import CCP4Modules
+        from core.CCP4PluginScript import CPluginScript
+
+        class StreamingPlugin(CPluginScript):
+            TASKNAME = 'streaming_test'
+            TASKCOMMAND = sys.executable
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self._readyReadStandardOutputHandler = self.handleReadyReadStandardOutput
+                self.scraped = []
+
+            def handleReadyReadStandardOutput(self):
+                if not hasattr(self, 'logFileHandle'):
+                    self.logFileHandle = open(self.makeFileName('LOG'), 'a')
+                pid = self.getProcessId()
+                qprocess = CCP4Modules.PROCESSMANAGER().getJobData(pid, attribute='qprocess')
+                availableStdout = qprocess.readAllStandardOutput().data().decode('utf-8')
+                qprocess.readAllStandardError()
+                self.logFileHandle.write(availableStdout)
+                self.logFileHandle.flush()
+                self.scraped.extend(availableStdout.splitlines())
+
+        plugin = StreamingPlugin(workDirectory=str(tmp_path), name='streaming_test')
+        plugin.commandLine = ['-c', STREAMING_SCRIPT]
+        error = plugin.startProcess()
+        plugin.logFileHandle.close()
+
+        assert error.maxSeverity() == 0
+        assert plugin.scraped == ['cycle 0', 'cycle 1', 'cycle 2']
+        log_text = Path(plugin.makeFileName('LOG')).read_text()
+        assert log_text.startswith('=' * 70 + '\nCCP4i2 Task: streaming_test\n')
+        assert log_text.endswith('Program Output:\n' + '=' * 70 + '\n\ncycle 0\ncycle 1\ncycle 2\n')
+
+    def test_streaming_plugin_log_has_sync_header(self, tmp_path):
+        from core.CCP4PluginScript import CPluginScript
+
+        class StreamingPlugin(CPluginScript):
+            TASKNAME = 'streaming_test'
+            TASKCOMMAND = sys.executable
+
+        def run(streaming):
+            directory = tmp_path / ('streamed' if streaming else 'plain')
+            plugin = StreamingPlugin(workDirectory=str(directory), name='streaming_test')
+            plugin.commandLine = ['-c', STREAMING_SCRIPT]
+            plugin.commandScript = ['TITLE test\n']
+            if streaming:
+                plugin._processOutputHandler = lambda pid, stream, data: None
+            assert plugin.startProcess().maxSeverity() == 0
+            return Path(plugin.makeFileName('LOG')).read_text().replace(str(directory), '')
+
+        assert run(streaming=True) == run(streaming=False)
+
+
+    def test_sync_start_from_manager_loop_is_refused(self):
+        from core.async_process_manager import EventLoopUnavailable
+
+        pm = AsyncProcessManager()
+
+        async def start():
+            return pm.startProcess(command=sys.executable, args=['-c', 'pass'], ifAsync=False)
+
+        # Waiting there would block the loop that has to run the process
+        future = asyncio.run_coroutine_threadsafe(start(), pm._get_loop())
+        with pytest.raises(EventLoopUnavailable):
+            future.result(timeout=10)
+
+    def test_plugin_on_manager_loop_runs_without_streaming(self, tmp_path):
+        from core.CCP4PluginScript import CPluginScript
+
+        class StreamingPlugin(CPluginScript):
+            TASKNAME = 'streaming_test'
+            TASKCOMMAND = sys.executable
+
+        plugin = StreamingPlugin(workDirectory=str(tmp_path), name='streaming_test')
+        plugin.commandLine = ['-c', STREAMING_SCRIPT]
+        plugin._processOutputHandler = lambda pid, stream, data: None
+
+        async def start():
+            return plugin.startProcess()
+
+        pm = AsyncProcessManager()
+        error = asyncio.run_coroutine_threadsafe(start(), pm._get_loop()).result(timeout=30)
+
+        assert error.maxSeverity() == 0
+        assert 'cycle 2' in Path(plugin.makeFileName('LOG')).read_text()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v', '-s'])
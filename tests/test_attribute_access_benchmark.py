@@ -0,0 +1,146 @@
+"""
+Microbenchmarks for CData attribute access: reads, writes and traversal.
+
+Plain attribute and method reads on CData objects use the normal CPython lookup;
+children are resolved from the hierarchy only when that lookup misses. These
+benchmarks report the cost of each access pattern next to a plain Python object
+baseline. Run directly for a table, or under pytest with -s:
+
+    python tests/test_attribute_access_benchmark.py
+    pytest -s tests/test_attribute_access_benchmark.py
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.base_object.base_classes import CContainer
+from core.base_object.fundamental_types import CInt
+from core.task_manager.def_xml_handler import DefXmlParser
+
+CCP4I2_ROOT = Path(os.environ.get("CCP4I2_ROOT", Path(__file__).parent.parent))
+PROSMART_REFMAC = CCP4I2_ROOT / "pipelines" / "prosmart_refmac" / "script" / "prosmart_refmac.def.xml"
+
+NUMBER = 20000
+REPEATS = 5
+
+
+class _PlainLeaf:
+    """Baseline: an ordinary Python object with a method and an attribute."""
+
+    def __init__(self):
+        self.payload = 1
+
+    def isSet(self):
+        return True
+
+
+def best_time(stmt, number=NUMBER, repeats=REPEATS):
+    """Best per-call time in nanoseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=repeats)) / number * 1e9
+
+
+def walk(obj):
+    """Visit every descendant through children() and read its value if any."""
+    count = 1
+    for child in obj.children():
+        getattr(child, "value", None)
+        count += walk(child)
+    return count
+
+
+def build_container():
+    """A container shaped like a task: container.controlParameters.NCYCLES."""
+    container = CContainer(name="container")
+    container.controlParameters = CContainer(name="controlParameters")
+    container.controlParameters.NCYCLES = CInt(10, name="NCYCLES")
+    for i in range(50):
+        setattr(container.controlParameters, f"PARAM_{i}", CInt(i, name=f"PARAM_{i}"))
+    return container
+
+
+def run_benchmarks():
+    """Return a list of (label, nanoseconds per operation) rows."""
+    container = build_container()
+    ctrl = container.controlParameters
+    leaf = ctrl.NCYCLES
+    plain = _PlainLeaf()
+
+    rows = [
+        ("plain object attribute read", best_time(lambda: plain.payload)),
+        ("plain object method lookup", best_time(lambda: plain.isSet)),
+        ("CData method lookup (leaf.isSet)", best_time(lambda: leaf.isSet)),
+        ("CData slot read (leaf._qualifiers)", best_time(lambda: leaf._qualifiers)),
+        ("CInt property read (leaf.value)", best_time(lambda: leaf.value)),
+        ("CData get_qualifier('min')", best_time(lambda: leaf.get_qualifier("min"))),
+        ("child read (ctrl.NCYCLES)", best_time(lambda: ctrl.NCYCLES)),
+        ("child chain (container.controlParameters.NCYCLES)",
+         best_time(lambda: container.controlParameters.NCYCLES)),
+        ("value write (leaf.value = 5)", best_time(lambda: setattr(leaf, "value", 5))),
+        ("smart write (ctrl.NCYCLES = 5)", best_time(lambda: setattr(ctrl, "NCYCLES", 5))),
+    ]
+
+    if PROSMART_REFMAC.exists():
+        task = DefXmlParser().parse_def_xml(PROSMART_REFMAC)
+        nodes = walk(task)
+        rows.append((f"traversal per node (prosmart_refmac, {nodes} nodes)",
+                     best_time(lambda: walk(task), number=20) / nodes))
+    return rows
+
+
+def print_report(rows):
+    print("\n" + "=" * 78)
+    print("BENCHMARK: CData attribute access")
+    print("=" * 78)
+    for label, nanoseconds in rows:
+        print(f"{label:60s} {nanoseconds:10.1f} ns")
+    print("=" * 78)
+
+
+def test_attribute_access_semantics():
+    """Children, methods and values resolve as before."""
+    container = build_container()
+    ctrl = container.controlParameters
+
+    assert ctrl.NCYCLES is ctrl.find_child("NCYCLES")
+    assert container.controlParameters.NCYCLES.value == 10
+    ctrl.NCYCLES = 25
+    assert ctrl.NCYCLES.value == 25
+    assert callable(ctrl.NCYCLES.isSet)
+    with pytest.raises(AttributeError):
+        ctrl.DOES_NOT_EXIST
+
+
+def test_child_takes_precedence_over_class_attribute():
+    """A child named like a class attribute shadows it only where it exists."""
+
+    class _Annotated(CContainer):
+        label = None
+
+    with_child = _Annotated(name="with_child")
+    with_child.label = CInt(3, name="label")
+    without_child = _Annotated(name="without_child")
+
+    assert isinstance(with_child.label, CInt)
+    assert with_child.label.value == 3
+    assert without_child.label is None
+    assert _Annotated.label is None
+
+
+def test_benchmark_attribute_access():
+    """Report access costs; non-child reads must stay close to plain Python."""
+    rows = dict(run_benchmarks())
+    print_report(rows.items())
+
+    plain = rows["plain object method lookup"]
+    assert rows["CData method lookup (leaf.isSet)"] < plain * 4 + 50
+
+
+if __name__ == "__main__":
+    print_report(run_benchmarks())
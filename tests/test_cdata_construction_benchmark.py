@@ -0,0 +1,188 @@
+"""
+Benchmark CData container construction for the largest .def.xml files.
+
+Reports, per container, the number of CData nodes, the number of Python objects
+allocated by one build, traced memory and the best-of-N build time. Run directly
+for a table, or under pytest with -s to see the report:
+
+    python tests/test_cdata_construction_benchmark.py
+    pytest -s tests/test_cdata_construction_benchmark.py
+
+Requires:
+- CCP4I2_ROOT environment variable (or running from the source tree)
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.task_manager.def_xml_handler import DefXmlParser, DefXmlTemplateCache
+
+CCP4I2_ROOT = Path(os.environ.get("CCP4I2_ROOT", Path(__file__).parent.parent))
+
+# Largest def.xml files in the tree (prosmart_refmac for its inheritance chain)
+DEF_XML_FILES = [
+    "wrappers/xia2_dials/script/xia2_dials.def.xml",
+    "wrappers/phaser_phil/script/phaser_phil.def.xml",
+    "wrappers/xia2_xds/script/xia2_xds.def.xml",
+    "pipelines/prosmart_refmac/script/prosmart_refmac.def.xml",
+]
+
+REPEATS = 3
+
+
+def count_nodes(obj):
+    """Count obj and all of its hierarchical descendants."""
+    return 1 + sum(count_nodes(child) for child in obj.children())
+
+
+def measure_build(parser, template, repeats=REPEATS):
+    """
+    Build one container from template and measure it.
+
+    Returns:
+        dict with nodes, objects (gc-tracked allocations), memory (bytes) and
+        seconds (best of repeats)
+    """
+    # Warm-up build so lazy imports and per-class tables are not counted
+    container = parser.build_from_template(template)
+    nodes = count_nodes(container)
+    del container
+    gc.collect()
+
+    gc.disable()
+    try:
+        before = len(gc.get_objects())
+        container = parser.build_from_template(template)
+        objects = len(gc.get_objects()) - before
+    finally:
+        gc.enable()
+    del container
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        container = parser.build_from_template(template)
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del container
+    gc.collect()
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        container = parser.build_from_template(template)
+        timings.append(time.perf_counter() - start)
+        del container
+        gc.collect()
+
+    return {
+        "nodes": nodes,
+        "objects": objects,
+        "memory": memory,
+        "seconds": min(timings),
+    }
+
+
+def run_benchmark(def_xml_files=DEF_XML_FILES):
+    """Measure every available def.xml file and return rows of results."""
+    parser = DefXmlParser(template_cache=DefXmlTemplateCache())
+    rows = []
+    for relative_path in def_xml_files:
+        def_xml = CCP4I2_ROOT / relative_path
+        if not def_xml.exists():
+            continue
+        template = parser.compile_def_xml(def_xml)
+        result = measure_build(parser, template)
+        result["task"] = template.task_name or def_xml.name
+        rows.append(result)
+    return rows
+
+
+def print_report(rows):
+    print("\n" + "=" * 78)
+    print("BENCHMARK: CData container construction from compiled def.xml templates")
+    print("=" * 78)
+    print(f"{'task':24s} {'nodes':>7s} {'objects':>9s} {'obj/node':>9s} {'memory':>10s} {'build':>10s}")
+    for row in rows:
+        print(
+            f"{row['task']:24s} {row['nodes']:7d} {row['objects']:9d} "
+            f"{row['objects'] / row['nodes']:9.1f} {row['memory'] / 1e6:8.2f}MB "
+            f"{row['seconds'] * 1000:8.1f}ms"
+        )
+    print("=" * 78)
+
+
+def test_benchmark_container_construction():
+    """Build the largest containers and report object count and build time."""
+    rows = run_benchmark()
+    if not rows:
+        pytest.skip("No benchmark def.xml files available")
+
+    print_report(rows)
+
+    for row in rows:
+        assert row["nodes"] > 100
+        # Each node is a handful of objects (the instance, its child set and
+        # name dicts, a parent weakref) - signals and locks are created lazily
+        assert row["objects"] / row["nodes"] < 12
+
+
+def test_core_signals_created_on_first_use():
+    """Unconnected objects carry no signal manager, but connecting still works."""
+    from core.base_object.base_classes import CContainer
+    from core.base_object.fundamental_types import CInt
+
+    container = CContainer(name="container")
+    leaf = CInt(1, name="leaf")
+    leaf.set_parent(container)
+    assert container._signals is None
+    assert leaf._signals is None
+
+    added = []
+    container.child_added.connect(added.append)
+    other = CInt(2, name="other")
+    other.set_parent(container)
+
+    assert added == [other]
+    assert container.get_signal("child_added") is container.child_added
+
+
+def test_handlers_run_without_hierarchy_lock():
+    """Signal and event handlers can wait on other threads using the hierarchy."""
+    import threading
+
+    from core.base_object.base_classes import CContainer
+    from core.base_object.fundamental_types import CInt
+
+    def other_thread_builds():
+        # Blocks for the timeout if the caller still holds the shared lock
+        thread = threading.Thread(target=lambda: CInt(3, name="built").set_parent(CContainer()))
+        thread.start()
+        thread.join(timeout=2)
+        return not thread.is_alive()
+
+    container = CContainer(name="container")
+    results = []
+    container.child_added.connect(lambda child: results.append(("added", other_thread_builds())))
+    container.install_event_handler(
+        "changed", lambda obj, event, data: results.append(("event", other_thread_builds()))
+    )
+    leaf = CInt(1, name="leaf")
+    leaf.set_parent(container)
+    leaf.emit_event("changed")
+
+    assert results == [("added", True), ("event", True)]
+
+
+if __name__ == "__main__":
+    print_report(run_benchmark())
@@ -0,0 +1,131 @@
+"""Tests for the NumPy mask evaluator of mmdb-style coordinate selections."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+gemmi = pytest.importorskip("gemmi")
+
+from core.coordinate_selection import (
+    AtomSelection, AtomTable, SelectionEvaluator, compile_selection,
+    evaluate_selection, parse_selection,
+)
+from core.coordinate_selection import evaluator as evaluator_module
+
+# (record, atom, altloc, residue, chain, seq, icode, element)
+ATOMS = [
+    ("ATOM", "N", "", "ALA", "A", 1, "", "N"),
+    ("ATOM", "CA", "", "ALA", "A", 1, "", "C"),
+    ("ATOM", "N", "", "GLY", "A", 2, "", "N"),
+    ("ATOM", "CA", "A", "GLY", "A", 2, "", "C"),
+    ("ATOM", "CA", "B", "GLY", "A", 2, "", "C"),
+    ("ATOM", "N", "", "SER", "A", 2, "A", "N"),
+    ("ATOM", "CA", "", "SER", "A", 2, "A", "C"),
+    ("ATOM", "N", "", "ALA", "B", 10, "", "N"),
+    ("ATOM", "CA", "", "ALA", "B", 10, "", "C"),
+    ("HETATM", "ZN", "", "ZN", "B", 11, "", "ZN"),
+    ("HETATM", "O", "", "HOH", "C", 1, "", "O"),
+]
+
+
+def pdb_string(models=1):
+    lines = []
+    for model in range(1, models + 1):
+        lines.append(f"MODEL     {model:4d}")
+        for serial, (record, name, alt, res, chain, seq, icode, elem) in enumerate(ATOMS, 1):
+            lines.append(
+                f"{record:<6}{serial:5d} {name:^4}{alt:1}{res:>3} {chain:1}{seq:4d}{icode:1}   "
+                f"{serial:8.3f}{model:8.3f}{0.0:8.3f}{1.0:6.2f}{20.0:6.2f}          {elem:>2}"
+            )
+        lines.append("ENDMDL")
+    return "\n".join(lines + ["END", ""])
+
+
+@pytest.fixture
+def structure():
+    return gemmi.read_pdb_string(pdb_string(models=2))
+
+
+def describe(selected):
+    return [
+        (model.num, chain.name, residue.seqid.num, residue.name, atom.name, atom.altloc)
+        for model, chain, residue, atom in selected
+    ]
+
+
+def select(structure, selection):
+    return describe(evaluate_selection(parse_selection(selection), structure))
+
+
+def test_cid_fields(structure):
+    assert select(structure, "/1/A/2.A/N") == [(1, "A", 2, "SER", "N", "\0")]
+    assert select(structure, "/2/A/2/CA:B") == [(2, "A", 2, "GLY", "CA", "B")]
+    assert [a[2:5] for a in select(structure, "/1/B/*/*[Zn]")] == [(11, "ZN", "ZN")]
+    assert len(select(structure, "/1/A/1-2/CA")) == 4
+    assert len(select(structure, "(ALA,SER)")) == 12
+
+
+def test_logical_operators_keep_structure_order(structure):
+    selected = select(structure, "{A/* or B/*} and not {(HOH) or CA[C]}")
+    assert [(atom[0], atom[2], atom[4]) for atom in selected] == [
+        (model, seq, name)
+        for model in (1, 2)
+        for seq, name in ((1, "N"), (2, "N"), (2, "N"), (10, "N"), (11, "ZN"))
+    ]
+    assert len(select(structure, "not (HOH)")) == 2 * (len(ATOMS) - 1)
+
+
+def test_sparse_and_columnar_atom_matching_agree(structure, monkeypatch):
+    selections = ["A/2/CA", "/1/A/2.A/N", "B/*/ZN[Zn]", "CA[C]:A"]
+    monkeypatch.setattr(evaluator_module, "SPARSE_CANDIDATE_FRACTION", 1)
+    table = AtomTable(structure)
+    sparse = [describe(SelectionEvaluator(structure, table).select(parse_selection(s)))
+              for s in selections[:3]]
+    assert not any(table.has_column(c) for c in ("atom_name", "element", "alt_loc"))
+    # Without residue-level fields every atom is a candidate
+    sparse.append(describe(SelectionEvaluator(structure, table).select(parse_selection(selections[3]))))
+    assert table.has_column("atom_name")
+
+    monkeypatch.setattr(evaluator_module, "SPARSE_CANDIDATE_FRACTION", 10 ** 6)
+    dense = [describe(SelectionEvaluator(structure, AtomTable(structure)).select(parse_selection(s)))
+             for s in selections]
+    assert sparse == dense
+    assert [len(atoms) for atoms in dense] == [6, 1, 2, 2]
+
+
+def test_selection_is_lazy_sequence(structure):
+    selection = SelectionEvaluator(structure).select(parse_selection("A/*/CA"))
+    assert isinstance(selection, AtomSelection)
+    assert len(selection) == 8
+    assert selection.mask.sum() == 8
+    model, chain, residue, atom = selection[-1]
+    assert (model.num, residue.name, atom.name) == (2, "SER", "CA")
+    assert describe(selection[:2]) == describe(list(selection)[:2])
+
+
+def test_compiled_selections_are_cached():
+    assert compile_selection("A/27/CA") is compile_selection("A/27/CA")
+    assert compile_selection("A/27/CA") == parse_selection("A/27/CA")
+
+
+def test_interpret_and_write_selection(structure, tmp_path):
+    from core.CCP4ModelData import CPdbData
+
+    path = tmp_path / "model.pdb"
+    path.write_text(pdb_string())
+    pdb_data = CPdbData()
+    pdb_data.loadFile(str(path))
+
+    count, selected = pdb_data.interpretSelection("A/* and not CA[C]")
+    assert count == 3
+    table = pdb_data._atom_table
+    assert pdb_data.interpretSelection("B/*")[0] == 3
+    assert pdb_data._atom_table is table
+
+    output = tmp_path / "selected.pdb"
+    assert pdb_data.writeSelection(selected, str(output)) == 0
+    written = gemmi.read_structure(str(output))
+    assert [atom.name for residue in written[0]["A"] for atom in residue] == ["N", "N", "N"]
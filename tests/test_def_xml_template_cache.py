@@ -0,0 +1,164 @@
+"""
+Tests for compiled, cached .def.xml templates (DefXmlParser.compile_def_xml).
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.task_manager.def_xml_handler import (
+    DefXmlParser,
+    DefXmlTemplate,
+    DefXmlTemplateCache,
+)
+from core.base_object.base_classes import ValueState
+
+SAMPLE_DEF_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<ns0:ccp4i2 xmlns:ns0="http://www.ccp4.ac.uk/ccp4ns">
+  <ccp4i2_body id="cache_test">
+    <container id="inputData">
+      <content id="XYZIN">
+        <className>CPdbDataFile</className>
+        <qualifiers>
+          <mustExist>True</mustExist>
+        </qualifiers>
+      </content>
+      <content id="DICT_LIST">
+        <className>CList</className>
+        <subItem>
+          <className>CDictDataFile</className>
+          <qualifiers>
+            <mustExist>True</mustExist>
+          </qualifiers>
+        </subItem>
+      </content>
+    </container>
+    <container id="controlParameters">
+      <content id="NCYCLES">
+        <className>CInt</className>
+        <qualifiers>
+          <default>{ncycles}</default>
+          <min>1</min>
+        </qualifiers>
+      </content>
+      <content id="MODE">
+        <className>CString</className>
+        <qualifiers>
+          <enumerators>a,b,c</enumerators>
+          <default>a</default>
+        </qualifiers>
+      </content>
+    </container>
+  </ccp4i2_body>
+</ns0:ccp4i2>
+"""
+
+
+def _write(path, ncycles=10):
+    path.write_text(SAMPLE_DEF_XML.format(ncycles=ncycles))
+    # Make sure the mtime moves even on filesystems with coarse timestamps
+    stamp = time.time() + ncycles
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.fixture
+def parser():
+    return DefXmlParser(template_cache=DefXmlTemplateCache(maxsize=4))
+
+
+def test_compile_is_cached(parser, tmp_path):
+    def_xml = tmp_path / "cache_test.def.xml"
+    _write(def_xml)
+
+    first = parser.compile_def_xml(def_xml)
+    second = parser.compile_def_xml(def_xml)
+
+    assert isinstance(first, DefXmlTemplate)
+    assert first is second
+    assert first.task_name == "cache_test"
+    assert parser.template_cache.misses == 1
+    assert parser.template_cache.hits == 1
+
+
+def test_builds_are_independent(parser, tmp_path):
+    def_xml = tmp_path / "cache_test.def.xml"
+    _write(def_xml)
+
+    first = parser.parse_def_xml(def_xml)
+    second = parser.parse_def_xml(def_xml)
+
+    assert first is not second
+    assert first.controlParameters.NCYCLES.value == 10
+    assert first.controlParameters.NCYCLES.getValueState() == ValueState.DEFAULT
+    assert first.inputData.DICT_LIST.get_qualifier('subItem')['class'].__name__ == 'CDictDataFile'
+
+    # Mutating one build must not leak into the template or other builds
+    first.controlParameters.NCYCLES.value = 3
+    first.controlParameters.MODE.get_qualifier('enumerators').append('d')
+    assert second.controlParameters.NCYCLES.value == 10
+    assert second.controlParameters.MODE.get_qualifier('enumerators') == ['a', 'b', 'c']
+    assert parser.parse_def_xml(def_xml).controlParameters.MODE.get_qualifier('enumerators') == ['a', 'b', 'c']
+
+
+def test_recompiles_when_file_changes(parser, tmp_path):
+    def_xml = tmp_path / "cache_test.def.xml"
+    _write(def_xml, ncycles=10)
+    assert parser.parse_def_xml(def_xml).controlParameters.NCYCLES.value == 10
+
+    _write(def_xml, ncycles=20)
+    assert parser.parse_def_xml(def_xml).controlParameters.NCYCLES.value == 20
+
+
+def test_inherited_parents_are_dependencies(parser):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    def_xml = os.path.join(root, 'pipelines', 'prosmart_refmac', 'script', 'prosmart_refmac.def.xml')
+    if not os.path.exists(def_xml):
+        pytest.skip("prosmart_refmac.def.xml not available")
+
+    template = parser.compile_def_xml(def_xml)
+    dependency_names = [os.path.basename(path) for path, _ in template.dependencies]
+
+    assert dependency_names[0] == 'prosmart_refmac.def.xml'
+    assert len(dependency_names) > 1
+    assert template.is_current()
+
+
+def test_disk_cache_round_trip(tmp_path):
+    def_xml = tmp_path / "cache_test.def.xml"
+    _write(def_xml)
+    cache_dir = tmp_path / "cache"
+
+    writer = DefXmlParser(template_cache=DefXmlTemplateCache(cache_dir=cache_dir))
+    compiled = writer.compile_def_xml(def_xml)
+    assert list(cache_dir.glob("*.pickle"))
+
+    # A fresh cache (e.g. another process) loads the pickle instead of recompiling
+    reader = DefXmlParser(template_cache=DefXmlTemplateCache(cache_dir=cache_dir))
+    loaded = reader.compile_def_xml(def_xml)
+    assert loaded == compiled
+    assert reader.template_cache.hits == 1
+    assert reader.template_cache.misses == 0
+
+    # Stale pickles are ignored
+    _write(def_xml, ncycles=30)
+    stale_reader = DefXmlParser(template_cache=DefXmlTemplateCache(cache_dir=cache_dir))
+    assert stale_reader.parse_def_xml(def_xml).controlParameters.NCYCLES.value == 30
+
+
+def test_lru_eviction(tmp_path):
+    cache = DefXmlTemplateCache(maxsize=2)
+    parser = DefXmlParser(template_cache=cache)
+    paths = []
+    for i in range(3):
+        def_xml = tmp_path / f"task{i}.def.xml"
+        _write(def_xml)
+        paths.append(def_xml)
+        parser.compile_def_xml(def_xml)
+
+    assert cache.get(paths[0].absolute()) is None
+    assert cache.get(paths[2].absolute()) is not None
@@ -0,0 +1,192 @@
+"""
+Tests for core/file_watcher.py and CPluginScript.watchFile()/watchDirectory().
+
+Every behaviour is checked with both the inotify and the stat-polling backend.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from core.async_process_manager import ASYNC_PROCESSMANAGER
+from core.file_watcher import FileWatcher
+
+HAS_INOTIFY = sys.platform.startswith("linux")
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request):
+    if request.param == "inotify" and not HAS_INOTIFY:
+        pytest.skip("inotify requires Linux")
+    watcher = FileWatcher(
+        loop=ASYNC_PROCESSMANAGER()._get_loop(),
+        use_inotify=request.param == "inotify",
+        coalesce_delay=0.05,
+        poll_interval=0.05,
+    )
+    assert watcher.backend == request.param
+    yield watcher
+    watcher.close()
+
+
+def append(path, text):
+    with open(path, "a") as handle:
+        handle.write(text)
+
+
+def test_file_created_after_watch(watcher, tmp_path):
+    path = tmp_path / "program.log"
+    calls = []
+    watcher.watch_file(path, calls.append)
+
+    append(path, "started\n")
+    assert wait_for(lambda: calls)
+    assert calls[0] == os.fspath(path)
+
+
+def test_burst_of_writes_is_coalesced(watcher, tmp_path):
+    path = tmp_path / "program.log"
+    path.write_text("")
+    calls = []
+    watch = watcher.watch_file(path, calls.append)
+
+    with open(path, "a") as handle:
+        for line in range(200):
+            handle.write(f"line {line}\n")
+            handle.flush()
+    assert wait_for(lambda: calls)
+    time.sleep(0.3)
+    assert 1 <= watch.calls <= 3
+
+
+def test_min_delta_size(watcher, tmp_path):
+    path = tmp_path / "program.xml"
+    path.write_text("")
+    sizes = []
+    watcher.watch_file(path, lambda p: sizes.append(os.path.getsize(p)), min_delta_size=100)
+
+    append(path, "x" * 10)
+    time.sleep(0.3)
+    assert sizes == []
+
+    append(path, "x" * 100)
+    assert wait_for(lambda: sizes == [110])
+
+    # A rewritten (shorter) file counts from zero again
+    path.write_text("y" * 105)
+    assert wait_for(lambda: sizes == [110, 105])
+
+
+def test_unwatch_while_handling_discards_handler_writes(watcher, tmp_path):
+    path = tmp_path / "data.json"
+    calls = []
+
+    def handler(p):
+        calls.append(p)
+        # The handler touching its own file must not retrigger it
+        append(p, "handled\n")
+        time.sleep(0.15)
+
+    watcher.watch_file(path, handler, unwatch_while_handling=True)
+    append(path, "{}\n")
+    assert wait_for(lambda: calls)
+    time.sleep(0.4)
+    assert len(calls) == 1
+
+
+def test_changes_while_handling_run_handler_again(watcher, tmp_path):
+    path = tmp_path / "program.log"
+    release = threading.Event()
+    running = []
+    calls = []
+
+    def handler(p):
+        running.append(1)
+        assert len(running) == 1, "handler calls overlapped"
+        calls.append(p)
+        release.wait(5)
+        running.pop()
+
+    watcher.watch_file(path, handler)
+    append(path, "first\n")
+    assert wait_for(lambda: calls)
+    append(path, "second\n")
+    time.sleep(0.2)
+    assert len(calls) == 1
+    release.set()
+    assert wait_for(lambda: len(calls) == 2)
+
+
+def test_watch_directory(watcher, tmp_path):
+    calls = []
+    watcher.watch_directory(tmp_path, calls.append)
+
+    (tmp_path / "new_file.txt").write_text("x")
+    assert wait_for(lambda: calls)
+    assert calls[0] == os.fspath(tmp_path)
+
+
+def test_unwatch_owner(watcher, tmp_path):
+    owner = object()
+    calls = []
+    watcher.watch_file(tmp_path / "a.log", calls.append, owner=owner)
+    watcher.watch_file(tmp_path / "b.log", calls.append, owner=owner)
+    other = watcher.watch_file(tmp_path / "c.log", calls.append)
+    assert len(watcher.watches(owner)) == 2
+
+    watcher.unwatch_owner(owner)
+    assert watcher.watches() == [other]
+    append(tmp_path / "a.log", "x")
+    time.sleep(0.3)
+    assert calls == []
+
+
+def test_handler_runs_on_registering_loop(watcher, tmp_path):
+    path = tmp_path / "program.log"
+    threads = []
+    done = threading.Event()
+
+    async def register_and_wait():
+        async def handler(p):
+            threads.append(threading.current_thread())
+            done.set()
+
+        watcher.watch_file(path, handler)
+        await asyncio.get_running_loop().run_in_executor(None, append, path, "x")
+        await asyncio.get_running_loop().run_in_executor(None, done.wait, 5)
+        return threading.current_thread()
+
+    plugin_thread = asyncio.run(register_and_wait())
+    assert threads == [plugin_thread]
+
+
+def test_plugin_watches_released_on_finish(tmp_path):
+    from core.CCP4PluginScript import CPluginScript
+    from core.file_watcher import FILE_WATCHER
+
+    plugin = CPluginScript(workDirectory=str(tmp_path), name="watch_test", dummy=True)
+    log_path = tmp_path / "watched.log"
+    calls = []
+    plugin.watchFile(str(log_path), handler=calls.append, minDeltaSize=5)
+    plugin.watchDirectory(str(tmp_path), handler=lambda path: None)
+    assert len(FILE_WATCHER().watches(plugin)) == 2
+
+    append(log_path, "grown by more than five bytes\n")
+    assert wait_for(lambda: calls == [str(log_path)])
+
+    plugin.reportStatus(CPluginScript.SUCCEEDED)
+    assert FILE_WATCHER().watches(plugin) == []
+    assert plugin.watchedFiles() == {}
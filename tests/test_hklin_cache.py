@@ -0,0 +1,218 @@
+"""Tests for the content-addressed HKLIN cache (core.hklin_cache)."""
+
+import os
+import shutil
+from pathlib import Path
+
+import gemmi
+import numpy as np
+import pytest
+
+from core import CCP4Utils, hklin_cache
+from core.CCP4PluginScript import CPluginScript
+from core.CCP4XtalData import CPhsDataFile
+from core.CPurgeProject import CPurgeProject
+from core.base_object.base_classes import CContainer
+from core.base_object.fundamental_types import CInt
+from core.hklin_cache import HklinCache, file_digest, project_directory_for
+
+DEMO_DATA = Path(__file__).parent.parent / "demo_data"
+
+
+class MockObsDataFile:
+    CONTENT_FLAG_FMEAN = 4
+    CONTENT_SIGNATURE_LIST = [
+        ['Iplus', 'SIGIplus', 'Iminus', 'SIGIminus'],
+        ['Fplus', 'SIGFplus', 'Fminus', 'SIGFminus'],
+        ['I', 'SIGI'],
+        ['F', 'SIGF'],
+    ]
+
+    def __init__(self, path, content_flag=4):
+        self._path = path
+        self.contentFlag = CInt(content_flag)
+
+    def getFullPath(self):
+        return self._path
+
+
+class MockFreeRDataFile(MockObsDataFile):
+    CONTENT_FLAG_FREER = 1
+    CONTENT_SIGNATURE_LIST = [['FREER']]
+
+
+def write_mtz(path, columns, seed=0):
+    mtz = gemmi.Mtz(with_base=True)
+    mtz.spacegroup = gemmi.find_spacegroup_by_name("P 21 21 21")
+    mtz.set_cell_for_all(gemmi.UnitCell(50, 60, 70, 90, 90, 90))
+    mtz.add_dataset("test_dataset")
+    for label, col_type in columns:
+        mtz.add_column(label, col_type)
+    hkl = gemmi.make_miller_array(mtz.cell, mtz.spacegroup, 6.0)
+    values = np.random.default_rng(seed).random((len(hkl), len(columns))) * 100
+    mtz.set_data(np.column_stack([hkl, values]).astype(np.float32))
+    mtz.update_reso()
+    mtz.write_to_file(str(path))
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    imported = tmp_path / "CCP4_IMPORTED_FILES"
+    imported.mkdir()
+    write_mtz(imported / "obs.mtz", [("F", "F"), ("SIGF", "Q")])
+    write_mtz(imported / "freer.mtz", [("FREER", "I")], seed=1)
+    return tmp_path
+
+
+def make_plugin(project, job_number):
+    work_directory = project / "CCP4_JOBS" / f"job_{job_number}"
+    work_directory.mkdir(parents=True)
+    script = CPluginScript()
+    script.workDirectory = work_directory
+    script.container.inputData = CContainer(name="inputData")
+    script.container.inputData.HKLIN1 = MockObsDataFile(project / "CCP4_IMPORTED_FILES" / "obs.mtz")
+    script.container.inputData.FREERFLAG = MockFreeRDataFile(
+        project / "CCP4_IMPORTED_FILES" / "freer.mtz", content_flag=1)
+    script.container.outputData = CContainer(name="outputData")
+    return script
+
+
+def test_project_directory_for(tmp_path):
+    assert project_directory_for(tmp_path / "CCP4_JOBS" / "job_1" / "job_2" / "x.mtz") == tmp_path
+    assert project_directory_for(tmp_path / "CCP4_IMPORTED_FILES" / "x.mtz") == tmp_path
+    assert project_directory_for(tmp_path / "elsewhere" / "x.mtz") is None
+
+
+def test_file_digest_follows_content(tmp_path):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"one")
+    first = file_digest(path)
+    assert file_digest(path) == first
+    path.write_bytes(b"two")
+    os.utime(path, ns=(1, 1))
+    assert file_digest(path) != first
+
+
+def test_rerun_is_served_from_cache(project, monkeypatch):
+    first = make_plugin(project, 1).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+
+    merges = []
+    merge_mtz_files = CCP4Utils.merge_mtz_files
+
+    def counting_merge(**kwargs):
+        merges.append(kwargs)
+        return merge_mtz_files(**kwargs)
+
+    monkeypatch.setattr(CCP4Utils, "merge_mtz_files", counting_merge)
+    second = make_plugin(project, 2).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+
+    assert merges == []
+    assert second == project / "CCP4_JOBS" / "job_2" / "hklin.mtz"
+    assert second.read_bytes() == first.read_bytes()
+    assert gemmi.read_mtz_file(str(second)).column_labels() == [
+        'H', 'K', 'L', 'HKLIN1_F', 'HKLIN1_SIGF', 'FREERFLAG_FREER']
+
+    # Different column mappings or strategy are different entries
+    make_plugin(project, 3).makeHklinGemmi([{'name': 'HKLIN1', 'rename': 'identity'}, 'FREERFLAG'])
+    make_plugin(project, 4).makeHklinGemmi(['HKLIN1', 'FREERFLAG'], merge_strategy='last')
+    assert len(merges) == 2
+
+
+def test_changed_input_misses(project):
+    first = make_plugin(project, 1).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+    write_mtz(project / "CCP4_IMPORTED_FILES" / "obs.mtz", [("F", "F"), ("SIGF", "Q")], seed=5)
+    second = make_plugin(project, 2).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+    assert second.read_bytes() != first.read_bytes()
+    assert len(list((project / hklin_cache.HKLIN_CACHE_SUBDIRECTORY).glob("*.mtz"))) == 2
+
+
+def test_modified_entry_is_not_served(project):
+    first = make_plugin(project, 1).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+    expected = first.read_bytes()
+    # Rewriting the job's file in place also changes a hardlinked entry
+    with open(first, "r+b") as stream:
+        stream.truncate(len(expected) // 2)
+
+    second = make_plugin(project, 2).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+    assert second.read_bytes() == expected
+
+
+def test_lru_eviction(tmp_path):
+    cache = HklinCache(tmp_path / "cache", max_bytes=250)
+    sources = []
+    for index in range(3):
+        source = tmp_path / f"source{index}.mtz"
+        source.write_bytes(bytes([index]) * 100)
+        sources.append(source)
+
+    cache.store("a", sources[0])
+    cache.store("b", sources[1])
+    os.utime(cache.directory / "a.json", (1, 1))
+    os.utime(cache.directory / "b.json", (2, 2))
+    assert cache.fetch("a", tmp_path / "use_a.mtz")
+    cache.store("c", sources[2])
+
+    assert not cache.fetch("b", tmp_path / "use_b.mtz")
+    assert cache.fetch("a", tmp_path / "use_a.mtz")
+    assert cache.fetch("c", tmp_path / "use_c.mtz")
+    assert cache.size() == 200
+
+
+def test_get_or_build_does_not_write_through_links(tmp_path):
+    cache = HklinCache(tmp_path / "cache")
+    dest = tmp_path / "hklin.mtz"
+
+    def build(content):
+        def write():
+            dest.write_bytes(content)
+            return dest
+        return write
+
+    cache.get_or_build("one", dest, build(b"first"))
+    cache.get_or_build("one", dest, build(b"unused"))
+    cache.get_or_build("two", dest, build(b"second"))
+    assert dest.read_bytes() == b"second"
+    assert (cache.directory / "one.mtz").read_bytes() == b"first"
+
+
+def test_purge(project):
+    make_plugin(project, 1).makeHklinGemmi(['HKLIN1', 'FREERFLAG'])
+    cache = HklinCache.for_project(project)
+    size = cache.size()
+    assert size > 0
+
+    stats = CPurgeProject().purgeHklinCache(projectDirectory=str(project), reportMode="skip")
+    assert stats['files_deleted'] == 1
+    assert stats['bytes_freed'] >= size
+    assert stats['errors'] == 0
+    assert cache.size() == 0
+    # The job's copy survives
+    assert (project / "CCP4_JOBS" / "job_1" / "hklin.mtz").exists()
+
+
+def test_conversion_is_memoized(project, monkeypatch):
+    imported = project / "CCP4_IMPORTED_FILES"
+    shutil.copy(DEMO_DATA / "gamma" / "initial_phases_as_PHIFOM.mtz", imported / "phases.mtz")
+
+    def phase_file():
+        phases = CPhsDataFile()
+        phases.setFullPath(str(imported / "phases.mtz"))
+        phases.setContentFlag()
+        return phases
+
+    work_directory = project / "CCP4_JOBS" / "job_1"
+    work_directory.mkdir(parents=True)
+    first = phase_file().as_HL(work_directory)
+    expected = Path(first).read_bytes()
+    os.remove(first)
+
+    from core.conversions import PhaseDataConverter
+
+    def fail(*args, **kwargs):
+        raise AssertionError("conversion should have been served from the cache")
+
+    monkeypatch.setattr(PhaseDataConverter, "to_hl", fail)
+    second = phase_file().as_HL(work_directory)
+    assert second == first
+    assert Path(second).read_bytes() == expected
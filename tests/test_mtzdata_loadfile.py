@@ -137,5 +137,72 @@ class TestCMtzDataLoadFile:
         assert True
 
 
+DEMO_MTZ = Path(__file__).resolve().parent.parent / 'demo_data' / 'gere' / 'gere_nat.mtz'
+
+
+@pytest.mark.skipif(not DEMO_MTZ.exists(), reason="Demo MTZ file not available")
+class TestHeaderOnlyLoad:
+    """loadFile() reads only the MTZ header, cached by path, size and mtime."""
+
+    def test_metadata_matches_full_read(self):
+        import gemmi
+
+        mtz_data = CMtzData()
+        error = mtz_data.loadFile(str(DEMO_MTZ))
+        assert error.count() == 0
+
+        full = gemmi.read_mtz_file(str(DEMO_MTZ))
+        full.update_reso()
+        assert mtz_data.resolutionRange.high.value == pytest.approx(full.resolution_high(), abs=1e-4)
+        assert mtz_data.resolutionRange.low.value == pytest.approx(full.resolution_low(), abs=1e-4)
+        assert mtz_data.cell.a.value == pytest.approx(full.cell.a)
+        assert mtz_data.spaceGroup.value == full.spacegroup.hm
+        assert mtz_data.getListOfColumns() == full.column_labels()
+
+        # Reflections are read only on request
+        assert mtz_data._gemmi_mtz.array.shape[0] == 0
+        reflections = mtz_data.loadReflections()
+        assert reflections.array.shape == full.array.shape
+
+    def test_header_cache_tracks_file_changes(self, tmp_path):
+        import os
+        import shutil
+        import gemmi
+        from core.mtz_metadata import (
+            clear_mtz_header_cache,
+            mtz_header_cache_info,
+            read_mtz_header,
+        )
+
+        path = tmp_path / 'copy.mtz'
+        shutil.copy(DEMO_MTZ, path)
+        clear_mtz_header_cache()
+
+        first = read_mtz_header(path)
+        assert read_mtz_header(str(path)) is first
+        assert mtz_header_cache_info() == {'hits': 1, 'misses': 1, 'size': 1}
+
+        # Rewriting the file invalidates the cached header
+        stat = path.stat()
+        rewritten = gemmi.read_mtz_file(str(path))
+        rewritten.title = 'rewritten'
+        rewritten.write_to_file(str(path))
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert read_mtz_header(path).title == 'rewritten'
+        assert mtz_header_cache_info()['misses'] == 2
+
+    def test_file_content_property_uses_header(self):
+        from core.mtz_metadata import clear_mtz_header_cache, mtz_header_cache_info
+
+        clear_mtz_header_cache()
+        mtz_file = CMtzDataFile()
+        mtz_file.setFullPath(str(DEMO_MTZ))
+        content = mtz_file.fileContent
+        assert content.resolutionRange.high.value > 0
+        mtz_file.fileContent
+        CMtzData().loadFile(str(DEMO_MTZ))
+        assert mtz_header_cache_info()['misses'] == 1
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,104 @@
+"""Tests for the flattened CContainer path index."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.base_object.ccontainer import CContainer
+from core.base_object.fundamental_types import CInt, CList
+from core.CCP4ModelData import CPdbDataFile
+from core.CCP4PerformanceData import CRefinementPerformance
+from core.CCP4XtalData import CObsDataFile
+
+
+@pytest.fixture
+def container():
+    task = CContainer(name="prosmart_refmac")
+    input_data = task.addContent(CContainer, "inputData")
+    input_data.addObject(CPdbDataFile(name="XYZIN"))
+    files = input_data.addObject(CList(name="FILES"))
+    for _ in range(3):
+        files.append(CObsDataFile())
+    control = task.addContent(CContainer, "controlParameters")
+    control.addContent(CInt, "NCYCLES")
+    output_data = task.addContent(CContainer, "outputData")
+    output_data.addObject(CRefinementPerformance(name="PERFORMANCEINDICATOR"))
+    return task
+
+
+def test_paths_include_list_indices(container):
+    index = container.path_index()
+    files = container.inputData.FILES
+
+    assert index.get("inputData.FILES[1]") is files[1]
+    assert index.get("inputData.FILES[2].baseName") is files[2].baseName
+    assert index.get("controlParameters.NCYCLES") is container.controlParameters.NCYCLES
+    assert index.get("inputData.MISSING") is None
+    assert "inputData.XYZIN.baseName" in index.paths()
+
+
+def test_type_buckets(container):
+    index = container.path_index()
+    files = container.inputData.FILES
+
+    assert index.files() == [container.inputData.XYZIN, files[0], files[1], files[2]]
+    assert container.find_all_files() == index.files()
+    assert index.performance_indicators() == [container.outputData.PERFORMANCEINDICATOR]
+    assert index.of_type(CList) == [files]
+
+
+def test_index_follows_list_changes(container):
+    index = container.path_index()
+    files = container.inputData.FILES
+    first, second = files[0], files[1]
+
+    files.pop(0)
+    assert index.get("inputData.FILES[0]") is second
+    assert index.get("inputData.FILES[2]") is None
+    assert first not in index.files()
+
+    files.append(CObsDataFile())
+    assert index.get("inputData.FILES[2]") is files[2]
+
+    files.remove(second)
+    files.clear()
+    assert index.get("inputData.FILES[0]") is None
+    assert container.find_all_files() == [container.inputData.XYZIN]
+
+
+def test_index_follows_container_changes(container):
+    index = container.path_index()
+    assert len(index.files()) == 4
+
+    container.inputData.deleteObject("XYZIN")
+    assert index.get("inputData.XYZIN") is None
+    assert len(index.files()) == 3
+
+    hklin = container.inputData.addObject(CObsDataFile(name="HKLIN"))
+    assert index.get("inputData.HKLIN") is hklin
+    assert container.find_by_path("prosmart_refmac.inputData.HKLIN") is hklin
+
+
+def test_find_by_path_with_and_without_index(container):
+    files = container.inputData.FILES
+    expected = container.find_by_path("prosmart_refmac.inputData.FILES[1].baseName")
+
+    container.path_index()
+    assert container.find_by_path("prosmart_refmac.inputData.FILES[1].baseName") is expected
+    assert expected is files[1].baseName
+    with pytest.raises(AttributeError):
+        container.find_by_path("inputData.MISSING", skip_first=False)
+
+
+def test_close_stops_listening(container):
+    index = container.path_index()
+    index.paths()
+    files = container.inputData.FILES
+    assert files.child_added.connection_count == 1
+
+    index.close()
+    assert files.child_added.connection_count == 0
+    assert index.get("inputData.FILES[0]") is files[0]
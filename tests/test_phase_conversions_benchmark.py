@@ -410,6 +410,161 @@ def test_benchmark_phifom_to_hl_vs_chltofom(tmp_path):
     print(f"{'=' * 70}\n")
 
 
+def reference_phifom_loop(hla, hlb, hlc, hld, samples=3600):
+    """Per-reflection centroid phase and FOM, integrated one reflection at a time."""
+    phi_samples = np.arange(samples) * (2 * np.pi / samples)
+    phi = np.zeros(len(hla))
+    fom = np.zeros(len(hla))
+    for i in range(len(hla)):
+        exponent = (hla[i] * np.cos(phi_samples) + hlb[i] * np.sin(phi_samples) +
+                    hlc[i] * np.cos(2 * phi_samples) + hld[i] * np.sin(2 * phi_samples))
+        prob = np.exp(exponent - exponent.max())
+        # Trapezoid rule over one period (the end points coincide)
+        total = prob.sum()
+        x = np.sum(prob * np.cos(phi_samples)) / total
+        y = np.sum(prob * np.sin(phi_samples)) / total
+        phi[i] = np.degrees(np.arctan2(y, x)) % 360.0
+        fom[i] = np.hypot(x, y)
+    return phi, fom
+
+
+def test_vectorized_engine_matches_reference_phifom():
+    """
+    Compare the vectorized HL → PHIFOM engine with the PHI/FOM reference
+    shipped in demo_data (initial_phases_as_PHIFOM.mtz, written by chltofom).
+    """
+    import time
+    import gemmi
+    from core.conversions.phase_data_converter import PhaseDataConverter
+
+    demo = Path(__file__).parent.parent / "demo_data" / "gamma"
+    hl_mtz = gemmi.read_mtz_file(str(demo / "initial_phases.mtz"))
+    ref_mtz = gemmi.read_mtz_file(str(demo / "initial_phases_as_PHIFOM.mtz"))
+    hl = [hl_mtz.array[:, hl_mtz.column_with_label(label).idx] for label in ("HLA", "HLB", "HLC", "HLD")]
+
+    start = time.perf_counter()
+    centric, centric_phase = PhaseDataConverter._centric_phases(hl_mtz)
+    phi, fom = PhaseDataConverter._hl_to_phifom_calculation(
+        *hl, centric=centric, centric_phase=centric_phase)
+    elapsed = time.perf_counter() - start
+    print(f"\nVectorized engine: {hl_mtz.nreflections} reflections in {elapsed * 1000:.1f} ms")
+
+    phi_ref = ref_mtz.array[:, ref_mtz.column_with_label("PHI").idx]
+    fom_ref = ref_mtz.array[:, ref_mtz.column_with_label("FOM").idx]
+    assert np.abs(fom - fom_ref).max() < 1e-5
+
+    # The phase of a reflection without phase information is arbitrary
+    informative = fom > 1e-6
+    phi_diff = np.abs(phi - phi_ref) % 360.0
+    phi_diff = np.minimum(phi_diff, 360.0 - phi_diff)
+    assert phi_diff[informative].max() < 0.01
+
+
+def test_vectorized_engine_benchmark_synthetic():
+    """
+    Time the vectorized engine on 200k reflections against a per-reflection
+    loop, and check both its integration paths against that loop.
+    """
+    import time
+    from core.conversions.phase_data_converter import PhaseDataConverter
+
+    rng = np.random.default_rng(2024)
+    n_reflections = 200_000
+    hl = rng.normal(0.0, 4.0, (4, n_reflections)).astype(np.float32)
+    hl[2:, : n_reflections // 2] = 0.0  # Half unimodal (C = D = 0)
+
+    start = time.perf_counter()
+    phi, fom = PhaseDataConverter._hl_to_phifom_calculation(*hl)
+    elapsed = time.perf_counter() - start
+
+    subset = rng.choice(n_reflections, 400, replace=False)
+    start = time.perf_counter()
+    phi_loop, fom_loop = reference_phifom_loop(*(x[subset] for x in hl))
+    loop_elapsed = (time.perf_counter() - start) * n_reflections / len(subset)
+
+    print(f"\nVectorized: {elapsed:.2f} s for {n_reflections} reflections")
+    print(f"Per-reflection loop (extrapolated): {loop_elapsed:.1f} s")
+
+    assert np.abs(fom[subset] - fom_loop).max() < 1e-6
+    phi_diff = np.abs(phi[subset] - phi_loop)
+    phi_diff = np.minimum(phi_diff, 360.0 - phi_diff)
+    assert phi_diff[fom_loop > 1e-3].max() < 1e-3
+
+    # The I1/I0 table and the numerical integral agree on unimodal reflections
+    unimodal = slice(0, 1000)
+    phi_grid, fom_grid = PhaseDataConverter._hl_to_phifom_calculation(
+        *(x[unimodal] for x in hl), analytic=False)
+    assert np.abs(fom_grid - fom[unimodal]).max() < 1e-8
+
+    # Chunking does not change the result
+    phi_small, fom_small = PhaseDataConverter._hl_to_phifom_calculation(
+        *(x[:5000] for x in hl), chunk_bytes=64 * 1024)
+    np.testing.assert_array_equal(fom_small, fom[:5000])
+    np.testing.assert_array_equal(phi_small, phi[:5000])
+
+
+def test_vectorized_phifom_to_hl_roundtrip():
+    """PHIFOM → HL → PHIFOM reproduces phases and FOMs, centric or not."""
+    from core.conversions.phase_data_converter import PhaseDataConverter
+
+    rng = np.random.default_rng(7)
+    n_reflections = 10_000
+    centric = rng.random(n_reflections) < 0.2
+    fom = rng.uniform(0.0, 0.99, n_reflections)
+    phi = rng.uniform(0.0, 360.0, n_reflections)
+    centric_phase = np.radians(phi)
+
+    hla, hlb, hlc, hld = PhaseDataConverter._phifom_to_hl_calculation(phi, fom, centric=centric)
+    assert not np.any(hlc) and not np.any(hld)
+    phi_back, fom_back = PhaseDataConverter._hl_to_phifom_calculation(
+        hla, hlb, hlc, hld, centric=centric, centric_phase=centric_phase)
+
+    assert np.abs(fom_back - fom).max() < 1e-9
+    phi_diff = np.abs(phi_back - phi)
+    phi_diff = np.minimum(phi_diff, 360.0 - phi_diff)
+    assert phi_diff[fom > 1e-6].max() < 1e-6
+
+
+@pytest.mark.skipif(
+    'CCP4I2_ROOT' not in os.environ,
+    reason="CCP4I2_ROOT environment variable not set"
+)
+@pytest.mark.skipif(
+    not check_chltofom_available(),
+    reason="CCP4 chltofom not available"
+)
+def test_benchmark_engines_wall_time(tmp_path):
+    """Wall time and agreement of the numpy and chltofom engines on the same file."""
+    import time
+    from core.CCP4XtalData import CPhsDataFile
+    from core.conversions.phase_data_converter import PhaseDataConverter
+
+    input_file = os.path.join(os.environ["CCP4I2_ROOT"], "demo_data", "gamma", "initial_phases.mtz")
+    timings = {}
+    outputs = {}
+    for engine in ("numpy", "chltofom"):
+        hl_file = CPhsDataFile()
+        hl_file.setFullPath(input_file)
+        hl_file.setContentFlag()
+        work_directory = tmp_path / engine
+        work_directory.mkdir()
+        start = time.perf_counter()
+        outputs[engine] = PhaseDataConverter.to_phifom(
+            hl_file, work_directory=str(work_directory), engine=engine)
+        timings[engine] = time.perf_counter() - start
+
+    print(f"\nnumpy engine:    {timings['numpy']:.3f} s")
+    print(f"chltofom engine: {timings['chltofom']:.3f} s")
+
+    fom_numpy = get_mtz_data(outputs["numpy"], 'FOM')
+    fom_chltofom = get_mtz_data(outputs["chltofom"], 'FOM')
+    assert np.abs(fom_numpy - fom_chltofom).max() < 1e-4
+    informative = fom_chltofom > 1e-6
+    phi_numpy = get_mtz_data(outputs["numpy"], 'PHI')[informative]
+    phi_chltofom = get_mtz_data(outputs["chltofom"], 'PHI')[informative]
+    assert calculate_circular_rmsd(phi_numpy, phi_chltofom) < 0.1
+
+
 if __name__ == "__main__":
     # Allow running this test directly
     import sys
@@ -0,0 +1,264 @@
+"""
+Tests for incremental program.xml writing (core/program_xml.py).
+
+Also benchmarks the writer against reserialising the whole tree on every
+flush, as log scrapers used to do. Run directly for the numbers:
+
+    python tests/test_program_xml.py
+"""
+
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+from lxml import etree
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.program_xml import (
+    IncrementalXmlWriter,
+    parse_program_xml,
+    read_program_xml_changes,
+)
+
+
+def add_cycle(root, number):
+    cycle = etree.SubElement(root, 'Cycle')
+    etree.SubElement(cycle, 'number').text = str(number)
+    return cycle
+
+
+def canonical(element):
+    """Serialise (lxml or ElementTree) ignoring indentation whitespace."""
+    if isinstance(element, ET.Element):
+        element = etree.fromstring(ET.tostring(element))
+    else:
+        element = etree.fromstring(etree.tostring(element))
+    for node in element.iter():
+        if node.text is not None and not node.text.strip():
+            node.text = None
+        node.tail = None
+    return etree.tostring(element)
+
+
+def test_every_flush_is_well_formed(tmp_path):
+    path = tmp_path / 'program.xml'
+    root = etree.Element('REFMAC')
+    writer = IncrementalXmlWriter(path, root, interval=0)
+
+    for number in range(5):
+        cycle = add_cycle(root, number)
+        writer.checkpoint()
+        etree.SubElement(cycle, 'r_free').text = '0.%d' % number
+        writer.checkpoint()
+        assert canonical(etree.parse(str(path)).getroot()) == canonical(root)
+
+    writer.close()
+    assert canonical(parse_program_xml(path)) == canonical(root)
+
+
+def test_changes_since_cursor(tmp_path):
+    path = tmp_path / 'program.xml'
+    root = etree.Element('REFMAC', version='5.8')
+    writer = IncrementalXmlWriter(path, root, interval=0)
+
+    add_cycle(root, 0)
+    writer.checkpoint()
+    first = read_program_xml_changes(path)
+    assert first.reset
+    assert first.root.tag == 'REFMAC' and first.root.get('version') == '5.8'
+    assert first.appended == []
+    assert [cycle.findtext('number') for cycle in first.tail] == ['0']
+
+    add_cycle(root, 1)
+    add_cycle(root, 2)
+    writer.checkpoint()
+    second = read_program_xml_changes(path, since=first.cursor)
+    assert not second.reset
+    assert [cycle.findtext('number') for cycle in second.appended] == ['0', '1']
+    assert [cycle.findtext('number') for cycle in second.tail] == ['2']
+
+    # Nothing new: nothing appended, tail unchanged
+    third = read_program_xml_changes(path, since=second.cursor)
+    assert third.appended == [] and third.cursor == second.cursor
+    writer.close()
+
+
+def test_changed_committed_child_is_rewritten(tmp_path):
+    path = tmp_path / 'program.xml'
+    root = etree.Element('REFMAC')
+    writer = IncrementalXmlWriter(path, root, interval=0)
+
+    twinning = etree.SubElement(root, 'Twinning')
+    add_cycle(root, 0)
+    add_cycle(root, 1)
+    writer.checkpoint()
+    before = read_program_xml_changes(path)
+
+    # The scraper goes back and adds to an element that was already committed
+    etree.SubElement(twinning, 'TwinOperator').text = 'h,-k,-l'
+    add_cycle(root, 2)
+    writer.checkpoint()
+
+    after = read_program_xml_changes(path, since=before.cursor)
+    assert after.reset
+    assert after.appended[0].findtext('TwinOperator') == 'h,-k,-l'
+    assert canonical(etree.parse(str(path)).getroot()) == canonical(root)
+
+    # Removing children (scrapers clear and rebuild the tree) is picked up too
+    root.clear()
+    add_cycle(root, 9)
+    writer.checkpoint()
+    assert canonical(etree.parse(str(path)).getroot()) == canonical(root)
+    writer.close()
+
+
+def test_time_and_size_budget(tmp_path):
+    path = tmp_path / 'program.xml'
+    root = etree.Element('REFMAC')
+    writer = IncrementalXmlWriter(path, root, interval=3600, max_pending_bytes=1000)
+
+    add_cycle(root, 0)
+    assert writer.checkpoint()  # First checkpoint always writes
+    for number in range(1, 5):
+        add_cycle(root, number)
+        assert not writer.checkpoint()
+    assert writer.flushes == 1
+
+    # Enough committed bytes waiting exceeds the size budget
+    while not writer.checkpoint():
+        cycle = add_cycle(root, 0)
+        etree.SubElement(cycle, 'padding').text = 'x' * 100
+    assert writer.flushes == 2
+
+    writer.close()
+    assert canonical(parse_program_xml(path)) == canonical(root)
+
+
+def test_elementtree_and_namespaced_roots(tmp_path):
+    path = tmp_path / 'et.xml'
+    root = ET.Element('SERVALCAT')
+    with IncrementalXmlWriter(path, root, interval=0) as writer:
+        for number in range(3):
+            ET.SubElement(root, 'cycle', number=str(number))
+            writer.checkpoint()
+    assert [cycle.get('number') for cycle in parse_program_xml(path)] == ['0', '1', '2']
+
+    path = tmp_path / 'ns.xml'
+    root = etree.Element('{http://www.ccp4.ac.uk/ccp4ns}ccp4i2', nsmap={'ccp4': 'http://www.ccp4.ac.uk/ccp4ns'})
+    with IncrementalXmlWriter(path, root, interval=0) as writer:
+        for number in range(3):
+            etree.SubElement(root, '{http://www.ccp4.ac.uk/ccp4ns}item').text = str(number)
+            writer.checkpoint()
+    changes = read_program_xml_changes(path)
+    assert changes.root.tag == '{http://www.ccp4.ac.uk/ccp4ns}ccp4i2'
+    assert [item.text for item in changes.appended + changes.tail] == ['0', '1', '2']
+
+
+def test_file_without_checkpoint(tmp_path):
+    path = tmp_path / 'program.xml'
+    path.write_text('<REFMAC><Cycle/></REFMAC>')
+    assert read_program_xml_changes(path) is None
+    assert parse_program_xml(path).tag == 'REFMAC'
+
+
+def test_refmac_log_scraper_streams_to_program_xml(tmp_path):
+    """The refmac scraper publishes each cycle as its log lines arrive."""
+    from wrappers.refmac_i2.script.refmacLogScraper import logScraper
+
+    path = tmp_path / 'program.xml'
+    root = etree.Element('REFMAC')
+    writer = IncrementalXmlWriter(path, root, interval=0)
+    scraper = logScraper(xmlroot=root, flushXML=writer.checkpoint)
+
+    cursor = None
+    for cycle in range(3):
+        scraper.processLogChunk(
+            f"     CGMAT cycle number =      {cycle + 1}\n"
+            f"Overall R factor                     =     0.2{cycle}00\n"
+            f"Free R factor                        =     0.2{cycle + 5}00\n"
+        )
+        changes = read_program_xml_changes(path, since=cursor)
+        cursor = changes.cursor
+        assert changes.tail[-1].findtext('r_free') == f'0.2{cycle + 5}00'
+    writer.close()
+
+    cycles = parse_program_xml(path).findall('Cycle')
+    assert [cycle.findtext('r_factor') for cycle in cycles] == ['0.2000', '0.2100', '0.2200']
+
+
+def test_refmac_failure_closes_program_xml(tmp_path):
+    """A failed run still writes what was scraped since the last checkpoint."""
+    from core.CCP4PluginScript import CPluginScript
+    from wrappers.refmac_i2.script.refmac_i2 import refmac_i2
+
+    plugin = refmac_i2(workDirectory=str(tmp_path), name='refmac')
+    cycle = "     CGMAT cycle number =      {0}\nOverall R factor                     =     0.{1}\n"
+    # A live chunk opens the writer, so the final scrape falls within its interval
+    plugin.logScraper.processLogChunk(cycle.format(1, 2000))
+    with open(plugin.makeFileName('LOG'), 'w') as log:
+        log.write(cycle.format(1, 2000) + cycle.format(2, 1900))
+
+    # No process was started, so the exit status cannot be recovered
+    assert plugin.processOutputFiles() == CPluginScript.FAILED
+    assert plugin.xmlWriter is None
+    cycles = parse_program_xml(plugin.makeFileName('PROGRAMXML')).findall('Cycle')
+    assert [cycle.findtext('r_factor') for cycle in cycles] == ['0.2000', '0.1900']
+
+
+def run_benchmark(cycles=300):
+    """Compare full reserialisation with the incremental writer for one run."""
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # What refmac_i2.flushXML used to do on every trigger
+        root = etree.Element('REFMAC')
+        path = os.path.join(tmpdir, 'full.xml')
+        written = 0
+        start = time.perf_counter()
+        for number in range(cycles):
+            cycle = add_cycle(root, number)
+            for tag in ('WeightUsed', 'r_factor', 'r_free', 'rmsBonds'):
+                etree.SubElement(cycle, tag).text = '0.1234'
+                data = etree.tostring(root, pretty_print=True)
+                with open(path + '_tmp', 'wb') as handle:
+                    handle.write(data)
+                os.replace(path + '_tmp', path)
+                written += len(data)
+        results['full'] = (time.perf_counter() - start, written)
+
+        root = etree.Element('REFMAC')
+        writer = IncrementalXmlWriter(os.path.join(tmpdir, 'incremental.xml'), root, interval=0)
+        start = time.perf_counter()
+        for number in range(cycles):
+            cycle = add_cycle(root, number)
+            for tag in ('WeightUsed', 'r_factor', 'r_free', 'rmsBonds'):
+                etree.SubElement(cycle, tag).text = '0.1234'
+                writer.checkpoint()
+        writer.close(rewrite=False)
+        results['incremental'] = (time.perf_counter() - start, writer.bytes_written)
+    return results
+
+
+def print_report(results, cycles=300):
+    print("\n" + "=" * 70)
+    print(f"BENCHMARK: publishing program.xml over {cycles} refinement cycles")
+    print("=" * 70)
+    for label, (seconds, written) in results.items():
+        print(f"{label:12s} {seconds * 1000:10.1f} ms {written / 1e6:10.2f} MB written")
+    print("=" * 70)
+
+
+def test_benchmark_incremental_writer():
+    results = run_benchmark()
+    print_report(results)
+    # Bytes written grow linearly instead of quadratically with cycles
+    assert results['incremental'][1] * 20 < results['full'][1]
+
+
+if __name__ == '__main__':
+    print_report(run_benchmark())
@@ -0,0 +1,120 @@
+"""Tests for split_mtz_files / split_mtz_file utility functions."""
+
+import pytest
+
+import gemmi
+import numpy as np
+
+from core.CCP4Utils import MtzSplitSource, split_mtz_file, split_mtz_files
+
+
+@pytest.fixture
+def hklout(tmp_path):
+    """An HKLOUT-like MTZ with observations, phases and a free-R flag, not in the ASU."""
+    mtz = gemmi.Mtz(with_base=True)
+    mtz.spacegroup = gemmi.find_spacegroup_by_name("P 21 21 21")
+    mtz.set_cell_for_all(gemmi.UnitCell(30, 35, 40, 90, 90, 90))
+    mtz.add_dataset("refined")
+    for label, col_type in [("FP", "F"), ("SIGFP", "Q"), ("FWT", "F"), ("PHWT", "P"),
+                            ("HLA", "A"), ("HLB", "A"), ("HLC", "A"), ("HLD", "A"),
+                            ("FreeR_flag", "I")]:
+        mtz.add_column(label, col_type)
+
+    hkl = gemmi.make_miller_array(mtz.cell, mtz.spacegroup, 3.0)
+    # Leave reflections out and move some to another asymmetric unit
+    hkl = hkl[::2].copy()
+    hkl[::3] *= -1
+    rng = np.random.default_rng(0)
+    values = rng.random((len(hkl), 9)) * 100
+    mtz.set_data(np.column_stack([hkl, values]).astype(np.float32))
+    mtz.update_reso()
+
+    path = tmp_path / "hklout.mtz"
+    mtz.write_to_file(str(path))
+    return path
+
+
+def read_columns(path):
+    mtz = gemmi.read_mtz_file(str(path))
+    return mtz, {column.label: column.array for column in mtz.columns}
+
+
+def test_split_mtz_files_writes_all_outputs(hklout, tmp_path):
+    outputs = [
+        (tmp_path / "fobs.mtz", {"FP": "F", "SIGFP": "SIGF"}),
+        (tmp_path / "fphi.mtz", {"FWT": "F", "PHWT": "PHI"}),
+        (tmp_path / "abcd.mtz", {"HLA": "HLA", "HLB": "HLB", "HLC": "HLC", "HLD": "HLD"}),
+        (tmp_path / "freer.mtz", {"FreeR_flag": "FREER"}),
+    ]
+    paths = split_mtz_files(hklout, outputs)
+    assert paths == [path for path, _ in outputs]
+
+    source = gemmi.read_mtz_file(str(hklout))
+    source.ensure_asu()
+    source_hkl = {tuple(h): i for i, h in enumerate(source.make_miller_array())}
+
+    mtz, columns = read_columns(tmp_path / "fphi.mtz")
+    assert mtz.column_labels() == ["H", "K", "L", "F", "PHI"]
+    assert [column.type for column in mtz.columns] == ["H", "H", "H", "F", "P"]
+    # Complete unique set; reflections missing from the input are NaN
+    hkl = mtz.make_miller_array()
+    assert len(hkl) > len(source_hkl)
+    rows = np.array([source_hkl.get(tuple(h), -1) for h in hkl])
+    present = rows >= 0
+    # (input reflections on the resolution limits may fall outside the set)
+    assert present.sum() >= len(source_hkl) - 5
+    np.testing.assert_array_equal(columns["F"][present],
+                                  source.column_with_label("FWT").array[rows[present]])
+    assert np.isnan(columns["PHI"][~present]).all()
+
+
+def test_split_mtz_files_matches_single_splits(hklout, tmp_path):
+    mapping = {"FP": "F", "SIGFP": "SIGF"}
+    split_mtz_files(hklout, [(tmp_path / "batched.mtz", mapping)], max_workers=4)
+    split_mtz_file(hklout, tmp_path / "single.mtz", mapping)
+
+    batched = gemmi.read_mtz_file(str(tmp_path / "batched.mtz"))
+    single = gemmi.read_mtz_file(str(tmp_path / "single.mtz"))
+    np.testing.assert_array_equal(batched.array, single.array)
+
+
+def test_threaded_split(hklout, tmp_path):
+    outputs = [(tmp_path / f"out{i}.mtz", {label: "F"})
+               for i, label in enumerate(["FP", "SIGFP", "FWT", "HLA", "HLB", "HLC"])]
+    split_mtz_files(hklout, outputs, max_workers=3)
+
+    source = MtzSplitSource(hklout)
+    for (path, mapping), label in zip(outputs, ["FP", "SIGFP", "FWT", "HLA", "HLB", "HLC"]):
+        _, columns = read_columns(path)
+        expected = np.full(len(source.uniques), np.nan, dtype=np.float32)
+        present = source.rows >= 0
+        expected[present] = source.mtz.column_with_label(label).array[source.rows[present]]
+        np.testing.assert_array_equal(columns["F"], expected)
+
+
+def test_missing_column_fails_before_writing(hklout, tmp_path):
+    outputs = [
+        (tmp_path / "fobs.mtz", {"FP": "F", "SIGFP": "SIGF"}),
+        (tmp_path / "bad.mtz", {"NOT_THERE": "X"}),
+    ]
+    with pytest.raises(ValueError, match="NOT_THERE"):
+        split_mtz_files(hklout, outputs)
+    assert not (tmp_path / "fobs.mtz").exists()
+
+
+def test_missing_input(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        split_mtz_files(tmp_path / "missing.mtz", [(tmp_path / "out.mtz", {"F": "F"})])
+
+
+def test_input_read_once(hklout, tmp_path, monkeypatch):
+    reads = []
+    read_mtz_file = gemmi.read_mtz_file
+
+    def counting_read(path, *args, **kwargs):
+        reads.append(path)
+        return read_mtz_file(path, *args, **kwargs)
+
+    monkeypatch.setattr(gemmi, "read_mtz_file", counting_read)
+    split_mtz_files(hklout, [(tmp_path / f"out{i}.mtz", {"FP": "F"}) for i in range(5)])
+    assert reads == [str(hklout)]
@@ -0,0 +1,72 @@
+"""Tests for the process-wide task catalog shared by CTaskManager instances."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from core.CCP4TaskManager import CTaskManager, TASKMANAGER
+from core.task_manager.task_catalog import TaskCatalog, get_task_catalog
+
+
+def test_task_managers_share_catalog():
+    first, second = CTaskManager(), CTaskManager()
+    assert first.catalog is second.catalog is TASKMANAGER().catalog is get_task_catalog()
+    assert first.plugin_lookup is second.plugin_lookup
+    with pytest.raises(TypeError):
+        first.plugin_lookup["new_task"] = {}
+
+
+def test_def_xml_index_matches_lookup_file():
+    catalog = get_task_catalog()
+    path = CTaskManager().locate_def_xml("pointless")
+    assert path is not None and path.name == "pointless.def.xml" and path.exists()
+    assert CTaskManager().locate_def_xml("nonexistent_plugin_xyz") is None
+    # Every task of the lookup file with an existing file is indexed
+    names = {entry["pluginName"] for entry in catalog.defxml_lookup}
+    assert set(catalog.def_xml_paths) <= names
+    assert len(catalog.def_xml_paths) > 100
+
+
+def test_catalog_indexes_by_task_name():
+    catalog = get_task_catalog()
+    assert catalog.task_modules["pointless"] == CTaskManager()._get_task_module(
+        "pointless", catalog.plugin_lookup["pointless"]
+    )
+    assert catalog.plugin_metadata["pointless"]["TASKNAME"] == "pointless"
+    assert "_import_module" in catalog.plugin_metadata["pointless"]
+    report_name = next(iter(catalog.report_metadata))
+    assert catalog.report_metadata[report_name] is CTaskManager().get_report_metadata(report_name)
+
+
+def test_task_tree_is_built_once(tmp_path):
+    for name, content in [
+        ("defxml_lookup.json", []),
+        ("plugin_lookup.json", {
+            "alpha": {"TASKMODULE": "refinement", "TASKTITLE": "Alpha"},
+            "beta": {"TASKMODULE": "Expt data util", "TASKTITLE": "Beta"},
+        }),
+        ("task_module_map.json", {"_comment": "ignored", "alpha": "validation"}),
+        ("task_metadata.json", {"beta": {"DESCRIPTION": "Second task"}}),
+    ]:
+        (tmp_path / name).write_text(json.dumps(content))
+    catalog = TaskCatalog(str(tmp_path))
+    assert dict(catalog.task_modules) == {"alpha": "validation", "beta": "expt_data_utility"}
+
+    manager = CTaskManager()
+    manager.catalog = catalog
+    manager.plugin_lookup = catalog.plugin_lookup
+    manager.task_module_map = catalog.task_module_map
+    manager.task_metadata = catalog.task_metadata
+
+    tree = manager.task_tree()
+    assert [module for module, _, _ in tree] == ["validation", "expt_data_utility"]
+    tree[0][2].append("mutated")
+    assert manager.task_tree()[0][2] == ["alpha"]
+    assert manager.task_lookup["beta"]["0.0"]["DESCRIPTION"] == "Second task"
+    calls = []
+    assert catalog.derived("task_lookup", lambda: calls.append(1)) is not None
+    assert not calls
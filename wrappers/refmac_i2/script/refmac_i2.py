@@ -49,13 +49,14 @@ class refmac_i2(CPluginScript):
         self.xmlroot = etree.Element('REFMAC')
         from .refmacLogScraper import logScraper
         self.logScraper = logScraper(xmlroot=self.xmlroot, flushXML=self.flushXML)
-        self.xmlLength = 0
+        self.xmlWriter = None
 
     @QtCore.Slot()
     def handleReadyReadStandardOutput(self):
         if not hasattr(self,'logFileHandle'):
             logFilePath = pathlib.Path(self.makeFileName('LOG'))
-            self.logFileHandle = logFilePath.open('w')
+            # After the header written by CPluginScript when run synchronously
+            self.logFileHandle = logFilePath.open('a')
         if not hasattr(self,'errFileHandle'):
             logFilePath = pathlib.Path(self.makeFileName('LOG'))
             errFilePath = logFilePath.with_stem(logFilePath.stem + "_err")
@@ -73,17 +74,11 @@ class refmac_i2(CPluginScript):
         self.logScraper.processLogChunk(availableStdout.data().decode("utf-8"))
     
     def flushXML(self):
-        newXml = etree.tostring(self.xmlroot,pretty_print=True)
-        if len(newXml)>self.xmlLength:
-            self.xmlLength = len(newXml)
-            with open (self.makeFileName('PROGRAMXML')+'_tmp','w') as programXmlFile:
-                import sys
-                if sys.version_info > (3,0):
-                    programXmlFile.write(newXml.decode("utf-8"))
-                else:
-                    programXmlFile.write(newXml)
-            import shutil
-            shutil.move(self.makeFileName('PROGRAMXML')+'_tmp', self.makeFileName('PROGRAMXML'))
+        # Append to program.xml instead of reserialising the whole tree each time
+        if self.xmlWriter is None:
+            from core.program_xml import IncrementalXmlWriter
+            self.xmlWriter = IncrementalXmlWriter(self.makeFileName('PROGRAMXML'), self.xmlroot)
+        self.xmlWriter.checkpoint()
 
     def processInputFiles(self):
         from core import CCP4XtalData
@@ -149,6 +144,12 @@ class refmac_i2(CPluginScript):
         else:
             self.xmlroot.clear()
             self.logScraper.scrapeFile( self.makeFileName('LOG') )
+
+        #Finish the live program.xml before any early return; on success it is
+        #replaced by the full report XML below
+        if self.xmlWriter is not None:
+            self.xmlWriter.close(rewrite=False)
+            self.xmlWriter = None
         
         #First up check for exit status of the program
         from core.CCP4Modules import PROCESSMANAGER
@@ -56,7 +56,8 @@ class servalcat(CPluginScript):
     def handleReadyReadStandardOutput(self):
         if not hasattr(self,'logFileHandle'):
             logFilePath = pathlib.Path(self.makeFileName('LOG'))
-            self.logFileHandle = logFilePath.open('w')
+            # After the header written by CPluginScript when run synchronously
+            self.logFileHandle = logFilePath.open('a')
         if not hasattr(self,'errFileHandle'):
             logFilePath = pathlib.Path(self.makeFileName('LOG'))
             errFilePath = logFilePath.with_stem(logFilePath.stem + "_err")